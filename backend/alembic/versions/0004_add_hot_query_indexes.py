@@ -0,0 +1,91 @@
+"""add indexes for hot queries
+
+Revision ID: 0004_add_hot_query_indexes
+Revises: 0003_remove_user_name_from_ratings
+Create Date: 2026-10-19 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0004_add_hot_query_indexes"
+down_revision: Union[str, None] = "0003_remove_user_name_from_ratings"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Перед уникальным индексом по games.name сливаем дубликаты игр:
+    # оставляем игру с BGG ID (а среди них — самую свежую),
+    # оценки дубликатов переносим на неё.
+    op.execute(
+        """
+        CREATE TEMPORARY TABLE game_duplicates AS
+        SELECT id, keep_id FROM (
+            SELECT
+                id,
+                first_value(id) OVER (
+                    PARTITION BY name
+                    ORDER BY (bgg_id IS NULL), updated_at DESC, id
+                ) AS keep_id
+            FROM games
+        ) ranked
+        WHERE id <> keep_id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM ratings r
+        USING game_duplicates d, ratings k
+        WHERE r.game_id = d.id
+          AND k.game_id = d.keep_id
+          AND k.user_id = r.user_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE ratings SET game_id = d.keep_id
+        FROM game_duplicates d
+        WHERE ratings.game_id = d.id
+        """
+    )
+    op.execute("DELETE FROM games USING game_duplicates d WHERE games.id = d.id")
+    op.execute("DROP TABLE game_duplicates")
+
+    # Удаляем повторные оценки одной игры одним пользователем (оставляем последнюю запись)
+    op.execute(
+        """
+        DELETE FROM ratings a
+        USING ratings b
+        WHERE a.user_id = b.user_id
+          AND a.game_id = b.game_id
+          AND a.ctid < b.ctid
+        """
+    )
+
+    # Проверка оценки при импорте и join в ранжировании: (user_id, game_id).
+    # Составной индекс покрывает и фильтр только по user_id, поэтому
+    # отдельный ix_ratings_user_id больше не нужен.
+    op.create_index("ix_ratings_user_id_game_id", "ratings", ["user_id", "game_id"], unique=True)
+    op.drop_index("ix_ratings_user_id", table_name="ratings")
+
+    # Поиск игры по названию при импорте и сохранении из BGG
+    op.create_index("ix_games_name", "games", ["name"], unique=True)
+
+    # Поиск пользователя по имени (имена могут совпадать — индекс не уникальный)
+    op.create_index("ix_users_name", "users", ["name"], unique=False)
+
+    # Индекс создан в 0002, но мог отсутствовать в базах, созданных через create_all
+    op.execute("CREATE INDEX IF NOT EXISTS ix_ranking_sessions_user_id ON ranking_sessions (user_id)")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_name", table_name="users")
+    op.drop_index("ix_games_name", table_name="games")
+    op.create_index("ix_ratings_user_id", "ratings", ["user_id"], unique=False)
+    op.drop_index("ix_ratings_user_id_game_id", table_name="ratings")
+    # ix_ranking_sessions_user_id относится к ревизии 0002 и остаётся на месте
+    # Слитые дубликаты игр и оценок не восстанавливаются
@@ -0,0 +1,26 @@
+"""add alternate names to games
+
+Revision ID: 0005_add_game_alternate_names
+Revises: 0004_add_hot_query_indexes
+Create Date: 2026-10-19 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0005_add_game_alternate_names"
+down_revision: Union[str, None] = "0004_add_hot_query_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Альтернативные названия из BGG для индекса подсказок по названиям
+    op.add_column("games", sa.Column("alternate_names", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("games", "alternate_names")
@@ -0,0 +1,41 @@
+"""add negative cache of names BGG cannot resolve
+
+Revision ID: 0006_add_bgg_unresolved_names
+Revises: 0005_add_game_alternate_names
+Create Date: 2026-10-19 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+revision: str = "0006_add_bgg_unresolved_names"
+down_revision: Union[str, None] = "0005_add_game_alternate_names"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "bgg_unresolved_names",
+        sa.Column("id", UUID(), server_default=sa.text("gen_random_uuid()"), nullable=False),
+        sa.Column("name_key", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("bgg_id", sa.Integer(), nullable=True),
+        sa.Column("last_checked_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("next_check_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_bgg_unresolved_names_id", "bgg_unresolved_names", ["id"], unique=False)
+    op.create_index("ix_bgg_unresolved_names_name_key", "bgg_unresolved_names", ["name_key"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bgg_unresolved_names_name_key", table_name="bgg_unresolved_names")
+    op.drop_index("ix_bgg_unresolved_names_id", table_name="bgg_unresolved_names")
+    op.drop_table("bgg_unresolved_names")
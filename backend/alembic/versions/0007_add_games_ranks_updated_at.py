@@ -0,0 +1,26 @@
+"""add ranks_updated_at to games
+
+Revision ID: 0007_add_games_ranks_updated_at
+Revises: 0006_add_bgg_unresolved_names
+Create Date: 2026-10-19 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0007_add_games_ranks_updated_at"
+down_revision: Union[str, None] = "0006_add_bgg_unresolved_names"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Время обновления ранга и статистики из выгрузки рангов BGG
+    op.add_column("games", sa.Column("ranks_updated_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("games", "ranks_updated_at")
@@ -0,0 +1,25 @@
+"""add index on games.updated_at
+
+Revision ID: 0008_add_games_updated_at_index
+Revises: 0007_add_games_ranks_updated_at
+Create Date: 2026-10-19 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0008_add_games_updated_at_index"
+down_revision: Union[str, None] = "0007_add_games_ranks_updated_at"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Выбор самых устаревших игр фоновым обновлением (ORDER BY updated_at LIMIT N)
+    op.create_index("ix_games_updated_at", "games", ["updated_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_games_updated_at", table_name="games")
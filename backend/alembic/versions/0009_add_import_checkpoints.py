@@ -0,0 +1,40 @@
+"""add import checkpoints
+
+Revision ID: 0009_add_import_checkpoints
+Revises: 0008_add_games_updated_at_index
+Create Date: 2026-10-19 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+revision: str = "0009_add_import_checkpoints"
+down_revision: Union[str, None] = "0008_add_games_updated_at_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "import_checkpoints",
+        sa.Column("id", UUID(), server_default=sa.text("gen_random_uuid()"), nullable=False),
+        sa.Column("fingerprint", sa.String(), nullable=False),
+        sa.Column("last_row", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_rows", sa.Integer(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_import_checkpoints_id", "import_checkpoints", ["id"], unique=False)
+    op.create_index("ix_import_checkpoints_fingerprint", "import_checkpoints", ["fingerprint"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_import_checkpoints_fingerprint", table_name="import_checkpoints")
+    op.drop_index("ix_import_checkpoints_id", table_name="import_checkpoints")
+    op.drop_table("import_checkpoints")
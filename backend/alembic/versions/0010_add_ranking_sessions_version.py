@@ -0,0 +1,28 @@
+"""add ranking sessions version
+
+Revision ID: 0010_add_ranking_sessions_version
+Revises: 0009_add_import_checkpoints
+Create Date: 2026-10-19 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0010_add_ranking_sessions_version"
+down_revision: Union[str, None] = "0009_add_import_checkpoints"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "ranking_sessions",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("ranking_sessions", "version")
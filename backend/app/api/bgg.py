@@ -1,10 +1,18 @@
 import logging
-from typing import List
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
+from app.infrastructure.db import get_db
+from app.infrastructure.repositories import delete_unresolved_name, list_unresolved_names, set_unresolved_override
 from app.services.bgg import search_boardgame, get_boardgame_details
+from app.services.fuzzy import score_candidates, similarity_tier
+from app.utils.retry import CircuitOpenError
 
 logger = logging.getLogger(__name__)
 
@@ -47,73 +55,104 @@ class BGGSearchResponse(BaseModel):
     games: List[BGGGameDetails]
 
 
+class UnresolvedName(BaseModel):
+    id: str
+    name: str
+    attempts: int
+    bgg_id: Optional[int] = None
+    last_checked_at: datetime
+    next_check_at: Optional[datetime] = None
+
+
+class UnresolvedNamesResponse(BaseModel):
+    names: List[UnresolvedName]
+
+
+class UnresolvedOverrideRequest(BaseModel):
+    # ID игры на BGG; null — снять сопоставление и проверить название при ближайшем импорте
+    bgg_id: Optional[int] = None
+
+
+def _unresolved_response(entry) -> UnresolvedName:
+    return UnresolvedName(
+        id=str(entry.id),
+        name=entry.name,
+        attempts=entry.attempts,
+        bgg_id=entry.bgg_id,
+        last_checked_at=entry.last_checked_at,
+        next_check_at=entry.next_check_at,
+    )
+
+
 @router.get("/bgg/search", response_model=BGGSearchResponse, tags=["bgg"])
 async def bgg_search(name: str, exact: bool = False, limit: int = 5) -> BGGSearchResponse:
     """
     Search for games on BGG by name with detailed information.
 
     Returns comprehensive game data including global rankings and image URLs.
+    BGG calls run in the thread pool, so concurrent identical searches
+    share one in-flight request instead of blocking the event loop.
 
     :param name: Game name to search for
     :param exact: If True, search for exact matches only
     :param limit: Maximum number of games to load details for (default: 5)
     """
-    print(f"🔍 BGG search API called: name='{name}', exact={exact}, limit={limit}", flush=True)
-    print(f"🔍 BGG API called: name='{name}', exact={exact}, limit={limit}", flush=True)
-    logger.info(f"API запрос на поиск игры: name='{name}', exact={exact}, limit={limit}")
+    logger.info("API запрос на поиск игры: name='%s', exact=%s, limit=%s", name, exact, limit)
     try:
         if exact:
             # Для точного поиска просто ищем
-            print(f"🎯 Doing exact search for '{name}'", flush=True)
-            found = search_boardgame(name, exact=True)
-            print(f"🎯 Exact search returned {len(found)} results", flush=True)
+            found = await run_in_threadpool(search_boardgame, name, exact=True)
         else:
             # Для нечеткого поиска: сначала ищем точно, потом добавляем результаты нечеткого поиска
-            print(f"🔄 Doing combined search for '{name}'", flush=True)
-            found = search_boardgame(name, exact=True)  # Начинаем с точных результатов
-            print(f"🎯 Exact part found {len(found)} results", flush=True)
-            fuzzy_results = search_boardgame(name, exact=False)  # Добавляем нечеткие результаты
-            print(f"🔍 Fuzzy part found {len(fuzzy_results)} results", flush=True)
+            found = await run_in_threadpool(search_boardgame, name, exact=True)  # Начинаем с точных результатов
+            logger.debug("Точный поиск дал %s результатов", len(found))
+            fuzzy_results = await run_in_threadpool(search_boardgame, name, exact=False)  # Добавляем нечеткие результаты
+            logger.debug("Нечёткий поиск дал %s результатов", len(fuzzy_results))
 
             # Убираем дубликаты по ID
             existing_ids = {item.get('id') for item in found}
             new_fuzzy_results = [item for item in fuzzy_results if item.get('id') not in existing_ids]
             found.extend(new_fuzzy_results)
-            print(f"📊 Combined results: {len(found)} total games", flush=True)
 
-        logger.info(f"Поиск BGG дал {len(found)} результатов для '{name}' (exact={exact})")
+        logger.info("Поиск BGG дал %s результатов для '%s' (exact=%s)", len(found), name, exact)
 
         if not found:
-            logger.warning(f"Поиск не дал результатов для: '{name}'")
+            logger.warning("Поиск не дал результатов для: '%s'", name)
             return BGGSearchResponse(games=[])
 
         # Загружаем детали для большего количества игр, чтобы иметь данные для сортировки
         # Берем в 3 раза больше, чем нужно, для лучшей сортировки
         candidates_limit = min(len(found), limit * 3)
-        logger.info(f"Найдено {len(found)} игр, загружаем детали для {candidates_limit} кандидатов для сортировки...")
+        logger.info("Найдено %s игр, загружаем детали для %s кандидатов для сортировки...", len(found), candidates_limit)
 
         candidates: List[BGGGameDetails] = []
         for idx, item in enumerate(found[:candidates_limit], 1):
             try:
                 game_id = item.get("id")
                 if not game_id:
-                    logger.warning(f"Пропущен item без id: {item}")
+                    logger.warning("Пропущен item без id: %s", item)
                     continue
-                logger.debug(f"Загрузка деталей игры {idx}/{candidates_limit}: game_id={game_id}")
-                details = get_boardgame_details(game_id)
+                logger.debug("Загрузка деталей игры %s/%s: game_id=%s", idx, candidates_limit, game_id)
+                details = await run_in_threadpool(get_boardgame_details, game_id)
                 candidates.append(BGGGameDetails(**details))
+            except CircuitOpenError:
+                raise
             except Exception as e:
-                logger.error(f"Error loading game details for game_id={item.get('id')}: {e}", exc_info=True)
+                logger.error("Error loading game details for game_id=%s: %s", item.get('id'), e, exc_info=True)
                 # Продолжаем обработку остальных игр
 
         # Сортируем результаты по релевантности:
         # 1. Сначала игры с точным совпадением названия (без учета регистра)
-        # 2. Затем по мировому рейтингу (меньше число = выше рейтинг)
-        # 3. Наконец по количеству голосов (больше = лучше)
-        def sort_key(game: BGGGameDetails) -> tuple:
+        # 2. Затем по группе схожести названия (та же оценка, что и при импорте)
+        # 3. Затем основные игры перед расширениями
+        # 4. Затем по мировому рейтингу (меньше число = выше рейтинг)
+        # 5. Наконец по количеству голосов (больше = лучше)
+        similarities = score_candidates(name, [game.name for game in candidates])
+
+        def sort_key(item: tuple) -> tuple:
+            game, similarity = item
             game_name = (game.name or '').lower()
-            query_name = name.lower()
-            exact_match = game_name == query_name
+            exact_match = game_name == name.lower()
 
             # Проверяем, является ли игра основной (не расширением)
             is_base_game = 'expansion' not in game_name and 'fan' not in game_name
@@ -121,19 +160,62 @@ async def bgg_search(name: str, exact: bool = False, limit: int = 5) -> BGGSearc
 
             rank = game.rank or 999999  # Если нет рейтинга, ставим в конец
             users_rated = game.usersrated or 0
-            return (0 if exact_match else 1, base_game_priority, rank, -users_rated)  # exact_match первым, затем основные игры, затем лучший рейтинг, затем больше голосов
+            return (0 if exact_match else 1, similarity_tier(similarity), base_game_priority, rank, -users_rated)
 
-        candidates_sorted = sorted(candidates, key=sort_key)
-        logger.info(f"Результаты отсортированы по релевантности. Первый результат: '{candidates_sorted[0].name}' (rank: {candidates_sorted[0].rank})")
+        candidates_sorted = [game for game, _ in sorted(zip(candidates, similarities), key=sort_key)]
+        logger.info("Результаты отсортированы по релевантности. Первый результат: '%s' (rank: %s)", candidates_sorted[0].name, candidates_sorted[0].rank)
 
         # Возвращаем только запрошенное количество лучших результатов
         games = candidates_sorted[:limit]
-        logger.info(f"Возвращаем {len(games)} лучших результатов из {len(candidates_sorted)} кандидатов")
+        logger.info("Возвращаем %s лучших результатов из %s кандидатов", len(games), len(candidates_sorted))
 
         return BGGSearchResponse(games=games)
+    except CircuitOpenError as exc:
+        logger.warning("BGG circuit is open, rejecting search: %s", exc)
+        raise HTTPException(
+            status_code=503,
+            detail=str(exc),
+            headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+        )
     except ValueError as exc:
-        logger.error(f"BGG configuration error: {exc}")
+        logger.error("BGG configuration error: %s", exc)
         raise HTTPException(status_code=500, detail=f"BGG configuration error: {exc}")
     except Exception as exc:  # noqa: BLE001
-        logger.error(f"Error accessing BGG API: {exc}", exc_info=True)
-        raise HTTPException(status_code=502, detail=f"Error accessing BGG API: {exc}")
\ No newline at end of file
+        logger.error("Error accessing BGG API: %s", exc, exc_info=True)
+        raise HTTPException(status_code=502, detail=f"Error accessing BGG API: {exc}")
+
+
+@router.get("/bgg/unresolved", response_model=UnresolvedNamesResponse, tags=["bgg"])
+async def get_unresolved_names(db: Session = Depends(get_db)) -> UnresolvedNamesResponse:
+    """
+    List imported game names that BGG could not resolve.
+
+    Import skips the BGG lookup for these names until next_check_at.
+    """
+    return UnresolvedNamesResponse(names=[_unresolved_response(entry) for entry in list_unresolved_names(db)])
+
+
+@router.put("/bgg/unresolved/{entry_id}", response_model=UnresolvedName, tags=["bgg"])
+async def override_unresolved_name(
+    entry_id: UUID,
+    request: UnresolvedOverrideRequest,
+    db: Session = Depends(get_db),
+) -> UnresolvedName:
+    """
+    Manually map an unresolved name to a BGG game.
+
+    With bgg_id set, import loads the game by that ID instead of searching by name.
+    With bgg_id=null, the mapping is removed and the name is searched on the next import.
+    """
+    entry = set_unresolved_override(db, entry_id, request.bgg_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Unresolved name not found")
+    return _unresolved_response(entry)
+
+
+@router.delete("/bgg/unresolved/{entry_id}", tags=["bgg"])
+async def delete_unresolved(entry_id: UUID, db: Session = Depends(get_db)) -> dict:
+    """Forget an unresolved name so the next import searches BGG for it again."""
+    if not delete_unresolved_name(db, entry_id):
+        raise HTTPException(status_code=404, detail="Unresolved name not found")
+    return {"status": "ok"}
@@ -4,8 +4,10 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from app.api.import_table import IMPORT_RUNNING_DETAIL
 from app.infrastructure.db import get_db
-from app.infrastructure.repositories import clear_all_data
+from app.infrastructure.repositories import ImportInProgressError, clear_all_data, import_lock, user_games_cache
+from app.services.game_index import game_index
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +27,25 @@ class ClearDatabaseResponse(BaseModel):
     message: str = ""
 
 
+class InvalidateCachesResponse(BaseModel):
+    status: str
+    message: str = ""
+
+
+@router.post("/invalidate-caches", response_model=InvalidateCachesResponse, tags=["admin"])
+async def invalidate_caches():
+    """
+    Drop in-process caches that mirror game data.
+
+    Call after changing games outside the API (e.g. scripts/import_bgg_ranks.py):
+    user game lists are re-read and the suggestion index is rebuilt on next use.
+    """
+    user_games_cache.clear()
+    game_index.invalidate()
+    logger.info("In-process game caches invalidated")
+    return InvalidateCachesResponse(status="ok", message="Кэши игр сброшены.")
+
+
 @router.post("/clear-database", response_model=ClearDatabaseResponse, tags=["admin"])
 async def clear_database(
     request: ClearDatabaseRequest,
@@ -35,6 +56,7 @@ async def clear_database(
 
     Removes all games, ratings, and ranking sessions, but preserves users.
     Requires explicit confirmation via confirm=true parameter.
+    Returns 409 while a table import is running: clearing would delete its checkpoint.
     """
     if not request.confirm:
         raise HTTPException(
@@ -44,8 +66,9 @@ async def clear_database(
 
     logger.info("Clear database request confirmed")
     try:
-        result = clear_all_data(db)
-        db.commit()
+        with import_lock(db):
+            result = clear_all_data(db)
+            db.commit()
         logger.info(f"Successfully cleared database: {result}")
 
         return ClearDatabaseResponse(
@@ -56,6 +79,9 @@ async def clear_database(
             users_deleted=result["users_deleted"],
             message="База данных успешно очищена. Пользователи сохранены."
         )
+    except ImportInProgressError:
+        logger.warning("Clear database rejected: a table import is running")
+        raise HTTPException(status_code=409, detail=IMPORT_RUNNING_DETAIL)
     except Exception as exc:  # noqa: BLE001
         db.rollback()
         logger.error(f"Error clearing database: {exc}", exc_info=True)
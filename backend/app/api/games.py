@@ -2,14 +2,16 @@ import logging
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException
+from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.infrastructure.db import get_db
 from app.infrastructure.models import GameModel
-from app.infrastructure.repositories import save_game_from_bgg_data
+from app.infrastructure.projections import full_game_query
+from app.infrastructure.repositories import index_entry, save_game_from_bgg_data
+from app.services.game_index import game_index
 from app.services.translation import translate_game_descriptions_background, translation_service
 
 logger = logging.getLogger(__name__)
@@ -54,6 +56,46 @@ class GamesSearchResponse(BaseModel):
     games: List[GameDetails]
 
 
+class GameSuggestionItem(BaseModel):
+    game_id: UUID
+    name: str
+    matched_name: str
+    score: int
+    bgg_id: int | None = None
+    bgg_rank: int | None = None
+    yearpublished: int | None = None
+    thumbnail: str | None = None
+
+
+class GameSuggestResponse(BaseModel):
+    query: str
+    suggestions: List[GameSuggestionItem]
+
+
+@router.get("/games/suggest", response_model=GameSuggestResponse, tags=["games"])
+async def suggest_games(
+    q: str,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+) -> GameSuggestResponse:
+    """
+    Autocomplete game names from the in-memory name index.
+
+    Matches name prefixes (including BGG alternate names) first, then
+    names with typos; the index is built from the database on first use.
+
+    :param q: Text typed so far
+    :param limit: Maximum number of suggestions to return
+    :param db: Database session (used only to build the index)
+    """
+    game_index.ensure_loaded(db)
+    suggestions = game_index.suggest(q, limit=limit)
+    return GameSuggestResponse(
+        query=q,
+        suggestions=[GameSuggestionItem(**vars(s)) for s in suggestions],
+    )
+
+
 @router.get("/games/search", response_model=GamesSearchResponse, tags=["games"])
 async def search_games_in_db(
     name: str,
@@ -71,8 +113,8 @@ async def search_games_in_db(
     """
     logger.info(f"Database search request: name='{name}', exact={exact}, limit={limit}")
 
-    # Формируем запрос к базе данных
-    query = db.query(GameModel)
+    # Формируем запрос к базе данных (карточке нужны и описания, и списки)
+    query = full_game_query(db)
 
     if exact:
         # Точное совпадение
@@ -186,7 +228,9 @@ async def save_game_from_bgg(
 
     try:
         game = save_game_from_bgg_data(db, bgg_data, user_query)
+        indexed = index_entry(game, bgg_data)
         db.commit()
+        game_index.upsert(indexed)
 
         logger.info(f"✅ Game saved successfully: '{game_name}' (DB ID: {game.id})")
 
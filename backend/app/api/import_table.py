@@ -1,19 +1,32 @@
+import hashlib
+import io
+import json
 import logging
-from typing import List, Optional
+import tempfile
+import zlib
+from typing import IO, Any, Dict, Iterator, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.infrastructure.db import get_db
-from app.infrastructure.repositories import replace_all_from_table
+from app.infrastructure.query_counter import count_queries, log_query_stats
+from app.infrastructure.repositories import (
+    ImportInProgressError,
+    import_fingerprint,
+    import_lock,
+    plan_import,
+    replace_all_from_table,
+    resumable_import_row,
+    start_import_checkpoint,
+)
 from app.services.translation import translate_game_descriptions_background
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
-logger.critical("🚨 IMPORT_TABLE MODULE LOADED")
-print("📊 IMPORT_TABLE MODULE LOADED", flush=True)
 
 
 class ImportTableRequest(BaseModel):
@@ -21,65 +34,270 @@ class ImportTableRequest(BaseModel):
     # Если True — принудительно обновляем данные всех игр из BGG,
     # иначе обновляем только те, у которых данные старше месяца.
     is_forced_update: bool = False
+    # Если True — только план импорта (см. plan_import): без BGG и без записи в БД
+    dry_run: bool = False
 
 
 class ImportTableResponse(BaseModel):
+    # ok; partial — часть строк не сохранилась (rows_failed); dry_run
     status: str
     games_imported: int = 0
+    rows_failed: int = 0
+    # Сколько строк было закоммичено прерванным импортом той же таблицы и пропущено
+    resumed_from_row: int = 0
+    # План импорта для dry_run
+    plan: Optional[Dict[str, Any]] = None
     message: str = ""
 
 
+class ImportTableRow(BaseModel):
+    """Строка таблицы в потоке /import-table/stream (как элемент ImportTableRequest.rows)."""
+    name: str
+    bgg_id: Optional[int] = None
+    niza_games_rank: Optional[int] = None
+    genre: Optional[str] = None
+    description_ru: Optional[str] = None
+    ratings: Dict[str, int] = {}
+
+
+class ImportStreamResponse(ImportTableResponse):
+    rows_received: int = 0
+    rows_invalid: int = 0
+
+
+# Сколько байт тела запроса держать в памяти, прежде чем сбрасывать на диск
+STREAM_SPOOL_MEMORY = 1024 * 1024
+
+IMPORT_RUNNING_DETAIL = "Another table import is already running, retry when it finishes"
+
+
+def _import_status(rows_failed: int) -> tuple[str, str]:
+    """Статус и сообщение ответа импорта по числу несохранённых строк."""
+    if rows_failed:
+        return "partial", f"Import finished with {rows_failed} failed rows (see backend logs). Translation started in background."
+    return "ok", "Import completed. Translation started in background."
+
+
+def iter_ndjson_rows(lines: IO[str], stats: Dict[str, int]) -> Iterator[dict]:
+    """
+    Читает NDJSON построчно и отдаёт проверенные строки таблицы.
+
+    Некорректные строки пропускаются; счётчики — в stats ("rows", "invalid").
+    """
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        stats["rows"] += 1
+        try:
+            yield ImportTableRow(**json.loads(line)).dict()
+        except (ValueError, TypeError) as exc:
+            stats["invalid"] += 1
+            logger.warning("Skipping NDJSON line %s: %s", line_no, exc)
+
+
+async def _spool_request_body(request: Request, digest) -> IO[bytes]:
+    """
+    Сохраняет тело запроса во временный файл, распаковывая gzip на лету.
+
+    Распакованное содержимое попутно хэшируется в digest (отпечаток импорта).
+    """
+    gzipped = request.headers.get("content-encoding", "").lower() == "gzip"
+    # wbits=31 — формат gzip (заголовок и контрольная сумма)
+    decompressor = zlib.decompressobj(wbits=31) if gzipped else None
+    spool = tempfile.SpooledTemporaryFile(max_size=STREAM_SPOOL_MEMORY)
+    try:
+        async for part in request.stream():
+            data = decompressor.decompress(part) if decompressor else part
+            digest.update(data)
+            spool.write(data)
+        if decompressor:
+            tail = decompressor.flush()
+            digest.update(tail)
+            spool.write(tail)
+            if not decompressor.eof:
+                raise HTTPException(status_code=400, detail="Truncated gzip body")
+    except zlib.error as exc:
+        spool.close()
+        raise HTTPException(status_code=400, detail=f"Invalid gzip body: {exc}")
+    except HTTPException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
 @router.post("/import-table", response_model=ImportTableResponse, tags=["admin"])
 async def import_table(
     request: ImportTableRequest,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
 ):
-    logger.critical("🚀🚀🚀 IMPORT_TABLE FUNCTION CALLED! 🚀🚀🚀")
     """
     Import games data from external table/spreadsheet to database.
 
     Updates existing games and creates new ratings. Supports forced updates
-    to refresh BGG data for all games.
+    to refresh BGG data for all games. If an import of the same rows was
+    interrupted, it resumes after the last committed row. Only one import runs at
+    a time: a concurrent request gets 409. Rows that failed to save are counted in
+    `rows_failed`, and the status is then `partial`.
+
+    With `dry_run` nothing is written and BGG is not called: the response `plan`
+    holds create/update/stale/unchanged counts, predicted BGG calls and the
+    estimated duration. Rows an interrupted import of the same rows already
+    committed are left out of the estimate (`resumed_skipped`).
     """
-    logger.error(f"🚀 IMPORT STARTED: {len(request.rows)} rows, forced_update={request.is_forced_update}")
+    content = json.dumps(request.rows, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    fingerprint = import_fingerprint(hashlib.sha256(content), request.is_forced_update)
+
+    if request.dry_run:
+        plan = plan_import(
+            db, request.rows,
+            is_forced_update=request.is_forced_update,
+            resume_after=resumable_import_row(db, fingerprint),
+        )
+        return ImportTableResponse(status="dry_run", plan=plan, message="Dry run: nothing was imported.")
+
+    logger.info("Import started: %s rows, forced_update=%s", len(request.rows), request.is_forced_update)
 
-    # Логируем структуру данных для диагностики ошибок
-    if request.rows:
+    # Структура данных — для диагностики ошибок
+    if request.rows and logger.isEnabledFor(logging.DEBUG):
         sample_ratings = request.rows[0].get('ratings', {})
-        logger.error(f"📊 Sample ratings keys: {list(sample_ratings.keys())}")
-        logger.error(f"📊 Contains 'общий': {'общий' in sample_ratings}")
-        logger.error(f"📊 Total rows to process: {len(request.rows)}")
+        logger.debug("Sample ratings keys: %s", list(sample_ratings.keys()))
 
     try:
-        replace_all_from_table(
-            db,
-            request.rows,
-            is_forced_update=request.is_forced_update,
-        )
-        db.commit()
-        logger.info(f"Successfully imported {len(request.rows)} games")
+        import_stats: Dict[str, int] = {}
+        with import_lock(db):
+            checkpoint = start_import_checkpoint(db, fingerprint, total_rows=len(request.rows))
+            resumed_from_row = checkpoint.last_row
+            with count_queries() as query_stats:
+                replace_all_from_table(
+                    db,
+                    request.rows,
+                    is_forced_update=request.is_forced_update,
+                    checkpoint=checkpoint,
+                    stats=import_stats,
+                )
+                db.commit()
+        log_query_stats(f"import-table ({len(request.rows)} rows)", query_stats)
+        rows_failed = import_stats.get("failed", 0)
+        logger.info("Imported %s games, failed rows: %s", len(request.rows), rows_failed)
 
         # Запускаем фоновый перевод описаний для игр, у которых его нет
-        logger.info("🎯 Scheduling background translation task for imported games")
+        logger.debug("Scheduling background translation task for imported games")
         background_tasks.add_task(translate_game_descriptions_background, db)
 
+        status, message = _import_status(rows_failed)
         return ImportTableResponse(
-            status="ok",
+            status=status,
             games_imported=len(request.rows),
-            message="Import completed. Translation started in background."
+            rows_failed=rows_failed,
+            resumed_from_row=resumed_from_row,
+            message=message,
         )
     except HTTPException:
         # Не логируем HTTP исключения повторно
         raise
+    except ImportInProgressError:
+        logger.warning("Import rejected: another import is running")
+        raise HTTPException(status_code=409, detail=IMPORT_RUNNING_DETAIL)
     except Exception as exc:  # noqa: BLE001
         db.rollback()
-        logger.error(f"Error importing table data: {type(exc).__name__}: {exc}", exc_info=True)
+        logger.error("Error importing table data: %s: %s", type(exc).__name__, exc, exc_info=True)
         # Логируем детали запроса для диагностики
-        logger.error(f"Request details: rows={len(request.rows)}, forced_update={request.is_forced_update}")
+        logger.error("Request details: rows=%s, forced_update=%s", len(request.rows), request.is_forced_update)
         if request.rows:
-            logger.error(f"First row sample: {request.rows[0]}")
+            logger.error("First row sample: %s", request.rows[0])
         raise HTTPException(status_code=400, detail=f"Data import error: {type(exc).__name__}: {str(exc)}")
 
 
+@router.post("/import-table/stream", response_model=ImportStreamResponse, tags=["admin"])
+async def import_table_stream(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    is_forced_update: bool = False,
+    total_rows: Optional[int] = None,
+    dry_run: bool = False,
+    db: Session = Depends(get_db),
+):
+    """
+    Import games from an NDJSON stream: one JSON row per line, same fields as `/import-table` rows.
+
+    Send the body with `Content-Encoding: gzip` to compress it. The body is spooled to a
+    temporary file, then rows are validated and imported one by one; processed rows are
+    detached from the DB session every `IMPORT_CHUNK_SIZE` rows, so memory does not grow
+    with the sheet size. Invalid lines are skipped and counted in `rows_invalid`.
+    Re-sending the same body after an interrupted import resumes after the last
+    committed row. A concurrent import gets 409; failed rows make the status `partial`.
+    `dry_run` returns the import plan instead (see `/import-table`).
+    """
+    digest = hashlib.sha256()
+    body = await _spool_request_body(request, digest)
+    fingerprint = import_fingerprint(digest, is_forced_update)
+    stats = {"rows": 0, "invalid": 0}
+    lines = io.TextIOWrapper(body, encoding="utf-8", errors="replace")
+    if dry_run:
+        try:
+            plan = await run_in_threadpool(
+                plan_import, db, iter_ndjson_rows(lines, stats),
+                is_forced_update=is_forced_update,
+                resume_after=resumable_import_row(db, fingerprint),
+            )
+        finally:
+            lines.close()
+        return ImportStreamResponse(
+            status="dry_run",
+            plan=plan,
+            rows_received=stats["rows"],
+            rows_invalid=stats["invalid"],
+            message="Dry run: nothing was imported.",
+        )
+
+    logger.info("Streaming import started: total_rows=%s, forced_update=%s", total_rows, is_forced_update)
+
+    import_stats: Dict[str, int] = {}
+
+    def run_import() -> tuple[int, int]:
+        with import_lock(db):
+            checkpoint = start_import_checkpoint(db, fingerprint, total_rows=total_rows)
+            resumed_from_row = checkpoint.last_row
+            with count_queries() as query_stats:
+                imported = replace_all_from_table(
+                    db,
+                    iter_ndjson_rows(lines, stats),
+                    is_forced_update=is_forced_update,
+                    total_rows=total_rows,
+                    checkpoint=checkpoint,
+                    stats=import_stats,
+                )
+                db.commit()
+        log_query_stats(f"import-table/stream ({stats['rows']} rows)", query_stats)
+        return imported or 0, resumed_from_row
+
+    try:
+        games_imported, resumed_from_row = await run_in_threadpool(run_import)
+    except ImportInProgressError:
+        logger.warning("Streaming import rejected: another import is running")
+        raise HTTPException(status_code=409, detail=IMPORT_RUNNING_DETAIL)
+    except Exception as exc:  # noqa: BLE001
+        db.rollback()
+        logger.error("Error importing table stream: %s: %s", type(exc).__name__, exc, exc_info=True)
+        raise HTTPException(status_code=400, detail=f"Data import error: {type(exc).__name__}: {str(exc)}")
+    finally:
+        lines.close()
 
+    rows_failed = import_stats.get("failed", 0)
+    logger.info(
+        "Streaming import finished: rows=%s, invalid=%s, failed=%s, games=%s",
+        stats["rows"], stats["invalid"], rows_failed, games_imported,
+    )
+    background_tasks.add_task(translate_game_descriptions_background, db)
+    status, message = _import_status(rows_failed)
+    return ImportStreamResponse(
+        status=status,
+        games_imported=games_imported,
+        rows_failed=rows_failed,
+        resumed_from_row=resumed_from_row,
+        rows_received=stats["rows"],
+        rows_invalid=stats["invalid"],
+        message=message,
+    )
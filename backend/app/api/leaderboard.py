@@ -0,0 +1,81 @@
+import logging
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.domain.models import LeaderboardMethod
+from app.infrastructure.db import get_db
+from app.infrastructure.models import GameModel
+from app.services.leaderboard import group_leaderboard
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class LeaderboardItem(BaseModel):
+    position: int
+    game_id: str
+    name: str
+    bgg_id: Optional[int] = None
+    score: float
+    raters: int
+
+
+class LeaderboardResponse(BaseModel):
+    method: LeaderboardMethod
+    games: List[LeaderboardItem]
+
+
+@router.get("/leaderboard", response_model=LeaderboardResponse, tags=["leaderboard"])
+async def get_leaderboard(
+    method: LeaderboardMethod = Query(LeaderboardMethod.BORDA),
+    limit: int = Query(50, ge=1, le=500),
+    min_raters: int = Query(1, ge=1),
+    db: Session = Depends(get_db),
+) -> LeaderboardResponse:
+    """
+    Get the group leaderboard built from all users' ratings.
+
+    Supported methods:
+    - borda: sum of Borda points (1st place = 50 points), higher is better;
+    - mean_rank: average place among users who rated the game, lower is better;
+    - bayesian: average place shrunk towards the global mean, lower is better.
+
+    Unrated entries (rank 0) are ignored.
+    """
+    logger.info(f"Leaderboard request: method={method.value}, limit={limit}, min_raters={min_raters}")
+
+    try:
+        group_leaderboard.ensure_loaded(db)
+        entries = group_leaderboard.compute(method, limit=limit, min_raters=min_raters)
+
+        # Подтягиваем названия одним запросом только для игр из топа
+        game_ids = [entry.game_id for entry in entries]
+        names = {}
+        if game_ids:
+            rows = (
+                db.query(GameModel.id, GameModel.name, GameModel.bgg_id)
+                .filter(GameModel.id.in_(game_ids))
+                .all()
+            )
+            names = {row.id: (row.name, row.bgg_id) for row in rows}
+
+        games = [
+            LeaderboardItem(
+                position=entry.position,
+                game_id=str(entry.game_id),
+                name=names.get(entry.game_id, ("", None))[0],
+                bgg_id=names.get(entry.game_id, ("", None))[1],
+                score=entry.score,
+                raters=entry.raters,
+            )
+            for entry in entries
+        ]
+        return LeaderboardResponse(method=method, games=games)
+
+    except Exception as exc:
+        logger.error(f"Error building leaderboard: {exc}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error building leaderboard: {exc}")
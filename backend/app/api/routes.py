@@ -1,17 +1,13 @@
-print("🔄 ROUTES.PY STARTING", flush=True)
 import logging
 
 from fastapi import APIRouter
 
-print("📦 IMPORTING API MODULES", flush=True)
-from app.api import import_table, clear_database, bgg, games, users
+from app.api import import_table, clear_database, bgg, games, users, leaderboard
 # from app.api import ranking  # Temporarily disabled - may have import issues
-print("✅ API MODULES IMPORTED", flush=True)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
-print("🔧 API ROUTER CREATED", flush=True)
 logger.info("API router created")
 
 # router.include_router(ranking.router)  # Temporarily disabled
@@ -26,5 +22,7 @@ router.include_router(games.router)
 logger.info("Games router included")
 router.include_router(users.router)
 logger.info("Users router included")
+router.include_router(leaderboard.router)
+logger.info("Leaderboard router included")
 
 logger.debug("API routes registered")
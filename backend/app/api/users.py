@@ -1,12 +1,22 @@
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.infrastructure.db import get_db
-from app.infrastructure.repositories import get_or_create_user, get_user_games_with_bgg_links
+from app.infrastructure.models import UserModel
+from app.infrastructure.repositories import (
+    get_or_create_user,
+    get_user_games_page,
+    get_user_games_with_bgg_links,
+    import_bgg_collection,
+)
+from app.services.bgg import BggCollectionError
+from app.utils.retry import CircuitOpenError
 
 logger = logging.getLogger(__name__)
 
@@ -26,8 +36,32 @@ class UserResponse(BaseModel):
     name_updated: bool = False
 
 
+class UserInfoResponse(BaseModel):
+    id: str
+    name: str
+    telegram_id: int
+
+
 class UserGamesResponse(BaseModel):
     games: List[Dict[str, Any]]
+    # Заполняются только при постраничном запросе (limit)
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+class BggCollectionImportRequest(BaseModel):
+    username: str
+
+
+class BggCollectionImportResponse(BaseModel):
+    username: str
+    collection_size: int
+    games_known: int
+    games_created: int
+    games_updated: int
+    games_skipped: int
+    ratings_added: int
 
 
 @router.post("/users", response_model=UserResponse, tags=["users"])
@@ -72,26 +106,66 @@ async def create_or_update_user(
         raise HTTPException(status_code=500, detail=f"Error creating user: {exc}")
 
 
+@router.get("/users/{telegram_id}", response_model=UserInfoResponse, tags=["users"])
+async def get_user(
+    telegram_id: int,
+    db: Session = Depends(get_db),
+) -> UserInfoResponse:
+    """
+    Check whether a user is registered.
+
+    Returns basic user info or 404 if the user does not exist.
+    Does not touch games or ratings, so it is cheap enough for login checks.
+    """
+    logger.debug(f"Checking user with telegram_id: {telegram_id}")
+
+    user = (
+        db.query(UserModel.id, UserModel.name, UserModel.telegram_id)
+        .filter(UserModel.telegram_id == telegram_id)
+        .first()
+    )
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    return UserInfoResponse(id=str(user.id), name=user.name, telegram_id=user.telegram_id)
+
+
 @router.get("/users/{telegram_id}/games", response_model=UserGamesResponse, tags=["users"])
 async def get_user_games(
     telegram_id: int,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    after: Optional[UUID] = None,
+    before: Optional[UUID] = None,
     db: Session = Depends(get_db),
 ) -> UserGamesResponse:
     """
     Get a list of user's games with BGG links.
 
     Returns only games that have a BGG ID, sorted alphabetically.
+    With `limit` the list is paginated by (name, id): pass `next_cursor`
+    as `after` for the next page or `prev_cursor` as `before` for the
+    previous one. Without `limit` the whole list is returned.
     """
+    if after is not None and before is not None:
+        raise HTTPException(status_code=400, detail="Use either 'after' or 'before', not both")
+
     logger.info(f"Getting games for user with telegram_id: {telegram_id}")
 
     try:
-        # Находим пользователя по telegram_id
-        from app.infrastructure.models import UserModel
-        user = db.query(UserModel).filter(UserModel.telegram_id == telegram_id).first()
-        if not user:
+        # Находим пользователя по telegram_id (нужен только id)
+        user_id = db.query(UserModel.id).filter(UserModel.telegram_id == telegram_id).scalar()
+        if not user_id:
             raise HTTPException(status_code=404, detail="User not found")
 
-        games = get_user_games_with_bgg_links(db, str(user.id))
+        if limit is not None:
+            page = get_user_games_page(
+                db, str(user_id), limit,
+                after=str(after) if after else None,
+                before=str(before) if before else None,
+            )
+            return UserGamesResponse(**page)
+
+        games = get_user_games_with_bgg_links(db, str(user_id))
 
         return UserGamesResponse(games=games)
 
@@ -100,3 +174,48 @@ async def get_user_games(
     except Exception as exc:
         logger.error(f"Error getting user games: {exc}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error retrieving user games: {exc}")
+
+
+@router.post(
+    "/users/{telegram_id}/bgg-collection",
+    response_model=BggCollectionImportResponse,
+    tags=["users"],
+)
+async def import_user_bgg_collection(
+    telegram_id: int,
+    request: BggCollectionImportRequest,
+    db: Session = Depends(get_db),
+) -> BggCollectionImportResponse:
+    """
+    Import the games of a BGG user's collection into the user's list.
+
+    Costs one BGG collection request (polled while BGG answers 202) plus one
+    thing request per 20 games missing from the database. New games are
+    added to the user's list unranked (rank 0); existing ratings are kept.
+    """
+    username = request.username.strip()
+    if not username:
+        raise HTTPException(status_code=400, detail="BGG username must not be empty")
+
+    user_id = db.query(UserModel.id).filter(UserModel.telegram_id == telegram_id).scalar()
+    if not user_id:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    logger.info(f"Importing BGG collection '{username}' for telegram_id: {telegram_id}")
+    try:
+        # Опрос BGG занимает секунды — выполняем в пуле потоков, не блокируя event loop
+        result = await run_in_threadpool(import_bgg_collection, db, user_id, username)
+    except BggCollectionError as exc:
+        raise HTTPException(status_code=404, detail=f"BGG collection not available: {exc}")
+    except CircuitOpenError as exc:
+        raise HTTPException(
+            status_code=503,
+            detail=str(exc),
+            headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+        )
+    except Exception as exc:  # noqa: BLE001
+        db.rollback()
+        logger.error(f"Error importing BGG collection: {exc}", exc_info=True)
+        raise HTTPException(status_code=502, detail=f"Error importing BGG collection: {exc}")
+
+    return BggCollectionImportResponse(username=username, **result)
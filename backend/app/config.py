@@ -56,19 +56,73 @@ class Config:
 
     # BGG / внешние API
     BGG_BEARER_TOKEN: Optional[str] = os.getenv("BGG_BEARER_TOKEN")
+    # Адреса XML API можно переопределить, например, для локального
+    # сервера-заглушки из benchmarks/fake_bgg.py
+    BGG_SEARCH_URL: str = os.getenv("BGG_SEARCH_URL", "https://boardgamegeek.com/xmlapi2/search")
+    BGG_THING_URL: str = os.getenv("BGG_THING_URL", "https://boardgamegeek.com/xmlapi2/thing")
+    BGG_COLLECTION_URL: str = os.getenv("BGG_COLLECTION_URL", "https://boardgamegeek.com/xmlapi2/collection")
+    # Сколько раз запрашивать коллекцию, пока BGG отвечает 202 (коллекция готовится)
+    BGG_COLLECTION_POLL_ATTEMPTS: int = int(os.getenv("BGG_COLLECTION_POLL_ATTEMPTS", "8"))
 
     # Настройки обновления данных игр из BGG
     # Количество дней, после которого данные игры считаются устаревшими
     # и могут быть автоматически обновлены при импорте таблицы.
     GAME_UPDATE_DAYS: int = int(os.getenv("GAME_UPDATE_DAYS", "30"))
 
+    # Фоновое обновление устаревших игр: раз в GAME_REFRESH_INTERVAL_MINUTES
+    # минут (0 — выключено) обновляется GAME_REFRESH_BATCH_SIZE игр
+    GAME_REFRESH_INTERVAL_MINUTES: float = float(os.getenv("GAME_REFRESH_INTERVAL_MINUTES", "10"))
+    GAME_REFRESH_BATCH_SIZE: int = int(os.getenv("GAME_REFRESH_BATCH_SIZE", "20"))
+
+    # Через сколько строк импорта таблицы отсоединять обработанные объекты от сессии
+    IMPORT_CHUNK_SIZE: int = int(os.getenv("IMPORT_CHUNK_SIZE", "500"))
+    # Через сколько дней без продвижения удалять чекпойнты брошенных импортов
+    IMPORT_CHECKPOINT_TTL_DAYS: int = int(os.getenv("IMPORT_CHECKPOINT_TTL_DAYS", "7"))
+
     # Задержка между запросами к BGG API в секундах (для избежания rate limiting)
     BGG_REQUEST_DELAY: float = float(os.getenv("BGG_REQUEST_DELAY", "2.0"))
 
+    # Негативный кэш названий, которые BGG не нашёл: первая повторная проверка
+    # через BGG_UNRESOLVED_RECHECK_HOURS часов, далее интервал удваивается,
+    # но не больше BGG_UNRESOLVED_MAX_RECHECK_DAYS дней
+    BGG_UNRESOLVED_RECHECK_HOURS: float = float(os.getenv("BGG_UNRESOLVED_RECHECK_HOURS", "24"))
+    BGG_UNRESOLVED_MAX_RECHECK_DAYS: float = float(os.getenv("BGG_UNRESOLVED_MAX_RECHECK_DAYS", "90"))
+
+    # Повторы запросов к BGG: пауза base * 2^(n-1) со случайным разбросом,
+    # не больше BGG_RETRY_MAX_DELAY секунд (в том числе для Retry-After)
+    BGG_RETRY_BASE_DELAY: float = float(os.getenv("BGG_RETRY_BASE_DELAY", "1.0"))
+    BGG_RETRY_MAX_DELAY: float = float(os.getenv("BGG_RETRY_MAX_DELAY", "30"))
+    # Circuit breaker: после стольких неудач подряд запросы к BGG сразу
+    # отклоняются на BGG_CIRCUIT_RESET_TIMEOUT секунд
+    BGG_CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("BGG_CIRCUIT_FAILURE_THRESHOLD", "5"))
+    BGG_CIRCUIT_RESET_TIMEOUT: float = float(os.getenv("BGG_CIRCUIT_RESET_TIMEOUT", "60"))
+
     # Язык по умолчанию для отображения описаний игр
     # "ru" - русский (переведенный), "en" - английский (оригинал)
     DEFAULT_LANGUAGE: str = os.getenv("DEFAULT_LANGUAGE", "ru")
 
+    # Подсчёт SQL-выражений на запрос (заголовки X-DB-Statements / X-DB-Time-Ms).
+    # Выключено по умолчанию; порог — с какого числа выражений писать warning (N+1).
+    SQL_COUNTER_ENABLED: bool = os.getenv("SQL_COUNTER_ENABLED", "false").lower() == "true"
+    SQL_STATEMENT_WARN_THRESHOLD: int = int(os.getenv("SQL_STATEMENT_WARN_THRESHOLD", "50"))
+
+    # Построчная детализация импорта (логгер "<module>.rows", уровень DEBUG):
+    # пишется каждая N-я строка, 0 — выключено
+    LOG_ROW_SAMPLE_EVERY: int = int(os.getenv("LOG_ROW_SAMPLE_EVERY", "100"))
+
+    # Метрики Prometheus: GET /metrics и гистограммы латентности по маршрутам
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+    # Кэш списков игр пользователей (/users/{telegram_id}/games)
+    # Максимальное число пользователей в кэше и время жизни записи в секундах
+    USER_GAMES_CACHE_SIZE: int = int(os.getenv("USER_GAMES_CACHE_SIZE", "1024"))
+    USER_GAMES_CACHE_TTL: float = float(os.getenv("USER_GAMES_CACHE_TTL", "600"))
+
+    # Кэш активных сессий ранжирования (в памяти воркера)
+    # Максимальное число сессий и время простоя в секундах, после которого сессия вытесняется
+    RANKING_SESSION_CACHE_SIZE: int = int(os.getenv("RANKING_SESSION_CACHE_SIZE", "256"))
+    RANKING_SESSION_CACHE_TTL: float = float(os.getenv("RANKING_SESSION_CACHE_TTL", "1800"))
+
 
 class DevelopmentConfig(Config):
     """Конфигурация для разработки"""
@@ -85,3 +85,42 @@ class SecondTieringState:
     """
     candidate_game_ids: List[UUID]
     tiers: Dict[UUID, SecondTier]
+
+
+class LeaderboardMethod(str, Enum):
+    """Способ агрегации оценок всех пользователей в общий рейтинг."""
+    BORDA = "borda"
+    MEAN_RANK = "mean_rank"
+    BAYESIAN = "bayesian"
+
+
+@dataclass
+class LeaderboardEntry:
+    """
+    Позиция игры в групповом рейтинге.
+
+    score — значение метрики: для BORDA больше = лучше,
+    для MEAN_RANK и BAYESIAN меньше = лучше (это средние места).
+    """
+    game_id: UUID
+    position: int
+    score: float
+    raters: int
+
+
+@dataclass
+class GameSuggestion:
+    """
+    Подсказка при вводе названия игры.
+
+    matched_name — название, по которому нашлось совпадение (основное или альтернативное),
+    score — схожесть 0..100 (100 для совпадения по префиксу).
+    """
+    game_id: UUID
+    name: str
+    matched_name: str
+    score: int
+    bgg_id: Optional[int] = None
+    bgg_rank: Optional[int] = None
+    yearpublished: Optional[int] = None
+    thumbnail: Optional[str] = None
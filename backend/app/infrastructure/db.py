@@ -4,6 +4,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 from app.config import config
+from app.utils.metrics import registry
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +16,14 @@ SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, futu
 
 Base = declarative_base()
 
+# Состояние пула соединений считается в момент сбора метрик
+DB_POOL = registry.gauge("db_pool_connections", "SQLAlchemy connection pool state", ["state"])
+if hasattr(engine.pool, "checkedout"):
+    DB_POOL.set_function(lambda: engine.pool.size(), state="size")
+    DB_POOL.set_function(lambda: engine.pool.checkedout(), state="checked_out")
+    DB_POOL.set_function(lambda: engine.pool.checkedin(), state="checked_in")
+    DB_POOL.set_function(lambda: engine.pool.overflow(), state="overflow")
+
 
 def get_db():
     """Database dependency for FastAPI."""
@@ -1,6 +1,6 @@
-from sqlalchemy import JSON, Column, DateTime, Enum, Float, ForeignKey, Integer, String, Text, func
+from sqlalchemy import JSON, Column, DateTime, Enum, Float, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 from .db import Base
 from app.domain.models import GameGenre
@@ -10,7 +10,7 @@ class UserModel(Base):
     __tablename__ = "users"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=func.gen_random_uuid(), index=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     telegram_id = Column(Integer, nullable=False, unique=True, index=True)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -29,7 +29,7 @@ class GameModel(Base):
     __tablename__ = "games"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=func.gen_random_uuid(), index=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, unique=True, index=True)
     # ID игры на BGG (для последующего обновления по API)
     bgg_id = Column(Integer, nullable=True, index=True)
     bgg_rank = Column(Integer, nullable=True)
@@ -59,22 +59,31 @@ class GameModel(Base):
     wishing = Column(Integer, nullable=True)
     averageweight = Column(Float, nullable=True)
     numweights = Column(Integer, nullable=True)
-    # Списки (из link-ов BGG)
-    categories = Column(JSON, nullable=True)
-    mechanics = Column(JSON, nullable=True)
-    designers = Column(JSON, nullable=True)
-    publishers = Column(JSON, nullable=True)
+    # Списки (из link-ов BGG).
+    # Тяжёлые колонки загружаются отложенно (deferred): по умолчанию запросы
+    # к GameModel их не читают, нужные группы подключаются явно —
+    # см. app.infrastructure.projections.
+    categories = deferred(Column(JSON, nullable=True), group="lists")
+    mechanics = deferred(Column(JSON, nullable=True), group="lists")
+    designers = deferred(Column(JSON, nullable=True), group="lists")
+    publishers = deferred(Column(JSON, nullable=True), group="lists")
+    # Альтернативные названия игры на BGG (для подсказок при поиске)
+    alternate_names = deferred(Column(JSON, nullable=True), group="lists")
     image = Column(String, nullable=True)
     thumbnail = Column(String, nullable=True)
-    description = Column(Text, nullable=True)
-    description_ru = Column(Text, nullable=True)
+    description = deferred(Column(Text, nullable=True), group="descriptions")
+    description_ru = deferred(Column(Text, nullable=True), group="descriptions")
+    # Когда ранг и статистика последний раз обновлялись из выгрузки рангов BGG
+    ranks_updated_at = Column(DateTime(timezone=True), nullable=True)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Индекс — для выбора самых устаревших игр фоновым обновлением
     updated_at = Column(
         DateTime(timezone=True),
         server_default=func.now(),
         onupdate=func.now(),
         nullable=False,
+        index=True,
     )
 
     ratings = relationship("RatingModel", back_populates="game", cascade="all, delete-orphan")
@@ -82,10 +91,14 @@ class GameModel(Base):
 
 class RatingModel(Base):
     __tablename__ = "ratings"
+    __table_args__ = (
+        # Одна оценка на пару пользователь-игра; индекс покрывает и фильтр по user_id
+        Index("ix_ratings_user_id_game_id", "user_id", "game_id", unique=True),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=func.gen_random_uuid(), index=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    game_id = Column(UUID(as_uuid=True), ForeignKey("games.id", ondelete="CASCADE"), nullable=False)
+    game_id = Column(UUID(as_uuid=True), ForeignKey("games.id", ondelete="CASCADE"), nullable=False, index=True)
     rank = Column(Integer, nullable=False)
 
     user = relationship("UserModel", back_populates="ratings")
@@ -103,7 +116,7 @@ class RankingSessionModel(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=func.gen_random_uuid(), index=True)
     user_name = Column(String, nullable=True)  # Для обратной совместимости
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
 
     # first_tier, second_tier, ordering, final
     state = Column(String, nullable=False, default="first_tier")
@@ -129,6 +142,10 @@ class RankingSessionModel(Base):
     current_index_first = Column(Integer, nullable=False, default=0)
     current_index_second = Column(Integer, nullable=False, default=0)
 
+    # Версия строки: растёт при каждом ответе, по ней кэш сессий
+    # (app.services.ranking_sessions) обнаруживает изменения из других воркеров
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
     user = relationship("UserModel", back_populates="ranking_sessions")
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -138,3 +155,55 @@ class RankingSessionModel(Base):
         onupdate=func.now(),
         nullable=False,
     )
+
+
+class BggUnresolvedNameModel(Base):
+    """
+    Названия из таблицы импорта, которые BGG не нашёл (негативный кэш).
+
+    Пока не наступил next_check_at, импорт не ищет такое название в BGG.
+    Интервал повторной проверки растёт экспоненциально с каждой неудачей.
+    bgg_id — ручное сопоставление: импорт берёт данные игры по этому ID без поиска.
+    """
+
+    __tablename__ = "bgg_unresolved_names"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=func.gen_random_uuid(), index=True)
+    # Нормализованное название (casefold, одиночные пробелы) — ключ поиска
+    name_key = Column(String, nullable=False, unique=True, index=True)
+    # Название в том виде, в каком оно пришло из таблицы
+    name = Column(String, nullable=False)
+    attempts = Column(Integer, nullable=False, default=1)
+    bgg_id = Column(Integer, nullable=True)
+
+    last_checked_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    next_check_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class ImportCheckpointModel(Base):
+    """
+    Чекпойнт импорта таблицы.
+
+    fingerprint — хэш содержимого таблицы (и флага принудительного обновления).
+    last_row — номер последней строки, транзакция которой закоммичена: он
+    сохраняется в той же транзакции, что и сама строка. Повторный импорт той же
+    таблицы после сбоя продолжается со следующей строки.
+    """
+
+    __tablename__ = "import_checkpoints"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=func.gen_random_uuid(), index=True)
+    fingerprint = Column(String, nullable=False, unique=True, index=True)
+    last_row = Column(Integer, nullable=False, default=0)
+    total_rows = Column(Integer, nullable=True)
+    # Заполняется, когда импорт дошёл до конца таблицы
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
@@ -0,0 +1,92 @@
+"""
+Явные проекции GameModel для горячих путей.
+
+Тяжёлые колонки GameModel (описания и JSON-списки) объявлены как deferred,
+поэтому каждый путь чтения сам решает, какие поля ему нужны:
+
+- ранжирование — только скалярные поля доменной модели Game;
+- список игр пользователя — название, ссылка на BGG, ранг и год;
+- индекс подсказок по названиям — названия, ранг, год и миниатюра;
+- поиск/карточка игры — все поля, включая описания и списки.
+"""
+from typing import Any, Tuple
+
+from sqlalchemy.orm import Query, Session, undefer_group
+
+from app.domain.models import Game
+from .models import GameModel
+
+# Поля, из которых строится доменная модель Game (имена совпадают с атрибутами)
+RANKING_COLUMNS: Tuple[Any, ...] = (
+    GameModel.id,
+    GameModel.name,
+    GameModel.bgg_rank,
+    GameModel.niza_games_rank,
+    GameModel.genre,
+    GameModel.usersrated,
+    GameModel.yearpublished,
+    GameModel.average,
+    GameModel.bayesaverage,
+    GameModel.averageweight,
+    GameModel.minplayers,
+    GameModel.maxplayers,
+    GameModel.playingtime,
+    GameModel.minage,
+)
+
+# Поля для списка игр пользователя (/users/{telegram_id}/games)
+USER_GAMES_COLUMNS: Tuple[Any, ...] = (
+    GameModel.id,
+    GameModel.name,
+    GameModel.bgg_id,
+    GameModel.bgg_rank,
+    GameModel.yearpublished,
+)
+
+# Поля для индекса подсказок по названиям (app.services.game_index)
+GAME_INDEX_COLUMNS: Tuple[Any, ...] = (
+    GameModel.id,
+    GameModel.name,
+    GameModel.alternate_names,
+    GameModel.bgg_id,
+    GameModel.bgg_rank,
+    GameModel.yearpublished,
+    GameModel.thumbnail,
+)
+
+# Группы deferred-колонок GameModel
+DESCRIPTIONS_GROUP = "descriptions"
+LISTS_GROUP = "lists"
+
+
+def ranking_games_query(session: Session) -> Query:
+    """Запрос только тех колонок, которые нужны алгоритму ранжирования."""
+    return session.query(*RANKING_COLUMNS)
+
+
+def row_to_game(row: Any) -> Game:
+    """Преобразует строку проекции RANKING_COLUMNS в доменную модель Game."""
+    return Game(**row._mapping)
+
+
+def user_games_query(session: Session) -> Query:
+    """Запрос колонок для списка игр пользователя."""
+    return session.query(*USER_GAMES_COLUMNS)
+
+
+def game_index_query(session: Session) -> Query:
+    """Запрос колонок для построения индекса подсказок по названиям."""
+    return session.query(*GAME_INDEX_COLUMNS)
+
+
+def full_game_query(session: Session) -> Query:
+    """
+    Запрос GameModel со всеми колонками, включая описания и списки.
+
+    Используется там, где возвращается полная карточка игры,
+    чтобы не делать отдельный запрос на каждую deferred-группу.
+    """
+    return session.query(GameModel).options(
+        undefer_group(DESCRIPTIONS_GROUP),
+        undefer_group(LISTS_GROUP),
+    )
@@ -0,0 +1,153 @@
+"""
+Подсчёт SQL-выражений и времени БД на запрос или фоновую задачу.
+
+Построено на событиях движка SQLAlchemy (before/after_cursor_execute) и
+contextvars, поэтому счётчики корректно работают и в async-эндпоинтах,
+и в синхронных зависимостях, выполняемых FastAPI в пуле потоков.
+
+    with count_queries() as stats:
+        replace_all_from_table(session, rows)
+    logger.info(f"import: {stats.statements} statements, {stats.duration_ms:.1f} ms")
+
+Для тестов есть assert_statement_budget — падает, если код выполнил
+больше выражений, чем разрешено (ловит N+1).
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryStats:
+    """Накопленная статистика по SQL-выражениям."""
+
+    statements: int = 0
+    duration_ms: float = 0.0
+    # Тексты выражений сохраняются только по запросу (для диагностики в тестах)
+    record_sql: bool = False
+    sql: List[str] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, statement: str, duration_ms: float) -> None:
+        with self._lock:
+            self.statements += 1
+            self.duration_ms += duration_ms
+            if self.record_sql:
+                self.sql.append(statement)
+
+
+# Активные счётчики текущего контекста (вложенные count_queries суммируются во все)
+_active: ContextVar[Tuple[QueryStats, ...]] = ContextVar("query_counter_active", default=())
+
+_installed = False
+_install_lock = threading.Lock()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active.get():
+        conn.info.setdefault("query_counter_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    active = _active.get()
+    if not active:
+        return
+    starts = conn.info.get("query_counter_start")
+    started = starts.pop() if starts else time.perf_counter()
+    duration_ms = (time.perf_counter() - started) * 1000
+    for stats in active:
+        stats.add(statement, duration_ms)
+
+
+def install() -> None:
+    """Подписывается на события всех движков SQLAlchemy (один раз на процесс)."""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _installed = True
+
+
+@contextmanager
+def count_queries(record_sql: bool = False) -> Iterator[QueryStats]:
+    """Считает SQL-выражения, выполненные внутри блока (в текущем контексте)."""
+    install()
+    stats = QueryStats(record_sql=record_sql)
+    token = _active.set(_active.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def assert_statement_budget(max_statements: int) -> Iterator[QueryStats]:
+    """
+    Тестовый помощник: блок должен уложиться в max_statements SQL-выражений.
+
+        with assert_statement_budget(3):
+            client.get("/api/users/1/games")
+    """
+    with count_queries(record_sql=True) as stats:
+        yield stats
+    if stats.statements > max_statements:
+        listing = "\n".join(f"  {i}. {sql}" for i, sql in enumerate(stats.sql, 1))
+        raise AssertionError(
+            f"Expected at most {max_statements} SQL statements, got {stats.statements}:\n{listing}"
+        )
+
+
+def log_query_stats(label: str, stats: QueryStats) -> None:
+    """Пишет итог в лог; при превышении порога — warning (вероятный N+1)."""
+    if stats.statements > config.SQL_STATEMENT_WARN_THRESHOLD:
+        logger.warning(
+            f"{label}: {stats.statements} SQL statements, {stats.duration_ms:.1f} ms "
+            f"(threshold {config.SQL_STATEMENT_WARN_THRESHOLD})"
+        )
+    else:
+        logger.debug(f"{label}: {stats.statements} SQL statements, {stats.duration_ms:.1f} ms")
+
+
+class QueryCounterMiddleware:
+    """
+    ASGI-middleware: считает SQL-выражения каждого HTTP-запроса и добавляет
+    заголовки X-DB-Statements и X-DB-Time-Ms к ответу.
+
+    Заголовки отправляются вместе с началом ответа, поэтому для потоковых
+    ответов учитываются только выражения, выполненные до первого байта.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_queries() as stats:
+            async def send_with_headers(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-db-statements", str(stats.statements).encode()))
+                    headers.append((b"x-db-time-ms", f"{stats.duration_ms:.1f}".encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_headers)
+            finally:
+                log_query_stats(f"{scope.get('method')} {scope.get('path')}", stats)
@@ -0,0 +1,175 @@
+"""
+Загрузка рангов и статистики игр из выгрузки рангов BGG (boardgames_ranks.csv).
+
+BGG публикует CSV со всеми играми, у которых есть ранг:
+
+    id,name,yearpublished,rank,bayesaverage,average,usersrated,is_expansion,...
+
+Файл (или zip с ним) читается потоково, кусками по chunk_size строк.
+Куски загружаются во временную таблицу через COPY (psycopg2), без
+драйверной поддержки COPY — многострочными INSERT. Затем один UPDATE ... FROM
+обновляет игры, которые уже есть в базе, по bgg_id, и отмечает время
+обновления в ranks_updated_at. Новые игры из выгрузки не создаются: в ней
+около 30 000 игр, и каталог заполнился бы играми, которых нет ни у кого
+из пользователей.
+"""
+import csv
+import io
+import logging
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.services.game_index import game_index
+from .repositories import user_games_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Строка временной таблицы: bgg_id, bgg_rank, yearpublished, bayesaverage, average, usersrated
+RankRow = Tuple[int, Optional[int], Optional[int], Optional[float], Optional[float], Optional[int]]
+
+TEMP_TABLE = "bgg_ranks_import"
+
+CREATE_TEMP_TABLE = f"""
+CREATE TEMPORARY TABLE {TEMP_TABLE} (
+    bgg_id integer NOT NULL,
+    bgg_rank integer,
+    yearpublished integer,
+    bayesaverage double precision,
+    average double precision,
+    usersrated integer
+) ON COMMIT DROP
+"""
+
+UPDATE_GAMES = f"""
+UPDATE games AS g SET
+    bgg_rank = t.bgg_rank,
+    yearpublished = COALESCE(t.yearpublished, g.yearpublished),
+    bayesaverage = t.bayesaverage,
+    average = t.average,
+    usersrated = t.usersrated,
+    ranks_updated_at = now()
+FROM {TEMP_TABLE} AS t
+WHERE g.bgg_id = t.bgg_id
+"""
+
+
+def _to_int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int((value or "").strip())
+    except ValueError:
+        return None
+
+
+def _to_nonzero_int(value: Optional[str]) -> Optional[int]:
+    # В выгрузке 0 означает «нет значения» (ранг, год)
+    return _to_int(value) or None
+
+
+def _to_float(value: Optional[str]) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number else None
+
+
+@contextmanager
+def open_ranks_dump(path: Path) -> Iterator[IO[str]]:
+    """Открывает CSV выгрузки; для zip — первый .csv внутри архива."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            names = [name for name in archive.namelist() if name.lower().endswith(".csv")]
+            if not names:
+                raise ValueError(f"No CSV file inside {path}")
+            with archive.open(names[0]) as raw:
+                yield io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+    else:
+        with open(path, encoding="utf-8-sig", newline="") as file:
+            yield file
+
+
+def iter_rank_chunks(file: IO[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[RankRow]]:
+    """Потоково читает CSV выгрузки и отдаёт строки кусками по chunk_size."""
+    reader = csv.DictReader(file)
+    missing = {"id", "rank"} - set(reader.fieldnames or [])
+    if missing:
+        raise ValueError(f"Not a BGG ranks dump: missing columns {sorted(missing)}")
+
+    chunk: List[RankRow] = []
+    for record in reader:
+        bgg_id = _to_int(record.get("id"))
+        if not bgg_id:
+            continue
+        chunk.append((
+            bgg_id,
+            _to_nonzero_int(record.get("rank")),
+            _to_nonzero_int(record.get("yearpublished")),
+            _to_float(record.get("bayesaverage")),
+            _to_float(record.get("average")),
+            _to_int(record.get("usersrated")),
+        ))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _copy_chunk(session: Session, chunk: List[RankRow]) -> None:
+    """Загружает кусок во временную таблицу: COPY, если драйвер умеет, иначе INSERT."""
+    dbapi_connection = session.connection().connection
+    cursor = dbapi_connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(chunk)
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY {TEMP_TABLE} FROM STDIN WITH (FORMAT csv)", buffer)
+            return
+    finally:
+        cursor.close()
+
+    session.execute(
+        text(
+            f"INSERT INTO {TEMP_TABLE} VALUES "
+            "(:bgg_id, :bgg_rank, :yearpublished, :bayesaverage, :average, :usersrated)"
+        ),
+        [
+            dict(zip(("bgg_id", "bgg_rank", "yearpublished", "bayesaverage", "average", "usersrated"), row))
+            for row in chunk
+        ],
+    )
+
+
+def ingest_ranks_dump(session: Session, file: IO[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, int]:
+    """
+    Обновляет bgg_rank, yearpublished, bayesaverage, average и usersrated
+    игр из выгрузки рангов BGG одной транзакцией.
+
+    :return: {"rows": строк в выгрузке, "games_updated": обновлено игр}
+    """
+    session.execute(text(CREATE_TEMP_TABLE))
+    rows = 0
+    for chunk in iter_rank_chunks(file, chunk_size):
+        _copy_chunk(session, chunk)
+        rows += len(chunk)
+        logger.debug("Loaded %s rank rows into %s", rows, TEMP_TABLE)
+
+    # Временные таблицы не анализируются автоматически, а от статистики зависит план UPDATE
+    session.execute(text(f"ANALYZE {TEMP_TABLE}"))
+    games_updated = session.execute(text(UPDATE_GAMES)).rowcount
+    session.commit()
+
+    # Ранги показываются в списках игр пользователей и в подсказках
+    user_games_cache.clear()
+    game_index.invalidate()
+
+    logger.info("BGG ranks dump ingested: rows=%s, games_updated=%s", rows, games_updated)
+    return {"rows": rows, "games_updated": games_updated}
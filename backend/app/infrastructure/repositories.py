@@ -1,26 +1,102 @@
+import hashlib
 import logging
 import time
+import uuid
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Any, Optional, Callable
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Callable, Sequence
 
-from sqlalchemy.orm import Session
-
-try:
-    from fuzzywuzzy import fuzz
-except ImportError:
-    logging.warning("fuzzywuzzy not installed, using basic string matching")
-    fuzz = None
+from sqlalchemy import and_, case, func, literal_column, or_, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Query, Session, aliased
 
 from app.config import config
 from app.domain.models import GameGenre
-from app.services.bgg import get_boardgame_details, search_boardgame
-from .models import GameModel, RatingModel, RankingSessionModel, UserModel
+from app.services.bgg import (
+    BGG_REQUEST_SECONDS,
+    get_boardgame_details,
+    get_boardgames_details,
+    get_collection,
+    search_boardgame,
+)
+from app.services.fuzzy import score_candidates, similarity_tier
+from app.services.game_index import IndexedGame, game_index
+from app.services.leaderboard import RatingChange, group_leaderboard
+from app.utils.cache import LRUCache
+from app.utils.logging import get_row_logger
+from app.utils.metrics import registry
+from app.utils.retry import CircuitOpenError
+from .models import BggUnresolvedNameModel, GameModel, ImportCheckpointModel, RatingModel, RankingSessionModel, UserModel
+from .projections import user_games_query
 
 logger = logging.getLogger(__name__)
+# Детали по отдельным строкам импорта: DEBUG, каждая N-я строка
+row_logger = get_row_logger(__name__)
 
 
 GAME_UPDATE_DELTA = timedelta(days=config.GAME_UPDATE_DAYS)
 
+# Кэш списков игр пользователей: user_id (str) -> список словарей,
+# "<user_id>:total" -> число игр (для постраничного вывода)
+user_games_cache: LRUCache[Any] = LRUCache(
+    maxsize=config.USER_GAMES_CACHE_SIZE,
+    ttl=config.USER_GAMES_CACHE_TTL,
+)
+
+
+def _user_games_total_key(user_id: Any) -> str:
+    return f"{user_id}:total"
+
+
+CACHE_HITS = registry.counter("cache_hits_total", "In-process cache hits", ["cache"])
+CACHE_MISSES = registry.counter("cache_misses_total", "In-process cache misses", ["cache"])
+CACHE_HITS.set_function(lambda: user_games_cache.hits, cache="user_games")
+CACHE_MISSES.set_function(lambda: user_games_cache.misses, cache="user_games")
+
+IMPORT_IN_PROGRESS = registry.gauge("import_in_progress", "Table imports currently running")
+IMPORT_ROWS_TOTAL = registry.gauge("import_rows_total", "Rows in the current (or last) table import")
+IMPORT_ROWS_PROCESSED = registry.gauge("import_rows_processed", "Rows processed by the current (or last) table import")
+IMPORT_GAMES = registry.counter("import_games_total", "Imported games by result", ["result"])
+IMPORT_RATINGS = registry.counter("import_ratings_total", "Imported ratings by action", ["action"])
+GAME_REFRESH = registry.counter("game_refresh_total", "Games refreshed by the background refresher", ["result"])
+IMPORT_SECONDS = registry.histogram(
+    "import_duration_seconds", "Table import duration",
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600),
+)
+
+
+def _notify_ratings_changed(changes: List[RatingChange]) -> None:
+    """
+    Сообщает кэшам об изменившихся оценках.
+
+    Вызывается только после успешного commit, чтобы в памяти
+    не оказались изменения из откаченной транзакции.
+    """
+    if changes:
+        group_leaderboard.apply_changes(changes)
+        for user_id in {user_id for user_id, _, _ in changes}:
+            user_games_cache.invalidate(str(user_id))
+            user_games_cache.invalidate(_user_games_total_key(user_id))
+
+
+def index_entry(game: GameModel, bgg_data: Dict[str, Any] | None = None) -> IndexedGame:
+    """
+    Запись для индекса подсказок по названиям.
+
+    Поля BGG берутся из bgg_data, а не из модели: после commit атрибуты
+    модели сброшены, и чтение вызвало бы лишний SELECT на каждую игру.
+    """
+    bgg_data = bgg_data or {}
+    return IndexedGame(
+        game_id=game.id,
+        name=game.name,
+        bgg_id=bgg_data.get("id"),
+        bgg_rank=bgg_data.get("rank"),
+        yearpublished=bgg_data.get("yearpublished"),
+        thumbnail=bgg_data.get("thumbnail"),
+        alternate_names=bgg_data.get("alternate_names") or [],
+    )
+
 
 def get_or_create_user(session: Session, telegram_id: int, name: str) -> tuple[UserModel, bool, bool]:
     """
@@ -41,53 +117,230 @@ def get_or_create_user(session: Session, telegram_id: int, name: str) -> tuple[U
         session.add(user)
         session.flush()
         created = True
-        logger.info(f"Created new user: {name} (telegram_id: {telegram_id})")
+        logger.info("Created new user: %s (telegram_id: %s)", name, telegram_id)
     else:
         # Обновляем имя, если оно изменилось
         if user.name != name:
             old_name = user.name
             user.name = name
             name_changed = True
-            logger.info(f"Updated user name from '{old_name}' to '{name}' (telegram_id: {telegram_id})")
+            logger.info("Updated user name from '%s' to '%s' (telegram_id: %s)", old_name, name, telegram_id)
 
     return user, created, name_changed
 
 
+def _user_game_item(game) -> Dict[str, Any]:
+    return {
+        "id": str(game.id),
+        "name": game.name,
+        "bgg_id": game.bgg_id,
+        "bgg_url": f"https://boardgamegeek.com/boardgame/{game.bgg_id}",
+        "rank": game.bgg_rank,
+        "year": game.yearpublished,
+    }
+
+
+def _user_games_filter(user_id: str) -> tuple:
+    return (
+        RatingModel.user_id == uuid.UUID(str(user_id)),
+        GameModel.bgg_id.isnot(None),  # Только игры с BGG ID
+    )
+
+
 def get_user_games_with_bgg_links(session: Session, user_id: str) -> List[Dict[str, Any]]:
     """
     Получает список игр пользователя с ссылками на BGG, отсортированный лексикографически.
 
+    Выбираются только нужные колонки (без описаний и JSON-полей), а результат
+    кэшируется по user_id до следующего импорта или изменения оценок пользователя.
+
     :param session: Сессия базы данных
     :param user_id: ID пользователя
     :return: Список игр с информацией о BGG
     """
-    from uuid import UUID
+    cached = user_games_cache.get(str(user_id))
+    if cached is not None:
+        return cached
 
-    games = (
-        session.query(GameModel)
+    rows = (
+        user_games_query(session)
         .join(RatingModel)
-        .filter(
-            RatingModel.user_id == UUID(user_id),
-            GameModel.bgg_id.isnot(None)  # Только игры с BGG ID
-        )
-        .order_by(GameModel.name)  # Лексикографическая сортировка
+        .filter(*_user_games_filter(user_id))
+        .order_by(GameModel.name, GameModel.id)  # Лексикографическая сортировка
         .all()
     )
 
-    result = []
-    for game in games:
-        result.append({
-            "id": str(game.id),
-            "name": game.name,
-            "bgg_id": game.bgg_id,
-            "bgg_url": f"https://boardgamegeek.com/boardgame/{game.bgg_id}",
-            "rank": game.bgg_rank,
-            "year": game.yearpublished,
-        })
+    result = [_user_game_item(game) for game in rows]
 
+    user_games_cache.set(str(user_id), result)
     return result
 
 
+def user_games_page_query(
+    session: Session,
+    user_id: str,
+    limit: int,
+    after: str | None = None,
+    before: str | None = None,
+) -> Query:
+    """
+    Keyset-запрос страницы игр пользователя по (name, id).
+
+    after/before — id игры, после (до) которой начинается страница.
+    Название игры-курсора берётся подзапросом, поэтому страница — это
+    один запрос без OFFSET. Выбирается limit + 1 строка: лишняя строка
+    говорит, что дальше (раньше) есть ещё игры. Для before строки
+    возвращаются в обратном порядке.
+    """
+    query = user_games_query(session).join(RatingModel).filter(*_user_games_filter(user_id))
+
+    cursor = after or before
+    if cursor is not None:
+        cursor_id = uuid.UUID(str(cursor))
+        cursor_game = aliased(GameModel)
+        cursor_name = select(cursor_game.name).where(cursor_game.id == cursor_id).scalar_subquery()
+        if after is not None:
+            query = query.filter(or_(
+                GameModel.name > cursor_name,
+                and_(GameModel.name == cursor_name, GameModel.id > cursor_id),
+            ))
+        else:
+            query = query.filter(or_(
+                GameModel.name < cursor_name,
+                and_(GameModel.name == cursor_name, GameModel.id < cursor_id),
+            ))
+
+    if before is not None:
+        query = query.order_by(GameModel.name.desc(), GameModel.id.desc())
+    else:
+        query = query.order_by(GameModel.name, GameModel.id)
+    return query.limit(limit + 1)
+
+
+def _user_games_total(session: Session, user_id: str) -> int:
+    """Число игр пользователя с BGG ID; кэшируется вместе со списком игр."""
+    key = _user_games_total_key(user_id)
+    total = user_games_cache.get(key)
+    if total is None:
+        total = (
+            session.query(func.count(RatingModel.id))
+            .join(GameModel, GameModel.id == RatingModel.game_id)
+            .filter(*_user_games_filter(user_id))
+            .scalar()
+        ) or 0
+        user_games_cache.set(key, total)
+    return total
+
+
+def _slice_user_games(
+    games: List[Dict[str, Any]],
+    limit: int,
+    after: str | None,
+    before: str | None,
+) -> tuple:
+    """Та же страница, что и user_games_page_query, но из уже загруженного списка."""
+    if after is not None:
+        position = next((i for i, game in enumerate(games) if game["id"] == str(after)), None)
+        if position is None:
+            return [], False, False
+        page = games[position + 1:position + 1 + limit]
+        return page, True, position + 1 + limit < len(games)
+    if before is not None:
+        position = next((i for i, game in enumerate(games) if game["id"] == str(before)), None)
+        if position is None:
+            return [], False, False
+        start = max(0, position - limit)
+        return games[start:position], start > 0, True
+    return games[:limit], False, limit < len(games)
+
+
+def get_user_games_page(
+    session: Session,
+    user_id: str,
+    limit: int,
+    after: str | None = None,
+    before: str | None = None,
+) -> Dict[str, Any]:
+    """
+    Страница списка игр пользователя (keyset-пагинация по названию и id).
+
+    Если полный список игр пользователя уже в кэше, страница берётся из
+    него без запросов к БД. Иначе выполняется один keyset-запрос страницы
+    и (при первом обращении) запрос общего числа игр.
+
+    :param after: id последней игры предыдущей страницы (листаем вперёд)
+    :param before: id первой игры следующей страницы (листаем назад)
+    :return: {"games", "total", "next_cursor", "prev_cursor"}; курсор —
+             id игры, который нужно передать в after/before
+    """
+    cached = user_games_cache.get(str(user_id))
+    if cached is not None:
+        games, has_prev, has_next = _slice_user_games(cached, limit, after, before)
+        total = len(cached)
+    else:
+        rows = user_games_page_query(session, user_id, limit, after=after, before=before).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if before is not None:
+            rows.reverse()
+            has_prev, has_next = has_more, True
+        else:
+            has_prev, has_next = after is not None, has_more
+        games = [_user_game_item(game) for game in rows]
+        total = _user_games_total(session, user_id)
+
+    if not games:
+        # Курсор мог устареть (игру удалили) — начинаем сначала
+        has_prev = has_next = False
+    return {
+        "games": games,
+        "total": total,
+        "next_cursor": games[-1]["id"] if has_next and games else None,
+        "prev_cursor": games[0]["id"] if has_prev and games else None,
+    }
+
+
+# Поля игры, которые заполняются из данных BGG: ключ в данных BGG -> колонка games
+BGG_GAME_FIELDS: Dict[str, str] = {
+    "id": "bgg_id",
+    "rank": "bgg_rank",
+    "yearpublished": "yearpublished",
+    "bayesaverage": "bayesaverage",
+    "usersrated": "usersrated",
+    "minplayers": "minplayers",
+    "maxplayers": "maxplayers",
+    "playingtime": "playingtime",
+    "minplaytime": "minplaytime",
+    "maxplaytime": "maxplaytime",
+    "minage": "minage",
+    "average": "average",
+    "numcomments": "numcomments",
+    "owned": "owned",
+    "trading": "trading",
+    "wanting": "wanting",
+    "wishing": "wishing",
+    "averageweight": "averageweight",
+    "numweights": "numweights",
+    "categories": "categories",
+    "mechanics": "mechanics",
+    "designers": "designers",
+    "publishers": "publishers",
+    "image": "image",
+    "thumbnail": "thumbnail",
+    "description": "description",
+    "alternate_names": "alternate_names",
+}
+
+
+# Поля, которые обновляет выгрузка рангов BGG (app.infrastructure.ranks_dump)
+RANK_DUMP_FIELDS = ("bgg_rank", "yearpublished", "bayesaverage", "average", "usersrated")
+
+
+def bgg_game_values(bgg_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Значения колонок games из данных BGG (get_boardgame_details)."""
+    return {column: bgg_data.get(key) for key, column in BGG_GAME_FIELDS.items()}
+
+
 def save_game_from_bgg_data(
     session: Session,
     bgg_data: Dict[str, Any],
@@ -127,55 +380,48 @@ def save_game_from_bgg_data(
         bgg_russian_name = bgg_data.get("name_ru")
         if bgg_russian_name:
             game_name = bgg_russian_name
-            logger.info(f"Using Russian name from BGG: '{game_name}'")
+            logger.info("Using Russian name from BGG: '%s'", game_name)
         elif user_query:
             game_name = user_query
-            logger.info(f"Using user query: '{game_name}'")
+            logger.info("Using user query: '%s'", game_name)
         else:
             game_name = name
-            logger.info(f"Using English name from BGG: '{game_name}'")
+            logger.info("Using English name from BGG: '%s'", game_name)
+
+        if game_name != name:
+            # Игра могла прийти из таблицы под этим названием без bgg_id —
+            # тогда привязываем bgg_id к ней (games.name уникально)
+            game = (
+                session.query(GameModel)
+                .filter(GameModel.name == game_name)
+                .one_or_none()
+            )
+            if game is not None and game.bgg_id not in (None, game_id):
+                logger.warning(
+                    "Name '%s' is taken by BGG game %s, saving BGG game %s as '%s'",
+                    game_name, game.bgg_id, game_id, name,
+                )
+                game, game_name = None, name
 
+    if game is None:
         game = GameModel(name=game_name)
         session.add(game)
-        logger.info(f"Created new game from BGG data: {game_name} (bgg_id: {game_id})")
+        logger.info("Created new game from BGG data: %s (bgg_id: %s)", game_name, game_id)
 
     # Обновляем все поля данными из BGG
-    game.bgg_id = game_id
-    game.bgg_rank = bgg_data.get("rank")
-    game.yearpublished = bgg_data.get("yearpublished")
-    game.bayesaverage = bgg_data.get("bayesaverage")
-    game.usersrated = bgg_data.get("usersrated")
-    game.minplayers = bgg_data.get("minplayers")
-    game.maxplayers = bgg_data.get("maxplayers")
-    game.playingtime = bgg_data.get("playingtime")
-    game.minplaytime = bgg_data.get("minplaytime")
-    game.maxplaytime = bgg_data.get("maxplaytime")
-    game.minage = bgg_data.get("minage")
-    game.average = bgg_data.get("average")
-    game.numcomments = bgg_data.get("numcomments")
-    game.owned = bgg_data.get("owned")
-    game.trading = bgg_data.get("trading")
-    game.wanting = bgg_data.get("wanting")
-    game.wishing = bgg_data.get("wishing")
-    game.averageweight = bgg_data.get("averageweight")
-    game.numweights = bgg_data.get("numweights")
-    game.categories = bgg_data.get("categories")
-    game.mechanics = bgg_data.get("mechanics")
-    game.designers = bgg_data.get("designers")
-    game.publishers = bgg_data.get("publishers")
-    game.image = bgg_data.get("image")
-    game.thumbnail = bgg_data.get("thumbnail")
-    game.description = bgg_data.get("description")
+    for column, value in bgg_game_values(bgg_data).items():
+        setattr(game, column, value)
     # description_ru будет заполнен позже через фоновый перевод
 
     session.flush()
     action = "updated" if game.bgg_id == game_id else "created"
-    logger.info(f"💾 Game {action}: '{name}' (DB ID: {game.id}, BGG ID: {game_id})")
+    logger.info("💾 Game %s: '%s' (DB ID: %s, BGG ID: %s)", action, name, game.id, game_id)
 
-    if game.description:
-        logger.debug(f"📝 Game '{name}' has description ({len(game.description)} chars)")
+    description = bgg_data.get("description")
+    if description:
+        logger.debug("📝 Game '%s' has description (%s chars)", name, len(description))
     else:
-        logger.debug(f"📝 Game '{name}' has no description")
+        logger.debug("📝 Game '%s' has no description", name)
 
     return game
 
@@ -203,29 +449,46 @@ def _should_update_game(game: GameModel, is_forced_update: bool) -> bool:
     - is_forced_update=True (принудительное обновление)
     - Новая игра (нет bgg_id - данные из BGG не загружались)
     - Существующая игра, данные которой старше 30 дней
+
+    Выгрузка рангов BGG (ranks_updated_at) свежесть не продлевает: она
+    обновляет только ранг и статистику, а не описание, картинки и прочее
+    (см. _ranks_fresh).
     """
     if is_forced_update:
-        logger.debug(f"Forced update requested for game: {game.name}")
+        logger.debug("Forced update requested for game: %s", game.name)
         return True
 
     # Новая игра - нет данных из BGG
     if not game.bgg_id:
-        logger.debug(f"Game {game.name} has no BGG ID, update needed")
+        logger.debug("Game %s has no BGG ID, update needed", game.name)
         return True
 
     # Существующая игра - проверяем дату последнего обновления
     if not game.updated_at:
-        logger.debug(f"Game {game.name} has no updated_at, update needed")
+        logger.debug("Game %s has no updated_at, update needed", game.name)
         return True
 
     now = datetime.now(timezone.utc)
     should_update = now - game.updated_at > GAME_UPDATE_DELTA
     if should_update:
-        logger.debug(f"Game {game.name} data is outdated (last update: {game.updated_at})")
+        logger.debug("Game %s data is outdated (last update: %s)", game.name, game.updated_at)
     return should_update
 
 
-def _fetch_bgg_details_for_row(row: Dict[str, Any]) -> Dict[str, Any] | None:
+def _ranks_fresh(game: GameModel, now: datetime) -> bool:
+    """
+    Ранг и статистика игры свежие из выгрузки рангов BGG.
+
+    Тогда при обновлении из BGG API поля RANK_DUMP_FIELDS не трогаем:
+    ранги всех игр остаются из одной выгрузки.
+    """
+    return game.ranks_updated_at is not None and now - game.ranks_updated_at <= GAME_UPDATE_DELTA
+
+
+def _fetch_bgg_details_for_row(
+    row: Dict[str, Any],
+    on_not_found: Callable[[str], None] | None = None,
+) -> Dict[str, Any] | None:
     """
     Вспомогательная функция: по названию получает подробные данные игры из BGG.
 
@@ -237,6 +500,9 @@ def _fetch_bgg_details_for_row(row: Dict[str, Any]) -> Dict[str, Any] | None:
     - Наконец по количеству голосов (больше = лучше)
 
     Explicit bgg_id из данных импорта игнорируется, так как часто содержит ошибки.
+
+    on_not_found вызывается, только если BGG ответил, что игр с таким названием
+    нет; при ошибках запросов функция просто возвращает None.
     """
     name = row.get("name")
 
@@ -247,15 +513,15 @@ def _fetch_bgg_details_for_row(row: Dict[str, Any]) -> Dict[str, Any] | None:
 
     # Всегда ищем по названию - это более надежно чем проверка explicit bgg_id,
     # так как данные импорта часто содержат неправильные ID
-    logger.debug(f"Searching BGG for game: {name}")
-
-    logger.debug(f"Searching BGG for game: {name}")
+    logger.debug("Searching BGG for game: %s", name)
     try:
         found = search_boardgame(name, exact=True)
         if not found:
             found = search_boardgame(name, exact=False)
             if not found:
-                logger.warning(f"❌ No BGG search results found for game: '{name}'")
+                logger.warning("❌ No BGG search results found for game: '%s'", name)
+                if on_not_found is not None:
+                    on_not_found(name)
                 return None
 
         # Получаем детали для большего количества кандидатов для выбора лучшего
@@ -266,21 +532,22 @@ def _fetch_bgg_details_for_row(row: Dict[str, Any]) -> Dict[str, Any] | None:
             try:
                 game_id = item.get("id")
                 if not game_id:
-                    logger.warning(f"Пропущен item без id: {item}")
+                    logger.warning("Пропущен item без id: %s", item)
                     continue
 
-                logger.debug(f"Загрузка деталей кандидата {idx}/{candidates_limit}: game_id={game_id}")
+                logger.debug("Загрузка деталей кандидата %s/%s: game_id=%s", idx, candidates_limit, game_id)
                 details = get_boardgame_details(game_id)
-                logger.debug(f"Получены детали для game_id={game_id}: name='{details.get('name')}', type='{details.get('type')}', rank={details.get('rank')}")
                 candidates.append(details)
                 # Задержка между запросами для избежания rate limiting
                 time.sleep(config.BGG_REQUEST_DELAY)
+            except CircuitOpenError:
+                raise
             except Exception as e:
-                logger.error(f"Ошибка при загрузке деталей кандидата game_id={item.get('id')}: {e}", exc_info=True)
+                logger.error("Ошибка при загрузке деталей кандидата game_id=%s: %s", item.get('id'), e, exc_info=True)
                 continue
 
         if not candidates:
-            logger.warning(f"❌ Failed to load details for any BGG candidates for game: '{name}' (found {len(found)} candidates)")
+            logger.warning("❌ Failed to load details for any BGG candidates for game: '%s' (found %s candidates)", name, len(found))
             return None
 
         # Сортируем кандидатов по релевантности с использованием fuzzy matching:
@@ -289,25 +556,10 @@ def _fetch_bgg_details_for_row(row: Dict[str, Any]) -> Dict[str, Any] | None:
         # 3. Затем по схожести названия (fuzzy ratio)
         # 4. Затем по мировому рейтингу (меньше число = выше)
         # 5. Наконец по количеству голосов (больше = лучше)
-        def sort_key(candidate: Dict[str, Any]) -> tuple:
-            candidate_name = (candidate.get("name") or '').strip()
-            query_name_clean = name.strip()
-
-            # Используем fuzzy matching если доступна библиотека
-            if fuzz is not None:
-                # Рассчитываем схожесть с учетом сортировки слов
-                similarity_ratio = fuzz.token_sort_ratio(query_name_clean, candidate_name)
-                # Проверяем, содержит ли одно название другое
-                partial_ratio = fuzz.partial_ratio(query_name_clean.lower(), candidate_name.lower())
-                # Лучший из двух показателей
-                best_similarity = max(similarity_ratio, partial_ratio)
-            else:
-                # Fallback на простое сравнение без fuzzywuzzy
-                best_similarity = 100 if candidate_name.lower() == query_name_clean.lower() else 0
+        query_name_clean = name.strip()
 
-            # Определяем уровень схожести
-            is_high_similarity = best_similarity >= 85  # Очень похожие названия
-            is_medium_similarity = best_similarity >= 60  # Умеренно похожие
+        def sort_key(candidate: Dict[str, Any], best_similarity: int) -> tuple:
+            candidate_name = (candidate.get("name") or '').strip()
 
             # Дополнительная проверка на расширения: если название кандидата намного длиннее,
             # это может быть расширение или связанная игра
@@ -320,7 +572,7 @@ def _fetch_bgg_details_for_row(row: Dict[str, Any]) -> Dict[str, Any] | None:
 
             # Создаем приоритеты:
             # 1. Высокая схожесть названия (основной фактор)
-            similarity_priority = 0 if is_high_similarity else (1 if is_medium_similarity else 2)
+            similarity_priority = similarity_tier(best_similarity)
             # 2. Основные игры имеют приоритет перед расширениями
             game_type_priority = 0 if is_base_game else 1000
             if is_likely_expansion:
@@ -337,55 +589,557 @@ def _fetch_bgg_details_for_row(row: Dict[str, Any]) -> Dict[str, Any] | None:
                 -users_rated                  # Больше голосов
             )
 
-        candidates_sorted = sorted(candidates, key=sort_key)
+        # Схожесть всех кандидатов считается одним вызовом; ключи — один раз,
+        # они же используются в логах ниже
+        similarities = score_candidates(query_name_clean, [c.get("name") for c in candidates])
+        sort_keys = [sort_key(c, similarity) for c, similarity in zip(candidates, similarities)]
+        order = sorted(range(len(candidates)), key=sort_keys.__getitem__)
+        candidates_sorted = [candidates[i] for i in order]
         best_candidate = candidates_sorted[0]
+        best_similarity = -sort_keys[order[0]][2]
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Выбор лучшего кандидата для '%s' из %s вариантов:", name, len(candidates))
+            for position, i in enumerate(order[:5], 1):  # Показываем топ-5
+                candidate = candidates[i]
+                logger.debug(
+                    "  %s. [%s%%] '%s' (ID: %s, Type: %s, Rank: %s, Users: %s) | Sort key: %s",
+                    position, -sort_keys[i][2], candidate.get("name"), candidate.get("id"),
+                    candidate.get("type", "unknown"), candidate.get("rank", "N/A"),
+                    candidate.get("usersrated", 0), sort_keys[i],
+                )
 
-        # Логируем всех кандидатов для диагностики
-        logger.info(f"🎯 Выбор лучшего кандидата для '{name}' из {len(candidates)} вариантов:")
-        for i, candidate in enumerate(candidates_sorted[:5], 1):  # Показываем топ-5
-            game_type = candidate.get("type", "unknown")
-            rank = candidate.get("rank", "N/A")
-            users_rated = candidate.get("usersrated", 0)
+        logger.debug(
+            "Выбран кандидат для '%s': '%s' (ID: %s, Type: %s, Rank: %s, Similarity: %s%%)",
+            name, best_candidate.get("name"), best_candidate.get("id"),
+            best_candidate.get("type"), best_candidate.get("rank"), best_similarity,
+        )
 
-            # Рассчитываем схожесть для логирования
-            candidate_name = (candidate.get("name") or '').strip()
-            query_name_clean = name.strip()
-            if fuzz is not None:
-                similarity = max(
-                    fuzz.token_sort_ratio(query_name_clean, candidate_name),
-                    fuzz.partial_ratio(query_name_clean.lower(), candidate_name.lower())
-                )
-            else:
-                similarity = 100 if candidate_name.lower() == query_name_clean.lower() else 0
-
-            similarity_indicator = f"{similarity}%"
-            sort_key_value = sort_key(candidate)
-            logger.info(f"  {i}. [{similarity_indicator}] '{candidate.get('name')}' (ID: {candidate.get('id')}, Type: {game_type}, Rank: {rank}, Users: {users_rated}) | Sort key: {sort_key_value}")
-
-        # Рассчитываем схожесть лучшего кандидата для логирования
-        best_candidate_name = (best_candidate.get("name") or '').strip()
-        if fuzz is not None:
-            best_similarity = max(
-                fuzz.token_sort_ratio(name.strip(), best_candidate_name),
-                fuzz.partial_ratio(name.strip().lower(), best_candidate_name.lower())
-            )
+        return best_candidate
+
+    except CircuitOpenError as e:
+        # BGG недоступен: строка импортируется без обновления данных из BGG
+        logger.warning("Skipping BGG lookup for game %s: %s", name, e)
+        return None
+    except Exception as e:
+        logger.error("Error fetching BGG details for game %s: %s", name, e, exc_info=True)
+        return None
+
+def upsert_games_from_bgg(session: Session, bgg_games: List[Dict[str, Any]]) -> Dict[int, tuple[Any, str, bool]]:
+    """
+    Сохраняет игры из данных BGG одним INSERT ... ON CONFLICT (name) DO UPDATE.
+
+    Название — русское из BGG, иначе основное (как в save_game_from_bgg_data).
+    Одноимённая игра без BGG ID (например, из таблицы) дополняется данными BGG;
+    одноимённая игра с другим BGG ID не меняется, и новая игра пропускается.
+
+    :return: bgg_id -> (id игры, название, создана ли игра)
+    """
+    rows: Dict[str, Dict[str, Any]] = {}
+    for data in bgg_games:
+        name = data.get("name_ru") or data.get("name")
+        if not name or not data.get("id") or name in rows:
+            continue
+        rows[name] = {"name": name, **bgg_game_values(data)}
+    if not rows:
+        return {}
+
+    stmt = pg_insert(GameModel).values(list(rows.values()))
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[GameModel.name],
+        set_={**{column: excluded[column] for column in BGG_GAME_FIELDS.values()}, "updated_at": func.now()},
+        where=or_(GameModel.bgg_id.is_(None), GameModel.bgg_id == excluded.bgg_id),
+    ).returning(
+        GameModel.id,
+        GameModel.name,
+        GameModel.bgg_id,
+        # xmax = 0 только у вставленных строк (у обновлённых ON CONFLICT — id транзакции)
+        literal_column("(xmax = 0)").label("inserted"),
+    )
+    return {row.bgg_id: (row.id, row.name, bool(row.inserted)) for row in session.execute(stmt)}
+
+
+def import_bgg_collection(session: Session, user_id: Any, username: str) -> Dict[str, int]:
+    """
+    Импортирует коллекцию пользователя BGG: игры и их привязку к пользователю.
+
+    Запросы к BGG: один /collection (и повторы, пока BGG отвечает 202) и
+    по одному /thing на THING_BATCH_SIZE игр, которых ещё нет в базе.
+    Игры сохраняются одним upsert, оценки — одним INSERT ... ON CONFLICT DO NOTHING.
+
+    Оценки BGG (1–10) не переносятся: места в личном топе (1–50) расставляет
+    ранжирование. Новые игры получают rank=0 («в списке, ещё не оценена»),
+    существующие оценки пользователя не меняются.
+    """
+    collection = get_collection(username)
+    bgg_ids = list(dict.fromkeys(item["id"] for item in collection))
+    result = {
+        "collection_size": len(bgg_ids),
+        "games_known": 0,
+        "games_created": 0,
+        "games_updated": 0,
+        "games_skipped": 0,
+        "ratings_added": 0,
+    }
+    if not bgg_ids:
+        return result
+
+    game_ids: Dict[int, Any] = {
+        bgg_id: game_id
+        for bgg_id, game_id in session.query(GameModel.bgg_id, GameModel.id).filter(GameModel.bgg_id.in_(bgg_ids))
+    }
+    result["games_known"] = len(game_ids)
+
+    unknown = [bgg_id for bgg_id in bgg_ids if bgg_id not in game_ids]
+    details = get_boardgames_details(unknown) if unknown else {}
+    upserted = upsert_games_from_bgg(session, list(details.values()))
+    indexed: List[IndexedGame] = []
+    for bgg_id, (game_id, name, inserted) in upserted.items():
+        game_ids[bgg_id] = game_id
+        result["games_created" if inserted else "games_updated"] += 1
+        indexed.append(index_entry(GameModel(id=game_id, name=name), details.get(bgg_id)))
+    result["games_skipped"] = len(unknown) - len(upserted)
+
+    added: List[Any] = []
+    if game_ids:
+        stmt = (
+            pg_insert(RatingModel)
+            .values([{"user_id": user_id, "game_id": game_id, "rank": 0} for game_id in game_ids.values()])
+            .on_conflict_do_nothing(index_elements=[RatingModel.user_id, RatingModel.game_id])
+            .returning(RatingModel.game_id)
+        )
+        added = list(session.execute(stmt).scalars())
+    result["ratings_added"] = len(added)
+
+    session.commit()
+
+    _notify_ratings_changed([(user_id, game_id, 0) for game_id in added])
+    for entry in indexed:
+        game_index.upsert(entry)
+    if upserted:
+        # Данные одноимённых игр могли обновиться и у других пользователей
+        user_games_cache.clear()
+
+    logger.info(
+        "BGG collection '%s' imported: size=%s, known=%s, created=%s, updated=%s, skipped=%s, ratings_added=%s",
+        username, result["collection_size"], result["games_known"], result["games_created"],
+        result["games_updated"], result["games_skipped"], result["ratings_added"],
+    )
+    return result
+
+
+# Во сколько раз окно самых устаревших игр больше пачки обновления:
+# внутри окна игры упорядочиваются по приоритету
+STALE_WINDOW_FACTOR = 5
+
+
+def _active_session_game_ids(session: Session) -> List[uuid.UUID]:
+    """ID игр из незавершённых сессий ранжирования."""
+    game_ids = set()
+    for (games,) in session.query(RankingSessionModel.games).filter(RankingSessionModel.state != "final"):
+        for game_id in games or []:
+            try:
+                game_ids.add(uuid.UUID(str(game_id)))
+            except ValueError:
+                continue
+    return sorted(game_ids)
+
+
+def select_stale_games(session: Session, limit: int, now: datetime | None = None) -> List[GameModel]:
+    """
+    Устаревшие игры с BGG ID для фонового обновления, не больше limit.
+
+    Кандидаты — limit * STALE_WINDOW_FACTOR самых давно обновлённых игр
+    (по индексу ix_games_updated_at) и устаревшие игры из незавершённых
+    сессий ранжирования. Порядок: сначала игры из сессий ранжирования,
+    затем игры с большим числом оценок, затем самые старые.
+    Свежесть считается так же, как в _should_update_game.
+    """
+    cutoff = (now or datetime.now(timezone.utc)) - GAME_UPDATE_DELTA
+    stale = and_(GameModel.bgg_id.isnot(None), GameModel.updated_at < cutoff)
+    window = select(GameModel.id).where(stale).order_by(GameModel.updated_at).limit(limit * STALE_WINDOW_FACTOR)
+    candidates = GameModel.id.in_(window)
+
+    active_ids = _active_session_game_ids(session)
+    if active_ids:
+        in_active_session = GameModel.id.in_(active_ids)
+        candidates = or_(candidates, and_(stale, in_active_session))
+        priority = case((in_active_session, 1), else_=0)
+    else:
+        priority = literal_column("0")
+
+    return (
+        session.query(GameModel)
+        .outerjoin(RatingModel, RatingModel.game_id == GameModel.id)
+        .filter(candidates)
+        .group_by(GameModel.id)
+        .order_by(priority.desc(), func.count(RatingModel.id).desc(), GameModel.updated_at)
+        .limit(limit)
+        .all()
+    )
+
+
+def refresh_stale_games(session: Session, limit: int) -> Dict[str, int]:
+    """
+    Обновляет из BGG до limit устаревших игр (см. select_stale_games).
+
+    Детали запрашиваются пачками через get_boardgames_details. Игры, которых
+    BGG не вернул, тоже отмечаются обновлёнными, чтобы не выбираться снова
+    при каждом запуске.
+
+    :return: {"selected": выбрано, "refreshed": обновлено, "missing": не найдено на BGG}
+    """
+    games = select_stale_games(session, limit)
+    result = {"selected": len(games), "refreshed": 0, "missing": 0}
+    if not games:
+        return result
+
+    details = get_boardgames_details([game.bgg_id for game in games])
+    now = datetime.now(timezone.utc)
+    indexed: List[IndexedGame] = []
+    for game in games:
+        bgg_data = details.get(game.bgg_id)
+        if bgg_data is None:
+            logger.warning("Stale game %s (bgg_id=%s) not returned by BGG", game.name, game.bgg_id)
+            result["missing"] += 1
         else:
-            best_similarity = 100 if best_candidate_name.lower() == name.strip().lower() else 0
+            values = bgg_game_values(bgg_data)
+            if _ranks_fresh(game, now):
+                for column in RANK_DUMP_FIELDS:
+                    values.pop(column, None)
+            for column, value in values.items():
+                setattr(game, column, value)
+            indexed.append(index_entry(game, bgg_data))
+            result["refreshed"] += 1
+        # onupdate не срабатывает, если данные BGG не изменились
+        game.updated_at = now
+    session.commit()
 
-        logger.info(f"✅ Выбран кандидат: '{best_candidate.get('name')}' (ID: {best_candidate.get('id')}, Type: {best_candidate.get('type')}, Rank: {best_candidate.get('rank')}, Similarity: {best_similarity}%)")
+    for entry in indexed:
+        game_index.upsert(entry)
+    if indexed:
+        user_games_cache.clear()
 
-        return best_candidate
+    GAME_REFRESH.inc(result["refreshed"], result="refreshed")
+    GAME_REFRESH.inc(result["missing"], result="missing")
+    logger.info(
+        "Stale games refreshed: selected=%s, refreshed=%s, missing=%s",
+        result["selected"], result["refreshed"], result["missing"],
+    )
+    return result
 
+
+def unresolved_name_key(name: str) -> str:
+    """Ключ негативного кэша: название без учёта регистра и лишних пробелов."""
+    return " ".join(name.casefold().split())
+
+
+def unresolved_recheck_interval(attempts: int) -> timedelta:
+    """Интервал до следующей проверки после attempts неудачных поисков подряд."""
+    hours = config.BGG_UNRESOLVED_RECHECK_HOURS * 2 ** min(max(attempts - 1, 0), 20)
+    return min(timedelta(hours=hours), timedelta(days=config.BGG_UNRESOLVED_MAX_RECHECK_DAYS))
+
+
+def load_unresolved_names(session: Session) -> Dict[str, BggUnresolvedNameModel]:
+    """Весь негативный кэш одним запросом: name_key -> запись."""
+    return {entry.name_key: entry for entry in session.query(BggUnresolvedNameModel).all()}
+
+
+def _unresolved_pending(entry: BggUnresolvedNameModel | None, now: datetime) -> bool:
+    """True, если название в негативном кэше и срок повторной проверки ещё не наступил."""
+    return (
+        entry is not None
+        and entry.bgg_id is None
+        and entry.next_check_at is not None
+        and entry.next_check_at > now
+    )
+
+
+def _record_unresolved(
+    session: Session,
+    entry: BggUnresolvedNameModel | None,
+    name: str,
+    now: datetime,
+) -> BggUnresolvedNameModel:
+    """Отмечает очередную неудачную попытку найти название и назначает следующую проверку."""
+    if entry is None:
+        entry = BggUnresolvedNameModel(name_key=unresolved_name_key(name), name=name, attempts=0)
+        session.add(entry)
+    entry.attempts = (entry.attempts or 0) + 1
+    entry.last_checked_at = now
+    entry.next_check_at = now + unresolved_recheck_interval(entry.attempts)
+    return entry
+
+
+def _fetch_bgg_details_by_id(bgg_id: int) -> Dict[str, Any] | None:
+    """Данные игры по вручную заданному BGG ID (без поиска по названию)."""
+    try:
+        return get_boardgame_details(bgg_id)
     except Exception as e:
-        logger.error(f"Error fetching BGG details for game {name}: {e}", exc_info=True)
+        logger.error("Error fetching BGG details for bgg_id %s: %s", bgg_id, e, exc_info=True)
+        return None
+
+
+def list_unresolved_names(session: Session) -> List[BggUnresolvedNameModel]:
+    return (
+        session.query(BggUnresolvedNameModel)
+        .order_by(BggUnresolvedNameModel.next_check_at.asc().nullsfirst(), BggUnresolvedNameModel.name)
+        .all()
+    )
+
+
+def set_unresolved_override(session: Session, entry_id: Any, bgg_id: int | None) -> BggUnresolvedNameModel | None:
+    """
+    Ручное сопоставление названия с игрой на BGG.
+
+    С bgg_id импорт берёт данные игры по этому ID, без поиска по названию.
+    bgg_id=None снимает сопоставление, и название снова проверяется
+    при ближайшем импорте.
+    """
+    entry = session.get(BggUnresolvedNameModel, entry_id)
+    if entry is None:
         return None
+    entry.bgg_id = bgg_id
+    if bgg_id is None:
+        entry.next_check_at = None
+    session.commit()
+    return entry
+
+
+def delete_unresolved_name(session: Session, entry_id: Any) -> bool:
+    """Удаляет запись: при ближайшем импорте название снова ищется в BGG."""
+    deleted = session.query(BggUnresolvedNameModel).filter(BggUnresolvedNameModel.id == entry_id).delete()
+    session.commit()
+    return bool(deleted)
+
+
+# Оценка запросов к BGG на строку импорта (см. _fetch_bgg_details_for_row):
+# поиск по названию и детали до 5 кандидатов, после каждого /thing — пауза
+# BGG_REQUEST_DELAY; по ручному BGG ID — один /thing и пауза
+PLAN_CALLS_BY_NAME = 6
+PLAN_CALLS_BY_ID = 1
+# Длительность запроса к BGG, пока в метриках нет ни одного замера
+DEFAULT_BGG_REQUEST_SECONDS = 1.0
+
+
+def _import_row_name(row: Any) -> str | None:
+    """Название игры из строки импорта или None, если строка будет пропущена."""
+    if not isinstance(row, dict) or not isinstance(row.get("name"), str):
+        return None
+    return row["name"].strip() or None
+
+
+def _bgg_request_seconds() -> float:
+    """Средняя длительность запроса к BGG по метрикам этого процесса."""
+    endpoints = ("search", "thing")
+    count = sum(BGG_REQUEST_SECONDS.count(endpoint=endpoint) for endpoint in endpoints)
+    if not count:
+        return DEFAULT_BGG_REQUEST_SECONDS
+    return sum(BGG_REQUEST_SECONDS.total(endpoint=endpoint) for endpoint in endpoints) / count
+
+
+def plan_import(
+    session: Session,
+    rows: Iterable[Dict[str, Any]],
+    *,
+    is_forced_update: bool = False,
+    resume_after: int = 0,
+) -> Dict[str, Any]:
+    """
+    План импорта без запросов к BGG и без записи в БД (dry run).
+
+    Строки классифицируются так же, как в replace_all_from_table, но игры
+    читаются одним запросом на IMPORT_CHUNK_SIZE строк:
+    - create — новая игра; update — существующая, из них stale — данные
+      устарели (будет запрос к BGG), unchanged — свежие;
+    - unresolved_skipped — запросы, которые не будут сделаны из-за негативного кэша;
+    - bgg_lookups / bgg_calls — строки с запросами к BGG и оценка числа запросов;
+    - estimated_seconds — оценка длительности при текущих BGG_REQUEST_DELAY
+      и средней длительности запроса (bgg_request_seconds).
+
+    resume_after — last_row незавершённого чекпойнта той же таблицы
+    (см. resumable_import_row): эти строки импорт пропустит, и в план они
+    не входят (resumed_skipped).
+    """
+    unresolved = load_unresolved_names(session)
+    now = datetime.now(timezone.utc)
+    plan: Dict[str, Any] = {
+        "rows": 0, "invalid": 0, "create": 0, "update": 0, "stale": 0, "unchanged": 0,
+        "unresolved_skipped": 0, "bgg_lookups": 0, "bgg_calls": 0, "resumed_skipped": 0,
+    }
+    seen: set[str] = set()
+
+    def classify(names: List[str]) -> None:
+        existing = {
+            game.name: game
+            for game in session.query(
+                GameModel.name, GameModel.bgg_id, GameModel.updated_at
+            ).filter(GameModel.name.in_(set(names)))
+        }
+        for name in names:
+            game = existing.get(name)
+            if name in seen:
+                # Повтор строки: игра уже создана или обновлена выше по таблице
+                plan["update"] += 1
+                lookup = is_forced_update
+            elif game is None:
+                plan["create"] += 1
+                lookup = True
+            else:
+                plan["update"] += 1
+                lookup = _should_update_game(game, is_forced_update)
+            if name in existing or name in seen:
+                plan["stale" if lookup else "unchanged"] += 1
+            seen.add(name)
+
+            entry = unresolved.get(unresolved_name_key(name))
+            if lookup and _unresolved_pending(entry, now):
+                plan["unresolved_skipped"] += 1
+            elif lookup:
+                plan["bgg_lookups"] += 1
+                by_id = entry is not None and entry.bgg_id is not None
+                plan["bgg_calls"] += PLAN_CALLS_BY_ID if by_id else PLAN_CALLS_BY_NAME
+
+    chunk: List[str] = []
+    for row in rows:
+        plan["rows"] += 1
+        if plan["rows"] <= resume_after:
+            # Закоммичено прерванным импортом — повторный импорт строку пропустит
+            plan["resumed_skipped"] += 1
+            continue
+        name = _import_row_name(row)
+        if name is None:
+            plan["invalid"] += 1
+            continue
+        chunk.append(name)
+        if len(chunk) >= config.IMPORT_CHUNK_SIZE:
+            classify(chunk)
+            chunk = []
+    if chunk:
+        classify(chunk)
+
+    request_seconds = _bgg_request_seconds()
+    plan["bgg_request_seconds"] = round(request_seconds, 3)
+    plan["bgg_request_delay"] = config.BGG_REQUEST_DELAY
+    plan["estimated_seconds"] = round(plan["bgg_calls"] * (request_seconds + config.BGG_REQUEST_DELAY), 1)
+    logger.info("Import plan: %s", plan)
+    return plan
+
+
+class ImportInProgressError(RuntimeError):
+    """Другой импорт таблицы ещё выполняется."""
+
+
+# Ключ pg_try_advisory_lock, под которым выполняется импорт таблицы
+IMPORT_LOCK_KEY = 0x42475249  # "BGRI"
+
+
+@contextmanager
+def import_lock(session: Session) -> Iterator[None]:
+    """
+    Не даёт импортам таблицы выполняться одновременно (во всех воркерах).
+
+    Блокировка уровня сессии Postgres держится на отдельном соединении:
+    соединение сессии импорта возвращается в пул после каждого commit.
+    Если блокировка занята, сразу бросает ImportInProgressError.
+    """
+    connection = session.get_bind().connect()
+    try:
+        acquired = connection.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": IMPORT_LOCK_KEY}
+        ).scalar()
+        if not acquired:
+            raise ImportInProgressError("Another table import is already running")
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": IMPORT_LOCK_KEY})
+    finally:
+        connection.close()
+
+
+def import_fingerprint(content_digest: "hashlib._Hash", is_forced_update: bool) -> str:
+    """
+    Отпечаток импорта: хэш содержимого таблицы и флага принудительного обновления.
+
+    :param content_digest: hashlib.sha256 содержимого (можно накопленный по частям)
+    """
+    digest = content_digest.copy()
+    digest.update(b"\0forced" if is_forced_update else b"\0regular")
+    return digest.hexdigest()
+
+
+def resumable_import_row(session: Session, fingerprint: str) -> int:
+    """Строка, после которой продолжится импорт таблицы (0 — начнётся сначала)."""
+    checkpoint = (
+        session.query(ImportCheckpointModel)
+        .filter(ImportCheckpointModel.fingerprint == fingerprint)
+        .one_or_none()
+    )
+    if checkpoint is None or checkpoint.completed_at is not None:
+        return 0
+    return checkpoint.last_row
+
+
+def start_import_checkpoint(session: Session, fingerprint: str, total_rows: int | None = None) -> ImportCheckpointModel:
+    """
+    Чекпойнт для импорта таблицы с данным отпечатком.
+
+    Незавершённый импорт той же таблицы продолжается с last_row, завершённый
+    начинается заново. У каждой таблицы свой чекпойнт; чужие удаляются,
+    только если их импорт завершён или брошен (не продвигался
+    IMPORT_CHECKPOINT_TTL_DAYS дней).
+    """
+    abandoned_before = datetime.now(timezone.utc) - timedelta(days=config.IMPORT_CHECKPOINT_TTL_DAYS)
+    session.query(ImportCheckpointModel).filter(
+        ImportCheckpointModel.fingerprint != fingerprint,
+        or_(
+            ImportCheckpointModel.completed_at.isnot(None),
+            ImportCheckpointModel.updated_at < abandoned_before,
+        ),
+    ).delete(synchronize_session=False)
+    checkpoint = (
+        session.query(ImportCheckpointModel)
+        .filter(ImportCheckpointModel.fingerprint == fingerprint)
+        .one_or_none()
+    )
+    if checkpoint is None:
+        checkpoint = ImportCheckpointModel(fingerprint=fingerprint, last_row=0)
+        session.add(checkpoint)
+    elif checkpoint.completed_at is not None:
+        checkpoint.last_row = 0
+        checkpoint.completed_at = None
+    elif checkpoint.last_row:
+        logger.info("Resuming interrupted import %s after row %s", fingerprint[:12], checkpoint.last_row)
+    checkpoint.total_rows = total_rows
+    session.commit()
+    return checkpoint
+
+
+# Объекты, которые импорт меняет на протяжении всей таблицы и не отсоединяет от сессии
+_IMPORT_LONG_LIVED = (BggUnresolvedNameModel, ImportCheckpointModel)
+
+
+def _expunge_import_chunk(session: Session) -> None:
+    """
+    Отсоединяет от сессии объекты обработанных строк импорта, чтобы память
+    не росла вместе с таблицей. Записи негативного кэша и чекпойнт остаются
+    в сессии: их меняют следующие строки.
+    """
+    for obj in list(session.identity_map.values()):
+        if not isinstance(obj, _IMPORT_LONG_LIVED):
+            session.expunge(obj)
 
 
 def replace_all_from_table(
     session: Session,
-    rows: List[Dict[str, Any]],
+    rows: Iterable[Dict[str, Any]],
     *,
     is_forced_update: bool = False,
+    total_rows: int | None = None,
+    checkpoint: ImportCheckpointModel | None = None,
+    stats: Dict[str, int] | None = None,
 ) -> int:
     """
     Обновляет данные об играх и оценках на основе табличных данных.
@@ -399,6 +1153,18 @@ def replace_all_from_table(
     - локальные поля (niza_games_rank, genre, description_ru) всегда обновляются из таблицы;
     - добавлено управление частотой обновлений через is_forced_update.
 
+    rows может быть и потоком (генератором) строк — тогда общее число строк
+    для метрик передаётся в total_rows. Каждые IMPORT_CHUNK_SIZE строк
+    обработанные объекты отсоединяются от сессии, и память не зависит от
+    размера таблицы.
+
+    С checkpoint (см. start_import_checkpoint) строки до checkpoint.last_row
+    пропускаются без запросов к BGG, а номер строки сохраняется в чекпойнт
+    в одной транзакции с самой строкой.
+
+    В stats (если передан) записывается "failed" — число строк, которые не
+    удалось сохранить (их изменения откачены).
+
     Ожидаемый формат rows:
     [
         {
@@ -412,62 +1178,107 @@ def replace_all_from_table(
         ...
     ]
     """
-    logger.info(f"Starting import from table: {len(rows)} rows, forced_update={is_forced_update}")
+    # Счётчик, а не флаг: гейдж верен и при параллельных импортах, и при
+    # исключении, вылетевшем из импорта (иначе фоновое обновление игр
+    # пропускало бы все запуски до перезапуска процесса)
+    IMPORT_IN_PROGRESS.inc()
+    try:
+        return _import_table_rows(
+            session, rows, is_forced_update=is_forced_update, total_rows=total_rows, checkpoint=checkpoint,
+            stats=stats if stats is not None else {},
+        )
+    finally:
+        IMPORT_IN_PROGRESS.dec()
 
-    # Логируем первые несколько строк для диагностики
-    if rows:
-        logger.info(f"Sample row 0: {rows[0]}")
-        if len(rows) > 1:
-            logger.info(f"Sample row 1: {rows[1]}")
 
-    # Логируем структуру данных для диагностики
-    if rows:
-        logger.debug(f"Sample row structure: {rows[0]}")
-        logger.debug(f"Row keys: {list(rows[0].keys())}")
-    else:
-        logger.warning("No rows to process!")
-        return
+def _import_table_rows(
+    session: Session,
+    rows: Iterable[Dict[str, Any]],
+    *,
+    is_forced_update: bool,
+    total_rows: int | None,
+    checkpoint: ImportCheckpointModel | None,
+    stats: Dict[str, int],
+) -> int:
+    """Тело replace_all_from_table (без учёта IMPORT_IN_PROGRESS)."""
+    stats["failed"] = 0
+    if total_rows is None and isinstance(rows, Sequence):
+        total_rows = len(rows)
+    logger.info("Starting import from table: %s rows, forced_update=%s", total_rows, is_forced_update)
+
+    # Пример строки — только для диагностики
+    if isinstance(rows, Sequence):
+        if not rows:
+            logger.warning("No rows to process!")
+            return
+        logger.debug("Sample row 0: %s", rows[0])
     
     # Рейтинги добавляем/обновляем последовательно вместе с играми
     # (не удаляем существующие, чтобы сохранить историю)
 
     # Проверим, сколько пользователей есть в системе
     total_users_in_db = session.query(UserModel).count()
-    logger.info(f"Total users in database: {total_users_in_db}")
+    logger.info("Total users in database: %s", total_users_in_db)
+
+    # Названия, которые BGG не нашёл: до срока повторной проверки в BGG не ходим
+    unresolved = load_unresolved_names(session)
+    logger.info("Names in BGG negative cache: %s", len(unresolved))
+
+    import_started = time.perf_counter()
+    IMPORT_ROWS_TOTAL.set(total_rows or 0)
+    IMPORT_ROWS_PROCESSED.set(0)
 
     games_created = 0
     games_updated = 0
     games_bgg_updated = 0
     games_bgg_not_found = 0
+    games_bgg_skipped = 0
     ratings_added = 0
     ratings_updated = 0
 
+    # Строки, закоммиченные прерванным запуском того же импорта
+    resume_after = checkpoint.last_row if checkpoint is not None else 0
+    if resume_after:
+        logger.info("Skipping %s rows committed by the interrupted import", resume_after)
+
+    idx = 0
     for idx, row in enumerate(rows, 1):
+        if idx <= resume_after:
+            continue
+        if idx > 1 and (idx - 1) % config.IMPORT_CHUNK_SIZE == 0:
+            _expunge_import_chunk(session)
+        rating_changes: List[RatingChange] = []
+        indexed: IndexedGame | None = None
+        # Изменения негативного кэша применяются к словарю unresolved после commit
+        unresolved_added: BggUnresolvedNameModel | None = None
+        unresolved_removed: str | None = None
+        called_bgg = False
+        IMPORT_ROWS_PROCESSED.set(idx - 1)
         try:
             name = row.get("name")
             if not name:
-                logger.debug(f"Skipping row {idx}: no name")
+                logger.debug("Skipping row %s: no name", idx)
                 continue
 
             # Валидируем структуру данных
             if not isinstance(row, dict):
-                logger.warning(f"Skipping row {idx}: not a dict, got {type(row)}")
+                logger.warning("Skipping row %s: not a dict, got %s", idx, type(row))
                 continue
 
             # Проверяем, что name является строкой
             if not isinstance(name, str):
-                logger.warning(f"Skipping row {idx}: name is not string, got {type(name)}")
+                logger.warning("Skipping row %s: name is not string, got %s", idx, type(name))
                 continue
 
             name = name.strip()
             if not name:
-                logger.debug(f"Skipping row {idx}: empty name after strip")
+                logger.debug("Skipping row %s: empty name after strip", idx)
                 continue
 
-            logger.debug(f"Processing row {idx}: game='{name}'")
+            row_logger.debug(idx, "Processing row %s: game='%s'", idx, name)
 
         except Exception as e:
-            logger.warning(f"Error validating row {idx}: {e}")
+            logger.warning("Error validating row %s: %s", idx, e)
             continue
 
         # Обработка каждой игры в отдельном try/catch для изоляции ошибок
@@ -484,10 +1295,11 @@ def replace_all_from_table(
                 session.add(game)
                 session.flush()
                 games_created += 1
-                logger.debug(f"Created new game: {name}")
+                indexed = index_entry(game)
+                row_logger.debug(idx, "Created new game: %s", name)
             else:
                 games_updated += 1
-                logger.debug(f"Updating existing game: {name}")
+                row_logger.debug(idx, "Updating existing game: %s", name)
 
             # Всегда обновляем "локальные" поля из таблицы (niza_games_rank, genre, description_ru)
             niza_rank = row.get("niza_games_rank")
@@ -495,7 +1307,7 @@ def replace_all_from_table(
                 try:
                     game.niza_games_rank = int(niza_rank) if niza_rank != "" else None
                 except (ValueError, TypeError):
-                    logger.warning(f"Invalid niza_games_rank value for game '{name}': {niza_rank}")
+                    logger.warning("Invalid niza_games_rank value for game '%s': %s", name, niza_rank)
                     game.niza_games_rank = None
             else:
                 game.niza_games_rank = None
@@ -506,28 +1318,47 @@ def replace_all_from_table(
             description_ru = row.get("description_ru")
             if description_ru is not None and description_ru.strip():
                 game.description_ru = description_ru.strip()
-                logger.debug(f"Updated Russian description for game '{name}' from table")
+                row_logger.debug(idx, "Updated Russian description for game '%s' from table", name)
             # Если поле пустое или отсутствует, не трогаем существующее значение
 
+            # Название, которое BGG уже не находил, до срока повторной проверки не ищем
+            unresolved_key = unresolved_name_key(name)
+            unresolved_entry = unresolved.get(unresolved_key)
+            now = datetime.now(timezone.utc)
+            lookup_bgg = _should_update_game(game, is_forced_update)
+            if lookup_bgg and _unresolved_pending(unresolved_entry, now):
+                lookup_bgg = False
+                games_bgg_skipped += 1
+                row_logger.debug(
+                    idx, "Skipping BGG lookup for unresolved game '%s' until %s",
+                    name, unresolved_entry.next_check_at,
+                )
+
             # Решаем, нужно ли идти в BGG за свежими данными
-            if _should_update_game(game, is_forced_update):
-                details = _fetch_bgg_details_for_row(row)
+            if lookup_bgg:
+                called_bgg = True
+                not_found: List[str] = []
+                if unresolved_entry is not None and unresolved_entry.bgg_id is not None:
+                    details = _fetch_bgg_details_by_id(unresolved_entry.bgg_id)
+                else:
+                    details = _fetch_bgg_details_for_row(row, on_not_found=not_found.append)
                 if details:
                     # Обновляем bgg_id если он изменился (или был None)
                     if details.get("id") != game.bgg_id:
-                        logger.info(f"Updated BGG ID for game '{name}': {game.bgg_id} -> {details.get('id')}")
+                        row_logger.debug(idx, "Updated BGG ID for game '%s': %s -> %s", name, game.bgg_id, details.get("id"))
                         game.bgg_id = details.get("id")
-                    game.bgg_rank = details.get("rank")
-                    game.yearpublished = details.get("yearpublished")
-                    game.bayesaverage = details.get("bayesaverage")
-                    game.usersrated = details.get("usersrated")
+                    if is_forced_update or not _ranks_fresh(game, now):
+                        game.bgg_rank = details.get("rank")
+                        game.yearpublished = details.get("yearpublished")
+                        game.bayesaverage = details.get("bayesaverage")
+                        game.usersrated = details.get("usersrated")
+                        game.average = details.get("average")
                     game.minplayers = details.get("minplayers")
                     game.maxplayers = details.get("maxplayers")
                     game.playingtime = details.get("playingtime")
                     game.minplaytime = details.get("minplaytime")
                     game.maxplaytime = details.get("maxplaytime")
                     game.minage = details.get("minage")
-                    game.average = details.get("average")
                     game.numcomments = details.get("numcomments")
                     game.owned = details.get("owned")
                     game.trading = details.get("trading")
@@ -542,47 +1373,58 @@ def replace_all_from_table(
                     game.image = details.get("image")
                     game.thumbnail = details.get("thumbnail")
                     game.description = details.get("description")
+                    game.alternate_names = details.get("alternate_names")
+                    indexed = index_entry(game, details)
                     games_bgg_updated += 1
-                    logger.debug(f"Updated BGG data for game: {name}")
+                    row_logger.debug(idx, "Updated BGG data for game: %s", name)
+                    if unresolved_entry is not None and unresolved_entry.bgg_id is None:
+                        # Название нашлось — убираем его из негативного кэша
+                        session.delete(unresolved_entry)
+                        unresolved_removed = unresolved_key
                 else:
-                    logger.warning(f"❌ Game '{name}' not found on BGG during import (row bgg_id: {row.get('bgg_id')})")
+                    logger.warning("❌ Game '%s' not found on BGG during import (row bgg_id: %s)", name, row.get('bgg_id'))
                     games_bgg_not_found += 1
+                    if not_found:
+                        entry = _record_unresolved(session, unresolved_entry, name, now)
+                        if unresolved_entry is None:
+                            unresolved_added = entry
+                        row_logger.debug(idx, "Game '%s' added to BGG negative cache until %s", name, entry.next_check_at)
 
             session.flush()
 
             # Добавляем рейтинги для игры
             ratings = row.get("ratings") or {}
             if not isinstance(ratings, dict):
-                logger.warning(f"Invalid ratings format for game '{name}': expected dict, got {type(ratings)}")
+                logger.warning("Invalid ratings format for game '%s': expected dict, got %s", name, type(ratings))
                 ratings = {}
 
-            # Логируем пользователей для диагностики
-            logger.info(f"STARTING TO PROCESS RATINGS FOR GAME '{name}': {len(ratings)} users - {list(ratings.keys())}")
+            # Детализация по ячейкам оценок пишется только для сэмплированных строк
+            row_debug = row_logger.enabled(idx)
+            if row_debug:
+                row_logger.logger.debug("Processing ratings for game '%s': %s users", name, len(ratings))
 
             for user_name, rank in ratings.items():
                 try:
-                    logger.debug(f"Processing rating for user '{user_name}' (rank: {rank})")
                     if not isinstance(user_name, str) or not user_name.strip():
                         continue
 
                     # Пропускаем специального пользователя "Общий" - это не настоящий пользователь
                     user_name_clean = user_name.strip().lower()
-                    logger.debug(f"Checking user: '{user_name}' -> '{user_name_clean}'")
                     if 'общий' in user_name_clean or user_name_clean in ['general', 'общий рейтинг'] or user_name_clean == 'общий':
-                        logger.error(f"SKIPPING special user '{user_name}' for game '{name}' - CONDITION MET")
+                        if row_debug:
+                            row_logger.logger.debug("Skipping special user '%s' for game '%s'", user_name, name)
                         continue
-                    else:
-                        logger.debug(f"NOT SKIPPING user '{user_name}' for game '{name}'")
 
                     # rank может быть 0 (место для будущего рейтинга) или 1-50 (оценка)
                     if not isinstance(rank, int) or rank < 0 or rank > 50:
-                        logger.warning(f"Invalid rank value for game '{name}', user '{user_name}': {rank} (type: {type(rank)})")
+                        logger.warning("Invalid rank value for game '%s', user '%s': %s (type: %s)", name, user_name, rank, type(rank))
                         continue
 
                     # Ищем пользователя по имени (предполагаем, что имя в таблице соответствует имени пользователя)
                     user = session.query(UserModel).filter(UserModel.name == user_name.strip()).first()
                     if not user:
-                        logger.debug(f"User '{user_name}' not found, skipping rating for game '{name}'")
+                        if row_debug:
+                            row_logger.logger.debug("User '%s' not found, skipping rating for game '%s'", user_name, name)
                         continue
 
                     # Проверяем, существует ли уже рейтинг для этого пользователя и игры
@@ -594,8 +1436,10 @@ def replace_all_from_table(
                     if existing_rating:
                         # Обновляем существующий рейтинг
                         existing_rating.rank = rank
+                        rating_changes.append((user.id, game.id, rank))
                         ratings_updated += 1
-                        logger.debug(f"Updated rating for user '{user_name.strip()}' and game '{name}': {rank}")
+                        if row_debug:
+                            row_logger.logger.debug("Updated rating for user '%s' and game '%s': %s", user_name, name, rank)
                     else:
                         # Создаем новый рейтинг (включая 0 - место для будущего рейтинга)
                         rating = RatingModel(
@@ -604,38 +1448,69 @@ def replace_all_from_table(
                             rank=rank,
                         )
                         session.add(rating)
+                        rating_changes.append((user.id, game.id, rank))
                         ratings_added += 1
-                        logger.debug(f"Created rating for user '{user_name.strip()}' and game '{name}': {rank}")
+                        if row_debug:
+                            row_logger.logger.debug("Created rating for user '%s' and game '%s': %s", user_name, name, rank)
 
                 except (ValueError, TypeError) as e:
-                    logger.warning(f"Error processing rating for game '{name}', user '{user_name}': {e}")
+                    logger.warning("Error processing rating for game '%s', user '%s': %s", name, user_name, e)
                     continue
 
-            # Сохраняем изменения для этой игры
+            # Сохраняем изменения для этой игры вместе с продвижением чекпойнта
+            if checkpoint is not None:
+                checkpoint.last_row = idx
             session.commit()
+            _notify_ratings_changed(rating_changes)
+            if indexed is not None:
+                game_index.upsert(indexed)
+            if unresolved_added is not None:
+                unresolved[unresolved_added.name_key] = unresolved_added
+            if unresolved_removed is not None:
+                unresolved.pop(unresolved_removed, None)
 
         except Exception as e:
-            logger.error(f"Error processing game '{name}' in row {idx}: {type(e).__name__}: {e}", exc_info=True)
+            logger.error("Error processing game '%s' in row %s: %s: %s", name, idx, type(e).__name__, e, exc_info=True)
             # Откатываем изменения для этой игры, но продолжаем обработку следующих
             session.rollback()
+            IMPORT_GAMES.inc(result="failed")
+            stats["failed"] += 1
             continue
 
-        # Логируем прогресс каждые 10 игр
-        if idx % 10 == 0:
-            logger.info(f"Processed {idx}/{len(rows)} games so far: created={games_created}, updated={games_updated}, ratings_added={ratings_added}")
+        # Логируем прогресс каждые 100 игр
+        if idx % 100 == 0:
+            logger.info("Processed %s/%s games so far: created=%s, updated=%s, ratings_added=%s", idx, total_rows, games_created, games_updated, ratings_added)
 
-        # Небольшая задержка между обработкой игр для снижения нагрузки на API
-        time.sleep(config.BGG_REQUEST_DELAY)
+        # Небольшая задержка между обработкой игр для снижения нагрузки на API;
+        # строки без запросов к BGG (данные свежие, название в негативном кэше) её не ждут
+        if called_bgg:
+            time.sleep(config.BGG_REQUEST_DELAY)
 
     # Примечание: рейтинги пользователя "общий" больше не создаются,
     # так как такого пользователя нет в таблице users
 
+    if checkpoint is not None:
+        checkpoint.completed_at = datetime.now(timezone.utc)
     session.commit()
 
+    # Названия, ссылки и ранги игр могли измениться у всех пользователей
+    user_games_cache.clear()
+
+    IMPORT_ROWS_PROCESSED.set(idx)
+    IMPORT_SECONDS.observe(time.perf_counter() - import_started)
+    IMPORT_GAMES.inc(games_created, result="created")
+    IMPORT_GAMES.inc(games_updated, result="updated")
+    IMPORT_GAMES.inc(games_bgg_updated, result="bgg_updated")
+    IMPORT_GAMES.inc(games_bgg_not_found, result="bgg_not_found")
+    IMPORT_GAMES.inc(games_bgg_skipped, result="bgg_unresolved_skipped")
+    IMPORT_RATINGS.inc(ratings_added, action="added")
+    IMPORT_RATINGS.inc(ratings_updated, action="updated")
+
     logger.info(
-        f"Import completed: created={games_created}, updated={games_updated}, "
-        f"bgg_updated={games_bgg_updated}, bgg_not_found={games_bgg_not_found}, "
-        f"ratings_added={ratings_added}, ratings_updated={ratings_updated}"
+        "Import completed: created=%s, updated=%s, bgg_updated=%s, bgg_not_found=%s, "
+        "bgg_unresolved_skipped=%s, ratings_added=%s, ratings_updated=%s, failed=%s",
+        games_created, games_updated, games_bgg_updated, games_bgg_not_found, games_bgg_skipped,
+        ratings_added, ratings_updated, stats["failed"],
     )
 
     # Возвращаем общее количество обработанных игр
@@ -652,21 +1527,29 @@ def clear_all_data(session: Session) -> Dict[str, int]:
 
     # Удаляем рейтинги (сначала, чтобы не было проблем с foreign keys)
     ratings_deleted = session.query(RatingModel).delete()
-    logger.info(f"Deleted {ratings_deleted} ratings")
+    logger.info("Deleted %s ratings", ratings_deleted)
 
     # Удаляем сессии ранжирования
     sessions_deleted = session.query(RankingSessionModel).delete()
-    logger.info(f"Deleted {sessions_deleted} ranking sessions")
+    logger.info("Deleted %s ranking sessions", sessions_deleted)
 
     # Удаляем игры (последними, так как на них могут ссылаться рейтинги)
     games_deleted = session.query(GameModel).delete()
-    logger.info(f"Deleted {games_deleted} games")
+    logger.info("Deleted %s games", games_deleted)
+
+    # Прерванный импорт нельзя продолжить: закоммиченные им игры удалены
+    session.query(ImportCheckpointModel).delete()
+
+    # Групповой рейтинг будет перестроен из БД при следующем запросе
+    group_leaderboard.invalidate()
+    game_index.invalidate()
+    user_games_cache.clear()
 
     # Пользователи НЕ удаляются
     users_deleted = 0
     logger.info("Users preserved - not deleted")
 
-    logger.info(f"Database cleanup completed: games={games_deleted}, ratings={ratings_deleted}, sessions={sessions_deleted}, users_preserved=users_not_deleted")
+    logger.info("Database cleanup completed: games=%s, ratings=%s, sessions=%s, users_preserved=users_not_deleted", games_deleted, ratings_deleted, sessions_deleted)
 
     return {
         "games_deleted": games_deleted,
@@ -6,6 +6,9 @@ import xml.etree.ElementTree as ET
 import html
 
 from app.config import config
+from app.utils.metrics import registry
+from app.utils.retry import CircuitBreaker, RetryPolicy, parse_retry_after
+from app.utils.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -19,8 +22,61 @@ except ImportError as exc:  # pragma: no cover - only for local runtime
     ) from exc
 
 
-BGG_SEARCH_URL = "https://boardgamegeek.com/xmlapi2/search"
-BGG_THING_URL = "https://boardgamegeek.com/xmlapi2/thing"
+BGG_SEARCH_URL = config.BGG_SEARCH_URL
+BGG_THING_URL = config.BGG_THING_URL
+BGG_COLLECTION_URL = config.BGG_COLLECTION_URL
+
+# Сколько id BGG принимает в одном запросе /thing
+THING_BATCH_SIZE = 20
+
+BGG_REQUESTS = registry.counter(
+    "bgg_requests_total", "HTTP requests to BGG XML API", ["endpoint", "status"]
+)
+BGG_REQUEST_SECONDS = registry.histogram(
+    "bgg_request_duration_seconds", "BGG XML API request latency", ["endpoint"]
+)
+BGG_RETRIES = registry.counter("bgg_retries_total", "Retried BGG XML API requests", ["endpoint"])
+
+# Временные ошибки BGG: повторяем такие ответы и исключения
+RETRYABLE_STATUSES = frozenset({202, 429, 500, 502, 503, 504})
+RETRYABLE_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+# Общие для search и thing политика повторов и circuit breaker:
+# пока BGG недоступен, импорт и поиск пользователей не ждут таймаутов
+bgg_retry_policy = RetryPolicy(
+    base_delay=config.BGG_RETRY_BASE_DELAY,
+    max_delay=config.BGG_RETRY_MAX_DELAY,
+)
+bgg_circuit = CircuitBreaker(
+    "bgg",
+    failure_threshold=config.BGG_CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=config.BGG_CIRCUIT_RESET_TIMEOUT,
+)
+
+# Одновременные одинаковые запросы (несколько пользователей ищут одну новинку,
+# импорт и пользователь запрашивают один bgg_id) выполняются один раз
+bgg_search_flight = SingleFlight("bgg_search")
+bgg_thing_flight = SingleFlight("bgg_thing")
+
+
+def _get(endpoint: str, url: str, **kwargs) -> "requests.Response":
+    """
+    requests.get с учётом метрик: число запросов по статусам и латентность.
+    Сетевые ошибки считаются со статусом "error".
+    """
+    started = time.perf_counter()
+    status = "error"
+    try:
+        resp = requests.get(url, **kwargs)
+        status = str(resp.status_code)
+        return resp
+    finally:
+        BGG_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+        BGG_REQUESTS.inc(endpoint=endpoint, status=status)
 
 
 def _resolve_token(explicit_token: Optional[str] = None) -> str:
@@ -48,6 +104,87 @@ def _build_headers(token: Optional[str] = None) -> Dict[str, str]:
     return {"Authorization": f"Bearer {resolved}"}
 
 
+class BggCollectionError(RuntimeError):
+    """BGG отказал в выдаче коллекции (например, нет такого пользователя)."""
+
+
+class _RetryableResponse(Exception):
+    """Ответ BGG, после которого запрос стоит повторить."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None, queued: bool = False):
+        super().__init__(message)
+        self.retry_after = retry_after
+        # 202: BGG здоров, запрос поставлен в очередь — breaker это не учитывает
+        self.queued = queued
+
+
+def _check_response(resp: "requests.Response") -> None:
+    """Бросает _RetryableResponse для временных ошибок BGG и HTTPError для остальных."""
+    if resp.status_code in RETRYABLE_STATUSES:
+        # 202 — BGG поставил запрос в очередь и просит повторить позже
+        retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+        raise _RetryableResponse(f"HTTP {resp.status_code}", retry_after, queued=resp.status_code == 202)
+    resp.raise_for_status()
+    # BGG иногда отвечает пустым телом при 200 OK под нагрузкой
+    if not resp.text.strip():
+        raise _RetryableResponse("Пустой ответ от BGG")
+
+
+def _request_text(
+    endpoint: str,
+    url: str,
+    *,
+    params: Dict[str, Any],
+    headers: Dict[str, str],
+    retries: int,
+    timeout: int,
+) -> str:
+    """
+    GET к BGG XML API с общей политикой повторов и circuit breaker.
+
+    Повторяются сетевые ошибки, таймауты, ответы 202/429/5xx и пустое тело;
+    пауза — экспоненциальная со случайным разбросом или Retry-After из ответа.
+    Остальные ошибки (4xx, неожиданные исключения) не повторяются.
+    Пока BGG недоступен (breaker разомкнут), сразу бросает CircuitOpenError.
+    """
+    for attempt in range(1, retries + 1):
+        bgg_circuit.before_call()
+        logger.debug("Попытка %s/%s запроса к BGG %s API", attempt, retries, endpoint)
+        try:
+            resp = _get(endpoint, url, params=params, headers=headers, timeout=timeout)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("BGG %s ответ: status_code=%s, content_length=%s", endpoint, resp.status_code, len(resp.content))
+            _check_response(resp)
+        except RETRYABLE_EXCEPTIONS as exc:
+            error: Exception = exc
+            retry_after = None
+        except _RetryableResponse as exc:
+            error = exc
+            retry_after = exc.retry_after
+        except Exception as exc:  # noqa: BLE001
+            # Ошибка не говорит о недоступности BGG — breaker её не учитывает
+            bgg_circuit.release()
+            logger.error("Ошибка запроса к BGG %s API без повтора: %s", endpoint, exc)
+            raise RuntimeError(f"Ошибка обращения к BGG API ({endpoint}): {exc}") from exc
+        else:
+            bgg_circuit.record_success()
+            return resp.text
+
+        if isinstance(error, _RetryableResponse) and error.queued:
+            bgg_circuit.release()
+            logger.info("BGG %s API поставил запрос в очередь (попытка %s/%s)", endpoint, attempt, retries)
+        else:
+            bgg_circuit.record_failure()
+            logger.warning("Ошибка запроса к BGG %s API (попытка %s/%s): %s", endpoint, attempt, retries, error)
+        if attempt == retries:
+            logger.error("Не удалось выполнить запрос к BGG %s API после %s попыток: %s", endpoint, retries, error)
+            raise RuntimeError(f"Ошибка обращения к BGG API ({endpoint}) после {retries} попыток: {error}") from error
+        BGG_RETRIES.inc(endpoint=endpoint)
+        time.sleep(bgg_retry_policy.delay(attempt, retry_after))
+
+    raise RuntimeError(f"Ошибка обращения к BGG API ({endpoint}): retries={retries}")
+
+
 def search_boardgame(
     name: str,
     exact: bool = False,
@@ -59,6 +196,25 @@ def search_boardgame(
     """
     Ищет настольные игры по названию через BGG XML API v2.
 
+    Одновременные запросы с тем же названием (без учёта регистра и
+    лишних пробелов) и тем же exact выполняются одним HTTP-запросом.
+    Параметры — как у _search_boardgame.
+    """
+    key = (" ".join(name.casefold().split()), bool(exact), token)
+    return bgg_search_flight.do(key, _search_boardgame, name, exact, token=token, retries=retries, timeout=timeout)
+
+
+def _search_boardgame(
+    name: str,
+    exact: bool = False,
+    *,
+    token: Optional[str] = None,
+    retries: int = 3,
+    timeout: int = 15,
+) -> List[Dict[str, Any]]:
+    """
+    Ищет настольные игры по названию через BGG XML API v2.
+
     :param name: Название игры (или его часть).
     :param exact: Если True — ищет только точные совпадения.
     :param retries: Кол-во попыток при нестабильности API.
@@ -73,51 +229,15 @@ def search_boardgame(
         "exact": 1 if exact else 0,
     }
 
-    logger.info(f"Поиск игры на BGG: query='{name}', exact={exact}")
-    logger.debug(f"BGG search URL: {BGG_SEARCH_URL}, params={params}")
-
-    last_error = None
-    for attempt in range(1, retries + 1):
-        try:
-            logger.debug(f"Попытка {attempt}/{retries} запроса к BGG search API")
-            resp = requests.get(
-                BGG_SEARCH_URL,
-                params=params,
-                headers=headers,
-                timeout=timeout,
-            )
-            logger.debug(f"BGG search ответ: status_code={resp.status_code}, content_length={len(resp.text)}")
-            resp.raise_for_status()
-
-            # BGG иногда отвечает пустым телом при 200 OK — проверим это.
-            if not resp.text.strip():
-                logger.warning(f"BGG вернул пустой ответ для запроса '{name}'")
-                raise RuntimeError("Пустой ответ от BGG")
-
-            results = _parse_search_response(resp.text)
-            logger.info(f"BGG search успешен: найдено {len(results)} игр для запроса '{name}'")
-            if results:
-                logger.debug(f"Найденные игры: {[r.get('name') for r in results[:3]]}")
-            return results
-        except requests.exceptions.RequestException as exc:
-            last_error = exc
-            logger.warning(f"Ошибка HTTP запроса к BGG (попытка {attempt}/{retries}): {exc}")
-            if attempt < retries:
-                # Небольшая пауза перед повтором
-                time.sleep(1.5)
-            else:
-                logger.error(f"Не удалось выполнить запрос к BGG search API после {retries} попыток: {exc}")
-                raise RuntimeError(f"Ошибка обращения к BGG API после {retries} попыток: {exc}") from exc
-        except Exception as exc:  # noqa: BLE001
-            last_error = exc
-            logger.error(f"Неожиданная ошибка при поиске игры '{name}' (попытка {attempt}/{retries}): {exc}", exc_info=True)
-            if attempt < retries:
-                time.sleep(1.5)
-            else:
-                raise RuntimeError(f"Ошибка обращения к BGG API после {retries} попыток: {exc}") from exc
+    logger.debug("Поиск игры на BGG: query='%s', exact=%s", name, exact)
+    logger.debug("BGG search URL: %s, params=%s", BGG_SEARCH_URL, params)
 
-    # Теоретически сюда не дойдём из-за raise выше, но оставим для типа.
-    raise RuntimeError(f"Не удалось выполнить запрос к BGG API: {last_error}")
+    text = _request_text("search", BGG_SEARCH_URL, params=params, headers=headers, retries=retries, timeout=timeout)
+    results = _parse_search_response(text)
+    logger.debug("BGG search успешен: найдено %s игр для запроса '%s'", len(results), name)
+    if results and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Найденные игры: %s", [r.get('name') for r in results[:3]])
+    return results
 
 
 def get_boardgame_details(
@@ -130,6 +250,23 @@ def get_boardgame_details(
     """
     Получает подробную информацию и рейтинг игры по её ID.
 
+    Одновременные запросы одного game_id выполняются одним HTTP-запросом.
+    Поля результата описаны в _get_boardgame_details.
+    """
+    key = (str(game_id), token)
+    return bgg_thing_flight.do(key, _get_boardgame_details, game_id, token=token, retries=retries, timeout=timeout)
+
+
+def _get_boardgame_details(
+    game_id: int,
+    *,
+    token: Optional[str] = None,
+    retries: int = 3,
+    timeout: int = 15,
+) -> Dict[str, Any]:
+    """
+    Получает подробную информацию и рейтинг игры по её ID.
+
     На выходе минимум:
     - id: int
     - name: str | None
@@ -147,72 +284,124 @@ def get_boardgame_details(
         "stats": 1,
     }
 
-    logger.info(f"Запрос деталей игры с BGG: game_id={game_id}")
-    logger.debug(f"BGG thing URL: {BGG_THING_URL}, params={params}")
+    logger.debug("Запрос деталей игры с BGG: game_id=%s", game_id)
+    logger.debug("BGG thing URL: %s, params=%s", BGG_THING_URL, params)
 
-    last_error = None
-    for attempt in range(1, retries + 1):
-        try:
-            logger.debug(f"Попытка {attempt}/{retries} запроса к BGG thing API для game_id={game_id}")
-            resp = requests.get(
-                BGG_THING_URL,
-                params=params,
-                headers=headers,
-                timeout=timeout,
-            )
-            logger.debug(f"BGG thing ответ: status_code={resp.status_code}, content_length={len(resp.text)}")
-            resp.raise_for_status()
-
-            if not resp.text.strip():
-                logger.warning(f"BGG вернул пустой ответ для game_id={game_id}")
-                raise RuntimeError("Пустой ответ от BGG при запросе статистики игры")
-
-            try:
-                result = _parse_thing_response(resp.text)
-                logger.info(f"BGG thing успешен для game_id={game_id}: name='{result.get('name')}', rank={result.get('rank')}")
-                return result
-            except RuntimeError as parse_exc:
-                # Если игра не найдена в BGG - это нормально
-                if "не содержит элемента item" in str(parse_exc):
-                    logger.warning(f"Игра game_id={game_id} не найдена в BGG")
-                    return None
-                else:
-                    raise
-        except requests.exceptions.RequestException as exc:
-            last_error = exc
-            logger.warning(f"Ошибка HTTP запроса к BGG thing (попытка {attempt}/{retries}) для game_id={game_id}: {exc}")
-            if attempt < retries:
-                time.sleep(1.5)
-            else:
-                # Если игра не найдена - это нормально
-                if "не содержит элемента item" in str(last_error):
-                    logger.warning(f"Игра game_id={game_id} не найдена в BGG после {retries} попыток")
-                    return None
-                else:
-                    logger.error(f"Не удалось получить детали игры game_id={game_id} после {retries} попыток: {exc}")
-                    raise RuntimeError(
-                        f"Ошибка обращения к BGG API (thing) после {retries} попыток: {exc}"
-                    ) from exc
-        except Exception as exc:  # noqa: BLE001
-            last_error = exc
-            # Если игра не найдена в BGG - это нормально, логируем как warning
-            if "не содержит элемента item" in str(exc):
-                logger.warning(f"Игра game_id={game_id} не найдена в BGG (попытка {attempt}/{retries})")
-            else:
-                logger.error(f"Неожиданная ошибка при получении деталей игры game_id={game_id} (попытка {attempt}/{retries}): {exc}", exc_info=True)
-            if attempt < retries:
-                time.sleep(1.5)
-            else:
-                # Если игра не найдена - возвращаем None вместо ошибки
-                if "не содержит элемента item" in str(exc):
-                    logger.warning(f"Игра game_id={game_id} не найдена в BGG после {retries} попыток")
-                    return None
-                else:
-                    raise RuntimeError(
-                        f"Ошибка обращения к BGG API (thing) после {retries} попыток: {exc}"
-                    ) from exc
-
-    raise RuntimeError(f"Не удалось получить статистику игры: {last_error}")
+    text = _request_text("thing", BGG_THING_URL, params=params, headers=headers, retries=retries, timeout=timeout)
+    try:
+        result = _parse_thing_response(text)
+    except RuntimeError as parse_exc:
+        # Если игра не найдена в BGG - это нормально
+        if "не содержит элемента item" in str(parse_exc):
+            logger.warning("Игра game_id=%s не найдена в BGG", game_id)
+            return None
+        raise
+    logger.debug("BGG thing успешен для game_id=%s: name='%s', rank=%s", game_id, result.get('name'), result.get('rank'))
+    return result
+
+
+def get_boardgames_details(
+    game_ids: List[int],
+    *,
+    token: Optional[str] = None,
+    retries: int = 3,
+    timeout: int = 30,
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Детали нескольких игр: по одному запросу /thing на THING_BATCH_SIZE id.
+
+    :return: bgg_id -> словарь с теми же полями, что у get_boardgame_details.
+             Игр, которых BGG не вернул, в результате нет.
+    """
+    headers = _build_headers(token)
+    ids = list(dict.fromkeys(int(game_id) for game_id in game_ids))
+    result: Dict[int, Dict[str, Any]] = {}
+
+    for start in range(0, len(ids), THING_BATCH_SIZE):
+        if start:
+            time.sleep(config.BGG_REQUEST_DELAY)
+        batch = ids[start:start + THING_BATCH_SIZE]
+        params = {"id": ",".join(str(game_id) for game_id in batch), "stats": 1}
+        logger.debug("Запрос деталей %s игр с BGG: %s", len(batch), params["id"])
+        text = _request_text("thing", BGG_THING_URL, params=params, headers=headers, retries=retries, timeout=timeout)
+        for details in _parse_things_response(text):
+            if details.get("id") is not None:
+                result[details["id"]] = details
+
+    logger.debug("BGG thing: получены детали %s из %s игр", len(result), len(ids))
+    return result
+
+
+def get_collection(
+    username: str,
+    *,
+    token: Optional[str] = None,
+    own: bool = True,
+    timeout: int = 30,
+) -> List[Dict[str, Any]]:
+    """
+    Коллекция пользователя BGG одним запросом /collection (без дополнений).
+
+    BGG собирает коллекцию в фоне и, пока она не готова, отвечает 202;
+    запрос повторяется с нарастающей паузой до BGG_COLLECTION_POLL_ATTEMPTS раз.
+
+    :param own: Только игры, которые есть у пользователя
+    :return: Список словарей: id, name, yearpublished, image, thumbnail
+    :raises BggCollectionError: BGG вернул ошибку (например, неизвестный пользователь)
+    """
+    headers = _build_headers(token)
+    params: Dict[str, Any] = {
+        "username": username,
+        "subtype": "boardgame",
+        "excludesubtype": "boardgameexpansion",
+    }
+    if own:
+        params["own"] = 1
+
+    logger.debug("Запрос коллекции BGG: username='%s'", username)
+    text = _request_text(
+        "collection",
+        BGG_COLLECTION_URL,
+        params=params,
+        headers=headers,
+        retries=config.BGG_COLLECTION_POLL_ATTEMPTS,
+        timeout=timeout,
+    )
+    items = _parse_collection_response(text)
+    logger.info("Коллекция BGG '%s': %s игр", username, len(items))
+    return items
+
+
+def _parse_collection_response(xml_text: str) -> List[Dict[str, Any]]:
+    """Парсит XML‑ответ /collection; ошибки BGG (<errors>) превращает в BggCollectionError."""
+    try:
+        root = ET.fromstring(xml_text)
+    except ET.ParseError as e:
+        logger.error("Ошибка парсинга XML ответа BGG collection: %s", e)
+        raise RuntimeError(f"Не удалось распарсить ответ BGG: {e}") from e
+
+    if root.tag == "errors" or root.find("error") is not None:
+        messages = [el.text.strip() for el in root.iter("message") if el.text]
+        raise BggCollectionError("; ".join(messages) or "BGG вернул ошибку для коллекции")
+
+    results: List[Dict[str, Any]] = []
+    for item in root.findall("item"):
+        object_id = item.attrib.get("objectid")
+        if not object_id or not object_id.isdigit():
+            continue
+        name_el = item.find("name")
+        year_el = item.find("yearpublished")
+        image_el = item.find("image")
+        thumb_el = item.find("thumbnail")
+        year = year_el.text.strip() if year_el is not None and year_el.text else None
+        results.append({
+            "id": int(object_id),
+            "name": name_el.text if name_el is not None else None,
+            "yearpublished": int(year) if year and year.isdigit() else None,
+            "image": image_el.text if image_el is not None else None,
+            "thumbnail": thumb_el.text if thumb_el is not None else None,
+        })
+    return results
 
 
 def _parse_search_response(xml_text: str) -> List[Dict[str, Any]]:
@@ -220,7 +409,7 @@ def _parse_search_response(xml_text: str) -> List[Dict[str, Any]]:
     try:
         root = ET.fromstring(xml_text)
         items = root.findall("item")
-        logger.debug(f"Парсинг BGG search ответа: найдено {len(items)} элементов item")
+        logger.debug("Парсинг BGG search ответа: найдено %s элементов item", len(items))
         
         results: List[Dict[str, Any]] = []
 
@@ -236,7 +425,7 @@ def _parse_search_response(xml_text: str) -> List[Dict[str, Any]]:
             year = year_el.attrib.get("value") if year_el is not None else None
 
             if not game_id:
-                logger.warning(f"Найден item без id в ответе BGG search")
+                logger.warning("Найден item без id в ответе BGG search")
                 continue
 
             results.append(
@@ -248,34 +437,47 @@ def _parse_search_response(xml_text: str) -> List[Dict[str, Any]]:
                 }
             )
         
-        logger.debug(f"Успешно распарсено {len(results)} игр из BGG search ответа")
+        logger.debug("Успешно распарсено %s игр из BGG search ответа", len(results))
         return results
     except ET.ParseError as e:
-        logger.error(f"Ошибка парсинга XML ответа BGG search: {e}")
-        logger.debug(f"XML содержимое (первые 500 символов): {xml_text[:500]}")
+        logger.error("Ошибка парсинга XML ответа BGG search: %s", e)
+        logger.debug("XML содержимое (первые 500 символов): %s", xml_text[:500])
         raise RuntimeError(f"Не удалось распарсить ответ BGG: {e}") from e
 
 
-def _parse_thing_response(xml_text: str) -> Dict[str, Any]:
-    """Парсит XML‑ответ /thing?stats=1 в словарь с рейтингом и статистикой."""
+def _parse_thing_root(xml_text: str) -> ET.Element:
     try:
-        root = ET.fromstring(xml_text)
-        item = root.find("item")
-        if item is None:
-            logger.warning("Ответ BGG thing не содержит элемента item - игра не найдена")
-            logger.debug(f"XML содержимое (первые 500 символов): {xml_text[:500]}")
-            raise RuntimeError("Ответ BGG не содержит элемента item")
+        return ET.fromstring(xml_text)
     except ET.ParseError as e:
-        logger.error(f"Ошибка парсинга XML ответа BGG thing: {e}")
-        logger.debug(f"XML содержимое (первые 500 символов): {xml_text[:500]}")
+        logger.error("Ошибка парсинга XML ответа BGG thing: %s", e)
+        logger.debug("XML содержимое (первые 500 символов): %s", xml_text[:500])
         raise RuntimeError(f"Не удалось распарсить ответ BGG: {e}") from e
 
+
+def _parse_thing_response(xml_text: str) -> Dict[str, Any]:
+    """Парсит XML‑ответ /thing?stats=1 в словарь с рейтингом и статистикой."""
+    item = _parse_thing_root(xml_text).find("item")
+    if item is None:
+        logger.warning("Ответ BGG thing не содержит элемента item - игра не найдена")
+        logger.debug("XML содержимое (первые 500 символов): %s", xml_text[:500])
+        raise RuntimeError("Ответ BGG не содержит элемента item")
+    return _parse_thing_item(item)
+
+
+def _parse_things_response(xml_text: str) -> List[Dict[str, Any]]:
+    """Парсит ответ /thing с несколькими id: по словарю на каждый item."""
+    return [_parse_thing_item(item) for item in _parse_thing_root(xml_text).findall("item")]
+
+
+def _parse_thing_item(item: ET.Element) -> Dict[str, Any]:
+    """Поля одной игры из элемента item ответа /thing?stats=1."""
     game_id = item.attrib.get("id")
     game_type = item.attrib.get("type")  # boardgame, boardgameexpansion, etc.
 
-    # Находим основное название и русское название
+    # Находим основное название, русское название и все альтернативные названия
     primary_name = None
     russian_name = None
+    alternate_names: List[str] = []
 
     for name_el in item.findall("name"):
         name_type = name_el.attrib.get("type", "primary")
@@ -284,10 +486,11 @@ def _parse_thing_response(xml_text: str) -> Dict[str, Any]:
         if name_type == "primary":
             primary_name = name_value
         elif name_type == "alternate" and name_value:
-            # Проверяем, содержит ли название русские символы
-            if any('\u0400' <= char <= '\u04FF' for char in name_value):
+            if name_value not in alternate_names:
+                alternate_names.append(name_value)
+            # Берем первое найденное название с русскими символами
+            if russian_name is None and any('\u0400' <= char <= '\u04FF' for char in name_value):
                 russian_name = name_value
-                break  # Берем первое найденное русское название
 
     # Используем русское название, если найдено, иначе основное
     name = russian_name or primary_name
@@ -375,6 +578,7 @@ def _parse_thing_response(xml_text: str) -> Dict[str, Any]:
         "id": _to_int(game_id),
         "name": primary_name,  # Основное (английское) название
         "name_ru": russian_name,  # Русское название, если найдено
+        "alternate_names": alternate_names,  # Все альтернативные названия (для поиска)
         "type": game_type,  # Добавляем тип игры
         "yearpublished": _to_int(year),
         "minplayers": _to_int(minplayers_el.attrib.get("value") if minplayers_el is not None else None),
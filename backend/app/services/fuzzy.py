@@ -0,0 +1,121 @@
+"""
+Нечёткое сравнение названий игр.
+
+Схожесть названия кандидата с запросом — максимум из token_sort_ratio
+(порядок слов не важен) и partial_ratio (одно название содержит другое),
+шкала 0..100. Как и в WRatio, partial_ratio понижается, если названия сильно
+различаются по длине: иначе «Catan» совпадал бы с «Settlers of Catan» на 100%. Используется при выборе кандидата BGG во время импорта
+и при сортировке результатов /bgg/search.
+
+Реализация выбирается при импорте:
+- rapidfuzz — все кандидаты считаются одним вызовом process.cdist на C;
+- fuzzywuzzy — по кандидату в цикле (старое поведение);
+- без библиотек — только точное совпадение без учёта регистра.
+"""
+import logging
+from typing import List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    from rapidfuzz import fuzz as _rf_fuzz, process as _rf_process
+    from rapidfuzz.utils import default_process as _rf_default_process
+    BACKEND = "rapidfuzz"
+except ImportError:
+    try:
+        from fuzzywuzzy import fuzz as _fw_fuzz
+        BACKEND = "fuzzywuzzy"
+    except ImportError:
+        logging.warning("rapidfuzz/fuzzywuzzy not installed, using exact name matching")
+        BACKEND = "exact"
+
+# Пороги схожести, по которым кандидаты делятся на группы
+HIGH_SIMILARITY = 85
+MEDIUM_SIMILARITY = 60
+
+# Множители partial_ratio по отношению длин названий (как в WRatio)
+PARTIAL_SCALE = 0.9
+PARTIAL_SCALE_LONG = 0.6
+
+
+def _partial_scale(query_len: int, name_len: int) -> float:
+    shorter, longer = sorted((query_len, name_len))
+    if not shorter:
+        return 1.0
+    ratio = longer / shorter
+    if ratio >= 8:
+        return PARTIAL_SCALE_LONG
+    if ratio >= 1.5:
+        return PARTIAL_SCALE
+    return 1.0
+
+
+def _scores_rapidfuzz(query: str, names: Sequence[str]) -> List[int]:
+    # default_process повторяет full_process из fuzzywuzzy: нижний регистр,
+    # знаки препинания -> пробелы, обрезка пробелов
+    token_sort = _rf_process.cdist(
+        [query], names,
+        scorer=_rf_fuzz.token_sort_ratio, processor=_rf_default_process, dtype=np.uint8, workers=-1,
+    )
+    partial = _rf_process.cdist(
+        [query.lower()], [name.lower() for name in names],
+        scorer=_rf_fuzz.partial_ratio, dtype=np.uint8, workers=-1,
+    )
+    scale = np.fromiter(
+        (_partial_scale(len(query), len(name)) for name in names), dtype=np.float32, count=len(names)
+    )
+    partial_scaled = np.rint(partial[0] * scale).astype(np.uint8)
+    return np.maximum(token_sort[0], partial_scaled).tolist()
+
+
+def _scores_fuzzywuzzy(query: str, names: Sequence[str]) -> List[int]:
+    query_lower = query.lower()
+    return [
+        max(
+            _fw_fuzz.token_sort_ratio(query, name),
+            round(_fw_fuzz.partial_ratio(query_lower, name.lower()) * _partial_scale(len(query), len(name))),
+        )
+        for name in names
+    ]
+
+
+def _scores_exact(query: str, names: Sequence[str]) -> List[int]:
+    query_lower = query.lower()
+    return [100 if name.lower() == query_lower else 0 for name in names]
+
+
+def score_candidates(query: str, names: Sequence[str]) -> List[int]:
+    """
+    Возвращает схожесть каждого названия с запросом (0..100) в порядке names.
+
+    Названия и запрос обрезаются по краям; None считается пустой строкой.
+    """
+    query = (query or "").strip()
+    names = [(name or "").strip() for name in names]
+    if not names:
+        return []
+    if BACKEND == "rapidfuzz":
+        return _scores_rapidfuzz(query, names)
+    if BACKEND == "fuzzywuzzy":
+        return _scores_fuzzywuzzy(query, names)
+    return _scores_exact(query, names)
+
+
+def extract(query: str, names: Sequence[str], limit: int = 5, score_cutoff: int = 0) -> List[Tuple[str, int, int]]:
+    """
+    Лучшие совпадения: список (название, схожесть, индекс в names)
+    по убыванию схожести, при равной схожести — в исходном порядке.
+    """
+    scores = score_candidates(query, names)
+    order = sorted(range(len(scores)), key=lambda i: -scores[i])
+    return [(names[i], scores[i], i) for i in order[:limit] if scores[i] >= score_cutoff]
+
+
+def similarity_tier(score: int) -> int:
+    """0 — очень похожие названия, 1 — умеренно похожие, 2 — остальные."""
+    if score >= HIGH_SIMILARITY:
+        return 0
+    if score >= MEDIUM_SIMILARITY:
+        return 1
+    return 2
@@ -0,0 +1,430 @@
+from __future__ import annotations
+
+import heapq
+from bisect import insort
+import logging
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.domain.models import GameSuggestion
+from app.services.fuzzy import MEDIUM_SIMILARITY, score_candidates
+
+logger = logging.getLogger(__name__)
+
+
+# Сколько лучших названий кэшировать в узле префиксного дерева
+TOP_K = 32
+# До какого размера поддерева собирать все его названия при запросе из нескольких слов
+SCAN_LIMIT = 2000
+# Сколько названий с наибольшим числом общих триграмм перепроверять нечётким сравнением
+FUZZY_CANDIDATES = 40
+
+_NON_WORD = re.compile(r"[\W_]+")
+_NO_RANK = 10 ** 9
+
+
+def normalize(text: str) -> str:
+    """Нижний регистр, ё -> е, знаки препинания -> пробелы."""
+    return " ".join(_NON_WORD.sub(" ", text.casefold().replace("ё", "е")).split())
+
+
+def trigrams(normalized: str) -> List[str]:
+    padded = f"  {normalized} "
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+
+@dataclass
+class IndexedGame:
+    """Игра в индексе: поля для ответа и номера её названий."""
+    game_id: UUID
+    name: str
+    bgg_id: Optional[int] = None
+    bgg_rank: Optional[int] = None
+    yearpublished: Optional[int] = None
+    thumbnail: Optional[str] = None
+    alternate_names: List[str] = field(default_factory=list)
+    entries: List[int] = field(default_factory=list)
+
+
+class _TrieNode:
+    __slots__ = ("children", "entries", "count", "top")
+
+    def __init__(self):
+        self.children: Dict[str, _TrieNode] = {}
+        self.entries: Optional[set] = None  # названия, в которых слово заканчивается здесь
+        self.count = 0  # число пар (слово, название) в поддереве
+        self.top: Optional[List[int]] = None  # кэш лучших названий поддерева, None — устарел
+
+
+class GameNameIndex:
+    """
+    Индекс названий игр в памяти процесса для подсказок при вводе.
+
+    Каждое название (основное и альтернативные из BGG) нормализуется и режется
+    на слова. Слова лежат в префиксном дереве: узел знает число названий в
+    поддереве и кэширует лучшие из них по рангу BGG, поэтому запрос «ca»
+    отвечается без обхода дерева. Для опечаток есть триграммный индекс:
+    названия с наибольшим числом общих триграмм перепроверяются
+    score_candidates. Изменения игр применяются точечно (upsert/remove),
+    индекс строится из БД один раз. Изменения, пришедшие во время загрузки,
+    копятся и применяются поверх загруженного снимка.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Одна загрузка из БД за раз
+        self._load_lock = threading.Lock()
+        self._loaded = False
+        # Растёт при invalidate: снимок, начатый до сброса, не публикуется
+        self._generation = 0
+        # Изменения во время загрузки: (game, keep_alternate_names) для upsert,
+        # game_id для remove; None — загрузки нет
+        self._pending: Optional[List[object]] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._root = _TrieNode()
+        self._games: Dict[UUID, IndexedGame] = {}
+        # Названия: номер -> игра (None — удалено), исходный и нормализованный текст
+        self._entry_game: List[Optional[UUID]] = []
+        self._entry_name: List[str] = []
+        self._entry_norm: List[str] = []
+        self._entry_key: List[Tuple[int, int]] = []
+        # Номера удалённых названий: занимаются заново, чтобы upsert не растил списки
+        self._free_entries: List[int] = []
+        self._grams: Dict[str, set] = {}
+        self._gram_arrays: Dict[str, np.ndarray] = {}
+
+    # ---------- Загрузка и инвалидация ----------
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+    def load(self, games: Iterable[IndexedGame], generation: Optional[int] = None) -> None:
+        """
+        Полностью перестраивает индекс.
+
+        generation — номер поколения на момент снимка: если с тех пор был
+        invalidate, снимок устарел и отбрасывается.
+        """
+        games = list(games)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                logger.info("Game name index invalidated during load, snapshot discarded")
+                return
+            self._reset()
+            for game in games:
+                self._add(game)
+            pending, self._pending = self._pending or [], None
+            for change in pending:
+                if isinstance(change, tuple):
+                    self._upsert(*change)
+                else:
+                    self._remove_id(change)
+            # Кэши лучших названий и массивы триграмм строятся сразу,
+            # дальше они поддерживаются точечно
+            self._top(self._root)
+            for gram, postings in self._grams.items():
+                self._gram_arrays[gram] = np.fromiter(postings, dtype=np.int32, count=len(postings))
+            self._loaded = True
+            entries = len(self._entry_name)
+        logger.info("Game name index loaded: games=%s, names=%s", len(self._games), entries)
+
+    def load_from_db(self, session: Session) -> None:
+        """Строит индекс одним запросом по таблице games."""
+        from app.infrastructure.projections import game_index_query
+
+        with self._lock:
+            generation = self._generation
+            # С этого момента изменения копятся до публикации снимка
+            self._pending = []
+        games = [
+            IndexedGame(
+                game_id=row.id,
+                name=row.name,
+                bgg_id=row.bgg_id,
+                bgg_rank=row.bgg_rank,
+                yearpublished=row.yearpublished,
+                thumbnail=row.thumbnail,
+                alternate_names=row.alternate_names or [],
+            )
+            for row in game_index_query(session)
+        ]
+        self.load(games, generation=generation)
+
+    def ensure_loaded(self, session: Session) -> None:
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                self.load_from_db(session)
+
+    def invalidate(self) -> None:
+        """Сбрасывает индекс; он будет перестроен при следующем запросе."""
+        with self._lock:
+            self._loaded = False
+            self._generation += 1
+            self._pending = None
+            self._reset()
+        logger.debug("Game name index invalidated")
+
+    # ---------- Инкрементальное обновление ----------
+
+    def upsert(self, game: IndexedGame, *, keep_alternate_names: bool = False) -> None:
+        """
+        Добавляет или обновляет игру.
+
+        keep_alternate_names=True — альтернативные названия не известны
+        вызывающему коду, оставляем прежние. Во время загрузки изменение
+        откладывается до её конца; если индекс не загружен и не загружается,
+        изменение игнорируется — оно попадёт в индекс при полной загрузке.
+        """
+        with self._lock:
+            if self._loaded:
+                self._upsert(game, keep_alternate_names)
+            elif self._pending is not None:
+                self._pending.append((game, keep_alternate_names))
+
+    def remove(self, game_id: UUID) -> None:
+        with self._lock:
+            if self._loaded:
+                self._remove_id(game_id)
+            elif self._pending is not None:
+                self._pending.append(game_id)
+
+    def _upsert(self, game: IndexedGame, keep_alternate_names: bool) -> None:
+        previous = self._games.get(game.game_id)
+        if previous is not None:
+            if keep_alternate_names:
+                game.alternate_names = previous.alternate_names
+            self._remove(previous)
+        self._add(game)
+
+    def _remove_id(self, game_id: UUID) -> None:
+        game = self._games.get(game_id)
+        if game is not None:
+            self._remove(game)
+
+    def _add(self, game: IndexedGame) -> None:
+        game.entries = []
+        rank = game.bgg_rank or _NO_RANK
+        seen = set()
+        for name in [game.name, *game.alternate_names]:
+            norm = normalize(name or "")
+            if not norm or norm in seen:
+                continue
+            seen.add(norm)
+
+            if self._free_entries:
+                entry = self._free_entries.pop()
+                self._entry_game[entry] = game.game_id
+                self._entry_name[entry] = name
+                self._entry_norm[entry] = norm
+                self._entry_key[entry] = (rank, len(norm))
+            else:
+                entry = len(self._entry_name)
+                self._entry_game.append(game.game_id)
+                self._entry_name.append(name)
+                self._entry_norm.append(norm)
+                self._entry_key.append((rank, len(norm)))
+            game.entries.append(entry)
+
+            key = self._entry_key[entry]
+            for token in set(norm.split()):
+                node = self._root
+                for path_node in self._walk(token, create=True):
+                    self._offer_top(path_node, entry, key)
+                    node = path_node
+                if node.entries is None:
+                    node.entries = set()
+                node.entries.add(entry)
+            for gram in trigrams(norm):
+                self._grams.setdefault(gram, set()).add(entry)
+                self._gram_arrays.pop(gram, None)
+        self._games[game.game_id] = game
+
+    def _remove(self, game: IndexedGame) -> None:
+        for entry in game.entries:
+            norm = self._entry_norm[entry]
+            for token in set(norm.split()):
+                path = list(self._walk(token, create=False, delta=-1))
+                for node in path:
+                    if node.top is not None and entry in node.top:
+                        node.top = None
+                if len(path) == len(token) + 1 and path[-1].entries:
+                    path[-1].entries.discard(entry)
+            for gram in trigrams(norm):
+                postings = self._grams.get(gram)
+                if postings is not None:
+                    postings.discard(entry)
+                    self._gram_arrays.pop(gram, None)
+            self._entry_game[entry] = None
+            self._free_entries.append(entry)
+        del self._games[game.game_id]
+
+    def _walk(self, token: str, *, create: bool, delta: int = 1):
+        """Проходит по пути слова от корня, меняя счётчики узлов на delta."""
+        node = self._root
+        node.count += delta
+        yield node
+        for char in token:
+            child = node.children.get(char)
+            if child is None:
+                if not create:
+                    return
+                child = node.children[char] = _TrieNode()
+            node = child
+            node.count += delta
+            yield node
+
+    def _offer_top(self, node: _TrieNode, entry: int, key: Tuple[int, int]) -> None:
+        """Добавляет название в кэш лучших, если кэш построен и название в него проходит."""
+        top = node.top
+        if top is None or entry in top:
+            return
+        if len(top) < TOP_K:
+            insort(top, entry, key=self._entry_key.__getitem__)
+        elif key < self._entry_key[top[-1]]:
+            top.pop()
+            insort(top, entry, key=self._entry_key.__getitem__)
+
+    # ---------- Поиск ----------
+
+    def _find(self, prefix: str) -> Optional[_TrieNode]:
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def _subtree_entries(self, node: _TrieNode) -> set:
+        found = set()
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current.entries:
+                found.update(current.entries)
+            stack.extend(current.children.values())
+        return found
+
+    def _top(self, node: _TrieNode) -> List[int]:
+        """Лучшие по рангу названия поддерева; строится из кэшей дочерних узлов."""
+        if node.top is None:
+            candidates = set(node.entries or ())
+            for child in node.children.values():
+                if child.count:
+                    candidates.update(self._top(child))
+            node.top = heapq.nsmallest(TOP_K, candidates, key=self._entry_key.__getitem__)
+        return node.top
+
+    def _prefix_matches(self, tokens: Sequence[str]) -> List[int]:
+        """Названия, в которых каждое слово запроса — префикс какого-то слова названия."""
+        nodes = [self._find(token) for token in tokens]
+        if any(node is None or node.count == 0 for node in nodes):
+            return []
+        if len(tokens) == 1:
+            return self._top(nodes[0])
+
+        # Небольшие поддеревья пересекаем как множества, остальные слова
+        # проверяем по тексту уже у оставшихся кандидатов
+        order = sorted(range(len(tokens)), key=lambda i: nodes[i].count)
+        narrowest = nodes[order[0]]
+        candidates = self._subtree_entries(narrowest) if narrowest.count <= SCAN_LIMIT else set(self._top(narrowest))
+        unchecked = []
+        for i in order[1:]:
+            if nodes[i].count <= SCAN_LIMIT and candidates:
+                candidates &= self._subtree_entries(nodes[i])
+            else:
+                unchecked.append(tokens[i])
+
+        matches = []
+        for entry in candidates:
+            words = self._entry_norm[entry].split()
+            if all(any(word.startswith(token) for word in words) for token in unchecked):
+                matches.append(entry)
+        return heapq.nsmallest(TOP_K, matches, key=self._entry_key.__getitem__)
+
+    def _fuzzy_matches(self, query: str, normalized: str) -> List[Tuple[int, int]]:
+        """Кандидаты по общим триграммам, перепроверенные нечётким сравнением."""
+        arrays = []
+        for gram in trigrams(normalized):
+            postings = self._grams.get(gram)
+            if not postings:
+                continue
+            array = self._gram_arrays.get(gram)
+            if array is None:
+                array = self._gram_arrays[gram] = np.fromiter(postings, dtype=np.int32, count=len(postings))
+            arrays.append(array)
+        if not arrays:
+            return []
+
+        hits = np.bincount(np.concatenate(arrays), minlength=len(self._entry_name))
+        take = min(FUZZY_CANDIDATES, int(np.count_nonzero(hits)))
+        candidates = np.argpartition(-hits, take - 1)[:take].tolist()
+        scores = score_candidates(query, [self._entry_name[entry] for entry in candidates])
+        return [(entry, score) for entry, score in zip(candidates, scores) if score >= MEDIUM_SIMILARITY]
+
+    def suggest(self, query: str, limit: int = 10) -> List[GameSuggestion]:
+        """
+        Подсказки по началу названия или названию с опечатками.
+
+        Порядок: совпадение с началом всего названия, затем с началом слов;
+        внутри группы — по рангу BGG. Если по началу слов ничего не нашлось,
+        возвращаются нечёткие совпадения по убыванию схожести.
+        """
+        normalized = normalize(query or "")
+        if not normalized or limit <= 0:
+            return []
+
+        with self._lock:
+            # game_id -> (ключ сортировки, номер названия, схожесть)
+            best: Dict[UUID, Tuple[tuple, int, int]] = {}
+
+            def offer(entry: int, tier: int, score: int) -> None:
+                game_id = self._entry_game[entry]
+                if game_id is None:
+                    return
+                key = (tier, -score, *self._entry_key[entry])
+                current = best.get(game_id)
+                if current is None or key < current[0]:
+                    best[game_id] = (key, entry, score)
+
+            for entry in self._prefix_matches(normalized.split()):
+                tier = 0 if self._entry_norm[entry].startswith(normalized) else 1
+                offer(entry, tier, 100)
+
+            # Если хоть одно название начинается с введённого текста, опечатки нет
+            if not best:
+                for entry, score in self._fuzzy_matches(query, normalized):
+                    offer(entry, 2, score)
+
+            ranked = sorted(best.values())[:limit]
+            return [self._suggestion(entry, score) for _, entry, score in ranked]
+
+    def _suggestion(self, entry: int, score: int) -> GameSuggestion:
+        game = self._games[self._entry_game[entry]]
+        return GameSuggestion(
+            game_id=game.game_id,
+            name=game.name,
+            matched_name=self._entry_name[entry],
+            score=score,
+            bgg_id=game.bgg_id,
+            bgg_rank=game.bgg_rank,
+            yearpublished=game.yearpublished,
+            thumbnail=game.thumbnail,
+        )
+
+
+# Глобальный экземпляр индекса (по одному на процесс)
+game_index = GameNameIndex()
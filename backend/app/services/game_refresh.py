@@ -0,0 +1,85 @@
+"""
+Фоновое обновление устаревших данных игр из BGG.
+
+Раньше свежесть проверялась только при импорте таблицы, поэтому игры,
+добавленные через /game, не обновлялись никогда, а принудительный импорт
+обновлял всё разом. Планировщик раз в interval секунд берёт batch_size
+самых устаревших игр (см. repositories.select_stale_games) и обновляет их
+запросами /thing по THING_BATCH_SIZE игр — нагрузка на BGG распределяется
+равномерно.
+
+Запуск пропускается, пока идёт импорт таблицы или разомкнут circuit
+breaker BGG.
+"""
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from app.config import config
+from app.infrastructure.db import SessionLocal
+from app.infrastructure.repositories import IMPORT_IN_PROGRESS, refresh_stale_games
+from app.utils.retry import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+
+class GameRefreshScheduler:
+    """
+    Периодическое обновление устаревших игр.
+
+    :param interval: Пауза между запусками, секунды
+    :param batch_size: Сколько игр обновлять за один запуск
+    """
+
+    def __init__(self, interval: float, batch_size: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    def run_once(self) -> Dict[str, int]:
+        """Один запуск обновления (синхронно, вызывается в отдельном потоке)."""
+        if IMPORT_IN_PROGRESS.value():
+            logger.info("Table import in progress, skipping stale games refresh")
+            return {}
+
+        session = SessionLocal()
+        try:
+            return refresh_stale_games(session, self.batch_size)
+        except CircuitOpenError as e:
+            session.rollback()
+            logger.warning("Stale games refresh skipped: %s", e)
+            return {}
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    async def run_forever(self) -> None:
+        logger.info("Stale games refresher started: every %s s, %s games per run", self.interval, self.batch_size)
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception:
+                logger.error("Stale games refresh failed", exc_info=True)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Глобальный экземпляр: запускается при старте приложения (wsgi.py)
+game_refresher = GameRefreshScheduler(
+    interval=config.GAME_REFRESH_INTERVAL_MINUTES * 60,
+    batch_size=config.GAME_REFRESH_BATCH_SIZE,
+)
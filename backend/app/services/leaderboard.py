@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.domain.models import LeaderboardEntry, LeaderboardMethod
+from app.infrastructure.models import RatingModel
+
+logger = logging.getLogger(__name__)
+
+
+# Места в таблице — от 1 до 50, 0 означает «не оценивал»
+TOP_N = 50
+
+# Изменение оценки: (user_id, game_id, rank)
+RatingChange = Tuple[UUID, UUID, int]
+
+
+class GroupLeaderboard:
+    """
+    Групповой рейтинг игр по оценкам всех пользователей.
+
+    Оценки хранятся в памяти в виде матрицы пользователь×игра (0 = не оценивал).
+    Для каждой игры поддерживаются агрегаты: число оценивших, сумма мест
+    и сумма очков Борда. Матрица строится из БД один раз, а дальше
+    каждое изменение оценки обновляет агрегаты за O(1), без полного пересчёта.
+
+    Пока матрица загружается из БД, изменения копятся в буфере и
+    применяются после публикации снимка: оценка, закоммиченная импортом
+    между SELECT и концом загрузки, не теряется.
+    """
+
+    def __init__(self, top_n: int = TOP_N):
+        self.top_n = top_n
+        self._lock = threading.Lock()
+        # Одна загрузка из БД за раз
+        self._load_lock = threading.Lock()
+        self._loaded = False
+        self._version = 0
+        # Растёт при invalidate: снимок, начатый до сброса, не публикуется
+        self._generation = 0
+        # Изменения, пришедшие во время загрузки (None — загрузки нет)
+        self._pending: Optional[List[RatingChange]] = None
+        self._user_index: Dict[UUID, int] = {}
+        self._game_index: Dict[UUID, int] = {}
+        self._game_ids: List[UUID] = []
+        self._matrix = np.zeros((0, 0), dtype=np.int16)
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._rank_sums = np.zeros(0, dtype=np.int64)
+        self._borda_sums = np.zeros(0, dtype=np.int64)
+        # method -> (version, отсортированные индексы игр)
+        self._order_cache: Dict[LeaderboardMethod, Tuple[int, np.ndarray]] = {}
+
+    # ---------- Загрузка и инвалидация ----------
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def load(self, ratings: Iterable[RatingChange], generation: Optional[int] = None) -> None:
+        """
+        Полностью перестраивает матрицу из набора оценок.
+        Нулевые (неоценённые) записи пропускаются.
+
+        generation — номер поколения на момент снимка: если с тех пор был
+        invalidate, снимок устарел и отбрасывается. Изменения, накопленные
+        за время загрузки, применяются поверх снимка.
+        """
+        users: Dict[UUID, int] = {}
+        games: Dict[UUID, int] = {}
+        rows: List[int] = []
+        cols: List[int] = []
+        values: List[int] = []
+
+        for user_id, game_id, rank in ratings:
+            if not self._is_valid_rank(rank):
+                continue
+            rows.append(users.setdefault(user_id, len(users)))
+            cols.append(games.setdefault(game_id, len(games)))
+            values.append(rank)
+
+        matrix = np.zeros((len(users), len(games)), dtype=np.int16)
+        if values:
+            matrix[np.array(rows), np.array(cols)] = np.array(values, dtype=np.int16)
+
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                logger.info("Group leaderboard invalidated during load, snapshot discarded")
+                return
+            self._user_index = users
+            self._game_index = games
+            self._game_ids = list(games.keys())
+            self._matrix = matrix
+            self._recompute_aggregates()
+            pending, self._pending = self._pending or [], None
+            self._apply(pending)
+            self._loaded = True
+            self._version += 1
+            self._order_cache.clear()
+
+        logger.info(
+            f"Group leaderboard loaded: users={len(users)}, games={len(games)}, ratings={len(values)}, "
+            f"replayed={len(pending)}"
+        )
+
+    def load_from_db(self, session: Session) -> None:
+        """Строит матрицу одним запросом по таблице ratings."""
+        with self._lock:
+            generation = self._generation
+            # С этого момента изменения копятся до публикации снимка
+            self._pending = []
+        rows = (
+            session.query(RatingModel.user_id, RatingModel.game_id, RatingModel.rank)
+            .filter(RatingModel.rank > 0)
+            .all()
+        )
+        self.load(((user_id, game_id, rank) for user_id, game_id, rank in rows), generation=generation)
+
+    def ensure_loaded(self, session: Session) -> None:
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                self.load_from_db(session)
+
+    def invalidate(self) -> None:
+        """Сбрасывает состояние; матрица будет перестроена при следующем запросе."""
+        with self._lock:
+            self._loaded = False
+            self._generation += 1
+            self._pending = None
+            self._order_cache.clear()
+        logger.debug("Group leaderboard invalidated")
+
+    # ---------- Инкрементальное обновление ----------
+
+    def apply_changes(self, changes: Iterable[RatingChange]) -> None:
+        """
+        Применяет изменения оценок к агрегатам.
+
+        Во время загрузки изменения копятся и применяются после неё.
+        Если матрица не загружена и не загружается, изменения игнорируются —
+        они попадут в неё при первой полной загрузке из БД.
+        """
+        with self._lock:
+            if not self._loaded:
+                if self._pending is not None:
+                    self._pending.extend(changes)
+                return
+            applied = self._apply(changes)
+
+        if applied:
+            logger.debug(f"Group leaderboard updated incrementally: {applied} rating changes")
+
+    def _apply(self, changes: Iterable[RatingChange]) -> int:
+        """Применяет изменения к агрегатам; вызывается под _lock."""
+        applied = 0
+        for user_id, game_id, rank in changes:
+            new_rank = rank if self._is_valid_rank(rank) else 0
+            u = self._user_index.get(user_id)
+            g = self._game_index.get(game_id)
+            if new_rank == 0 and (u is None or g is None):
+                continue
+            if u is None:
+                u = self._add_user(user_id)
+            if g is None:
+                g = self._add_game(game_id)
+
+            old_rank = int(self._matrix[u, g])
+            if old_rank == new_rank:
+                continue
+
+            self._matrix[u, g] = new_rank
+            if old_rank:
+                self._counts[g] -= 1
+                self._rank_sums[g] -= old_rank
+                self._borda_sums[g] -= self._borda_points(old_rank)
+            if new_rank:
+                self._counts[g] += 1
+                self._rank_sums[g] += new_rank
+                self._borda_sums[g] += self._borda_points(new_rank)
+            applied += 1
+
+        if applied:
+            self._version += 1
+            self._order_cache.clear()
+        return applied
+
+    # ---------- Расчёт рейтинга ----------
+
+    def compute(
+        self,
+        method: LeaderboardMethod = LeaderboardMethod.BORDA,
+        limit: int = TOP_N,
+        min_raters: int = 1,
+    ) -> List[LeaderboardEntry]:
+        """Возвращает топ игр по выбранному способу агрегации."""
+        with self._lock:
+            scores = self._scores(method)
+            cached = self._order_cache.get(method)
+            if cached is not None and cached[0] == self._version:
+                order = cached[1]
+            else:
+                order = self._sort_order(method, scores)
+                self._order_cache[method] = (self._version, order)
+
+            counts = self._counts
+            game_ids = self._game_ids
+
+            result: List[LeaderboardEntry] = []
+            for idx in order:
+                raters = int(counts[idx])
+                if raters < max(min_raters, 1):
+                    continue
+                result.append(
+                    LeaderboardEntry(
+                        game_id=game_ids[idx],
+                        position=len(result) + 1,
+                        score=round(float(scores[idx]), 4),
+                        raters=raters,
+                    )
+                )
+                if len(result) >= limit:
+                    break
+        return result
+
+    def _scores(self, method: LeaderboardMethod) -> np.ndarray:
+        counts = self._counts.astype(np.float64)
+        rated = counts > 0
+
+        if method == LeaderboardMethod.BORDA:
+            return self._borda_sums.astype(np.float64)
+
+        if method == LeaderboardMethod.MEAN_RANK:
+            mean = np.full(counts.shape, np.inf)
+            np.divide(self._rank_sums, counts, out=mean, where=rated)
+            return mean
+
+        # Байесовское сглаживание среднего места к общему среднему:
+        # игры с малым числом оценок «подтягиваются» к середине таблицы.
+        total = counts.sum()
+        if not total:
+            return np.full(counts.shape, np.inf)
+        global_mean = self._rank_sums.sum() / total
+        prior_weight = counts[rated].mean()
+        shrunk = (prior_weight * global_mean + self._rank_sums) / (prior_weight + counts)
+        return np.where(rated, shrunk, np.inf)
+
+    @staticmethod
+    def _sort_order(method: LeaderboardMethod, scores: np.ndarray) -> np.ndarray:
+        if method == LeaderboardMethod.BORDA:
+            return np.argsort(-scores, kind="stable")
+        return np.argsort(scores, kind="stable")
+
+    # ---------- Вспомогательные методы ----------
+
+    def _is_valid_rank(self, rank: Optional[int]) -> bool:
+        return isinstance(rank, int) and 0 < rank <= self.top_n
+
+    def _borda_points(self, rank: int) -> int:
+        # 1-е место даёт top_n очков, последнее — 1
+        return self.top_n + 1 - rank
+
+    def _recompute_aggregates(self) -> None:
+        rated = self._matrix > 0
+        self._counts = rated.sum(axis=0).astype(np.int64)
+        self._rank_sums = self._matrix.sum(axis=0, dtype=np.int64)
+        self._borda_sums = np.where(rated, self.top_n + 1 - self._matrix, 0).sum(axis=0, dtype=np.int64)
+
+    def _add_user(self, user_id: UUID) -> int:
+        idx = len(self._user_index)
+        self._user_index[user_id] = idx
+        self._matrix = np.vstack([self._matrix, np.zeros((1, self._matrix.shape[1]), dtype=np.int16)])
+        return idx
+
+    def _add_game(self, game_id: UUID) -> int:
+        idx = len(self._game_index)
+        self._game_index[game_id] = idx
+        self._game_ids.append(game_id)
+        self._matrix = np.hstack([self._matrix, np.zeros((self._matrix.shape[0], 1), dtype=np.int16)])
+        self._counts = np.append(self._counts, 0)
+        self._rank_sums = np.append(self._rank_sums, 0)
+        self._borda_sums = np.append(self._borda_sums, 0)
+        return idx
+
+
+# Глобальный экземпляр (по одному на процесс)
+group_leaderboard = GroupLeaderboard()
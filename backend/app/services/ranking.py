@@ -8,6 +8,14 @@ from sqlalchemy.orm import Session
 from app.domain.models import FirstTier, Game, SecondTier
 from app.domain import services as domain_services
 from app.infrastructure.models import GameModel, RatingModel, RankingSessionModel
+from app.infrastructure.projections import ranking_games_query, row_to_game
+from app.services.ranking_sessions import (
+    RankingSessionState,
+    apply_answer,
+    cache_new_session,
+    get_session_state,
+    load_games,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -27,76 +35,34 @@ class RankingService:
     # ---------- Вспомогательные методы ----------
 
     def _load_games_for_user(self, user_name: str) -> List[Game]:
-        logger.debug(f"Loading games for user: {user_name}")
+        logger.debug("Loading games for user: %s", user_name)
         games: List[Game] = []
 
         # Сначала найдем пользователя по имени
         from app.infrastructure.models import UserModel
         user = self.db.query(UserModel).filter(UserModel.name == user_name).first()
         if not user:
-            logger.warning(f"User '{user_name}' not found for ranking")
+            logger.warning("User '%s' not found for ranking", user_name)
             return []
 
+        # Только скалярные поля, без описаний и JSON-списков
         q = (
-            self.db.query(GameModel)
+            ranking_games_query(self.db)
             .join(RatingModel, RatingModel.game_id == GameModel.id)
             .filter(RatingModel.user_id == user.id)
             .order_by(GameModel.id)
         )
 
-        for gm in q.all():
-            games.append(
-                Game(
-                    id=gm.id,
-                    name=gm.name,
-                    bgg_rank=gm.bgg_rank,
-                    niza_games_rank=gm.niza_games_rank,
-                    genre=gm.genre,
-                    usersrated=gm.usersrated,
-                    yearpublished=gm.yearpublished,
-                    average=gm.average,
-                    bayesaverage=gm.bayesaverage,
-                    averageweight=gm.averageweight,
-                    minplayers=gm.minplayers,
-                    maxplayers=gm.maxplayers,
-                    playingtime=gm.playingtime,
-                    minage=gm.minage,
-                )
-            )
-        logger.info(f"Loaded {len(games)} games for user {user_name}")
+        for row in q.all():
+            games.append(row_to_game(row))
+        logger.info("Loaded %s games for user %s", len(games), user_name)
         return games
 
-    def _get_session(self, session_id: int) -> RankingSessionModel:
-        logger.debug(f"Getting ranking session: {session_id}")
-        session = self.db.get(RankingSessionModel, session_id)
-        if session is None:
-            logger.warning(f"Ranking session {session_id} not found")
-            raise ValueError(f"Ranking session {session_id} not found")
-        return session
+    def _get_session(self, session_id: int) -> RankingSessionState:
+        return get_session_state(self.db, session_id)
 
     def _games_by_id(self, game_ids: Sequence[int]) -> Dict[int, Game]:
-        if not game_ids:
-            return {}
-        rows = self.db.query(GameModel).filter(GameModel.id.in_(list(game_ids))).all()
-        return {
-            gm.id: Game(
-                id=gm.id,
-                name=gm.name,
-                bgg_rank=gm.bgg_rank,
-                niza_games_rank=gm.niza_games_rank,
-                genre=gm.genre,
-                usersrated=gm.usersrated,
-                yearpublished=gm.yearpublished,
-                average=gm.average,
-                bayesaverage=gm.bayesaverage,
-                averageweight=gm.averageweight,
-                minplayers=gm.minplayers,
-                maxplayers=gm.maxplayers,
-                playingtime=gm.playingtime,
-                minage=gm.minage,
-            )
-            for gm in rows
-        }
+        return load_games(self.db, game_ids)
 
     # ---------- Публичные методы ----------
 
@@ -104,23 +70,24 @@ class RankingService:
         """
         Создаёт новую сессию ранжирования для пользователя и возвращает первую игру.
         """
-        logger.info(f"Starting ranking session for user: {user_name}")
+        logger.info("Starting ranking session for user: %s", user_name)
 
         # Найдем пользователя по имени
         from app.infrastructure.models import UserModel
         user = self.db.query(UserModel).filter(UserModel.name == user_name).first()
         if not user:
-            logger.warning(f"User '{user_name}' not found for ranking")
+            logger.warning("User '%s' not found for ranking", user_name)
             raise ValueError(f"Пользователь '{user_name}' не найден.")
 
         games = self._load_games_for_user(user_name)
         if not games:
-            logger.warning(f"No games found for user: {user_name}")
+            logger.warning("No games found for user: %s", user_name)
             raise ValueError("Для пользователя нет ни одной сыгранной игры.")
 
         games_ids = [g.id for g in games]
 
         session = RankingSessionModel(
+            version=1,
             user_name=user_name,  # Сохраняем для обратной совместимости
             user_id=user.id,      # Добавляем user_id
             state="first_tier",
@@ -135,9 +102,10 @@ class RankingService:
         )
         self.db.add(session)
         self.db.flush()
+        cache_new_session(session, games)
 
         first_game = games[0]
-        logger.info(f"Ranking session created: session_id={session.id}, total_games={len(games)}")
+        logger.info("Ranking session created: session_id=%s, total_games=%s", session.id, len(games))
         return {
             "session_id": session.id,
             "game": {
@@ -158,7 +126,7 @@ class RankingService:
         }
 
     def _next_unrated_game_first(
-        self, session: RankingSessionModel, games: List[Game]
+        self, session: RankingSessionState, games: List[Game]
     ) -> Optional[Game]:
         rated_ids = set(int(k) for k in (session.first_tiers or {}).keys())
 
@@ -180,13 +148,24 @@ class RankingService:
         Сохраняет ответ пользователя на первом проходе и возвращает следующую игру
         либо информацию о переходе ко второму этапу.
         """
-        logger.debug(f"Processing first tier answer: session_id={session_id}, game_id={game_id}, tier={tier.value}")
-        session = self._get_session(session_id)
+        logger.debug("Processing first tier answer: session_id=%s, game_id=%s, tier=%s", session_id, game_id, tier.value)
+        return apply_answer(
+            self.db, session_id, lambda session: self._answer_first_tier(session, game_id, tier, top_n)
+        )
+
+    def _answer_first_tier(
+        self,
+        session: RankingSessionState,
+        game_id: int,
+        tier: FirstTier,
+        top_n: int,
+    ) -> Dict:
+        session_id = session.id
         if session.state not in ("first_tier", "second_tier"):
-            logger.warning(f"Invalid session state for first tier: session_id={session_id}, state={session.state}")
+            logger.warning("Invalid session state for first tier: session_id=%s, state=%s", session_id, session.state)
             raise ValueError("Сессия уже прошла этап первого ранжирования.")
 
-        games = self._games_by_id(session.games)
+        games = session.projections
         ordered_games = [games[g_id] for g_id in session.games if g_id in games]
 
         tiers: Dict[int, str] = dict(session.first_tiers or {})
@@ -195,7 +174,7 @@ class RankingService:
 
         next_game = self._next_unrated_game_first(session, ordered_games)
         if next_game is not None:
-            logger.debug(f"First tier: next game available: session_id={session_id}, answered={len(tiers)}/{len(ordered_games)}")
+            logger.debug("First tier: next game available: session_id=%s, answered=%s/%s", session_id, len(tiers), len(ordered_games))
             return {
                 "phase": "first_tier",
                 "next_game": {
@@ -217,7 +196,7 @@ class RankingService:
             }
 
         # Первый проход завершён — выбираем пул кандидатов
-        logger.info(f"First tier completed: session_id={session_id}, selecting candidates (top_n={top_n})")
+        logger.info("First tier completed: session_id=%s, selecting candidates (top_n=%s)", session_id, top_n)
         first_tiers_enum: Dict[int, FirstTier] = {
             int(g_id): FirstTier(value)
             for g_id, value in (session.first_tiers or {}).items()
@@ -231,7 +210,7 @@ class RankingService:
         session.current_index_second = 0
 
         if not candidate_ids:
-            logger.warning(f"No candidates selected for session: session_id={session_id}")
+            logger.warning("No candidates selected for session: session_id=%s", session_id)
             return {
                 "phase": "completed",
                 "message": "Не удалось набрать кандидатов для топа.",
@@ -239,7 +218,7 @@ class RankingService:
 
         candidate_games = [games[g_id] for g_id in candidate_ids if g_id in games]
         first_candidate = candidate_games[0]
-        logger.info(f"Candidates selected: session_id={session_id}, candidates={len(candidate_games)}")
+        logger.info("Candidates selected: session_id=%s, candidates=%s", session_id, len(candidate_games))
 
         return {
             "phase": "second_tier",
@@ -261,7 +240,7 @@ class RankingService:
         }
 
     def _next_unrated_game_second(
-        self, session: RankingSessionModel, candidate_games: List[Game]
+        self, session: RankingSessionState, candidate_games: List[Game]
     ) -> Optional[Game]:
         rated_ids = set(int(k) for k in (session.second_tiers or {}).keys())
 
@@ -283,17 +262,28 @@ class RankingService:
         Сохраняет ответ пользователя на втором проходе и,
         если все игры оценены, формирует финальный топ.
         """
-        logger.debug(f"Processing second tier answer: session_id={session_id}, game_id={game_id}, tier={tier.value}")
-        session = self._get_session(session_id)
+        logger.debug("Processing second tier answer: session_id=%s, game_id=%s, tier=%s", session_id, game_id, tier.value)
+        return apply_answer(
+            self.db, session_id, lambda session: self._answer_second_tier(session, game_id, tier, top_n)
+        )
+
+    def _answer_second_tier(
+        self,
+        session: RankingSessionState,
+        game_id: int,
+        tier: SecondTier,
+        top_n: int,
+    ) -> Dict:
+        session_id = session.id
         if session.state != "second_tier":
-            logger.warning(f"Invalid session state for second tier: session_id={session_id}, state={session.state}")
+            logger.warning("Invalid session state for second tier: session_id=%s, state=%s", session_id, session.state)
             raise ValueError("Сессия не находится на этапе второго ранжирования.")
 
         if not session.candidate_ids:
-            logger.warning(f"No candidate_ids for session: session_id={session_id}")
+            logger.warning("No candidate_ids for session: session_id=%s", session_id)
             raise ValueError("Для сессии нет списка кандидатов.")
 
-        games = self._games_by_id(session.candidate_ids)
+        games = session.projections
         candidate_games = [games[g_id] for g_id in session.candidate_ids if g_id in games]
 
         tiers: Dict[int, str] = dict(session.second_tiers or {})
@@ -302,7 +292,7 @@ class RankingService:
 
         next_game = self._next_unrated_game_second(session, candidate_games)
         if next_game is not None:
-            logger.debug(f"Second tier: next game available: session_id={session_id}, answered={len(tiers)}/{len(candidate_games)}")
+            logger.debug("Second tier: next game available: session_id=%s, answered=%s/%s", session_id, len(tiers), len(candidate_games))
             return {
                 "phase": "second_tier",
                 "next_game": {
@@ -324,7 +314,7 @@ class RankingService:
             }
 
         # Второй проход завершён — формируем финальный топ
-        logger.info(f"Second tier completed: session_id={session_id}, building final top (top_n={top_n})")
+        logger.info("Second tier completed: session_id=%s, building final top (top_n=%s)", session_id, top_n)
         second_tiers_enum: Dict[int, SecondTier] = {
             int(g_id): SecondTier(value)
             for g_id, value in (session.second_tiers or {}).items()
@@ -339,7 +329,7 @@ class RankingService:
         session.state = "final"
 
         ranked_games = domain_services.build_ranked_games(games, final_ids)
-        logger.info(f"Final ranking built: session_id={session_id}, ranked_games={len(ranked_games)}")
+        logger.info("Final ranking built: session_id=%s, ranked_games=%s", session_id, len(ranked_games))
 
         return {
             "phase": "final",
@@ -0,0 +1,174 @@
+"""
+Кэш активных сессий ранжирования в памяти воркера.
+
+Каждый ответ пользователя раньше перечитывал строку сессии, все её игры и
+заново строил Game. Теперь снимок сессии вместе с готовыми Game хранится в
+LRU-кэше (ограничен размером и временем простоя), а ответ сохраняется сразу
+(write-through) одним UPDATE изменившихся полей.
+
+Между воркерами кэш не согласуется: UPDATE проверяет версию строки
+(ranking_sessions.version), и если её успел изменить другой воркер,
+снимок перечитывается из БД, а ответ применяется заново.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.config import config
+from app.domain.models import Game
+from app.infrastructure.models import GameModel, RankingSessionModel
+from app.infrastructure.projections import ranking_games_query, row_to_game
+from app.infrastructure.repositories import CACHE_HITS, CACHE_MISSES
+from app.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Поля сессии, которые меняются при ответах (пишутся в БД только изменившиеся)
+_SESSION_FIELDS = (
+    "state",
+    "first_tiers",
+    "second_tiers",
+    "candidate_ids",
+    "final_order",
+    "current_index_first",
+    "current_index_second",
+)
+
+
+@dataclass
+class RankingSessionState:
+    """
+    Снимок сессии ранжирования вместе с уже построенными Game всех её игр.
+
+    version — версия строки в БД, по которой проверяется сохранение.
+    """
+
+    id: Any
+    version: int
+    games: List[Any]
+    state: str
+    first_tiers: Dict
+    second_tiers: Dict
+    candidate_ids: Optional[List[Any]]
+    final_order: Optional[List[Any]]
+    current_index_first: int
+    current_index_second: int
+    projections: Dict[Any, Game] = field(default_factory=dict)
+
+    @classmethod
+    def from_model(cls, model: RankingSessionModel, projections: Dict[Any, Game]) -> "RankingSessionState":
+        return cls(
+            id=model.id,
+            version=model.version,
+            games=list(model.games or []),
+            state=model.state,
+            first_tiers=dict(model.first_tiers or {}),
+            second_tiers=dict(model.second_tiers or {}),
+            candidate_ids=model.candidate_ids,
+            final_order=model.final_order,
+            current_index_first=model.current_index_first,
+            current_index_second=model.current_index_second,
+            projections=projections,
+        )
+
+
+# session_id -> RankingSessionState
+ranking_session_cache: LRUCache[RankingSessionState] = LRUCache(
+    maxsize=config.RANKING_SESSION_CACHE_SIZE,
+    ttl=config.RANKING_SESSION_CACHE_TTL,
+)
+CACHE_HITS.set_function(lambda: ranking_session_cache.hits, cache="ranking_sessions")
+CACHE_MISSES.set_function(lambda: ranking_session_cache.misses, cache="ranking_sessions")
+
+
+def load_games(db: Session, game_ids: Sequence[Any]) -> Dict[Any, Game]:
+    """Game для ранжирования по id (только скалярные поля)."""
+    if not game_ids:
+        return {}
+    rows = ranking_games_query(db).filter(GameModel.id.in_(list(game_ids))).all()
+    return {row.id: row_to_game(row) for row in rows}
+
+
+def cache_new_session(session: RankingSessionModel, games: Sequence[Game]) -> None:
+    """Кладёт в кэш только что созданную сессию — её игры уже загружены."""
+    ranking_session_cache.set(session.id, RankingSessionState.from_model(session, {g.id: g for g in games}))
+
+
+def get_session_state(db: Session, session_id: Any, fresh: bool = False) -> RankingSessionState:
+    """
+    Снимок сессии: из кэша, а при промахе (или fresh=True) — из БД.
+
+    Игры сессии перечитываются, только если их нет в прежнем снимке.
+    """
+    cached = ranking_session_cache.get(session_id)
+    if cached is not None and not fresh:
+        return cached
+
+    logger.debug("Getting ranking session: %s", session_id)
+    session = db.get(RankingSessionModel, session_id, populate_existing=fresh)
+    if session is None:
+        ranking_session_cache.invalidate(session_id)
+        logger.warning("Ranking session %s not found", session_id)
+        raise ValueError(f"Ranking session {session_id} not found")
+
+    if cached is not None and cached.games == list(session.games or []):
+        projections = cached.projections
+    else:
+        projections = load_games(db, session.games)
+    state = RankingSessionState.from_model(session, projections)
+    ranking_session_cache.set(session_id, state)
+    return state
+
+
+def save_session_state(db: Session, before: RankingSessionState, after: RankingSessionState) -> bool:
+    """
+    Пишет изменившиеся поля сессии одним UPDATE с проверкой версии.
+
+    False — строку успела изменить (или удалить) другая транзакция,
+    и снимок устарел.
+    """
+    values = {
+        name: getattr(after, name)
+        for name in _SESSION_FIELDS
+        if getattr(after, name) != getattr(before, name)
+    }
+    values["version"] = before.version + 1
+    result = db.execute(
+        update(RankingSessionModel)
+        .where(RankingSessionModel.id == before.id, RankingSessionModel.version == before.version)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        logger.info("Ranking session %s changed concurrently (version %s)", before.id, before.version)
+        return False
+
+    after.version = before.version + 1
+    if after.state == "final":
+        ranking_session_cache.invalidate(after.id)
+    else:
+        ranking_session_cache.set(after.id, after)
+    return True
+
+
+def apply_answer(db: Session, session_id: Any, step: Callable[[RankingSessionState], Dict]) -> Dict:
+    """
+    Применяет ответ (step) к копии снимка сессии и сохраняет её.
+
+    step меняет снимок, только присваивая полям новые значения. При
+    конфликте версий ответ один раз применяется заново к свежему
+    состоянию из БД. Ошибка в step оставляет кэш как был.
+    """
+    for attempt in range(2):
+        before = get_session_state(db, session_id, fresh=attempt > 0)
+        after = replace(before)
+        result = step(after)
+        if save_session_state(db, before, after):
+            return result
+    ranking_session_cache.invalidate(session_id)
+    raise ValueError("Сессия ранжирования изменена параллельно, повторите ответ.")
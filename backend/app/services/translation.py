@@ -4,7 +4,7 @@ import random
 import time
 from typing import Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer, undefer_group
 
 try:
     from googletrans import Translator
@@ -15,9 +15,17 @@ except ImportError:
 
 from app.config import config
 from app.infrastructure.models import GameModel
+from app.infrastructure.projections import DESCRIPTIONS_GROUP
+from app.infrastructure.query_counter import count_queries, log_query_stats
+from app.utils.metrics import registry
 
 logger = logging.getLogger(__name__)
 
+TRANSLATIONS = registry.counter("translations_total", "Description translations by result", ["result"])
+TRANSLATED_CHARS = registry.counter("translation_source_chars_total", "Characters sent to the translator")
+TRANSLATION_SECONDS = registry.histogram("translation_duration_seconds", "Single translation latency incl. retries")
+TRANSLATION_PENDING = registry.gauge("translation_pending_games", "Games left in the current background translation run")
+
 
 class TranslationService:
     """
@@ -63,6 +71,7 @@ class TranslationService:
             return None
 
         text_length = len(text)
+        started = time.perf_counter()
         logger.debug(f"Starting translation of text ({text_length} chars) with {max_retries} max retries")
 
         for attempt in range(max_retries):
@@ -82,6 +91,9 @@ class TranslationService:
                 translated_length = len(translated_text)
 
                 self.translation_count += 1
+                TRANSLATIONS.inc(result="success")
+                TRANSLATED_CHARS.inc(text_length)
+                TRANSLATION_SECONDS.observe(time.perf_counter() - started)
                 logger.info(f"✅ Translation successful: {text_length} → {translated_length} chars "
                            f"(total: {self.translation_count}, errors: {self.error_count})")
 
@@ -105,6 +117,8 @@ class TranslationService:
                                   f"Retrying in {actual_delay:.2f}s...")
                     await asyncio.sleep(actual_delay)
                 else:
+                    TRANSLATIONS.inc(result="error")
+                    TRANSLATION_SECONDS.observe(time.perf_counter() - started)
                     logger.error(f"❌ Translation failed after {max_retries} attempts: {e} "
                                 f"(total: {self.translation_count}, errors: {self.error_count})",
                                 exc_info=True)
@@ -143,7 +157,12 @@ class TranslationService:
 
         logger.info("🔧 Starting to fix existing translation formatting")
 
-        games = db.query(GameModel).filter(GameModel.description_ru.isnot(None)).all()
+        games = (
+            db.query(GameModel)
+            .options(undefer(GameModel.description_ru))
+            .filter(GameModel.description_ru.isnot(None))
+            .all()
+        )
         fixed_count = 0
 
         for game in games:
@@ -183,6 +202,7 @@ class TranslationService:
             # Находим игры без русского описания, но с английским
             games_to_translate = (
                 db.query(GameModel)
+                .options(undefer_group(DESCRIPTIONS_GROUP))
                 .filter(GameModel.description.isnot(None))
                 .filter(GameModel.description_ru.is_(None))
                 .filter(GameModel.description != '')
@@ -195,6 +215,7 @@ class TranslationService:
                 logger.info("ℹ️  No games found that need translation")
                 return
 
+            TRANSLATION_PENDING.set(total_games)
             logger.info(f"📚 Found {total_games} games that need translation")
             logger.info("🚀 Starting background translation process...")
 
@@ -203,9 +224,10 @@ class TranslationService:
 
             # Переводим описания по одному (чтобы не перегружать API)
             for i, game in enumerate(games_to_translate, 1):
+                TRANSLATION_PENDING.set(total_games - i + 1)
                 try:
                     # Проверяем, не был ли перевод уже сделан другим процессом
-                    db.refresh(game)  # Обновляем объект из базы данных
+                    db.refresh(game, attribute_names=["description_ru"])  # Перечитываем только перевод
                     if game.description_ru is not None:
                         logger.debug(f"⏭️  [{i}/{total_games}] Skipping {game.name} - already translated by another process")
                         continue
@@ -256,6 +278,7 @@ class TranslationService:
             except Exception as rollback_error:
                 logger.error(f"❌ Failed to rollback transaction: {rollback_error}")
         finally:
+            TRANSLATION_PENDING.set(0)
             db.close()
             logger.debug("🔒 Database session closed in background translation task")
 
@@ -271,4 +294,6 @@ async def translate_game_descriptions_background(db: Session) -> None:
 
     :param db: Сессия базы данных
     """
-    await translation_service.translate_game_descriptions_background(db)
\ No newline at end of file
+    with count_queries() as query_stats:
+        await translation_service.translate_game_descriptions_background(db)
+    log_query_stats("background translation", query_stats)
\ No newline at end of file
@@ -57,10 +57,9 @@ def setup_logging(log_level: Optional[str] = None) -> None:
     logging.getLogger("app").setLevel(level)
     logging.getLogger("app.services.bgg").setLevel(level)
     logging.getLogger("app.api.bgg").setLevel(level)
-    logging.getLogger("app.infrastructure.repositories").setLevel(logging.INFO)
-    
+
     logger = logging.getLogger(__name__)
-    logger.info(f"Logging configured with level: {level}")
+    logger.info("Logging configured with level: %s", logging.getLevelName(level))
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -71,3 +70,36 @@ def get_logger(name: str) -> logging.Logger:
     """
     return logging.getLogger(name)
 
+
+
+class RowLogger:
+    """
+    Сэмплированный канал построчной детализации для длинных циклов (импорт таблицы).
+
+    Пишет в отдельный логгер "<name>.rows" на уровне DEBUG и только для каждой
+    N-й строки (1-й, N+1-й, ...), поэтому его можно включить на проде,
+    не заливая stdout. Проверка enabled() дешёвая — сообщения для пропущенных
+    строк не форматируются вовсе.
+    """
+
+    def __init__(self, name: str, every: int):
+        self.logger = logging.getLogger(f"{name}.rows")
+        self.every = every
+
+    def enabled(self, idx: int) -> bool:
+        if self.every <= 0 or (idx - 1) % self.every:
+            return False
+        return self.logger.isEnabledFor(logging.DEBUG)
+
+    def debug(self, idx: int, msg: str, *args) -> None:
+        if self.enabled(idx):
+            self.logger.debug(msg, *args)
+
+
+def get_row_logger(name: str, every: Optional[int] = None) -> RowLogger:
+    """
+    Получить сэмплированный построчный логгер.
+    :param name: Имя родительского логгера (обычно __name__)
+    :param every: Писать каждую N-ю строку (0 — выключено); по умолчанию LOG_ROW_SAMPLE_EVERY
+    """
+    return RowLogger(name, config.LOG_ROW_SAMPLE_EVERY if every is None else every)
@@ -0,0 +1,157 @@
+"""
+Повторы с экспоненциальной задержкой и circuit breaker для внешних API.
+
+RetryPolicy считает паузу перед следующей попыткой: base_delay * 2^(n-1)
+со случайным разбросом (jitter), не больше max_delay. Если сервер прислал
+Retry-After, ждём столько, сколько он попросил (тоже не больше max_delay).
+
+CircuitBreaker считает неудачи подряд. После failure_threshold неудач он
+размыкается, и вызовы сразу получают CircuitOpenError, не дожидаясь
+таймаутов. Через reset_timeout секунд пропускается одна пробная попытка:
+успех замыкает breaker, неудача снова размыкает его.
+"""
+import email.utils
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from app.utils.metrics import registry
+
+CIRCUIT_STATE = registry.gauge(
+    "circuit_breaker_state", "Circuit breaker state: 0 closed, 1 half-open, 2 open", ["name"]
+)
+CIRCUIT_REJECTED = registry.counter(
+    "circuit_breaker_rejected_total", "Calls rejected while the circuit was open", ["name"]
+)
+CIRCUIT_OPENED = registry.counter("circuit_breaker_opened_total", "Times the circuit opened", ["name"])
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(RuntimeError):
+    """Вызов отклонён: внешний сервис недавно был недоступен."""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"Сервис {name} временно недоступен, повторите через {retry_after:.0f} с")
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Параметры повторов.
+
+    :param base_delay: Пауза перед первым повтором, секунды
+    :param max_delay: Верхняя граница паузы (в том числе для Retry-After)
+    :param jitter: Доля паузы, на которую она случайно уменьшается (0..1)
+    """
+
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+    jitter: float = 0.5
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Пауза после неудачной попытки номер attempt (с 1)."""
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), self.max_delay)
+        delay = min(self.base_delay * 2 ** min(attempt - 1, 30), self.max_delay)
+        return delay * (1 - self.jitter * random.random())
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Значение заголовка Retry-After (секунды или HTTP-дата) в секундах."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class CircuitBreaker:
+    """
+    Потокобезопасный circuit breaker.
+
+    :param name: Имя для метрик и сообщений об ошибках
+    :param failure_threshold: Сколько неудач подряд размыкают breaker
+    :param reset_timeout: Через сколько секунд пропустить пробный вызов
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_progress = False
+        CIRCUIT_STATE.set(0, name=name)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+            self._set_state(HALF_OPEN)
+        return self._state
+
+    def _set_state(self, state: str) -> None:
+        self._state = state
+        CIRCUIT_STATE.set(_STATE_VALUES[state], name=self.name)
+
+    def before_call(self) -> None:
+        """Пропускает вызов или бросает CircuitOpenError."""
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and not self._trial_in_progress:
+                self._trial_in_progress = True
+                return
+            retry_after = max(0.0, self.reset_timeout - (now - self._opened_at))
+        CIRCUIT_REJECTED.inc(name=self.name)
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trial_in_progress = False
+            if self._state != CLOSED:
+                self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            trial_failed = self._state == HALF_OPEN
+            self._trial_in_progress = False
+            if trial_failed or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+                CIRCUIT_OPENED.inc(name=self.name)
+
+    def release(self) -> None:
+        """Завершает вызов, не повлиявший на здоровье сервиса (например, ошибка 4xx)."""
+        with self._lock:
+            self._trial_in_progress = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trial_in_progress = False
+            self._set_state(CLOSED)
@@ -0,0 +1,94 @@
+"""
+Объединение одинаковых одновременных вызовов (single-flight).
+
+Пока вызов с некоторым ключом выполняется, остальные вызовы с тем же
+ключом не запускают свою копию, а ждут и получают тот же результат
+(или то же исключение). Результат не кэшируется: следующий вызов после
+завершения снова выполняет функцию.
+
+Работает на потоках, поэтому объединяет вызовы и из синхронного кода
+(импорт), и из async-обработчиков, которые выполняют синхронную функцию
+в пуле потоков (run_in_threadpool).
+"""
+import copy
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, TypeVar
+
+from app.utils.metrics import registry
+
+T = TypeVar("T")
+
+SINGLE_FLIGHT_CALLS = registry.counter(
+    "single_flight_calls_total", "Calls through single-flight groups", ["group", "role"]
+)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Группа single-flight вызовов.
+
+    :param name: Имя группы для метрик
+    :param copy_result: Отдавать ожидавшим копию результата (copy.deepcopy),
+                        чтобы вызывающие могли менять полученные списки и словари
+    """
+
+    def __init__(self, name: str, copy_result: bool = True):
+        self.name = name
+        self.copy_result = copy_result
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Выполняет fn(*args, **kwargs) или ждёт уже идущий вызов с тем же ключом."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            SINGLE_FLIGHT_CALLS.inc(group=self.name, role="shared")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result) if self.copy_result else call.result
+
+        SINGLE_FLIGHT_CALLS.inc(group=self.name, role="leader")
+        try:
+            call.result = fn(*args, **kwargs)
+            return self._leader_result(key, call)
+        except BaseException as exc:
+            call.error = exc
+            self._finish(key, call)
+            raise
+
+    def _leader_result(self, key: Hashable, call: _Call) -> Any:
+        waiters = self._finish(key, call)
+        # Ожидающие копируют call.result — ведущему нельзя отдавать тот же объект
+        if waiters and self.copy_result:
+            return copy.deepcopy(call.result)
+        return call.result
+
+    def _finish(self, key: Hashable, call: _Call) -> int:
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+            waiters = call.waiters
+        call.done.set()
+        return waiters
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
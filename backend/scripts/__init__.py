@@ -5,4 +5,5 @@
 - Ожидания готовности базы данных (wait_for_db.py)
 - Проверки и создания таблиц (check_tables.py)
 - Полного пересоздания базы данных (reset_db.py)
+- Загрузки рангов игр из выгрузки рангов BGG (import_bgg_ranks.py)
 """
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""
+Скрипт для загрузки рангов и статистики игр из выгрузки рангов BGG.
+
+Выгрузку (boardgames_ranks.csv или zip с ним) можно скачать на странице
+https://boardgamegeek.com/data_dumps/bg_ranks (нужен вход на BGG).
+Обновляются только игры, которые уже есть в базе.
+
+Использование:
+    python import_bgg_ranks.py boardgames_ranks.zip
+    python import_bgg_ranks.py boardgames_ranks.csv --chunk-size 10000
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from app.infrastructure.db import SessionLocal
+from app.infrastructure.ranks_dump import DEFAULT_CHUNK_SIZE, ingest_ranks_dump, open_ranks_dump
+from app.utils.logging import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+def import_ranks(path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    logger.info(f"=== Importing BGG ranks dump from {path} ===")
+    session = SessionLocal()
+    try:
+        with open_ranks_dump(path) as file:
+            result = ingest_ranks_dump(session, file, chunk_size=chunk_size)
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+    logger.info(f"=== Done: {result['rows']} rows in dump, {result['games_updated']} games updated ===")
+    # Скрипт работает в отдельном процессе: кэши запущенного API он не видит
+    logger.info("Call POST /api/invalidate-caches (or restart the API) to show the new ranks")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import ranks and stats from a BGG ranks dump")
+    parser.add_argument("path", type=Path, help="boardgames_ranks.csv or a zip archive with it")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per COPY chunk")
+    args = parser.parse_args()
+    try:
+        import_ranks(args.path, chunk_size=args.chunk_size)
+    except Exception as e:
+        logger.error(f"BGG ranks import failed: {e}", exc_info=True)
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
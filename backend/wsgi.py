@@ -6,6 +6,18 @@ setup_logging()
 
 app = FastAPI(title="Board Game Ranker API")
 
+from app.config import config
+if config.SQL_COUNTER_ENABLED:
+    # Заголовки X-DB-Statements / X-DB-Time-Ms и предупреждения о N+1 в логах
+    from app.infrastructure.query_counter import QueryCounterMiddleware
+    app.add_middleware(QueryCounterMiddleware)
+
+if config.METRICS_ENABLED:
+    # GET /metrics (Prometheus) и латентность запросов по маршрутам
+    from app.api.metrics import MetricsMiddleware, router as metrics_router
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
+
 # Подключаем API роутеры
 @app.get("/health")
 def health():
@@ -13,6 +25,12 @@ def health():
 from app.api.routes import router as api_router
 app.include_router(api_router, prefix="/api")
 
+if config.GAME_REFRESH_INTERVAL_MINUTES > 0 and not config.TESTING:
+    # Фоновое обновление устаревших данных игр из BGG
+    from app.services.game_refresh import game_refresher
+    app.add_event_handler("startup", game_refresher.start)
+    app.add_event_handler("shutdown", game_refresher.stop)
+
 # Start the server
 import uvicorn
 uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
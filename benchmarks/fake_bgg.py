@@ -0,0 +1,365 @@
+"""
+Локальный сервер-заглушка BGG XML API v2 для бенчмарков и нагрузочных тестов.
+
+Отдаёт /xmlapi2/search и /xmlapi2/thing из записанных фикстур
+(benchmarks/fixtures/bgg/{search,thing}/*.xml). Для запросов без фикстуры
+может генерировать синтетические ответы в том же формате, что позволяет
+гонять импорт на тысячах игр без обращения к настоящему BGG.
+
+Умеет имитировать типичные проблемы BGG:
+- задержку ответа (latency);
+- 429 Too Many Requests с заголовком Retry-After;
+- 202 Accepted («запрос поставлен в очередь») перед нормальным ответом;
+- 200 OK с пустым телом.
+
+Пример запуска отдельным процессом:
+
+    python -m benchmarks.fake_bgg --port 8765 --latency 0.05 --rate-limit-every 20
+
+и настройка backend:
+
+    BGG_SEARCH_URL=http://127.0.0.1:8765/xmlapi2/search
+    BGG_THING_URL=http://127.0.0.1:8765/xmlapi2/thing
+    BGG_BEARER_TOKEN=fake
+
+Статистика запросов доступна по GET /_stats (JSON) и через FakeBGGServer.stats().
+"""
+import argparse
+import json
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import quoteattr
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "bgg"
+
+SEARCH_PATH = "/xmlapi2/search"
+THING_PATH = "/xmlapi2/thing"
+STATS_PATH = "/_stats"
+
+# Синтетические id начинаются отсюда, чтобы не пересекаться с фикстурами
+SYNTHETIC_ID_BASE = 1_000_000
+
+QUEUED_BODY = (
+    '<?xml version="1.0" encoding="utf-8"?>\n'
+    "<message>Your request for this collection has been accepted and will be processed. "
+    "Please try again later for access.</message>"
+)
+
+
+@dataclass
+class FakeBGGOptions:
+    """Настройки поведения заглушки (можно менять на лету)."""
+
+    # Задержка перед каждым ответом, секунды
+    latency: float = 0.0
+    # Каждый N-й запрос получает 429 (0 — выключено)
+    rate_limit_every: int = 0
+    # Значение заголовка Retry-After для 429, секунды
+    retry_after: int = 1
+    # Сколько раз отвечать 202 на один и тот же запрос перед нормальным ответом
+    queued_responses: int = 0
+    # Каждый N-й запрос получает 200 с пустым телом (0 — выключено)
+    empty_body_every: int = 0
+    # Генерировать ответы для запросов без фикстур
+    synthesize: bool = True
+
+
+def slugify(value: str) -> str:
+    """Имя файла фикстуры для поискового запроса: 'Terraforming Mars' -> 'terraforming_mars'."""
+    return re.sub(r"[^0-9a-zа-яё]+", "_", value.strip().lower()).strip("_")
+
+
+def synthetic_id(name: str) -> int:
+    """Детерминированный BGG id для синтетической игры."""
+    return SYNTHETIC_ID_BASE + zlib.crc32(slugify(name).encode("utf-8")) % 9_000_000
+
+
+class FakeBGG:
+    """Логика заглушки без привязки к HTTP: фикстуры, сбои и статистика."""
+
+    def __init__(self, fixtures_dir: Path = FIXTURES_DIR, options: Optional[FakeBGGOptions] = None):
+        self.fixtures_dir = Path(fixtures_dir)
+        self.options = options or FakeBGGOptions()
+        self._lock = threading.Lock()
+        self._request_number = 0
+        self._queued: Counter = Counter()
+        self._synthetic_names: Dict[int, str] = {}
+        self.requests_by_path: Counter = Counter()
+        self.responses_by_status: Counter = Counter()
+        self.thing_ids_requested = 0
+
+    # ---------- Статистика ----------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self._request_number,
+                "by_path": dict(self.requests_by_path),
+                "by_status": {str(k): v for k, v in self.responses_by_status.items()},
+                "thing_ids_requested": self.thing_ids_requested,
+                "options": asdict(self.options),
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._request_number = 0
+            self._queued.clear()
+            self.requests_by_path.clear()
+            self.responses_by_status.clear()
+            self.thing_ids_requested = 0
+
+    # ---------- Обработка запросов ----------
+
+    def handle(self, path: str, params: Dict[str, str]) -> Tuple[int, Dict[str, str], str]:
+        """Возвращает (status, headers, body) для запроса к API."""
+        opts = self.options
+        with self._lock:
+            self._request_number += 1
+            number = self._request_number
+            self.requests_by_path[path] += 1
+            key = (path, tuple(sorted(params.items())))
+            queued_before = self._queued[key]
+            if queued_before < opts.queued_responses:
+                self._queued[key] += 1
+
+        if opts.latency > 0:
+            time.sleep(opts.latency)
+
+        if path not in (SEARCH_PATH, THING_PATH):
+            return self._done(404, {}, "Not Found")
+
+        if opts.rate_limit_every and number % opts.rate_limit_every == 0:
+            return self._done(429, {"Retry-After": str(opts.retry_after)}, "Rate limit exceeded")
+
+        if queued_before < opts.queued_responses:
+            return self._done(202, {}, QUEUED_BODY)
+
+        if opts.empty_body_every and number % opts.empty_body_every == 0:
+            return self._done(200, {}, "")
+
+        if path == SEARCH_PATH:
+            body = self._search(params.get("query", ""), params.get("exact") == "1")
+        else:
+            ids = [i for i in params.get("id", "").split(",") if i.strip()]
+            with self._lock:
+                self.thing_ids_requested += len(ids)
+            body = self._thing(ids)
+        return self._done(200, {"Content-Type": "text/xml; charset=utf-8"}, body)
+
+    def _done(self, status: int, headers: Dict[str, str], body: str) -> Tuple[int, Dict[str, str], str]:
+        with self._lock:
+            self.responses_by_status[status] += 1
+        return status, headers, body
+
+    def _search(self, query: str, exact: bool) -> str:
+        fixture = self.fixtures_dir / "search" / f"{slugify(query)}.xml"
+        if fixture.exists():
+            xml_text = fixture.read_text(encoding="utf-8")
+            if not exact:
+                return xml_text
+            # Для exact=1 оставляем только совпадающие названия
+            items = re.findall(r"<item\b.*?</item>", xml_text, flags=re.S)
+            matched = [
+                item for item in items
+                if re.search(r'<name[^>]*value="([^"]*)"', item).group(1).lower() == query.strip().lower()
+            ]
+            return self._items(matched)
+
+        if not self.options.synthesize or not query.strip():
+            return self._items([])
+
+        game_id = synthetic_id(query)
+        with self._lock:
+            self._synthetic_names[game_id] = query.strip()
+        return self._items([
+            f'<item type="boardgame" id="{game_id}">'
+            f'<name type="primary" value={quoteattr(query.strip())} />'
+            f'<yearpublished value="{2000 + game_id % 25}" /></item>'
+        ])
+
+    def _thing(self, ids: List[str]) -> str:
+        items: List[str] = []
+        for raw_id in ids:
+            fixture = self.fixtures_dir / "thing" / f"{raw_id.strip()}.xml"
+            if fixture.exists():
+                xml_text = fixture.read_text(encoding="utf-8")
+                items.extend(re.findall(r"<item\b.*?</item>", xml_text, flags=re.S))
+            elif self.options.synthesize and raw_id.strip().isdigit():
+                items.append(self._synthetic_thing(int(raw_id)))
+        return self._items(items)
+
+    def _synthetic_thing(self, game_id: int) -> str:
+        with self._lock:
+            name = self._synthetic_names.get(game_id, f"Synthetic Game {game_id}")
+        rank = game_id % 20000 + 1
+        return (
+            f'<item type="boardgame" id="{game_id}">'
+            f"<thumbnail>https://example.invalid/{game_id}_thumb.jpg</thumbnail>"
+            f"<image>https://example.invalid/{game_id}.jpg</image>"
+            f'<name type="primary" sortindex="1" value={quoteattr(name)} />'
+            f"<description>Synthetic description for {name}. " + "Lorem ipsum dolor sit amet. " * 20 + "</description>"
+            f'<yearpublished value="{2000 + game_id % 25}" />'
+            f'<minplayers value="{1 + game_id % 3}" /><maxplayers value="{4 + game_id % 3}" />'
+            f'<playingtime value="{30 + game_id % 120}" /><minplaytime value="30" />'
+            f'<maxplaytime value="{30 + game_id % 120}" /><minage value="{8 + game_id % 8}" />'
+            f'<link type="boardgamecategory" id="1" value="Category {game_id % 7}" />'
+            f'<link type="boardgamemechanic" id="2" value="Mechanic {game_id % 11}" />'
+            f'<link type="boardgamedesigner" id="3" value="Designer {game_id % 13}" />'
+            f'<link type="boardgamepublisher" id="4" value="Publisher {game_id % 17}" />'
+            '<statistics page="1"><ratings>'
+            f'<usersrated value="{game_id % 50000}" /><average value="{5 + (game_id % 400) / 100:.2f}" />'
+            f'<bayesaverage value="{5 + (game_id % 300) / 100:.2f}" />'
+            f'<ranks><rank type="subtype" id="1" name="boardgame" value="{rank}" /></ranks>'
+            f'<owned value="{game_id % 90000}" /><trading value="10" /><wanting value="5" />'
+            f'<wishing value="20" /><numcomments value="100" /><numweights value="50" />'
+            f'<averageweight value="{1 + (game_id % 400) / 100:.2f}" />'
+            "</ratings></statistics></item>"
+        )
+
+    @staticmethod
+    def _items(items: List[str]) -> str:
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            f'<items total="{len(items)}" termsofuse="https://boardgamegeek.com/xmlapi/termsofuse">'
+            + "".join(items)
+            + "</items>"
+        )
+
+
+class _Handler(BaseHTTPRequestHandler):
+    fake: FakeBGG
+
+    def do_GET(self) -> None:  # noqa: N802 - имя задаёт BaseHTTPRequestHandler
+        parsed = urlparse(self.path)
+        if parsed.path == STATS_PATH:
+            self._send(200, {"Content-Type": "application/json"}, json.dumps(self.fake.stats()))
+            return
+        params = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        status, headers, body = self.fake.handle(parsed.path, params)
+        self._send(status, headers, body)
+
+    def _send(self, status: int, headers: Dict[str, str], body: str) -> None:
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        # Не засоряем вывод бенчмарков access-логом
+        pass
+
+
+class FakeBGGServer:
+    """
+    HTTP-сервер заглушки в фоновом потоке.
+
+        with FakeBGGServer(latency=0.01) as server:
+            os.environ["BGG_SEARCH_URL"] = server.search_url
+            ...
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        fixtures_dir: Path = FIXTURES_DIR,
+        **options: Any,
+    ):
+        self.fake = FakeBGG(fixtures_dir, FakeBGGOptions(**options))
+        handler = type("FakeBGGHandler", (_Handler,), {"fake": self.fake})
+        self._httpd = ThreadingHTTPServer((host, port), handler)
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def options(self) -> FakeBGGOptions:
+        return self.fake.options
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def search_url(self) -> str:
+        return self.base_url + SEARCH_PATH
+
+    @property
+    def thing_url(self) -> str:
+        return self.base_url + THING_PATH
+
+    def stats(self) -> Dict[str, Any]:
+        return self.fake.stats()
+
+    def reset_stats(self) -> None:
+        self.fake.reset_stats()
+
+    def start(self) -> "FakeBGGServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-bgg", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Запуск в текущем потоке (для CLI)."""
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "FakeBGGServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake BGG XML API server for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before each response")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="return 429 for every Nth request")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--queued-responses", type=int, default=0, help="202 responses before success")
+    parser.add_argument("--empty-body-every", type=int, default=0, help="empty 200 for every Nth request")
+    parser.add_argument("--no-synthesize", action="store_true", help="serve only recorded fixtures")
+    args = parser.parse_args()
+
+    server = FakeBGGServer(
+        host=args.host,
+        port=args.port,
+        fixtures_dir=args.fixtures,
+        latency=args.latency,
+        rate_limit_every=args.rate_limit_every,
+        retry_after=args.retry_after,
+        queued_responses=args.queued_responses,
+        empty_body_every=args.empty_body_every,
+        synthesize=not args.no_synthesize,
+    )
+    print(f"Fake BGG listening on {server.base_url} (search: {server.search_url}, thing: {server.thing_url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
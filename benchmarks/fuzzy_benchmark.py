@@ -0,0 +1,143 @@
+"""
+Бенчмарк оценки схожести названий (app.services.fuzzy.score_candidates).
+
+Сравнивает прежнюю схему — по кандидату в цикле: token_sort_ratio +
+partial_ratio в ключе сортировки, ещё раз для логов и ещё раз для
+победителя — с одним вызовом score_candidates на весь список.
+
+Прежняя схема считается через fuzzywuzzy, если он установлен, иначе через
+поштучные вызовы rapidfuzz.fuzz (это только ускоряет «старый» вариант,
+так что выигрыш оценивается снизу). Запуск:
+
+    python -m benchmarks.fuzzy_benchmark --sizes 1000 5000 20000 --queries 50
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+BACKEND_DIR = ROOT_DIR / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.import_benchmark import _git_commit  # noqa: E402
+
+DEFAULT_SIZES = [1000, 5000, 20000]
+
+WORDS = [
+    "Catan", "Mars", "Terraforming", "Gloomhaven", "Ticket", "Ride", "Pandemic", "Legacy", "Wingspan",
+    "Azul", "Brass", "Birmingham", "Lancashire", "Spirit", "Island", "Root", "Everdell", "Scythe",
+    "Agricola", "Carcassonne", "Dominion", "Twilight", "Struggle", "Imperium", "Arkham", "Horror",
+    "Expedition", "Empire", "Dune", "Ark", "Nova", "Lost", "Ruins", "Arnak", "Great", "Western",
+    "Trail", "Orleans", "Concordia", "Puerto", "Rico", "Power", "Grid", "Star", "Wars", "Rebellion",
+]
+SUFFIXES = ["", "", "", ": Expansion", ": Big Box", " Deluxe Edition", ": Jaws of the Lion", " 2nd Edition"]
+
+
+def generate_names(count: int, *, seed: int = 42) -> List[str]:
+    """Синтетические названия игр из 1-4 слов с типичными для BGG суффиксами."""
+    rnd = random.Random(seed)
+    return [
+        " ".join(rnd.sample(WORDS, rnd.randint(1, 4))) + rnd.choice(SUFFIXES)
+        for _ in range(count)
+    ]
+
+
+def _legacy_scorer():
+    try:
+        from fuzzywuzzy import fuzz
+        return "fuzzywuzzy", fuzz
+    except ImportError:
+        from rapidfuzz import fuzz
+        return "rapidfuzz-scalar", fuzz
+
+
+def legacy_best(query: str, names: Sequence[str], fuzz) -> str:
+    """Прежняя схема из _fetch_bgg_details_for_row: схожесть в ключе, в логах и для победителя."""
+
+    def similarity(candidate_name: str) -> float:
+        return max(
+            fuzz.token_sort_ratio(query, candidate_name),
+            fuzz.partial_ratio(query.lower(), candidate_name.lower()),
+        )
+
+    ordered = sorted(names, key=lambda candidate_name: -similarity(candidate_name))
+    for candidate_name in ordered:
+        similarity(candidate_name)  # пересчёт для строки лога
+    similarity(ordered[0])  # и ещё раз для победителя
+    return ordered[0]
+
+
+def vectorized_best(query: str, names: Sequence[str]) -> str:
+    from app.services.fuzzy import score_candidates
+
+    scores = score_candidates(query, names)
+    return names[max(range(len(scores)), key=scores.__getitem__)]
+
+
+def _time(fn, queries: Sequence[str]) -> float:
+    started = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return time.perf_counter() - started
+
+
+def run(sizes: List[int], queries_count: int, *, seed: int) -> Dict[str, Any]:
+    from app.services import fuzzy
+
+    legacy_name, legacy_fuzz = _legacy_scorer()
+    results = []
+    for size in sizes:
+        names = generate_names(size, seed=seed)
+        queries = random.Random(seed + size).sample(names, min(queries_count, size))
+
+        legacy_s = _time(lambda q: legacy_best(q, names, legacy_fuzz), queries)
+        vectorized_s = _time(lambda q: vectorized_best(q, names), queries)
+        result = {
+            "names": size,
+            "queries": len(queries),
+            "legacy_ms_per_query": round(legacy_s * 1000 / len(queries), 3),
+            "vectorized_ms_per_query": round(vectorized_s * 1000 / len(queries), 3),
+            "speedup": round(legacy_s / vectorized_s, 1) if vectorized_s else None,
+        }
+        results.append(result)
+        print(
+            f"[{size:>6} names] legacy {result['legacy_ms_per_query']} ms/query, "
+            f"score_candidates {result['vectorized_ms_per_query']} ms/query, x{result['speedup']}",
+            flush=True,
+        )
+
+    return {
+        "benchmark": "fuzzy",
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "params": {
+            "sizes": sizes, "queries": queries_count, "seed": seed,
+            "legacy": legacy_name, "backend": fuzzy.BACKEND,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Candidate scoring benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=None, help="JSON file (default: bench_fuzzy_<commit>.json)")
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.queries, seed=args.seed)
+
+    output = args.output or Path(f"bench_fuzzy_{report['commit']}.json")
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2, sort_keys=True), encoding="utf-8")
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
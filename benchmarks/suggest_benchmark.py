@@ -0,0 +1,147 @@
+"""
+Бенчмарк подсказок по названиям (app.services.game_index.GameNameIndex).
+
+Строит индекс на синтетических названиях (слова из fuzzy_benchmark плюс
+выдуманные из слогов — иначе словарь в несколько десятков слов даёт
+нереалистично длинные списки совпадений; у части игр есть альтернативные
+названия) и меряет задержку suggest для трёх
+видов запросов: начало названия, несколько слов, слово с опечаткой.
+Для сравнения меряется прежний путь — score_candidates по всем названиям. Запуск:
+
+    python -m benchmarks.suggest_benchmark --sizes 1000 10000 50000 --queries 200
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+BACKEND_DIR = ROOT_DIR / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.fuzzy_benchmark import SUFFIXES, WORDS  # noqa: E402
+from benchmarks.import_benchmark import _git_commit  # noqa: E402
+
+DEFAULT_SIZES = [1000, 10000, 50000]
+
+SYLLABLES = [
+    "ka", "ta", "ran", "mor", "gle", "vin", "dor", "el", "ast", "ri", "on", "bel",
+    "zar", "qu", "est", "lum", "ner", "fa", "go", "sha", "tri", "ven", "ox", "pel",
+]
+
+
+def generate_names(count: int, *, seed: int = 42, vocabulary: int = 5000) -> List[str]:
+    """Синтетические названия из 1-4 слов: известные слова и выдуманные из слогов."""
+    rnd = random.Random(seed)
+    words = list(WORDS)
+    while len(words) < vocabulary:
+        words.append("".join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 4))).capitalize())
+    return [
+        " ".join(rnd.sample(words, rnd.randint(1, 4))) + rnd.choice(SUFFIXES)
+        for _ in range(count)
+    ]
+
+
+def build_games(names: Sequence[str], *, seed: int) -> List[Any]:
+    from app.services.game_index import IndexedGame
+
+    rnd = random.Random(seed)
+    games = []
+    for rank, name in enumerate(names, 1):
+        alternate = [name.upper()] if rnd.random() < 0.2 else []
+        games.append(IndexedGame(game_id=uuid.uuid4(), name=name, bgg_rank=rank, alternate_names=alternate))
+    return games
+
+
+def make_queries(names: Sequence[str], count: int, *, seed: int) -> Dict[str, List[str]]:
+    """Запросы трёх видов: префикс, несколько слов, опечатка в слове."""
+    rnd = random.Random(seed)
+    sample = [rnd.choice(names) for _ in range(count)]
+    prefix, multi_word, typo = [], [], []
+    for name in sample:
+        words = name.replace(":", "").split()
+        prefix.append(name[:rnd.randint(2, 5)])
+        multi_word.append(" ".join(word[:3] for word in words[:2]))
+        word = max(words, key=len)
+        pos = rnd.randrange(1, len(word)) if len(word) > 1 else 0
+        typo.append(word[:pos] + word[pos + 1:] if len(word) > 4 else word + "x")
+    return {"prefix": prefix, "multi_word": multi_word, "typo": typo}
+
+
+def _latencies(fn: Callable[[str], Any], queries: Sequence[str]) -> Dict[str, float]:
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(query)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "p50_ms": round(statistics.median(timings), 4),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 4),
+        "max_ms": round(timings[-1], 4),
+    }
+
+
+def run(sizes: List[int], queries_count: int, *, seed: int, limit: int) -> Dict[str, Any]:
+    from app.services.fuzzy import score_candidates
+    from app.services.game_index import GameNameIndex
+
+    results = []
+    for size in sizes:
+        names = generate_names(size, seed=seed)
+        index = GameNameIndex()
+        started = time.perf_counter()
+        index.load(build_games(names, seed=seed))
+        build_s = time.perf_counter() - started
+
+        result: Dict[str, Any] = {"names": size, "build_s": round(build_s, 3)}
+        for kind, queries in make_queries(names, queries_count, seed=seed + size).items():
+            index.suggest(queries[0], limit=limit)  # прогрев кэша узлов
+            result[kind] = _latencies(lambda q: index.suggest(q, limit=limit), queries)
+        result["full_scan"] = _latencies(lambda q: score_candidates(q, names), make_queries(
+            names, min(queries_count, 20), seed=seed,
+        )["prefix"])
+        results.append(result)
+        print(
+            f"[{size:>6} names] build {result['build_s']} s, p50/p95 ms: "
+            + ", ".join(
+                f"{kind} {result[kind]['p50_ms']}/{result[kind]['p95_ms']}"
+                for kind in ("prefix", "multi_word", "typo", "full_scan")
+            ),
+            flush=True,
+        )
+
+    return {
+        "benchmark": "suggest",
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "params": {"sizes": sizes, "queries": queries_count, "seed": seed, "limit": limit},
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Game name suggestion benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=None, help="JSON file (default: bench_suggest_<commit>.json)")
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.queries, seed=args.seed, limit=args.limit)
+
+    output = args.output or Path(f"bench_suggest_{report['commit']}.json")
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2, sort_keys=True), encoding="utf-8")
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,14 @@ class BotConfig:
 
     # Google Sheets
     RATING_SHEET_CSV_URL: str = os.getenv("RATING_SHEET_CSV_URL", "")
+    # Автоимпорт таблицы (services/sheet_watcher.py): проверка раз в N минут, 0 — выключено
+    SHEET_AUTO_IMPORT_MINUTES: float = float(os.getenv("SHEET_AUTO_IMPORT_MINUTES", "30"))
+    # Файл с ETag и хэшами строк последнего автоимпорта
+    SHEET_STATE_PATH: str = os.getenv("SHEET_STATE_PATH", "data/sheet_state.json")
+    # Строк в одном запросе автоимпорта; таймаут пачки считается по плану импорта (dry_run)
+    SHEET_AUTO_IMPORT_BATCH_SIZE: int = int(os.getenv("SHEET_AUTO_IMPORT_BATCH_SIZE", "20"))
+    # Раз в N часов отправлять таблицу целиком (рейтинги новых пользователей), 0 — никогда
+    SHEET_FULL_IMPORT_HOURS: float = float(os.getenv("SHEET_FULL_IMPORT_HOURS", "24"))
 
     # Настройки подключения к БД (для отладки/прямого доступа)
     DB_HOST: str = os.getenv("DB_HOST", "localhost")
@@ -51,6 +59,27 @@ class BotConfig:
     # Язык по умолчанию для описаний игр
     DEFAULT_LANGUAGE: str = os.getenv("DEFAULT_LANGUAGE", "ru")
 
+    # Лимиты исходящих сообщений в Telegram (services/rate_limiter.py)
+    TG_GLOBAL_RATE: float = float(os.getenv("TG_GLOBAL_RATE", "30"))
+    TG_PRIVATE_CHAT_RATE: float = float(os.getenv("TG_PRIVATE_CHAT_RATE", "1"))
+    TG_GROUP_CHAT_RATE_PER_MINUTE: float = float(os.getenv("TG_GROUP_CHAT_RATE_PER_MINUTE", "20"))
+    TG_CHAT_BURST: int = int(os.getenv("TG_CHAT_BURST", "3"))
+    TG_RETRY_AFTER_ATTEMPTS: int = int(os.getenv("TG_RETRY_AFTER_ATTEMPTS", "3"))
+
+    # Количество игр на одной странице /my_games
+    MY_GAMES_PAGE_SIZE: int = int(os.getenv("MY_GAMES_PAGE_SIZE", "20"))
+
+    # Inline-поиск игр (@bot <название>)
+    # Сколько секунд Telegram может отдавать ответ на тот же запрос из своего кэша
+    INLINE_CACHE_TIME: int = int(os.getenv("INLINE_CACHE_TIME", "300"))
+    # Пауза перед запросом к backend: если пользователь продолжил ввод, запрос не отправляется
+    INLINE_DEBOUNCE_MS: int = int(os.getenv("INLINE_DEBOUNCE_MS", "300"))
+    INLINE_MIN_QUERY_LENGTH: int = int(os.getenv("INLINE_MIN_QUERY_LENGTH", "2"))
+    INLINE_RESULTS_LIMIT: int = int(os.getenv("INLINE_RESULTS_LIMIT", "10"))
+    # Кэш ответов backend в боте (общий для всех пользователей)
+    INLINE_CACHE_SIZE: int = int(os.getenv("INLINE_CACHE_SIZE", "1024"))
+    INLINE_CACHE_TTL: int = int(os.getenv("INLINE_CACHE_TTL", "600"))
+
     def validate(self) -> None:
         """Валидация обязательных параметров"""
         if not self.BOT_TOKEN:
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import html
+import logging
+from typing import Any, Dict
+
+import httpx
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+
+logger = logging.getLogger(__name__)
+
+router = Router()
+
+# BGG может готовить коллекцию до пары минут (ответы 202), backend ждёт её сам
+IMPORT_TIMEOUT = 300.0
+
+
+async def import_collection(api_base_url: str, telegram_id: int, username: str) -> Dict[str, Any]:
+    """Просит backend импортировать коллекцию пользователя BGG."""
+    async with httpx.AsyncClient() as client:
+        resp = await client.post(
+            f"{api_base_url}/api/users/{telegram_id}/bgg-collection",
+            json={"username": username},
+            timeout=IMPORT_TIMEOUT,
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+
+def format_import_result(result: Dict[str, Any]) -> str:
+    username = html.escape(str(result.get("username", "")))
+    lines = [
+        f"✅ Коллекция BGG <b>{username}</b> импортирована.",
+        "",
+        f"🎲 Игр в коллекции: {result.get('collection_size', 0)}",
+        f"➕ Добавлено в твой список: {result.get('ratings_added', 0)}",
+        f"🆕 Новых игр в базе: {result.get('games_created', 0)}",
+    ]
+    if result.get("games_skipped"):
+        lines.append(f"⚠️ Пропущено (конфликт названий): {result['games_skipped']}")
+    lines.extend(["", "Новые игры попадают в список без оценки — расставить места можно через /start_ranking."])
+    return "\n".join(lines)
+
+
+@router.message(Command("import_bgg"))
+async def cmd_import_bgg(message: Message, command: CommandObject, api_base_url: str) -> None:
+    """
+    Команда /import_bgg <имя пользователя BGG> - добавляет игры из коллекции BGG в список пользователя.
+    """
+    username = (command.args or "").strip()
+    if not username:
+        await message.answer("Укажи имя пользователя BoardGameGeek. Пример:\n/import_bgg my_bgg_login")
+        return
+
+    user_id = message.from_user.id
+    logger.info(f"User {user_id} requested BGG collection import for '{username}'")
+    await message.answer("⏳ Загружаю коллекцию с BoardGameGeek, это может занять пару минут...")
+
+    try:
+        result = await import_collection(api_base_url, user_id, username)
+    except httpx.HTTPStatusError as exc:
+        status = exc.response.status_code
+        if status == 404 and "User not found" in exc.response.text:
+            await message.answer("❌ Ты не зарегистрирован в системе.\n\nИспользуй команду /login для регистрации.")
+        elif status == 404:
+            await message.answer(f"❌ BGG не отдал коллекцию пользователя {html.escape(username)}. Проверь имя пользователя.")
+        elif status == 503:
+            await message.answer("⏳ BoardGameGeek сейчас недоступен, попробуй позже.")
+        else:
+            logger.error(f"HTTP error importing BGG collection: {status}")
+            await message.answer(f"❌ Ошибка сервера: {status}")
+        return
+    except Exception as exc:  # noqa: BLE001
+        logger.error(f"Error importing BGG collection: {exc}", exc_info=True)
+        await message.answer(f"❌ Не удалось импортировать коллекцию: {exc}")
+        return
+
+    await message.answer(format_import_result(result))
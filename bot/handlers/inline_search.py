@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import html
+import logging
+from typing import Any, Dict, List
+
+import httpx
+from aiogram import Router
+from aiogram.types import InlineQuery, InlineQueryResultArticle, InputTextMessageContent
+
+from config import config
+from services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+router = Router()
+
+# Подсказки backend по нормализованному запросу; общий кэш для всех чатов
+suggestions_cache: TTLCache[List[Dict[str, Any]]] = TTLCache(
+    maxsize=config.INLINE_CACHE_SIZE,
+    ttl=config.INLINE_CACHE_TTL,
+)
+
+# Последний inline-запрос каждого пользователя (для debounce)
+_latest_query_id: Dict[int, str] = {}
+# Запросы к backend, которые уже выполняются: одинаковый текст ждёт один ответ
+_in_flight: Dict[str, asyncio.Task] = {}
+
+
+def normalize_query(text: str | None) -> str:
+    return " ".join((text or "").casefold().split())
+
+
+async def fetch_suggestions(api_base_url: str, query: str) -> List[Dict[str, Any]]:
+    """Запрашивает подсказки у backend (/api/games/suggest)."""
+    async with httpx.AsyncClient() as client:
+        resp = await client.get(
+            f"{api_base_url}/api/games/suggest",
+            params={"q": query, "limit": config.INLINE_RESULTS_LIMIT},
+            timeout=5.0,
+        )
+        resp.raise_for_status()
+        return resp.json().get("suggestions") or []
+
+
+async def get_suggestions(api_base_url: str, query: str) -> List[Dict[str, Any]]:
+    """
+    Подсказки из кэша бота, иначе из backend.
+
+    Одновременные промахи по одному запросу (например, несколько
+    участников группы ищут одно и то же) ждут один общий ответ.
+    """
+    cached = suggestions_cache.get(query)
+    if cached is not None:
+        return cached
+
+    task = _in_flight.get(query)
+    if task is None:
+        task = asyncio.ensure_future(fetch_suggestions(api_base_url, query))
+        _in_flight[query] = task
+        task.add_done_callback(functools.partial(_on_fetched, query))
+    return await asyncio.shield(task)
+
+
+def _on_fetched(query: str, task: asyncio.Task) -> None:
+    _in_flight.pop(query, None)
+    # Ошибки не кэшируем: следующий запрос снова пойдёт в backend
+    if not task.cancelled() and task.exception() is None:
+        suggestions_cache.set(query, task.result())
+
+
+def build_results(suggestions: List[Dict[str, Any]]) -> List[InlineQueryResultArticle]:
+    results = []
+    for game in suggestions:
+        name = game.get("name") or "Без названия"
+        bgg_id = game.get("bgg_id")
+        year = game.get("yearpublished")
+        rank = game.get("bgg_rank")
+
+        details = []
+        if year:
+            details.append(str(year))
+        if rank:
+            details.append(f"BGG #{rank}")
+        matched_name = game.get("matched_name")
+        if matched_name and matched_name != name:
+            details.append(matched_name)
+
+        text = f"🎲 <b>{html.escape(name)}</b>"
+        if year:
+            text += f" ({year})"
+        if bgg_id:
+            text += f"\n<a href=\"https://boardgamegeek.com/boardgame/{bgg_id}\">BoardGameGeek</a>"
+
+        results.append(InlineQueryResultArticle(
+            id=str(game.get("game_id")),
+            title=name,
+            description=" · ".join(details) or None,
+            thumbnail_url=game.get("thumbnail"),
+            input_message_content=InputTextMessageContent(message_text=text),
+        ))
+    return results
+
+
+@router.inline_query()
+async def inline_search(inline_query: InlineQuery, api_base_url: str) -> None:
+    """
+    Inline-поиск игры: @bot <название>.
+
+    Ответ из кэша бота отдаётся сразу. Иначе запрос выполняется после паузы
+    INLINE_DEBOUNCE_MS, и только если пользователь за это время не продолжил
+    ввод. Ответы не персональные, поэтому Telegram отдаёт их из своего кэша
+    (INLINE_CACHE_TIME) всем, кто набирает тот же текст.
+    """
+    query = normalize_query(inline_query.query)
+    if len(query) < config.INLINE_MIN_QUERY_LENGTH:
+        await inline_query.answer([], cache_time=config.INLINE_CACHE_TIME, is_personal=False)
+        return
+
+    if suggestions_cache.get(query) is None:
+        user_id = inline_query.from_user.id
+        _latest_query_id[user_id] = inline_query.id
+        await asyncio.sleep(config.INLINE_DEBOUNCE_MS / 1000)
+        if _latest_query_id.get(user_id) != inline_query.id:
+            # Пользователь продолжил ввод — отвечаем уже на новый запрос
+            return
+        _latest_query_id.pop(user_id, None)
+
+    try:
+        suggestions = await get_suggestions(api_base_url, query)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Inline search failed for query '%s': %s", query, exc)
+        await inline_query.answer([], cache_time=0, is_personal=False)
+        return
+
+    logger.debug("Inline search '%s': %s results", query, len(suggestions))
+    await inline_query.answer(
+        build_results(suggestions),
+        cache_time=config.INLINE_CACHE_TIME,
+        is_personal=False,
+    )
@@ -32,9 +32,9 @@ async def cmd_login(message: Message, state: FSMContext, api_base_url: str) -> N
     # Проверяем, зарегистрирован ли пользователь
     try:
         async with httpx.AsyncClient() as client:
-            # Проверяем существование пользователя через GET запрос
+            # Проверяем существование пользователя (без загрузки списка игр)
             response = await client.get(
-                f"{api_base_url}/api/users/{user_id}/games",
+                f"{api_base_url}/api/users/{user_id}",
                 timeout=10.0
             )
 
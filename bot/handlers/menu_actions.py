@@ -46,9 +46,9 @@ async def handle_menu_login(callback: CallbackQuery, state: FSMContext, api_base
     # Проверяем, зарегистрирован ли пользователь
     try:
         async with httpx.AsyncClient() as client:
-            # Проверяем существование пользователя через GET запрос
+            # Проверяем существование пользователя (без загрузки списка игр)
             response = await client.get(
-                f"{api_base_url}/api/users/{user_id}/games",
+                f"{api_base_url}/api/users/{user_id}",
                 timeout=10.0
             )
 
@@ -100,26 +100,15 @@ async def handle_menu_login(callback: CallbackQuery, state: FSMContext, api_base
 
 async def handle_menu_my_games(callback: CallbackQuery, user_id: int, user_name: str, api_base_url: str, state: FSMContext) -> None:
     """Обработка показа списка игр пользователя"""
-    # Показываем список игр так же, как команда /my_games
-    sent_messages = []
-
-    async def answer_func_with_tracking(text, **kwargs):
-        message = await callback.message.answer(text, **kwargs)
-        sent_messages.append(message)
-        return message
-
+    # Показываем первую страницу так же, как команда /my_games, с кнопкой возврата в меню
     await _cmd_my_games_impl(
         user_id=user_id,
         user_name=user_name,
-        answer_func=answer_func_with_tracking,
-        api_base_url=api_base_url
+        answer_func=callback.message.answer,
+        api_base_url=api_base_url,
+        from_menu=True,
     )
 
-    # Добавляем кнопку "Назад в меню" к последнему сообщению
-    if sent_messages:
-        from .menu_keyboards import create_back_to_menu_keyboard
-        await sent_messages[-1].edit_reply_markup(reply_markup=create_back_to_menu_keyboard())
-
 
 async def handle_menu_start_ranking(callback: CallbackQuery, state: FSMContext) -> None:
     """Обработка начала ранжирования"""
@@ -1,15 +1,41 @@
 from __future__ import annotations
 
+import html
 import logging
+import math
+from typing import Any, Dict
+
 import httpx
-from aiogram import Router
+from aiogram import F, Router
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import Command
-from aiogram.types import Message
+from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
+
+from config import config
+
+from .menu_keyboards import create_back_to_menu_keyboard
 
 logger = logging.getLogger(__name__)
 
 router = Router()
 
+# callback_data кнопок листания: my_games:<prev|next>:<номер страницы>:<id игры-курсора>[:m]
+# Суффикс ":m" — список открыт из меню, под ним остаётся кнопка возврата в меню.
+# Курсор — id игры (UUID), поэтому callback_data укладывается в лимит Telegram 64 байта.
+CALLBACK_PREFIX = "my_games:"
+
+NO_GAMES_TEXT = (
+    "📭 У тебя пока нет оцененных игр.\n\n"
+    "Чтобы добавить игры:\n"
+    "1. Зарегистрируйся командой /login\n"
+    "2. Дождись импорта данных администратором (/import)\n"
+    "3. Твои игры появятся в этом списке!"
+)
+NOT_REGISTERED_TEXT = (
+    "❌ Ты не зарегистрирован в системе.\n\n"
+    "Используй команду /login для регистрации."
+)
+
 
 @router.message(Command("my_games"))
 async def cmd_my_games(message: Message, api_base_url: str) -> None:
@@ -21,92 +47,132 @@ async def cmd_my_games(message: Message, api_base_url: str) -> None:
     await _cmd_my_games_impl(message.from_user.id, message.from_user.full_name or str(message.from_user.id), message.answer, api_base_url)
 
 
-async def _cmd_my_games_impl(user_id: int, user_name: str, answer_func, api_base_url: str) -> None:
+async def fetch_games_page(
+    api_base_url: str,
+    telegram_id: int,
+    after: str | None = None,
+    before: str | None = None,
+) -> Dict[str, Any]:
+    """Запрашивает у backend одну страницу игр пользователя."""
+    params: Dict[str, Any] = {"limit": config.MY_GAMES_PAGE_SIZE}
+    if after:
+        params["after"] = after
+    if before:
+        params["before"] = before
+
+    async with httpx.AsyncClient() as client:
+        resp = await client.get(
+            f"{api_base_url}/api/users/{telegram_id}/games",
+            params=params,
+            timeout=10.0,
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+
+def render_games_page(data: Dict[str, Any], page: int, from_menu: bool = False) -> tuple[str, InlineKeyboardMarkup | None]:
+    """Текст страницы и клавиатура листания."""
+    total = data.get("total") or 0
+    pages = max(1, math.ceil(total / config.MY_GAMES_PAGE_SIZE))
+    page = min(max(page, 1), pages)
+
+    header = f"🎲 Твои игры ({total})"
+    if pages > 1:
+        header += f", страница {page} из {pages}"
+    lines = [header + ":\n"]
+    for game in data.get("games", []):
+        name = html.escape(game.get("name", "Без названия"))
+        bgg_url = game.get("bgg_url", "")
+        lines.append(f"• <a href=\"{bgg_url}\">{name}</a>")
+
+    suffix = ":m" if from_menu else ""
+    navigation = []
+    if data.get("prev_cursor"):
+        navigation.append(InlineKeyboardButton(
+            text="⬅️ Назад",
+            callback_data=f"{CALLBACK_PREFIX}prev:{page - 1}:{data['prev_cursor']}{suffix}",
+        ))
+    if data.get("next_cursor"):
+        navigation.append(InlineKeyboardButton(
+            text="Вперёд ➡️",
+            callback_data=f"{CALLBACK_PREFIX}next:{page + 1}:{data['next_cursor']}{suffix}",
+        ))
+
+    rows = [navigation] if navigation else []
+    if from_menu:
+        rows.extend(create_back_to_menu_keyboard().inline_keyboard)
+    return "\n".join(lines), InlineKeyboardMarkup(inline_keyboard=rows) if rows else None
+
+
+async def _cmd_my_games_impl(user_id: int, user_name: str, answer_func, api_base_url: str, from_menu: bool = False) -> None:
     """
-    Внутренняя реализация команды /my_games
+    Внутренняя реализация команды /my_games: первая страница списка одним сообщением.
+
+    Следующие страницы показываются в том же сообщении (см. handle_my_games_page).
     """
 
     logger.info(f"User {user_name} (ID: {user_id}) requested their games")
 
+    # Сообщения без списка (ошибки, пустой список) из меню тоже получают кнопку возврата
+    menu_markup = create_back_to_menu_keyboard() if from_menu else None
+
     try:
-        # Сначала получаем информацию о пользователе
-        async with httpx.AsyncClient() as client:
-            # Проверяем, зарегистрирован ли пользователь
-            user_response = await client.get(
-                f"{api_base_url}/api/users/{user_id}/games",
-                timeout=30.0  # Увеличиваем таймаут до 30 секунд
-            )
-            user_response.raise_for_status()
-
-            data = user_response.json()
-            games = data.get("games", [])
-
-            if not games:
-                await answer_func(
-                    "📭 У тебя пока нет оцененных игр.\n\n"
-                    "Чтобы добавить игры:\n"
-                    "1. Зарегистрируйся командой /login\n"
-                    "2. Дождись импорта данных администратором (/import)\n"
-                    "3. Твои игры появятся в этом списке!"
-                )
-                return
-
-            # Формируем сообщение со списком игр
-            lines = [f"🎲 Твои игры ({len(games)}):\n"]
-
-            for game in games:
-                name = game.get("name", "Без названия")
-                bgg_url = game.get("bgg_url", "")
-
-                # Формируем строку с игрой
-                game_line = f"• <a href=\"{bgg_url}\">{name}</a>"
-
-                lines.append(game_line)
-
-            # Разбиваем на части, если сообщение слишком длинное
-            text = "\n".join(lines)
-            if len(text) > 4000:  # Ограничение Telegram
-                # Разбиваем на части, гарантируя целостность каждой строки с ссылкой
-                parts = []
-                current_part = []
-                current_length = 0
-
-                # Заголовок всегда идет первым
-                header = lines[0]
-                current_part.append(header)
-                current_length = len(header) + 1
-
-                for line in lines[1:]:  # Пропускаем заголовок
-                    line_length = len(line) + 1  # +1 для символа новой строки
-
-                    # Каждая строка с игрой должна быть цельной (содержит полную ссылку)
-                    # Если добавление превысит лимит, сохраняем текущую часть
-                    if current_length + line_length > 4000:
-                        parts.append("\n".join(current_part))
-                        current_part = [header, line]  # Начинаем новую часть с заголовка
-                        current_length = len(header) + 1 + line_length
-                    else:
-                        current_part.append(line)
-                        current_length += line_length
-
-                # Добавляем последнюю часть, если она не пустая
-                if current_part:
-                    parts.append("\n".join(current_part))
-
-                for part in parts:
-                    await answer_func(part, disable_web_page_preview=True)
-            else:
-                await answer_func(text, disable_web_page_preview=True)
+        data = await fetch_games_page(api_base_url, user_id)
+        if not data.get("games"):
+            await answer_func(NO_GAMES_TEXT, reply_markup=menu_markup)
+            return
+
+        text, keyboard = render_games_page(data, page=1, from_menu=from_menu)
+        await answer_func(text, reply_markup=keyboard, disable_web_page_preview=True)
 
     except httpx.HTTPStatusError as exc:
         if exc.response.status_code == 404:
-            await answer_func(
-                "❌ Ты не зарегистрирован в системе.\n\n"
-                "Используй команду /login для регистрации."
-            )
+            await answer_func(NOT_REGISTERED_TEXT, reply_markup=menu_markup)
         else:
             logger.error(f"HTTP error getting user games: {exc.response.status_code}")
-            await answer_func(f"❌ Ошибка сервера: {exc.response.status_code}")
+            await answer_func(f"❌ Ошибка сервера: {exc.response.status_code}", reply_markup=menu_markup)
     except Exception as exc:
         logger.error(f"Error getting user games: {exc}", exc_info=True)
-        await answer_func(f"❌ Не удалось получить список игр: {exc}")
\ No newline at end of file
+        await answer_func(f"❌ Не удалось получить список игр: {exc}", reply_markup=menu_markup)
+
+
+@router.callback_query(F.data.startswith(CALLBACK_PREFIX))
+async def handle_my_games_page(callback: CallbackQuery, api_base_url: str) -> None:
+    """Листание списка игр: редактирует сообщение со списком на месте."""
+    parts = callback.data[len(CALLBACK_PREFIX):].split(":")
+    try:
+        direction, page, cursor = parts[0], int(parts[1]), parts[2]
+    except (IndexError, ValueError):
+        await callback.answer()
+        return
+    from_menu = len(parts) > 3 and parts[3] == "m"
+
+    try:
+        if direction == "next":
+            data = await fetch_games_page(api_base_url, callback.from_user.id, after=cursor)
+        else:
+            data = await fetch_games_page(api_base_url, callback.from_user.id, before=cursor)
+        if not data.get("games"):
+            # Список изменился (например, после импорта) — показываем первую страницу
+            data = await fetch_games_page(api_base_url, callback.from_user.id)
+            page = 1
+    except httpx.HTTPStatusError as exc:
+        logger.error(f"HTTP error getting user games page: {exc.response.status_code}")
+        await callback.answer(f"Ошибка сервера: {exc.response.status_code}", show_alert=True)
+        return
+    except Exception as exc:  # noqa: BLE001
+        logger.error(f"Error getting user games page: {exc}", exc_info=True)
+        await callback.answer("Не удалось получить список игр", show_alert=True)
+        return
+
+    await callback.answer()
+    if not data.get("games"):
+        await callback.message.edit_text(NO_GAMES_TEXT, reply_markup=create_back_to_menu_keyboard() if from_menu else None)
+        return
+
+    text, keyboard = render_games_page(data, page=page, from_menu=from_menu)
+    try:
+        await callback.message.edit_text(text, reply_markup=keyboard, disable_web_page_preview=True)
+    except TelegramBadRequest as exc:
+        # "message is not modified" при повторном нажатии — не ошибка
+        logger.debug(f"Games page not edited: {exc}")
@@ -3,6 +3,7 @@ from __future__ import annotations
 import logging
 import httpx
 from aiogram import Router
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
@@ -13,6 +14,10 @@ logger = logging.getLogger(__name__)
 router = Router()
 
 
+def _is_not_modified(exc: Exception) -> bool:
+    return isinstance(exc, TelegramBadRequest) and "message is not modified" in str(exc)
+
+
 async def _handle_phase_transition(
     callback: CallbackQuery,
     state: FSMContext,
@@ -62,8 +67,12 @@ async def _handle_phase_transition(
                 )
         except Exception as exc:
             # Неудачное редактирование - нормально
-            # Если не удалось отредактировать, отправляем новое сообщение
-            if thumbnail:
+            # Если не удалось отредактировать, отправляем новое сообщение.
+            # Flood control обрабатывается в services/rate_limiter.py, а повторное
+            # нажатие той же кнопки ("message is not modified") нового сообщения не требует
+            if _is_not_modified(exc):
+                logger.debug(f"Ranking message not modified: {exc}")
+            elif thumbnail:
                 await callback.message.answer_photo(
                     photo=thumbnail,
                     caption=text,
@@ -117,8 +126,12 @@ async def _handle_phase_transition(
                 )
         except Exception as exc:
             # Неудачное редактирование - нормально
-            # Если не удалось отредактировать, отправляем новое сообщение
-            if thumbnail:
+            # Если не удалось отредактировать, отправляем новое сообщение.
+            # Flood control обрабатывается в services/rate_limiter.py, а повторное
+            # нажатие той же кнопки ("message is not modified") нового сообщения не требует
+            if _is_not_modified(exc):
+                logger.debug(f"Ranking message not modified: {exc}")
+            elif thumbnail:
                 await callback.message.answer_photo(
                     photo=thumbnail,
                     caption=text,
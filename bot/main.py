@@ -1,6 +1,8 @@
 import asyncio
+import contextlib
 import logging
 import sys
+from pathlib import Path
 from dotenv import load_dotenv
 
 # Загружаем переменные окружения из .env файла
@@ -18,8 +20,12 @@ from handlers.bgg_game import router as bgg_game_router
 from handlers.login import router as login_router
 from handlers.my_games import router as my_games_router
 from handlers.menu import router as menu_router
+from handlers.inline_search import router as inline_search_router
+from handlers.bgg_collection import router as bgg_collection_router
 from services.import_ratings import import_ratings_from_sheet
 from services.clear_database import clear_database
+from services.rate_limiter import outbound_limiter
+from services.sheet_watcher import SheetWatcher
 from config import config
 
 # Настройка логирования
@@ -149,6 +155,27 @@ async def on_clear_database(message: Message):
         await message.answer(f"❌ Неожиданная ошибка при очистке базы данных: {exc}")
 
 
+async def on_bot_stats(message: Message):
+    """
+    Команда для просмотра очереди исходящих сообщений (лимиты Telegram).
+    Доступна только админу.
+    """
+    if not config.is_admin(message.from_user.id):
+        await message.answer("❌ У вас нет прав для выполнения этой команды.")
+        return
+
+    stats = outbound_limiter.stats()
+    await message.answer(
+        "📨 Очередь исходящих сообщений\n\n"
+        f"• В очереди: {stats['queued']}\n"
+        f"• Отправлено: {stats['sent']}\n"
+        f"• Ждали лимита: {stats['delayed']} (в среднем {stats['avg_wait_seconds']} с, максимум {stats['max_wait_seconds']} с)\n"
+        f"• Объединено редактирований: {stats['coalesced']}\n"
+        f"• Flood control (RetryAfter): {stats['retry_after']}\n"
+        f"• Чатов: {stats['chats']}"
+    )
+
+
 async def main():
     logger.info("Starting bot...")
 
@@ -161,6 +188,8 @@ async def main():
         raise
 
     bot = Bot(token=config.BOT_TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+    # Все исходящие запросы проходят через общие лимиты Telegram
+    bot.session.middleware(outbound_limiter)
     logger.info("Bot instance created")
 
     dp = Dispatcher()
@@ -171,19 +200,45 @@ async def main():
     # Команды верхнего уровня - теперь обрабатываются через роутеры
     dp.message.register(on_import, Command("import"))
     dp.message.register(on_clear_database, Command("clear"))
+    dp.message.register(on_bot_stats, Command("bot_stats"))
     logger.debug("Commands registered")
 
     # Подключаем роутеры
     dp.include_router(menu_router)  # Меню должно быть первым для обработки /start
+    # Листание /my_games — до ranking: его обработчики callback без фильтра по данным
+    dp.include_router(my_games_router)
     dp.include_router(ranking_router)
     dp.include_router(bgg_game_router)
     dp.include_router(login_router)
-    dp.include_router(my_games_router)
+    dp.include_router(inline_search_router)
+    dp.include_router(bgg_collection_router)
     logger.info("Routers included")
 
-    logger.info("Starting polling...")
-    await dp.start_polling(bot)
+    watcher_task = None
+    if config.SHEET_AUTO_IMPORT_MINUTES > 0 and config.RATING_SHEET_CSV_URL:
+        # Автоимпорт изменений таблицы; задача живёт, пока идёт polling
+        watcher = SheetWatcher(
+            api_base_url=config.API_BASE_URL,
+            sheet_csv_url=config.RATING_SHEET_CSV_URL,
+            state_path=Path(config.SHEET_STATE_PATH),
+            interval=config.SHEET_AUTO_IMPORT_MINUTES * 60,
+            batch_size=config.SHEET_AUTO_IMPORT_BATCH_SIZE,
+            full_import_interval=config.SHEET_FULL_IMPORT_HOURS * 3600,
+        )
+        watcher_task = asyncio.create_task(watcher.run_forever(
+            notify=lambda text: bot.send_message(config.ADMIN_USER_ID, text)
+        ))
+    elif config.SHEET_AUTO_IMPORT_MINUTES > 0:
+        logger.warning("RATING_SHEET_CSV_URL is not set, sheet auto-import disabled")
 
+    logger.info("Starting polling...")
+    try:
+        await dp.start_polling(bot)
+    finally:
+        if watcher_task is not None:
+            watcher_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await watcher_task
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -31,6 +31,9 @@ async def clear_database(api_base_url: str) -> dict:
         return result
 
     except httpx.HTTPStatusError as e:
+        if e.response.status_code == 409:
+            logger.warning("Database clear rejected: a table import is running")
+            raise RuntimeError("Сейчас идёт импорт таблицы, повторите очистку после его завершения")
         logger.error(f"HTTP error during database clear: {e.response.status_code} - {e.response.text}")
         raise RuntimeError(f"Ошибка API при очистке базы данных: {e.response.status_code}")
 
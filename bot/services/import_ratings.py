@@ -1,8 +1,10 @@
 import csv
 import io
+import json
 import logging
 import time
-from typing import List, Dict, Optional, Callable, Union
+import zlib
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Callable, Union
 
 import httpx
 
@@ -83,7 +85,18 @@ async def import_ratings_from_sheet(
         resp = await client.get(sheet_csv_url, follow_redirects=True)
         resp.raise_for_status()
 
-    text = resp.text
+    rows = parse_sheet_csv(resp.text)
+    games_count = await _process_sheet_data(api_base_url, rows, progress_callback)
+    logger.info(f"Import completed successfully: {games_count} games processed")
+    return games_count
+
+
+def parse_sheet_csv(text: str) -> List[List[str]]:
+    """
+    Разбирает CSV таблицы и проверяет минимальный формат.
+
+    Может возбуждать ValueError при проблемах с форматом данных.
+    """
     logger.info(f"Raw CSV content length: {len(text)} characters")
     logger.debug(f"Raw CSV content (first 500 chars): {text[:500]}")
 
@@ -110,25 +123,25 @@ async def import_ratings_from_sheet(
         logger.error(f"CSV header has insufficient columns: {len(header)}, header: {header}")
         raise ValueError(f"Недостаточно колонок в заголовке. Ожидается минимум 5, получено {len(header)}. Заголовок: {header}")
 
-    games_count = await _process_sheet_data(api_base_url, rows, progress_callback)
-    logger.info(f"Import completed successfully: {games_count} games processed")
-    return games_count
+    return rows
 
 
-async def _process_sheet_data(api_base_url: str, rows: List[List[str]], progress_callback: Optional[Callable[[int, int, str], None]] = None) -> int:
-    """Обрабатывает данные листа и отправляет в backend"""
-    logger.info(f"Processing sheet data: {len(rows)} rows")
+def _build_data_rows(rows: List[List[str]]) -> List[Dict]:
+    """
+    Преобразует строки CSV (первая — заголовок) в формат /api/import-table.
 
-    if not rows:
-        logger.warning("No rows to process")
-        return 0
+    Чистая функция без сетевых вызовов — используется бенчмарком импорта
+    (benchmarks/import_benchmark.py). Бот отправляет строки потоком (_iter_data_rows).
+    """
+    return list(_iter_data_rows(rows))
 
-    logger.info(f"Header row: {rows[0]}")
-    
-    if not rows:
-        logger.warning("No rows to process")
-        return 0
 
+def _iter_data_rows(rows: List[List[str]]) -> Iterator[Dict]:
+    """
+    Как _build_data_rows, но отдаёт строки по одной, не собирая их в список.
+
+    Заголовок проверяется сразу при вызове, а не при первой строке.
+    """
     header = rows[0]
     if len(header) < 5:
         logger.error(f"Unexpected table format: expected at least 5 columns, got {len(header)}")
@@ -150,10 +163,13 @@ async def _process_sheet_data(api_base_url: str, rows: List[List[str]], progress
     logger.info(f"Filtered user names (excluding 'общий'): {user_names}")
 
     logger.info(f"Final extracted user names: {user_names}")
+    return _generate_data_rows(rows, user_names)
+
 
-    data_rows: List[Dict] = []
+def _generate_data_rows(rows: List[List[str]], user_names: List[str]) -> Iterator[Dict]:
+    processed_rows = 0
     skipped_rows = 0
-    
+
     for row_idx, row in enumerate(rows[1:], start=2):
         # пропустим полностью пустые строки
         if not any(cell.strip() for cell in row):
@@ -203,36 +219,97 @@ async def _process_sheet_data(api_base_url: str, rows: List[List[str]], progress
                     ratings[user_name] = 0
                     logger.debug(f"Invalid rating value in row {row_idx}, column {idx}: {cell}, setting to 0")
 
-        data_rows.append(
-            {
-                "name": name,
-                "bgg_id": bgg_id,
-                "niza_games_rank": niza_rank,
-                "genre": genre or None,
-                "ratings": ratings,
-            }
+        processed_rows += 1
+        yield {
+            "name": name,
+            "bgg_id": bgg_id,
+            "niza_games_rank": niza_rank,
+            "genre": genre or None,
+            "ratings": ratings,
+        }
+
+    logger.info(f"Processed {processed_rows} games, skipped {skipped_rows} rows")
+
+
+async def _gzip_ndjson(data_rows: Iterable[Dict], stats: Dict[str, int]) -> AsyncIterator[bytes]:
+    """Кодирует строки в NDJSON и сжимает gzip по мере отправки."""
+    compressor = zlib.compressobj(wbits=31)  # wbits=31 — формат gzip
+    for data_row in data_rows:
+        stats["rows"] += 1
+        chunk = compressor.compress(json.dumps(data_row, ensure_ascii=False).encode("utf-8") + b"\n")
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
+
+async def send_data_rows(
+    api_base_url: str,
+    data_rows: Iterable[Dict],
+    total_rows: int,
+    stats: Optional[Dict[str, int]] = None,
+    timeout: float = 120.0,
+) -> Dict[str, Any]:
+    """
+    Отправляет строки в backend потоком (gzip NDJSON), не собирая их в память целиком.
+
+    Возвращает ответ backend (status, rows_failed, rows_invalid, ...); число
+    отправленных строк — в stats["rows"], в том числе при ошибке. Ошибки HTTP
+    пробрасываются.
+    """
+    stats = stats if stats is not None else {"rows": 0}
+    async with httpx.AsyncClient() as client:
+        resp = await client.post(
+            f"{api_base_url}/api/import-table/stream",
+            params={"total_rows": total_rows},
+            content=_gzip_ndjson(data_rows, stats),
+            headers={"Content-Type": "application/x-ndjson", "Content-Encoding": "gzip"},
+            timeout=timeout,  # Импорт синхронный: ждём, пока backend обработает все строки
+        )
+        resp.raise_for_status()
+    result = resp.json()
+    logger.info(f"Backend response: {result}")
+    return result
+
+
+async def plan_data_rows(api_base_url: str, data_rows: List[Dict], timeout: float = 120.0) -> Dict[str, Any]:
+    """
+    План импорта строк (dry_run): сколько запросов к BGG они потребуют и
+    estimated_seconds — оценка длительности. Ничего не импортирует.
+    """
+    async with httpx.AsyncClient() as client:
+        resp = await client.post(
+            f"{api_base_url}/api/import-table/stream",
+            params={"total_rows": len(data_rows), "dry_run": True},
+            content=_gzip_ndjson(data_rows, {"rows": 0}),
+            headers={"Content-Type": "application/x-ndjson", "Content-Encoding": "gzip"},
+            timeout=timeout,
         )
+        resp.raise_for_status()
+    return resp.json().get("plan") or {}
+
+
+async def _process_sheet_data(api_base_url: str, rows: List[List[str]], progress_callback: Optional[Callable[[int, int, str], None]] = None) -> int:
+    """Обрабатывает данные листа и отправляет в backend"""
+    logger.info(f"Processing sheet data: {len(rows)} rows")
+
+    if not rows:
+        logger.warning("No rows to process")
+        return 0
+
+    logger.info(f"Header row: {rows[0]}")
 
-    logger.info(f"Processed {len(data_rows)} games, skipped {skipped_rows} rows")
+    data_rows = _iter_data_rows(rows)
+    stats = {"rows": 0}
 
-    # Отправляем данные в backend с повторными попытками
-    logger.info(f"Sending {len(data_rows)} games to backend API")
+    logger.info(f"Streaming up to {len(rows) - 1} games to backend API")
 
     try:
         logger.info(f"Sending data to backend")
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                f"{api_base_url}/api/import-table",
-                json={"rows": data_rows},
-                timeout=120.0,  # Увеличиваем таймаут для импорта
-            )
-            resp.raise_for_status()
-            backend_response = resp.json()
-            logger.info(f"Backend response: {backend_response}")
+        await send_data_rows(api_base_url, data_rows, total_rows=len(rows) - 1, stats=stats)
         logger.info(f"Successfully sent data to backend") # Успешно отправили данные
     except Exception as e:
         logger.error(f"Send data failed: {e}")
 
-    return len(data_rows)
+    return stats["rows"]
 
 
@@ -0,0 +1,259 @@
+"""
+Ограничение исходящих запросов бота к Telegram Bot API.
+
+Подключается как middleware сессии бота (bot.session.middleware), поэтому
+через него проходят все отправки и редактирования сообщений из любых
+обработчиков. Лимиты — token bucket:
+
+- общий на бота (около 30 сообщений в секунду);
+- на каждый чат: личный — около 1 сообщения в секунду, группа — 20 в минуту.
+
+Запрос, которому не хватило токенов, ждёт своей очереди. Если пока
+редактирование ждёт, пришло новое редактирование того же сообщения,
+старое не отправляется, а получает результат нового. TelegramRetryAfter
+блокирует чат на retry_after секунд, после чего запрос повторяется.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import Response, TelegramType
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Методы, на которые распространяются лимиты Telegram на сообщения
+LIMITED_METHOD_PREFIXES = ("Send", "Edit", "Copy", "Forward")
+EDIT_METHOD_PREFIX = "Edit"
+
+# Сколько бакетов чатов хранить, прежде чем выбрасывать простаивающие
+MAX_IDLE_CHAT_BUCKETS = 10000
+
+
+class TokenBucket:
+    """
+    Token bucket: rate токенов в секунду, не больше capacity.
+
+    block(seconds) запрещает выдачу токенов на заданное время (RetryAfter).
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Через сколько секунд будет доступен один токен."""
+        self._refill(now)
+        wait = max(0.0, self.blocked_until - now)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return wait
+
+    def consume(self) -> None:
+        self.tokens -= 1
+
+    def block(self, seconds: float) -> None:
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    @property
+    def idle(self) -> bool:
+        return self.tokens >= self.capacity and self.blocked_until <= time.monotonic()
+
+
+class _PendingEdit:
+    """Редактирование сообщения, ожидающее отправки."""
+
+    __slots__ = ("future", "superseded_by")
+
+    def __init__(self):
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        # Исключение забирает тот, кто ждёт результат; без ожидающих не шумим в логах
+        self.future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self.superseded_by: Optional[_PendingEdit] = None
+
+    def latest(self) -> "_PendingEdit":
+        pending = self
+        while pending.superseded_by is not None:
+            pending = pending.superseded_by
+        return pending
+
+
+class OutboundRateLimiter(BaseRequestMiddleware):
+    """
+    Middleware сессии бота с общим и по-чатовыми token bucket.
+
+    :param global_rate: Сообщений в секунду на бота
+    :param private_rate: Сообщений в секунду в личный чат
+    :param group_rate: Сообщений в секунду в группу
+    :param burst: Сколько сообщений в чат можно отправить подряд без ожидания
+    :param max_retries: Сколько раз повторять запрос после RetryAfter
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        private_rate: float = 1.0,
+        group_rate: float = 20 / 60,
+        burst: int = 3,
+        max_retries: int = 3,
+    ):
+        self.private_rate = private_rate
+        self.group_rate = group_rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self._global = TokenBucket(global_rate, max(1.0, global_rate))
+        self._chats: Dict[Any, TokenBucket] = {}
+        self._pending_edits: Dict[Hashable, _PendingEdit] = {}
+
+        # Метрики очереди (см. stats())
+        self.queued = 0
+        self.sent = 0
+        self.delayed = 0
+        self.coalesced = 0
+        self.retry_after = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+    # ---------- Бакеты ----------
+
+    def _chat_bucket(self, chat_id: Any) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= MAX_IDLE_CHAT_BUCKETS:
+                self._chats = {key: b for key, b in self._chats.items() if not b.idle}
+            # У групп и каналов отрицательный chat_id, у @username — строка
+            is_private = isinstance(chat_id, int) and chat_id > 0
+            rate = self.private_rate if is_private else self.group_rate
+            bucket = self._chats[chat_id] = TokenBucket(rate, self.burst)
+        return bucket
+
+    async def _acquire(self, buckets: Tuple[TokenBucket, ...], pending: Optional[_PendingEdit] = None) -> bool:
+        """
+        Ждёт токен во всех бакетах и списывает его.
+
+        Возвращает False, если ожидавшее редактирование заменили более новым.
+        """
+        started = time.monotonic()
+        waited = False
+        self.queued += 1
+        try:
+            while True:
+                if pending is not None and pending.superseded_by is not None:
+                    return False
+                now = time.monotonic()
+                wait = max(bucket.delay(now) for bucket in buckets)
+                if wait <= 0:
+                    for bucket in buckets:
+                        bucket.consume()
+                    return True
+                waited = True
+                await asyncio.sleep(wait)
+        finally:
+            self.queued -= 1
+            if waited:
+                elapsed = time.monotonic() - started
+                self.delayed += 1
+                self.wait_seconds_total += elapsed
+                self.max_wait_seconds = max(self.max_wait_seconds, elapsed)
+
+    # ---------- Middleware ----------
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Any,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        method_name = type(method).__name__
+        chat_id = getattr(method, "chat_id", None)
+        if not method_name.startswith(LIMITED_METHOD_PREFIXES):
+            return await make_request(bot, method)
+
+        buckets = (self._global,) if chat_id is None else (self._global, self._chat_bucket(chat_id))
+
+        edit_key = None
+        pending = None
+        if method_name.startswith(EDIT_METHOD_PREFIX):
+            edit_key = (method_name, chat_id, getattr(method, "message_id", None), getattr(method, "inline_message_id", None))
+            pending = _PendingEdit()
+            previous = self._pending_edits.get(edit_key)
+            if previous is not None:
+                previous.superseded_by = pending
+            self._pending_edits[edit_key] = pending
+
+        try:
+            if not await self._acquire(buckets, pending):
+                self.coalesced += 1
+                logger.debug("Coalesced %s in chat %s", method_name, chat_id)
+                response = await asyncio.shield(pending.latest().future)
+                # Ждущие этого редактирования получают тот же результат
+                pending.future.set_result(response)
+                return response
+            if edit_key is not None and self._pending_edits.get(edit_key) is pending:
+                # Ушло в отправку — следующие редактирования уже не заменяют это
+                del self._pending_edits[edit_key]
+
+            response = await self._send(make_request, bot, method, buckets, chat_id)
+            if pending is not None:
+                pending.future.set_result(response)
+            return response
+        except BaseException as exc:
+            if pending is not None and not pending.future.done():
+                pending.future.set_exception(exc)
+            raise
+        finally:
+            if edit_key is not None and self._pending_edits.get(edit_key) is pending:
+                del self._pending_edits[edit_key]
+
+    async def _send(self, make_request, bot, method, buckets, chat_id) -> Any:
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await make_request(bot, method)
+                self.sent += 1
+                return response
+            except TelegramRetryAfter as exc:
+                self.retry_after += 1
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(
+                    "Flood control on %s in chat %s: retry in %s s (attempt %s/%s)",
+                    type(method).__name__, chat_id, exc.retry_after, attempt + 1, self.max_retries,
+                )
+                buckets[-1].block(exc.retry_after)
+                await self._acquire(buckets)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queued,
+            "sent": self.sent,
+            "delayed": self.delayed,
+            "coalesced": self.coalesced,
+            "retry_after": self.retry_after,
+            "avg_wait_seconds": round(self.wait_seconds_total / self.delayed, 3) if self.delayed else 0.0,
+            "max_wait_seconds": round(self.max_wait_seconds, 3),
+            "chats": len(self._chats),
+        }
+
+
+# Глобальный экземпляр: подключается к сессии бота в main.py
+outbound_limiter = OutboundRateLimiter(
+    global_rate=config.TG_GLOBAL_RATE,
+    private_rate=config.TG_PRIVATE_CHAT_RATE,
+    group_rate=config.TG_GROUP_CHAT_RATE_PER_MINUTE / 60,
+    burst=config.TG_CHAT_BURST,
+    max_retries=config.TG_RETRY_AFTER_ATTEMPTS,
+)
@@ -0,0 +1,270 @@
+"""
+Автоимпорт Google-таблицы по расписанию.
+
+Раз в SHEET_AUTO_IMPORT_MINUTES минут бот запрашивает CSV таблицы условным
+запросом (If-None-Match / If-Modified-Since). Ответ 304 или CSV с тем же
+хэшем содержимого означает, что таблица не менялась, и импорт не нужен.
+Если таблица изменилась, в backend отправляются только строки, которые
+изменились с прошлого импорта (хэши строк сравниваются по названию игры).
+Строки уходят пачками по SHEET_AUTO_IMPORT_BATCH_SIZE. Backend импортирует
+синхронно, а новая игра может стоить нескольких запросов к BGG с паузой
+BGG_REQUEST_DELAY, поэтому таймаут каждой пачки считается по плану импорта
+(dry_run, estimated_seconds). Хэш строки сохраняется, только когда backend
+импортировал её пачку без ошибок (status ok); строки из пачек с ошибками
+отправятся при следующей проверке. Если backend отвечает 409 (идёт другой
+импорт) или не успевает ответить, проверка заканчивается, оставшиеся строки
+уйдут при следующей.
+
+Раз в SHEET_FULL_IMPORT_HOURS часов таблица отправляется целиком: рейтинги
+пользователей, зарегистрировавшихся после импорта строки, backend пропустил,
+а сама строка с тех пор могла не меняться.
+
+Состояние (ETag, Last-Modified, хэши) хранится в JSON-файле SHEET_STATE_PATH,
+чтобы перезапуск бота не вызывал полного импорта. Без файла первая проверка
+отправляет всю таблицу.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from config import config
+from services.import_ratings import _iter_data_rows, parse_sheet_csv, plan_data_rows, send_data_rows
+
+logger = logging.getLogger(__name__)
+
+# Таймаут отправки пачки: запас на сеть и БД плюс оценка backend с двукратным запасом
+SEND_TIMEOUT_BASE = 60.0
+SEND_TIMEOUT_FACTOR = 2.0
+
+
+@dataclass
+class SheetState:
+    """Что известно о таблице после последнего успешного импорта."""
+
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    # Ключ строки (название игры, для повторов — с номером) -> хэш строки
+    row_hashes: Dict[str, str] = field(default_factory=dict)
+    # Время (unix) начала последней полной отправки таблицы
+    last_full_import: Optional[float] = None
+
+    @classmethod
+    def load(cls, path: Path) -> "SheetState":
+        try:
+            with open(path, encoding="utf-8") as file:
+                return cls(**json.load(file))
+        except FileNotFoundError:
+            return cls()
+        except (OSError, ValueError, TypeError) as exc:
+            logger.warning(f"Cannot read sheet state {path}, starting from scratch: {exc}")
+            return cls()
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(asdict(self), file, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+@dataclass
+class SheetDownload:
+    text: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_hash: str
+
+
+def row_hash(data_row: Dict) -> str:
+    return hashlib.sha256(json.dumps(data_row, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class SheetWatcher:
+    """
+    Проверка таблицы на изменения и импорт изменившихся строк.
+
+    :param api_base_url: Адрес backend API
+    :param sheet_csv_url: Ссылка на CSV Google-таблицы
+    :param state_path: Файл состояния (см. SheetState)
+    :param interval: Пауза между проверками, секунды
+    :param batch_size: Строк в одном запросе к backend
+    :param full_import_interval: Как часто отправлять таблицу целиком, секунды (0 — никогда)
+    """
+
+    def __init__(
+        self,
+        api_base_url: str,
+        sheet_csv_url: str,
+        state_path: Path,
+        interval: float,
+        batch_size: int = 20,
+        full_import_interval: float = 0,
+    ):
+        self.api_base_url = api_base_url
+        self.sheet_csv_url = sheet_csv_url
+        self.state_path = state_path
+        self.interval = interval
+        self.batch_size = max(1, batch_size)
+        self.full_import_interval = full_import_interval
+        self.state = SheetState.load(state_path)
+
+    def _full_import_due(self) -> bool:
+        if self.full_import_interval <= 0:
+            return False
+        last = self.state.last_full_import
+        return last is None or time.time() - last >= self.full_import_interval
+
+    def _start_full_import(self) -> None:
+        """
+        Забывает ETag и хэши строк: следующая загрузка отправит всю таблицу.
+
+        Состояние сохраняется сразу, поэтому прерванная полная отправка
+        продолжится по обычным правилам, а не начнётся заново.
+        """
+        logger.info("Sheet auto-import: periodic full re-import")
+        self.state = SheetState(last_full_import=time.time())
+        self.state.save(self.state_path)
+
+    async def fetch(self) -> Optional[SheetDownload]:
+        """Скачивает CSV, если таблица изменилась; иначе None."""
+        headers = {}
+        if self.state.etag:
+            headers["If-None-Match"] = self.state.etag
+        if self.state.last_modified:
+            headers["If-Modified-Since"] = self.state.last_modified
+
+        async with httpx.AsyncClient() as client:
+            resp = await client.get(
+                self.sheet_csv_url, headers=headers, follow_redirects=True, timeout=config.REQUEST_TIMEOUT
+            )
+        if resp.status_code == 304:
+            logger.debug("Sheet not modified (304)")
+            return None
+        resp.raise_for_status()
+
+        download = SheetDownload(
+            text=resp.text,
+            etag=resp.headers.get("ETag"),
+            last_modified=resp.headers.get("Last-Modified"),
+            content_hash=hashlib.sha256(resp.content).hexdigest(),
+        )
+        if download.content_hash == self.state.content_hash:
+            # Google не всегда отдаёт валидаторы — содержимое то же, импорт не нужен
+            logger.debug("Sheet content unchanged")
+            self.state.etag, self.state.last_modified = download.etag, download.last_modified
+            self.state.save(self.state_path)
+            return None
+        return download
+
+    async def sync(self) -> Optional[Dict[str, int]]:
+        """
+        Одна проверка таблицы.
+
+        Возвращает None, если таблица не менялась, иначе
+        {"rows": строк в таблице, "changed": импортировано изменившихся строк,
+        "pending": строк осталось до следующей проверки}.
+        Хэши строк сохраняются после каждой пачки, которую backend импортировал
+        без ошибок; ETag и хэш таблицы — только когда импортированы все
+        изменившиеся строки.
+        """
+        if self._full_import_due():
+            self._start_full_import()
+
+        download = await self.fetch()
+        if download is None:
+            return None
+
+        rows = parse_sheet_csv(download.text)
+        row_hashes: Dict[str, str] = {}
+        changed: List[Tuple[str, Dict]] = []
+        for data_row in _iter_data_rows(rows):
+            key = data_row["name"]
+            occurrence = 1
+            while key in row_hashes:
+                occurrence += 1
+                key = f"{data_row['name']}#{occurrence}"
+            row_hashes[key] = row_hash(data_row)
+            if self.state.row_hashes.get(key) != row_hashes[key]:
+                changed.append((key, data_row))
+
+        if changed:
+            logger.info(f"Sheet changed: sending {len(changed)} of {len(row_hashes)} rows to backend")
+        sent = 0
+        for start in range(0, len(changed), self.batch_size):
+            batch = changed[start:start + self.batch_size]
+            data_rows = [data_row for _, data_row in batch]
+            try:
+                plan = await plan_data_rows(self.api_base_url, data_rows)
+                response = await send_data_rows(
+                    self.api_base_url, data_rows, total_rows=len(batch), timeout=self._send_timeout(plan)
+                )
+            except httpx.TimeoutException:
+                # Backend продолжает импорт; пока он идёт, повторная отправка получит 409
+                logger.warning(
+                    f"Backend did not answer in time, {len(changed) - start} rows left for the next check"
+                )
+                break
+            except httpx.HTTPStatusError as exc:
+                if exc.response.status_code != 409:
+                    raise
+                logger.info(
+                    f"Backend is busy with another import, {len(changed) - start} rows left for the next check"
+                )
+                break
+            if response.get("status") != "ok" or response.get("rows_invalid"):
+                logger.warning(
+                    f"Batch not imported cleanly (status={response.get('status')}, "
+                    f"failed={response.get('rows_failed', 0)}, invalid={response.get('rows_invalid', 0)}), "
+                    f"{len(batch)} rows left for the next check"
+                )
+                continue
+            for key, _ in batch:
+                self.state.row_hashes[key] = row_hashes[key]
+            self.state.save(self.state_path)
+            sent += len(batch)
+
+        pending = len(changed) - sent
+        if not pending:
+            self.state = SheetState(
+                etag=download.etag,
+                last_modified=download.last_modified,
+                content_hash=download.content_hash,
+                row_hashes=row_hashes,
+                last_full_import=self.state.last_full_import,
+            )
+            self.state.save(self.state_path)
+        return {"rows": len(row_hashes), "changed": sent, "pending": pending}
+
+    @staticmethod
+    def _send_timeout(plan: Dict) -> float:
+        """Таймаут отправки пачки по оценке длительности её импорта."""
+        return SEND_TIMEOUT_BASE + SEND_TIMEOUT_FACTOR * float(plan.get("estimated_seconds") or 0)
+
+    async def run_forever(self, notify: Optional[Callable[[str], Awaitable[object]]] = None) -> None:
+        logger.info(f"Sheet auto-import started: every {self.interval} s")
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                result = await self.sync()
+            except Exception as exc:  # noqa: BLE001
+                logger.error(f"Sheet auto-import failed: {exc}", exc_info=True)
+                continue
+            if result and result["changed"] and notify is not None:
+                text = f"🔄 Автоимпорт: таблица изменилась, импортировано строк: {result['changed']} из {result['rows']}."
+                if result["pending"]:
+                    text += f" Осталось до следующей проверки: {result['pending']}."
+                try:
+                    await notify(text)
+                except Exception as exc:  # noqa: BLE001
+                    logger.warning(f"Cannot notify admin about auto-import: {exc}")
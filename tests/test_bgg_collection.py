@@ -0,0 +1,140 @@
+"""
+Tests for importing a user's BGG collection
+"""
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from backend.app.infrastructure import repositories
+from backend.app.services import bgg
+
+COLLECTION_XML = """<items totalitems="2">
+<item objecttype="thing" objectid="13" subtype="boardgame" collid="1">
+    <name sortindex="1">CATAN</name><yearpublished>1995</yearpublished>
+    <thumbnail>https://cf.geekdo-images.com/catan_t.jpg</thumbnail>
+</item>
+<item objecttype="thing" objectid="167791" subtype="boardgame" collid="2">
+    <name sortindex="1">Terraforming Mars</name><yearpublished>2016</yearpublished>
+</item>
+</items>"""
+
+
+def _response(status_code=200, text=COLLECTION_XML):
+    resp = MagicMock()
+    resp.status_code = status_code
+    resp.text = text
+    resp.content = text.encode()
+    resp.headers = {}
+    return resp
+
+
+def _thing_xml(ids):
+    items = "".join(f'<item type="boardgame" id="{i}"><name type="primary" value="Game {i}"/></item>' for i in ids)
+    return f"<items>{items}</items>"
+
+
+@pytest.fixture(autouse=True)
+def closed_circuit():
+    bgg.bgg_circuit.reset()
+    yield
+    bgg.bgg_circuit.reset()
+
+
+class TestCollectionClient:
+    """Collection request, 202 polling and batched thing requests"""
+
+    def test_parse_collection(self):
+        items = bgg._parse_collection_response(COLLECTION_XML)
+        assert [i["id"] for i in items] == [13, 167791]
+        assert items[0]["name"] == "CATAN"
+        assert items[0]["yearpublished"] == 1995
+
+    def test_errors_raise(self):
+        xml = "<errors><error><message>Invalid username specified</message></error></errors>"
+        with pytest.raises(bgg.BggCollectionError, match="Invalid username"):
+            bgg._parse_collection_response(xml)
+
+    @patch("backend.app.services.bgg.time.sleep")
+    @patch("backend.app.services.bgg.requests.get")
+    def test_polls_while_queued(self, mock_get, mock_sleep):
+        mock_get.side_effect = [_response(202, ""), _response(202, ""), _response()]
+        threshold = bgg.bgg_circuit.failure_threshold
+
+        with patch.object(bgg.config, "BGG_COLLECTION_POLL_ATTEMPTS", threshold + 5):
+            items = bgg.get_collection("someone", token="t")
+
+        assert len(items) == 2
+        assert mock_get.call_count == 3
+        assert mock_get.call_args.kwargs["params"]["own"] == 1
+        assert mock_sleep.call_count == 2
+        # 202 — это не сбой BGG
+        assert bgg.bgg_circuit.state == "closed"
+
+    @patch("backend.app.services.bgg.time.sleep")
+    @patch("backend.app.services.bgg.requests.get")
+    def test_details_batched_by_20(self, mock_get, mock_sleep):
+        mock_get.side_effect = lambda url, params, **kw: _response(text=_thing_xml(params["id"].split(",")))
+
+        details = bgg.get_boardgames_details(list(range(1, 46)) + [1], token="t")
+
+        assert sorted(details) == list(range(1, 46))
+        batches = [call.kwargs["params"]["id"].split(",") for call in mock_get.call_args_list]
+        assert [len(b) for b in batches] == [20, 20, 5]
+
+
+class TestImportCollection:
+    """Bulk upsert of games and ratings"""
+
+    def test_upsert_statement(self):
+        session = MagicMock()
+        game_id = uuid4()
+        session.execute.return_value = [MagicMock(id=game_id, bgg_id=13, inserted=True)]
+        session.execute.return_value[0].name = "Катан"
+
+        result = repositories.upsert_games_from_bgg(session, [
+            {"id": 13, "name": "CATAN", "name_ru": "Катан", "rank": 500},
+            {"id": 14, "name": "Катан"},  # то же название — в одну вставку не попадает
+        ])
+
+        assert result == {13: (game_id, "Катан", True)}
+        stmt = session.execute.call_args.args[0]
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (name) DO UPDATE" in sql
+        assert "games.bgg_id IS NULL OR games.bgg_id = excluded.bgg_id" in sql
+        assert "name_m1" not in sql
+
+    def test_only_unknown_games_fetched(self):
+        user_id = uuid4()
+        known_game, new_game = uuid4(), uuid4()
+        session = MagicMock()
+        session.query.return_value.filter.return_value = [(13, known_game)]
+        ratings_result = MagicMock()
+        ratings_result.scalars.return_value = [new_game]
+        session.execute.return_value = ratings_result
+
+        collection = [{"id": 13}, {"id": 167791}, {"id": 13}]
+        details = {167791: {"id": 167791, "name": "Terraforming Mars"}}
+        with patch.object(repositories, "get_collection", return_value=collection), \
+             patch.object(repositories, "get_boardgames_details", return_value=details) as get_details, \
+             patch.object(repositories, "upsert_games_from_bgg", return_value={167791: (new_game, "Terraforming Mars", True)}), \
+             patch.object(repositories, "game_index") as index, \
+             patch.object(repositories, "group_leaderboard"):
+            result = repositories.import_bgg_collection(session, user_id, "someone")
+
+        get_details.assert_called_once_with([167791])
+        assert result == {
+            "collection_size": 2,
+            "games_known": 1,
+            "games_created": 1,
+            "games_updated": 0,
+            "games_skipped": 0,
+            "ratings_added": 1,
+        }
+        session.commit.assert_called_once()
+        index.upsert.assert_called_once()
+
+        ratings_sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "INSERT INTO ratings" in ratings_sql
+        assert "ON CONFLICT (user_id, game_id) DO NOTHING" in ratings_sql
@@ -0,0 +1,147 @@
+"""
+Tests for the BGG retry policy and circuit breaker
+"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from backend.app.services import bgg
+from backend.app.utils.retry import CircuitBreaker, CircuitOpenError, RetryPolicy, parse_retry_after
+
+SEARCH_XML = '<items><item type="boardgame" id="13"><name value="CATAN"/></item></items>'
+
+
+def _response(status_code=200, text=SEARCH_XML, headers=None):
+    resp = MagicMock()
+    resp.status_code = status_code
+    resp.text = text
+    resp.content = text.encode()
+    resp.headers = headers or {}
+    if status_code >= 400:
+        resp.raise_for_status.side_effect = requests.exceptions.HTTPError(f"{status_code} Client Error")
+    return resp
+
+
+@pytest.fixture(autouse=True)
+def closed_circuit():
+    bgg.bgg_circuit.reset()
+    yield
+    bgg.bgg_circuit.reset()
+
+
+class TestRetryPolicy:
+    """Exponential backoff with jitter, Retry-After wins but is capped"""
+
+    def test_exponential_with_jitter(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=10.0, jitter=0.5)
+        for attempt, upper in [(1, 1.0), (2, 2.0), (3, 4.0), (6, 10.0)]:
+            delays = [policy.delay(attempt) for _ in range(50)]
+            assert all(upper / 2 <= d <= upper for d in delays)
+
+    def test_retry_after(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=10.0)
+        assert policy.delay(1, retry_after=3) == 3
+        assert policy.delay(1, retry_after=120) == 10
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after("5") == 5.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+class TestCircuitBreaker:
+    """Breaker opens after consecutive failures and probes after the timeout"""
+
+    def test_open_half_open_closed(self):
+        breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30)
+        with patch("backend.app.utils.retry.time.monotonic", return_value=100.0):
+            breaker.before_call()
+            breaker.record_failure()
+            breaker.before_call()
+            breaker.record_failure()
+            assert breaker.state == "open"
+            with pytest.raises(CircuitOpenError) as exc_info:
+                breaker.before_call()
+            assert exc_info.value.retry_after == 30
+
+        with patch("backend.app.utils.retry.time.monotonic", return_value=131.0):
+            assert breaker.state == "half_open"
+            breaker.before_call()  # пробный вызов
+            with pytest.raises(CircuitOpenError):
+                breaker.before_call()  # второй ждёт результата пробного
+            breaker.record_success()
+            assert breaker.state == "closed"
+
+    def test_failed_trial_reopens(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=10)
+        with patch("backend.app.utils.retry.time.monotonic", return_value=0.0):
+            breaker.record_failure()
+        with patch("backend.app.utils.retry.time.monotonic", return_value=11.0):
+            breaker.before_call()
+            breaker.record_failure()
+            assert breaker.state == "open"
+
+    def test_success_resets_failures(self):
+        breaker = CircuitBreaker("test", failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == "closed"
+
+
+class TestBggRequests:
+    """search/thing share one retry policy and breaker"""
+
+    @patch("backend.app.services.bgg.time.sleep")
+    @patch("backend.app.services.bgg.requests.get")
+    def test_client_error_not_retried(self, mock_get, mock_sleep):
+        mock_get.return_value = _response(404, text="Not Found")
+
+        with pytest.raises(RuntimeError, match="Ошибка обращения к BGG API"):
+            bgg.search_boardgame("Catan", token="t")
+
+        assert mock_get.call_count == 1
+        mock_sleep.assert_not_called()
+        assert bgg.bgg_circuit.state == "closed"
+
+    @patch("backend.app.services.bgg.time.sleep")
+    @patch("backend.app.services.bgg.requests.get")
+    def test_retry_after_honored(self, mock_get, mock_sleep):
+        mock_get.side_effect = [
+            _response(429, text="", headers={"Retry-After": "7"}),
+            _response(202, text=""),
+            _response(200),
+        ]
+
+        results = bgg.search_boardgame("Catan", token="t")
+
+        assert results[0]["id"] == 13
+        assert mock_get.call_count == 3
+        assert mock_sleep.call_args_list[0].args == (7.0,)
+        assert mock_sleep.call_args_list[1].args[0] <= bgg.bgg_retry_policy.base_delay * 2
+
+    @patch("backend.app.services.bgg.time.sleep")
+    @patch("backend.app.services.bgg.requests.get")
+    def test_parse_error_not_retried(self, mock_get, mock_sleep):
+        mock_get.return_value = _response(200, text="<html>oops")
+
+        with pytest.raises(RuntimeError, match="распарсить"):
+            bgg.search_boardgame("Catan", token="t")
+        assert mock_get.call_count == 1
+
+    @patch("backend.app.services.bgg.time.sleep")
+    @patch("backend.app.services.bgg.requests.get")
+    def test_open_circuit_fails_fast(self, mock_get, mock_sleep):
+        mock_get.side_effect = requests.exceptions.ConnectionError("BGG down")
+        threshold = bgg.bgg_circuit.failure_threshold
+
+        with pytest.raises(RuntimeError):
+            bgg.search_boardgame("Catan", token="t", retries=threshold)
+        assert mock_get.call_count == threshold
+        assert bgg.bgg_circuit.state == "open"
+
+        with pytest.raises(RuntimeError, match="временно недоступен"):
+            bgg.get_boardgame_details(13, token="t")
+        assert mock_get.call_count == threshold
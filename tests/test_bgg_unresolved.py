@@ -0,0 +1,128 @@
+"""
+Tests for the negative cache of game names BGG cannot resolve
+"""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from backend.app.infrastructure import repositories
+from backend.app.infrastructure.models import BggUnresolvedNameModel, GameModel
+
+NOW = datetime(2026, 10, 19, tzinfo=timezone.utc)
+
+
+class TestRecheckSchedule:
+    """Re-check interval doubles with each failed lookup up to the cap"""
+
+    def test_interval_doubles_and_is_capped(self):
+        with patch.object(repositories.config, "BGG_UNRESOLVED_RECHECK_HOURS", 24), \
+             patch.object(repositories.config, "BGG_UNRESOLVED_MAX_RECHECK_DAYS", 30):
+            intervals = [repositories.unresolved_recheck_interval(n) for n in (1, 2, 3, 6, 1000)]
+
+        assert intervals[:3] == [timedelta(days=1), timedelta(days=2), timedelta(days=4)]
+        assert intervals[3] == timedelta(days=30)
+        assert intervals[4] == timedelta(days=30)
+
+    def test_name_key_normalized(self):
+        assert repositories.unresolved_name_key("  House  Rules  Catan ") == "house rules catan"
+
+    def test_record_new_and_repeated_miss(self):
+        session = MagicMock()
+        entry = repositories._record_unresolved(session, None, "Homebrew Game", NOW)
+
+        session.add.assert_called_once_with(entry)
+        assert entry.name_key == "homebrew game"
+        assert entry.attempts == 1
+        assert entry.next_check_at == NOW + repositories.unresolved_recheck_interval(1)
+
+        later = NOW + timedelta(days=2)
+        assert repositories._record_unresolved(session, entry, "Homebrew Game", later) is entry
+        assert entry.attempts == 2
+        assert entry.next_check_at == later + repositories.unresolved_recheck_interval(2)
+
+    def test_pending(self):
+        entry = BggUnresolvedNameModel(name_key="x", name="x", attempts=1, next_check_at=NOW + timedelta(hours=1))
+        assert repositories._unresolved_pending(entry, NOW)
+        assert not repositories._unresolved_pending(entry, NOW + timedelta(hours=2))
+        assert not repositories._unresolved_pending(None, NOW)
+
+        entry.bgg_id = 13  # Ручное сопоставление — не пропускаем
+        assert not repositories._unresolved_pending(entry, NOW)
+
+
+class TestNotFoundCallback:
+    """Only a definite "no results" answer from BGG marks a name unresolved"""
+
+    def test_called_on_empty_search(self):
+        misses = []
+        with patch.object(repositories, "search_boardgame", return_value=[]):
+            assert repositories._fetch_bgg_details_for_row({"name": "Homebrew"}, on_not_found=misses.append) is None
+        assert misses == ["Homebrew"]
+
+    def test_not_called_on_bgg_error(self):
+        misses = []
+        with patch.object(repositories, "search_boardgame", side_effect=RuntimeError("Ошибка обращения к BGG API")):
+            assert repositories._fetch_bgg_details_for_row({"name": "Catan"}, on_not_found=misses.append) is None
+        assert misses == []
+
+
+class TestImportNegativeCache:
+    """replace_all_from_table skips BGG for names that are not due for a re-check"""
+
+    def _session(self, game):
+        session = MagicMock()
+        session.query.return_value.filter.return_value.one_or_none.return_value = game
+        return session
+
+    def _import(self, session, unresolved, search_result):
+        with patch.object(repositories, "load_unresolved_names", return_value=unresolved), \
+             patch.object(repositories, "search_boardgame", return_value=search_result) as search, \
+             patch.object(repositories, "get_boardgame_details") as details, \
+             patch.object(repositories.time, "sleep") as sleep:
+            details.side_effect = lambda game_id: {"id": game_id, "name": "Catan", "type": "boardgame"}
+            repositories.replace_all_from_table(session, [{"name": "Catan", "ratings": {}}])
+        return search, details, sleep
+
+    def test_pending_name_costs_no_bgg_calls(self):
+        entry = BggUnresolvedNameModel(name_key="catan", name="Catan", attempts=2, next_check_at=datetime.now(timezone.utc) + timedelta(days=1))
+        session = self._session(GameModel(name="Catan"))
+
+        search, details, sleep = self._import(session, {"catan": entry}, [])
+
+        search.assert_not_called()
+        details.assert_not_called()
+        sleep.assert_not_called()
+        assert entry.attempts == 2
+
+    def test_new_miss_is_recorded(self):
+        session = self._session(GameModel(name="Catan"))
+
+        search, _, _ = self._import(session, {}, [])
+
+        assert search.call_count == 2  # exact, затем нечёткий поиск
+        added = [c.args[0] for c in session.add.call_args_list if isinstance(c.args[0], BggUnresolvedNameModel)]
+        assert len(added) == 1
+        assert added[0].name_key == "catan"
+        assert added[0].attempts == 1
+
+    def test_due_name_found_is_removed(self):
+        entry = BggUnresolvedNameModel(name_key="catan", name="Catan", attempts=3, next_check_at=datetime.now(timezone.utc) - timedelta(hours=1))
+        session = self._session(GameModel(name="Catan"))
+        unresolved = {"catan": entry}
+
+        search, _, _ = self._import(session, unresolved, [{"id": 13, "name": "Catan"}])
+
+        search.assert_called()
+        session.delete.assert_called_once_with(entry)
+        assert unresolved == {}
+
+    def test_manual_override_uses_bgg_id(self):
+        entry = BggUnresolvedNameModel(name_key="catan", name="Catan", attempts=5, bgg_id=13, next_check_at=None)
+        game = GameModel(name="Catan")
+        session = self._session(game)
+
+        search, details, _ = self._import(session, {"catan": entry}, [])
+
+        search.assert_not_called()
+        details.assert_called_once_with(13)
+        assert game.bgg_id == 13
+        session.delete.assert_not_called()
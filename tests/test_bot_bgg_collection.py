@@ -0,0 +1,54 @@
+"""
+Tests for the /import_bgg bot command
+"""
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "bot"))
+
+from handlers import bgg_collection  # noqa: E402
+
+
+def _message():
+    message = MagicMock()
+    message.from_user.id = 42
+    message.answer = AsyncMock()
+    return message
+
+
+class TestImportBggCommand:
+    """Command argument handling and result messages"""
+
+    def test_requires_username(self):
+        message = _message()
+        command = MagicMock(args=None)
+        with patch.object(bgg_collection, "import_collection") as import_collection:
+            asyncio.run(bgg_collection.cmd_import_bgg(message, command, "http://api"))
+
+        import_collection.assert_not_called()
+        assert "/import_bgg" in message.answer.call_args.args[0]
+
+    def test_success(self):
+        message = _message()
+        result = {"username": "a<b", "collection_size": 300, "ratings_added": 120, "games_created": 80, "games_skipped": 2}
+        with patch.object(bgg_collection, "import_collection", AsyncMock(return_value=result)) as import_collection:
+            asyncio.run(bgg_collection.cmd_import_bgg(message, MagicMock(args=" a<b "), "http://api"))
+
+        import_collection.assert_awaited_once_with("http://api", 42, "a<b")
+        text = message.answer.call_args.args[0]
+        assert "a&lt;b" in text
+        assert "300" in text and "120" in text
+        assert "Пропущено" in text
+
+    def test_bgg_unavailable(self):
+        message = _message()
+        request = httpx.Request("POST", "http://api")
+        error = httpx.HTTPStatusError("503", request=request, response=httpx.Response(503, request=request))
+        with patch.object(bgg_collection, "import_collection", AsyncMock(side_effect=error)):
+            asyncio.run(bgg_collection.cmd_import_bgg(message, MagicMock(args="someone"), "http://api"))
+
+        assert "недоступен" in message.answer.call_args.args[0]
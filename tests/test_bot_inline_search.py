@@ -0,0 +1,141 @@
+"""
+Tests for bot inline game search
+"""
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "bot"))
+
+from handlers import inline_search  # noqa: E402
+from services.cache import TTLCache  # noqa: E402
+
+SUGGESTIONS = [{
+    "game_id": "11111111-1111-1111-1111-111111111111",
+    "name": "Колонизаторы",
+    "matched_name": "Catan",
+    "score": 100,
+    "bgg_id": 13,
+    "bgg_rank": 500,
+    "yearpublished": 1995,
+    "thumbnail": "https://example.com/catan.jpg",
+}]
+
+
+def _inline_query(text, query_id="1", user_id=42):
+    inline_query = Mock()
+    inline_query.id = query_id
+    inline_query.query = text
+    inline_query.from_user.id = user_id
+    inline_query.answer = AsyncMock()
+    return inline_query
+
+
+class TestTTLCache:
+    """Bot-side LRU cache"""
+
+    def test_lru_eviction_and_ttl(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+
+        expired = TTLCache(maxsize=2, ttl=-1)
+        expired.set("a", 1)
+        assert expired.get("a") is None
+
+
+class TestInlineSearch:
+    """Inline query handler: debounce, shared cache and answers"""
+
+    def setup_method(self):
+        inline_search.suggestions_cache.clear()
+        inline_search._latest_query_id.clear()
+
+    def test_answer_with_articles_and_cache_time(self):
+        fetch = AsyncMock(return_value=SUGGESTIONS)
+        query = _inline_query("  CATAN ")
+        with patch.object(inline_search, "fetch_suggestions", fetch), \
+                patch.object(inline_search.config, "INLINE_DEBOUNCE_MS", 0):
+            asyncio.run(inline_search.inline_search(query, "http://test"))
+
+        fetch.assert_awaited_once_with("http://test", "catan")
+        results = query.answer.call_args.args[0]
+        assert query.answer.call_args.kwargs == {
+            "cache_time": inline_search.config.INLINE_CACHE_TIME, "is_personal": False,
+        }
+        assert results[0].title == "Колонизаторы"
+        assert results[0].thumbnail_url == "https://example.com/catan.jpg"
+        assert "1995 · BGG #500 · Catan" == results[0].description
+        assert "boardgamegeek.com/boardgame/13" in results[0].input_message_content.message_text
+
+    def test_repeated_query_served_from_cache(self):
+        fetch = AsyncMock(return_value=SUGGESTIONS)
+        with patch.object(inline_search, "fetch_suggestions", fetch), \
+                patch.object(inline_search.config, "INLINE_DEBOUNCE_MS", 0):
+            asyncio.run(inline_search.inline_search(_inline_query("catan", "1", user_id=1), "http://test"))
+            query = _inline_query("Catan", "2", user_id=2)
+            asyncio.run(inline_search.inline_search(query, "http://test"))
+
+        assert fetch.await_count == 1
+        assert query.answer.call_args.args[0][0].title == "Колонизаторы"
+
+    def test_debounce_skips_superseded_query(self):
+        fetch = AsyncMock(return_value=SUGGESTIONS)
+        first = _inline_query("cat", "1")
+        second = _inline_query("catan", "2")
+
+        async def typing():
+            await asyncio.gather(
+                inline_search.inline_search(first, "http://test"),
+                inline_search.inline_search(second, "http://test"),
+            )
+
+        with patch.object(inline_search, "fetch_suggestions", fetch), \
+                patch.object(inline_search.config, "INLINE_DEBOUNCE_MS", 10):
+            asyncio.run(typing())
+
+        fetch.assert_awaited_once_with("http://test", "catan")
+        first.answer.assert_not_called()
+        second.answer.assert_awaited_once()
+
+    def test_concurrent_misses_share_one_request(self):
+        calls = []
+
+        async def fetch(api_base_url, query):
+            calls.append(query)
+            await asyncio.sleep(0.01)
+            return SUGGESTIONS
+
+        async def run():
+            return await asyncio.gather(*(inline_search.get_suggestions("http://test", "catan") for _ in range(3)))
+
+        with patch.object(inline_search, "fetch_suggestions", fetch):
+            results = asyncio.run(run())
+
+        assert calls == ["catan"]
+        assert results == [SUGGESTIONS] * 3
+
+    @pytest.mark.parametrize("text", ["", "c"])
+    def test_short_query_not_sent(self, text):
+        fetch = AsyncMock()
+        query = _inline_query(text)
+        with patch.object(inline_search, "fetch_suggestions", fetch):
+            asyncio.run(inline_search.inline_search(query, "http://test"))
+        fetch.assert_not_called()
+        assert query.answer.call_args.args[0] == []
+
+    def test_backend_error_not_cached(self):
+        fetch = AsyncMock(side_effect=RuntimeError("down"))
+        query = _inline_query("catan")
+        with patch.object(inline_search, "fetch_suggestions", fetch), \
+                patch.object(inline_search.config, "INLINE_DEBOUNCE_MS", 0):
+            asyncio.run(inline_search.inline_search(query, "http://test"))
+        assert query.answer.call_args.kwargs["cache_time"] == 0
+        assert len(inline_search.suggestions_cache) == 0
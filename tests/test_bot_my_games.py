@@ -0,0 +1,79 @@
+"""
+Tests for the paginated /my_games bot view
+"""
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock, patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "bot"))
+
+from handlers import my_games  # noqa: E402
+
+CURSOR = "11111111-1111-1111-1111-111111111111"
+
+
+def _page(prev_cursor=None, next_cursor=CURSOR, total=45):
+    return {
+        "games": [{"name": "Catan & Co", "bgg_url": "https://boardgamegeek.com/boardgame/13"}],
+        "total": total,
+        "prev_cursor": prev_cursor,
+        "next_cursor": next_cursor,
+    }
+
+
+class TestRenderGamesPage:
+    """Page text and navigation buttons"""
+
+    def test_header_and_buttons(self):
+        with patch.object(my_games.config, "MY_GAMES_PAGE_SIZE", 20):
+            text, keyboard = my_games.render_games_page(_page(prev_cursor=CURSOR), page=2, from_menu=True)
+
+        assert text.startswith("🎲 Твои игры (45), страница 2 из 3")
+        assert "Catan &amp; Co" in text
+        prev_button, next_button = keyboard.inline_keyboard[0]
+        assert prev_button.callback_data == f"my_games:prev:1:{CURSOR}:m"
+        assert next_button.callback_data == f"my_games:next:3:{CURSOR}:m"
+        assert keyboard.inline_keyboard[1][0].callback_data == "menu_back_to_main"
+        # Лимит Telegram на callback_data
+        assert all(len(b.callback_data.encode()) <= 64 for row in keyboard.inline_keyboard for b in row)
+
+    def test_single_page_without_keyboard(self):
+        text, keyboard = my_games.render_games_page(_page(next_cursor=None, total=1), page=1)
+        assert text.startswith("🎲 Твои игры (1):")
+        assert keyboard is None
+
+
+class TestMyGamesNavigation:
+    """Next/prev buttons edit the list message in place"""
+
+    def test_next_button_edits_message(self):
+        callback = Mock()
+        callback.data = f"my_games:next:2:{CURSOR}"
+        callback.from_user.id = 42
+        callback.answer = AsyncMock()
+        callback.message.edit_text = AsyncMock()
+        fetch = AsyncMock(return_value=_page(prev_cursor=CURSOR))
+
+        with patch.object(my_games, "fetch_games_page", fetch):
+            asyncio.run(my_games.handle_my_games_page(callback, "http://test"))
+
+        fetch.assert_awaited_once_with("http://test", 42, after=CURSOR)
+        text = callback.message.edit_text.call_args.args[0]
+        assert "страница 2" in text
+        callback.answer.assert_awaited_once()
+
+    def test_stale_cursor_shows_first_page(self):
+        callback = Mock()
+        callback.data = f"my_games:prev:3:{CURSOR}"
+        callback.from_user.id = 42
+        callback.answer = AsyncMock()
+        callback.message.edit_text = AsyncMock()
+        empty = {"games": [], "total": 45, "prev_cursor": None, "next_cursor": None}
+        fetch = AsyncMock(side_effect=[empty, _page()])
+
+        with patch.object(my_games, "fetch_games_page", fetch):
+            asyncio.run(my_games.handle_my_games_page(callback, "http://test"))
+
+        assert fetch.await_args_list[1].args == ("http://test", 42)
+        assert "страница 1" in callback.message.edit_text.call_args.args[0]
@@ -0,0 +1,120 @@
+"""
+Tests for the outbound Telegram rate limiter
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import AnswerCallbackQuery, EditMessageText, SendMessage
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "bot"))
+
+from services.rate_limiter import OutboundRateLimiter, TokenBucket  # noqa: E402
+
+
+class FakeApi:
+    """make_request, который записывает вызовы"""
+
+    def __init__(self, failures=0):
+        self.calls = []
+        self.failures = failures
+
+    async def __call__(self, bot, method):
+        if self.failures:
+            self.failures -= 1
+            raise TelegramRetryAfter(method=method, message="Too Many Requests", retry_after=0)
+        self.calls.append((type(method).__name__, getattr(method, "text", None), time.monotonic()))
+        return len(self.calls)
+
+
+class TestTokenBucket:
+    """Token bucket refill and blocking"""
+
+    def test_delay_after_burst(self):
+        bucket = TokenBucket(rate=10, capacity=2)
+        now = time.monotonic()
+        bucket.consume()
+        bucket.consume()
+        assert bucket.delay(now) == pytest.approx(0.1, abs=0.02)
+
+    def test_block(self):
+        bucket = TokenBucket(rate=10, capacity=2)
+        bucket.block(5)
+        assert bucket.delay(time.monotonic()) > 4
+        assert not bucket.idle
+
+
+class TestOutboundRateLimiter:
+    """Per-chat limits, edit coalescing and RetryAfter"""
+
+    def test_per_chat_limit_spaces_sends(self):
+        limiter = OutboundRateLimiter(global_rate=1000, private_rate=20, burst=1)
+        api = FakeApi()
+
+        async def run():
+            await asyncio.gather(*(limiter(api, None, SendMessage(chat_id=1, text=str(i))) for i in range(3)))
+
+        asyncio.run(run())
+        times = [t for _, _, t in api.calls]
+        assert len(times) == 3
+        assert times[2] - times[0] >= 0.09
+        assert limiter.stats()["delayed"] == 2
+        assert limiter.stats()["queued"] == 0
+
+    def test_other_chats_not_delayed(self):
+        limiter = OutboundRateLimiter(global_rate=1000, private_rate=0.1, burst=1)
+        api = FakeApi()
+
+        async def run():
+            await asyncio.gather(*(limiter(api, None, SendMessage(chat_id=i, text="x")) for i in range(1, 6)))
+
+        started = time.monotonic()
+        asyncio.run(run())
+        assert time.monotonic() - started < 0.5
+        assert limiter.stats()["delayed"] == 0
+
+    def test_unlimited_methods_pass_through(self):
+        limiter = OutboundRateLimiter(global_rate=0.1, burst=1)
+        api = FakeApi()
+
+        async def run():
+            for _ in range(3):
+                await limiter(api, None, AnswerCallbackQuery(callback_query_id="1"))
+
+        asyncio.run(run())
+        assert len(api.calls) == 3
+
+    def test_queued_edits_of_same_message_coalesced(self):
+        limiter = OutboundRateLimiter(global_rate=1000, private_rate=20, burst=1)
+        api = FakeApi()
+
+        def edit(text):
+            return limiter(api, None, EditMessageText(chat_id=1, message_id=7, text=text))
+
+        async def run():
+            await edit("v0")
+            return await asyncio.gather(edit("v1"), edit("v2"), edit("v3"))
+
+        results = asyncio.run(run())
+        assert [text for _, text, _ in api.calls] == ["v0", "v3"]
+        assert results == [2, 2, 2]
+        assert limiter.stats()["coalesced"] == 2
+
+    def test_retry_after_is_retried(self):
+        limiter = OutboundRateLimiter(global_rate=1000, private_rate=1000, burst=5, max_retries=2)
+        api = FakeApi(failures=2)
+
+        result = asyncio.run(limiter(api, None, SendMessage(chat_id=-100, text="x")))
+        assert result == 1
+        assert limiter.stats()["retry_after"] == 2
+
+    def test_retry_after_gives_up(self):
+        limiter = OutboundRateLimiter(global_rate=1000, private_rate=1000, burst=5, max_retries=1)
+        api = FakeApi(failures=5)
+
+        with pytest.raises(TelegramRetryAfter):
+            asyncio.run(limiter(api, None, SendMessage(chat_id=1, text="x")))
+        assert api.calls == []
@@ -0,0 +1,268 @@
+"""
+Tests for the scheduled sheet auto-import (conditional download, changed rows only)
+"""
+import asyncio
+import json
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "bot"))
+
+from services import import_ratings, sheet_watcher  # noqa: E402
+from services.sheet_watcher import SheetState, SheetWatcher  # noqa: E402
+
+HEADER = "Игра,Жанр,bgg,НизаГамс,Алиса,Боб\n"
+SHEET_V1 = HEADER + "Catan,стратегия,13,1,40,30\nAzul,семейная,230802,2,35,\n"
+SHEET_V2 = HEADER + "Catan,стратегия,13,1,45,30\nAzul,семейная,230802,2,35,\n"
+
+
+class FakeSheet:
+    """Google Sheets: отдаёт CSV с ETag и отвечает 304 на совпавший If-None-Match"""
+
+    def __init__(self, text, etag='"v1"'):
+        self.text = text
+        self.etag = etag
+        self.requests = []
+
+    def handler(self, request):
+        self.requests.append(request)
+        if self.etag and request.headers.get("If-None-Match") == self.etag:
+            return httpx.Response(304)
+        headers = {"ETag": self.etag} if self.etag else {}
+        return httpx.Response(200, content=self.text.encode("utf-8"), headers=headers)
+
+
+OK = {"status": "ok", "rows_failed": 0, "rows_invalid": 0}
+
+
+def run_sync(watcher, sheet, send=None, plan=None):
+    send = send or AsyncMock(return_value=OK)
+    plan = plan or AsyncMock(return_value={"estimated_seconds": 0})
+    transport = httpx.MockTransport(sheet.handler)
+    real_client = httpx.AsyncClient
+    with patch.object(sheet_watcher.httpx, "AsyncClient", lambda **kw: real_client(transport=transport)), \
+            patch.object(sheet_watcher, "plan_data_rows", plan), \
+            patch.object(sheet_watcher, "send_data_rows", send):
+        result = asyncio.run(watcher.sync())
+    return result, send
+
+
+@pytest.fixture
+def watcher(tmp_path):
+    return SheetWatcher("http://backend", "http://sheet/csv", tmp_path / "state.json", interval=60)
+
+
+class TestSheetWatcher:
+    """Conditional polling and changed-row detection"""
+
+    def test_first_sync_sends_all_rows_and_saves_state(self, watcher):
+        result, send = run_sync(watcher, FakeSheet(SHEET_V1))
+
+        assert result == {"rows": 2, "changed": 2, "pending": 0}
+        sent = send.await_args.args[1]
+        assert [r["name"] for r in sent] == ["Catan", "Azul"]
+        state = json.loads(watcher.state_path.read_text(encoding="utf-8"))
+        assert state["etag"] == '"v1"'
+        assert set(state["row_hashes"]) == {"Catan", "Azul"}
+
+    def test_not_modified_skips_import(self, watcher):
+        sheet = FakeSheet(SHEET_V1)
+        run_sync(watcher, sheet)
+
+        result, send = run_sync(watcher, sheet)
+
+        assert result is None
+        send.assert_not_awaited()
+        assert sheet.requests[-1].headers["If-None-Match"] == '"v1"'
+
+    def test_same_content_without_validators_skips_import(self, watcher):
+        sheet = FakeSheet(SHEET_V1, etag=None)
+        run_sync(watcher, sheet)
+
+        result, send = run_sync(watcher, sheet)
+
+        assert result is None
+        send.assert_not_awaited()
+
+    def test_only_changed_rows_are_sent(self, watcher):
+        run_sync(watcher, FakeSheet(SHEET_V1))
+
+        result, send = run_sync(watcher, FakeSheet(SHEET_V2, etag='"v2"'))
+
+        assert result == {"rows": 2, "changed": 1, "pending": 0}
+        sent = send.await_args.args[1]
+        assert [r["name"] for r in sent] == ["Catan"]
+        assert sent[0]["ratings"]["Алиса"] == 45
+        assert send.await_args.kwargs["total_rows"] == 1
+
+    def test_state_survives_restart(self, watcher):
+        run_sync(watcher, FakeSheet(SHEET_V1))
+
+        restarted = SheetWatcher("http://backend", "http://sheet/csv", watcher.state_path, interval=60)
+        result, send = run_sync(restarted, FakeSheet(SHEET_V2, etag='"v2"'))
+
+        assert result["changed"] == 1
+
+    def test_failed_send_keeps_previous_state(self, watcher):
+        run_sync(watcher, FakeSheet(SHEET_V1))
+        saved = watcher.state_path.read_text(encoding="utf-8")
+
+        failing = AsyncMock(side_effect=httpx.ConnectError("backend down"))
+        with pytest.raises(httpx.ConnectError):
+            run_sync(watcher, FakeSheet(SHEET_V2, etag='"v2"'), send=failing)
+
+        assert watcher.state_path.read_text(encoding="utf-8") == saved
+        # Следующая проверка снова отправит изменившуюся строку
+        result, send = run_sync(watcher, FakeSheet(SHEET_V2, etag='"v2"'))
+        assert result["changed"] == 1
+
+    def test_corrupt_state_file_starts_from_scratch(self, tmp_path):
+        path = tmp_path / "state.json"
+        path.write_text("{not json", encoding="utf-8")
+
+        assert SheetState.load(path) == SheetState()
+
+
+SHEET_FIVE = HEADER + "".join(f"Game{i},стратегия,{i},{i},40,\n" for i in range(1, 6))
+
+
+def busy_backend():
+    request = httpx.Request("POST", "http://backend/api/import-table/stream")
+    return httpx.HTTPStatusError("busy", request=request, response=httpx.Response(409, request=request))
+
+
+class TestSheetWatcherBatches:
+    """Batched sending, progress per accepted batch and periodic full re-import"""
+
+    def test_changed_rows_are_sent_in_batches(self, tmp_path):
+        watcher = SheetWatcher("http://backend", "http://sheet/csv", tmp_path / "state.json", 60, batch_size=2)
+
+        result, send = run_sync(watcher, FakeSheet(SHEET_FIVE))
+
+        assert result == {"rows": 5, "changed": 5, "pending": 0}
+        batches = [[r["name"] for r in c.args[1]] for c in send.await_args_list]
+        assert batches == [["Game1", "Game2"], ["Game3", "Game4"], ["Game5"]]
+        assert [c.kwargs["total_rows"] for c in send.await_args_list] == [2, 2, 1]
+
+    def test_accepted_batches_survive_failed_send(self, tmp_path):
+        watcher = SheetWatcher("http://backend", "http://sheet/csv", tmp_path / "state.json", 60, batch_size=2)
+        failing = AsyncMock(side_effect=[OK, httpx.ConnectError("backend down")])
+
+        with pytest.raises(httpx.ConnectError):
+            run_sync(watcher, FakeSheet(SHEET_FIVE), send=failing)
+
+        state = json.loads(watcher.state_path.read_text(encoding="utf-8"))
+        assert set(state["row_hashes"]) == {"Game1", "Game2"}
+        assert state["etag"] is None
+        # Следующая проверка скачивает таблицу заново и досылает только оставшиеся строки
+        result, send = run_sync(watcher, FakeSheet(SHEET_FIVE))
+        assert result == {"rows": 5, "changed": 3, "pending": 0}
+        assert [r["name"] for c in send.await_args_list for r in c.args[1]] == ["Game3", "Game4", "Game5"]
+
+    def test_busy_backend_stops_until_next_check(self, tmp_path):
+        watcher = SheetWatcher("http://backend", "http://sheet/csv", tmp_path / "state.json", 60, batch_size=2)
+        busy = AsyncMock(side_effect=[OK, busy_backend()])
+
+        result, _ = run_sync(watcher, FakeSheet(SHEET_FIVE), send=busy)
+
+        assert result == {"rows": 5, "changed": 2, "pending": 3}
+        assert busy.await_count == 2
+        result, send = run_sync(watcher, FakeSheet(SHEET_FIVE))
+        assert result["changed"] == 3
+
+    def test_full_import_resends_unchanged_rows(self, tmp_path):
+        watcher = SheetWatcher(
+            "http://backend", "http://sheet/csv", tmp_path / "state.json", 60, full_import_interval=3600
+        )
+        sheet = FakeSheet(SHEET_V1)
+        with patch.object(sheet_watcher.time, "time", return_value=1000.0):
+            run_sync(watcher, sheet)
+        with patch.object(sheet_watcher.time, "time", return_value=2000.0):
+            result, send = run_sync(watcher, sheet)
+        assert result is None
+
+        with patch.object(sheet_watcher.time, "time", return_value=1000.0 + 3600):
+            result, send = run_sync(watcher, sheet)
+
+        assert result == {"rows": 2, "changed": 2, "pending": 0}
+        assert "If-None-Match" not in sheet.requests[-1].headers
+        state = json.loads(watcher.state_path.read_text(encoding="utf-8"))
+        assert state["last_full_import"] == 4600.0
+        assert state["etag"] == '"v1"'
+
+    def test_timeout_stops_until_next_check(self, tmp_path):
+        watcher = SheetWatcher("http://backend", "http://sheet/csv", tmp_path / "state.json", 60, batch_size=2)
+        slow = AsyncMock(side_effect=[OK, httpx.ReadTimeout("slow import")])
+
+        result, _ = run_sync(watcher, FakeSheet(SHEET_FIVE), send=slow)
+
+        assert result == {"rows": 5, "changed": 2, "pending": 3}
+        assert slow.await_count == 2
+        state = json.loads(watcher.state_path.read_text(encoding="utf-8"))
+        assert set(state["row_hashes"]) == {"Game1", "Game2"}
+        assert state["etag"] is None
+
+    def test_partial_batch_stays_pending(self, tmp_path):
+        watcher = SheetWatcher("http://backend", "http://sheet/csv", tmp_path / "state.json", 60, batch_size=2)
+        partial = {"status": "partial", "rows_failed": 1, "rows_invalid": 0}
+        invalid = {"status": "ok", "rows_failed": 0, "rows_invalid": 1}
+        send = AsyncMock(side_effect=[OK, partial, invalid])
+
+        result, _ = run_sync(watcher, FakeSheet(SHEET_FIVE), send=send)
+
+        assert result == {"rows": 5, "changed": 2, "pending": 3}
+        state = json.loads(watcher.state_path.read_text(encoding="utf-8"))
+        assert set(state["row_hashes"]) == {"Game1", "Game2"}
+        # ETag не сохранён: следующая проверка скачает таблицу и повторит строки с ошибками
+        result, send = run_sync(watcher, FakeSheet(SHEET_FIVE))
+        assert [r["name"] for c in send.await_args_list for r in c.args[1]] == ["Game3", "Game4", "Game5"]
+        assert result == {"rows": 5, "changed": 3, "pending": 0}
+
+    def test_send_timeout_follows_import_plan(self, tmp_path):
+        watcher = SheetWatcher("http://backend", "http://sheet/csv", tmp_path / "state.json", 60, batch_size=2)
+        plan = AsyncMock(side_effect=[{"estimated_seconds": 300.0}, {"estimated_seconds": 0}, {}])
+
+        _, send = run_sync(watcher, FakeSheet(SHEET_FIVE), plan=plan)
+
+        assert [c.kwargs["timeout"] for c in send.await_args_list] == [660.0, 60.0, 60.0]
+        assert [len(c.args[1]) for c in plan.await_args_list] == [2, 2, 1]
+
+
+class TestBackendRequests:
+    """Import and dry-run requests return the backend response"""
+
+    def _run(self, coro_factory, body):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json=body)
+
+        transport = httpx.MockTransport(handler)
+        real_client = httpx.AsyncClient
+        with patch.object(import_ratings.httpx, "AsyncClient", lambda **kw: real_client(transport=transport)):
+            return asyncio.run(coro_factory()), requests
+
+    def test_send_returns_response(self):
+        rows = [{"name": "Catan", "ratings": {}}]
+        result, requests = self._run(
+            lambda: import_ratings.send_data_rows("http://backend", rows, total_rows=1),
+            {"status": "partial", "rows_failed": 1},
+        )
+
+        assert result == {"status": "partial", "rows_failed": 1}
+        assert requests[0].url.params["total_rows"] == "1"
+
+    def test_plan_requests_dry_run(self):
+        rows = [{"name": "Catan", "ratings": {}}]
+        plan, requests = self._run(
+            lambda: import_ratings.plan_data_rows("http://backend", rows),
+            {"status": "dry_run", "plan": {"estimated_seconds": 12.5}},
+        )
+
+        assert plan == {"estimated_seconds": 12.5}
+        assert requests[0].url.params["dry_run"] == "true"
@@ -0,0 +1,72 @@
+"""
+Tests for the offline BGG stand-in server used by benchmarks
+"""
+from unittest.mock import patch
+
+import pytest
+
+from benchmarks.fake_bgg import FakeBGGServer, synthetic_id
+from backend.app.services import bgg
+
+
+@pytest.fixture
+def fake_bgg():
+    with FakeBGGServer() as server:
+        with patch.object(bgg, "BGG_SEARCH_URL", server.search_url), \
+                patch.object(bgg, "BGG_THING_URL", server.thing_url), \
+                patch("backend.app.services.bgg.time.sleep"):
+            yield server
+
+
+class TestFakeBGGServer:
+    """Test the backend BGG client against the fake server"""
+
+    def test_search_from_fixture(self, fake_bgg):
+        results = bgg.search_boardgame("Catan", token="fake")
+        assert results[0] == {"id": 13, "name": "CATAN", "type": "boardgame", "yearpublished": 1995}
+        assert len(results) == 4
+
+    def test_exact_search_filters_fixture(self, fake_bgg):
+        results = bgg.search_boardgame("Terraforming Mars", exact=True, token="fake")
+        assert [r["id"] for r in results] == [167791]
+
+    def test_thing_from_fixture(self, fake_bgg):
+        details = bgg.get_boardgame_details(167791, token="fake")
+        assert details["name"] == "Terraforming Mars"
+        assert details["name_ru"] == "Покорение Марса"
+        assert details["rank"] == 7
+        assert "Card Drafting" in details["mechanics"]
+
+    def test_synthetic_game(self, fake_bgg):
+        results = bgg.search_boardgame("Synthetic Game 42", exact=True, token="fake")
+        assert results[0]["id"] == synthetic_id("Synthetic Game 42")
+
+        details = bgg.get_boardgame_details(results[0]["id"], token="fake")
+        assert details["name"] == "Synthetic Game 42"
+        assert details["rank"] is not None
+
+    def test_rate_limit_and_stats(self, fake_bgg):
+        fake_bgg.options.rate_limit_every = 1
+        with pytest.raises(RuntimeError, match="Ошибка обращения к BGG API"):
+            bgg.search_boardgame("Catan", token="fake", retries=2)
+
+        stats = fake_bgg.stats()
+        assert stats["by_status"] == {"429": 2}
+        assert stats["by_path"] == {"/xmlapi2/search": 2}
+
+    def test_empty_body(self, fake_bgg):
+        fake_bgg.options.empty_body_every = 1
+        with pytest.raises(RuntimeError, match="Ошибка обращения к BGG API"):
+            bgg.search_boardgame("Catan", token="fake", retries=1)
+
+    def test_queued_then_success(self, fake_bgg):
+        import requests
+
+        fake_bgg.options.queued_responses = 1
+        first = requests.get(fake_bgg.thing_url, params={"id": "13", "stats": 1}, timeout=5)
+        second = requests.get(fake_bgg.thing_url, params={"id": "13", "stats": 1}, timeout=5)
+
+        assert first.status_code == 202
+        assert second.status_code == 200
+        assert 'id="13"' in second.text
+        assert fake_bgg.stats()["by_status"] == {"202": 1, "200": 1}
@@ -0,0 +1,46 @@
+"""
+Tests for shared candidate name scoring
+"""
+import pytest
+
+from backend.app.services import fuzzy
+from backend.app.services.fuzzy import extract, score_candidates, similarity_tier
+
+
+class TestScoreCandidates:
+    """Test batch similarity scores"""
+
+    @pytest.mark.parametrize("query,name,expected_min_similarity", [
+        ("Catan", "Catan", 100),
+        ("Catan", "Settlers of Catan", 50),
+        ("Terraforming Mars", "Terraforming Mars", 100),
+        ("Terraforming Mars", "Mars", 40),
+    ])
+    def test_similarity_thresholds(self, query, name, expected_min_similarity):
+        assert score_candidates(query, [name])[0] >= expected_min_similarity
+
+    def test_scores_keep_input_order(self):
+        scores = score_candidates("Catan", ["Ticket to Ride", "Catan", None])
+        assert len(scores) == 3
+        assert scores[1] == 100
+        assert scores[0] < 60
+        assert scores[2] == 0
+
+    def test_word_order_and_case_ignored(self):
+        assert score_candidates("mars terraforming", ["Terraforming Mars"]) == [100]
+
+    def test_empty_names(self):
+        assert score_candidates("Catan", []) == []
+
+    def test_exact_fallback(self, monkeypatch):
+        monkeypatch.setattr(fuzzy, "BACKEND", "exact")
+        assert score_candidates(" catan ", ["Catan", "Catan Junior"]) == [100, 0]
+
+    def test_extract_top_matches(self):
+        names = ["Ticket to Ride", "Catan", "Gloomhaven", "Catan Junior"]
+        matches = extract("Catan", names, limit=2, score_cutoff=60)
+        assert [index for _, _, index in matches] == [1, 3]
+        assert matches[0] == ("Catan", 100, 1)
+
+    def test_similarity_tier(self):
+        assert [similarity_tier(s) for s in (100, 85, 84, 60, 59)] == [0, 0, 1, 1, 2]
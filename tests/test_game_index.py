@@ -0,0 +1,158 @@
+"""
+Tests for the in-memory game name suggestion index
+"""
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from backend.app.services.game_index import GameNameIndex, IndexedGame, normalize, trigrams
+
+
+def _game(name, rank=None, alternate=None):
+    return IndexedGame(game_id=uuid.uuid4(), name=name, bgg_rank=rank, alternate_names=alternate or [])
+
+
+def _names(suggestions):
+    return [s.name for s in suggestions]
+
+
+class TestGameNameIndex:
+    """Prefix, multi-word and typo-tolerant suggestions"""
+
+    def setup_method(self):
+        self.catan = _game("Catan", rank=500)
+        self.index = GameNameIndex()
+        self.index.load([
+            self.catan,
+            _game("Catan: Seafarers", rank=900),
+            _game("Cathedral", rank=1500),
+            _game("Terraforming Mars", rank=4, alternate=["Покорение Марса"]),
+            _game("Mars Open: Tabletop Edition"),
+            _game("Gloomhaven", rank=3),
+        ])
+
+    def test_normalize(self):
+        assert normalize("  Ёлки:   Палки!! ") == "елки палки"
+        assert trigrams("ab") == ["  a", " ab", "ab "]
+
+    def test_full_name_prefix_first_then_rank(self):
+        assert _names(self.index.suggest("cat")) == ["Catan", "Catan: Seafarers", "Cathedral"]
+        assert _names(self.index.suggest("CATAN")) == ["Catan", "Catan: Seafarers"]
+
+    def test_word_prefix_after_full_name_prefix(self):
+        assert _names(self.index.suggest("mars")) == ["Mars Open: Tabletop Edition", "Terraforming Mars"]
+
+    def test_multi_word_query(self):
+        assert _names(self.index.suggest("mars terra")) == ["Terraforming Mars"]
+        # Слова из разных игр: совпадений по началу нет, остаются только нечёткие
+        assert all(s.score < 100 for s in self.index.suggest("ter op"))
+
+    def test_alternate_names(self):
+        suggestions = self.index.suggest("покор")
+        assert _names(suggestions) == ["Terraforming Mars"]
+        assert suggestions[0].matched_name == "Покорение Марса"
+        assert suggestions[0].score == 100
+
+    def test_typo_falls_back_to_fuzzy(self):
+        suggestions = self.index.suggest("Glomhaven")
+        assert _names(suggestions)[0] == "Gloomhaven"
+        assert 60 <= suggestions[0].score < 100
+
+    def test_limit_and_empty_query(self):
+        assert len(self.index.suggest("cat", limit=1)) == 1
+        assert self.index.suggest("   ") == []
+        assert self.index.suggest("zzz") == []
+
+    def test_upsert_renames_and_reranks(self):
+        self.index.upsert(IndexedGame(game_id=self.catan.game_id, name="Catan", bgg_rank=2000))
+        assert _names(self.index.suggest("cat")) == ["Catan: Seafarers", "Cathedral", "Catan"]
+
+        self.index.upsert(IndexedGame(game_id=self.catan.game_id, name="Колонизаторы", bgg_rank=2000))
+        assert _names(self.index.suggest("cat")) == ["Catan: Seafarers", "Cathedral"]
+        assert _names(self.index.suggest("колон")) == ["Колонизаторы"]
+        assert len(self.index) == 6
+
+    def test_upsert_keeps_alternate_names(self):
+        mars = next(g for g in self.index._games.values() if g.name == "Terraforming Mars")
+        self.index.upsert(IndexedGame(game_id=mars.game_id, name="Terraforming Mars", bgg_rank=5), keep_alternate_names=True)
+        assert _names(self.index.suggest("покор")) == ["Terraforming Mars"]
+
+    def test_new_game_enters_cached_top(self):
+        self.index.suggest("cat")  # строим кэш узлов
+        self.index.upsert(_game("Catacombs", rank=1))
+        assert _names(self.index.suggest("cat"))[0] == "Catacombs"
+
+    def test_remove(self):
+        self.index.remove(self.catan.game_id)
+        assert _names(self.index.suggest("cat")) == ["Catan: Seafarers", "Cathedral"]
+
+    def test_repeated_upserts_reuse_entry_slots(self):
+        entries = len(self.index._entry_name)
+        for rank in range(100):
+            self.index.upsert(IndexedGame(game_id=self.catan.game_id, name="Catan", bgg_rank=rank, alternate_names=["Колонизаторы"]))
+        self.index.remove(self.catan.game_id)
+        self.index.upsert(_game("Catacombs", rank=1))
+
+        assert len(self.index._entry_name) <= entries + 1
+        assert _names(self.index.suggest("cat")) == ["Catacombs", "Catan: Seafarers", "Cathedral"]
+        assert self.index.suggest("колон") == []
+        assert _names(self.index.suggest("Catacomb"))[0] == "Catacombs"
+
+    def test_updates_ignored_until_loaded(self):
+        index = GameNameIndex()
+        index.upsert(_game("Catan"))
+        assert not index.is_loaded
+        assert index.suggest("cat") == []
+
+        self.index.invalidate()
+        assert not self.index.is_loaded
+        assert self.index.suggest("cat") == []
+
+
+def _session_with_games(games, during_select=None):
+    """Сессия, SELECT которой отдаёт games и вызывает during_select (коммит соседнего импорта)"""
+    def select(*columns):
+        if during_select is not None:
+            during_select()
+        return [
+            SimpleNamespace(
+                id=g.game_id, name=g.name, bgg_id=g.bgg_id, bgg_rank=g.bgg_rank,
+                yearpublished=g.yearpublished, thumbnail=g.thumbnail, alternate_names=g.alternate_names,
+            )
+            for g in games
+        ]
+
+    session = MagicMock()
+    session.query.side_effect = select
+    return session
+
+
+class TestGameNameIndexLoad:
+    """Changes committed while the index is being loaded from the database"""
+
+    def test_changes_during_load_are_replayed(self):
+        index = GameNameIndex()
+        catan, azul = _game("Catan", rank=500), _game("Azul", rank=60)
+        gone = _game("Cathedral", rank=1500)
+
+        def commit_during_select():
+            index.upsert(azul)
+            index.upsert(IndexedGame(game_id=catan.game_id, name="Catan", bgg_rank=400))
+            index.remove(gone.game_id)
+
+        index.ensure_loaded(_session_with_games([catan, gone], during_select=commit_during_select))
+
+        assert index.is_loaded
+        assert _names(index.suggest("a")) == ["Azul"]
+        assert index.suggest("cat")[0].bgg_rank == 400
+        assert _names(index.suggest("cat")) == ["Catan"]
+
+    def test_invalidate_during_load_discards_snapshot(self):
+        index = GameNameIndex()
+
+        index.ensure_loaded(_session_with_games([_game("Catan")], during_select=index.invalidate))
+
+        assert not index.is_loaded
+        index.ensure_loaded(_session_with_games([]))
+        assert index.is_loaded
+        assert index.suggest("cat") == []
@@ -0,0 +1,190 @@
+"""
+Tests for the background refresh of stale games
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from sqlalchemy.dialects import postgresql
+
+from backend.app.infrastructure import repositories
+from backend.app.infrastructure.models import GameModel
+from backend.app.services import game_refresh
+
+NOW = datetime(2026, 10, 19, tzinfo=timezone.utc)
+
+
+def _compiled(query) -> str:
+    return str(query.statement.compile(dialect=postgresql.dialect()))
+
+
+class TestSelectStaleGames:
+    """Stalest games come from an indexed window, prioritized by sessions and ratings"""
+
+    def _select(self, active_games):
+        captured = {}
+        active = MagicMock()
+        active.filter.return_value = [(games,) for games in active_games]
+
+        def query(*entities):
+            if entities[0] is GameModel:
+                return _Chain(repositories.Query(GameModel), captured)
+            return active
+
+        session = MagicMock()
+        session.query.side_effect = query
+        repositories.select_stale_games(session, 10, now=NOW)
+        return captured["sql"]
+
+    def test_window_uses_updated_at_order_and_freshness(self):
+        sql = self._select([])
+
+        assert "ORDER BY games.updated_at" in sql
+        assert "games.bgg_id IS NOT NULL" in sql
+        # Выгрузка рангов не продлевает свежесть описаний и картинок
+        assert "ranks_updated_at <" not in sql and "ranks_updated_at IS NULL" not in sql
+        assert "count(ratings.id) DESC" in sql
+
+    def test_active_session_games_prioritized(self):
+        game_id = uuid.uuid4()
+        sql = self._select([[str(game_id), "not-a-uuid"], None])
+
+        assert "CASE WHEN (games.id IN" in sql
+        assert sql.index("CASE WHEN") < sql.index("count(ratings.id) DESC")
+
+
+class _Chain:
+    """Applies builder calls to a real Query and captures the final SQL on .all()"""
+
+    def __init__(self, query, captured):
+        self._query = query
+        self._captured = captured
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            return _Chain(getattr(self._query, name)(*args, **kwargs), self._captured)
+        return call
+
+    def all(self):
+        self._captured["sql"] = _compiled(self._query)
+        return []
+
+
+class TestRefreshStaleGames:
+    """Selected games are refreshed in one batched lookup"""
+
+    def _game(self, bgg_id):
+        return GameModel(
+            id=uuid.uuid4(), name=f"Game {bgg_id}", bgg_id=bgg_id,
+            bgg_rank=500, updated_at=NOW - timedelta(days=60),
+        )
+
+    def test_refresh_updates_fields_and_marks_missing(self):
+        found, missing = self._game(1), self._game(2)
+        session = MagicMock()
+
+        with patch.object(repositories, "select_stale_games", return_value=[found, missing]), \
+             patch.object(repositories, "get_boardgames_details",
+                          return_value={1: {"id": 1, "name": "Game 1", "rank": 42}}) as details, \
+             patch.object(repositories, "game_index") as index, \
+             patch.object(repositories, "user_games_cache") as cache:
+            result = repositories.refresh_stale_games(session, 20)
+
+        details.assert_called_once_with([1, 2])
+        assert result == {"selected": 2, "refreshed": 1, "missing": 1}
+        assert found.bgg_rank == 42
+        assert missing.bgg_rank == 500
+        # Обе игры выпадают из выборки до следующего устаревания
+        assert found.updated_at > NOW and missing.updated_at > NOW
+        session.commit.assert_called_once()
+        index.upsert.assert_called_once()
+        cache.clear.assert_called_once()
+
+    def test_fresh_dump_ranks_are_kept(self):
+        game = self._game(1)
+        game.ranks_updated_at = datetime.now(timezone.utc) - timedelta(days=1)
+        game.average = 8.1
+
+        with patch.object(repositories, "select_stale_games", return_value=[game]), \
+             patch.object(repositories, "get_boardgames_details",
+                          return_value={1: {"id": 1, "name": "Game 1", "rank": 42, "average": 7.0,
+                                            "description": "Fresh description"}}), \
+             patch.object(repositories, "game_index"), \
+             patch.object(repositories, "user_games_cache"):
+            repositories.refresh_stale_games(MagicMock(), 20)
+
+        assert game.description == "Fresh description"
+        assert game.bgg_rank == 500
+        assert game.average == 8.1
+
+    def test_nothing_stale(self):
+        with patch.object(repositories, "select_stale_games", return_value=[]), \
+             patch.object(repositories, "get_boardgames_details") as details:
+            result = repositories.refresh_stale_games(MagicMock(), 20)
+
+        assert result == {"selected": 0, "refreshed": 0, "missing": 0}
+        details.assert_not_called()
+
+
+class TestScheduler:
+    """A run is skipped during imports and while BGG is unavailable"""
+
+    def test_run_once_refreshes_batch(self):
+        scheduler = game_refresh.GameRefreshScheduler(interval=60, batch_size=7)
+        session = MagicMock()
+
+        with patch.object(game_refresh, "SessionLocal", return_value=session), \
+             patch.object(game_refresh, "refresh_stale_games", return_value={"selected": 7}) as refresh:
+            assert scheduler.run_once() == {"selected": 7}
+
+        refresh.assert_called_once_with(session, 7)
+        session.close.assert_called_once()
+
+    def test_skipped_during_import(self):
+        scheduler = game_refresh.GameRefreshScheduler(interval=60, batch_size=7)
+
+        with patch.object(game_refresh.IMPORT_IN_PROGRESS, "value", return_value=1), \
+             patch.object(game_refresh, "SessionLocal") as session_factory:
+            assert scheduler.run_once() == {}
+
+        session_factory.assert_not_called()
+
+    def test_open_circuit_skips_run(self):
+        scheduler = game_refresh.GameRefreshScheduler(interval=60, batch_size=7)
+        session = MagicMock()
+
+        with patch.object(game_refresh, "SessionLocal", return_value=session), \
+             patch.object(game_refresh, "refresh_stale_games", side_effect=game_refresh.CircuitOpenError("bgg", 30)):
+            assert scheduler.run_once() == {}
+
+        session.rollback.assert_called_once()
+        session.close.assert_called_once()
+
+
+class TestImportInProgressGauge:
+    """The gauge the scheduler checks is restored even when an import fails"""
+
+    def test_gauge_reset_after_failed_import(self):
+        session = MagicMock()
+        session.query.return_value.count.side_effect = RuntimeError("connection lost")
+        before = repositories.IMPORT_IN_PROGRESS.value()
+
+        with pytest.raises(RuntimeError):
+            repositories.replace_all_from_table(session, [{"name": "Catan", "ratings": {}}])
+
+        assert repositories.IMPORT_IN_PROGRESS.value() == before
+
+    def test_gauge_counts_running_imports(self):
+        seen = []
+
+        def body(*args, **kwargs):
+            seen.append(repositories.IMPORT_IN_PROGRESS.value())
+            return 0
+
+        with patch.object(repositories, "_import_table_rows", side_effect=body):
+            repositories.replace_all_from_table(MagicMock(), [])
+
+        assert seen == [1]
+        assert repositories.IMPORT_IN_PROGRESS.value() == 0
@@ -0,0 +1,169 @@
+"""
+Unit tests for the group leaderboard aggregation
+"""
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+
+from backend.app.domain.models import LeaderboardMethod
+from backend.app.services.leaderboard import GroupLeaderboard
+
+
+@pytest.fixture
+def ids():
+    users = [uuid4() for _ in range(3)]
+    games = [uuid4() for _ in range(4)]
+    return users, games
+
+
+@pytest.fixture
+def leaderboard(ids):
+    users, games = ids
+    board = GroupLeaderboard()
+    board.load([
+        (users[0], games[0], 1),
+        (users[0], games[1], 2),
+        (users[0], games[2], 3),
+        (users[1], games[0], 2),
+        (users[1], games[1], 1),
+        (users[1], games[3], 0),  # не оценивал
+        (users[2], games[2], 1),
+    ])
+    return board
+
+
+class TestGroupLeaderboard:
+    """Test aggregation methods and incremental updates"""
+
+    def test_unrated_entries_are_skipped(self, leaderboard, ids):
+        _, games = ids
+        result = leaderboard.compute(LeaderboardMethod.BORDA)
+        assert games[3] not in [entry.game_id for entry in result]
+        assert len(result) == 3
+
+    def test_borda(self, leaderboard, ids):
+        _, games = ids
+        result = leaderboard.compute(LeaderboardMethod.BORDA)
+        # games[0]: 50 + 49, games[1]: 49 + 50, games[2]: 48 + 50
+        assert [entry.score for entry in result] == [99, 99, 98]
+        assert result[2].game_id == games[2]
+        assert [entry.position for entry in result] == [1, 2, 3]
+
+    def test_mean_rank(self, leaderboard, ids):
+        _, games = ids
+        result = leaderboard.compute(LeaderboardMethod.MEAN_RANK)
+        assert result[0].score == 1.5
+        assert {result[0].game_id, result[1].game_id} == {games[0], games[1]}
+        assert result[2].game_id == games[2]
+        assert result[2].raters == 2
+
+    def test_bayesian_shrinks_single_rating(self, ids):
+        users, games = ids
+        board = GroupLeaderboard()
+        board.load([
+            (users[0], games[0], 2),
+            (users[1], games[0], 2),
+            (users[2], games[0], 2),
+            (users[0], games[1], 1),  # одна оценка
+            (users[0], games[2], 20),
+            (users[1], games[2], 20),
+            (users[2], games[2], 20),
+        ])
+        mean_rank = board.compute(LeaderboardMethod.MEAN_RANK)
+        bayesian = board.compute(LeaderboardMethod.BAYESIAN)
+        assert mean_rank[0].game_id == games[1]
+        assert bayesian[0].game_id == games[0]
+
+    def test_incremental_update_matches_full_reload(self, leaderboard, ids):
+        users, games = ids
+        changes = [
+            (users[2], games[3], 1),   # новая оценка
+            (users[0], games[0], 5),   # изменение
+            (users[1], games[1], 0),   # оценка снята
+            (uuid4(), games[2], 2),    # новый пользователь
+        ]
+        leaderboard.apply_changes(changes)
+
+        reference = GroupLeaderboard()
+        reference.load([
+            (users[0], games[0], 5),
+            (users[0], games[1], 2),
+            (users[0], games[2], 3),
+            (users[1], games[0], 2),
+            (users[2], games[2], 1),
+            (users[2], games[3], 1),
+            (changes[3][0], games[2], 2),
+        ])
+
+        for method in LeaderboardMethod:
+            got = {(e.game_id, e.score, e.raters) for e in leaderboard.compute(method)}
+            expected = {(e.game_id, e.score, e.raters) for e in reference.compute(method)}
+            assert got == expected
+
+    def test_changes_ignored_until_loaded(self, ids):
+        users, games = ids
+        board = GroupLeaderboard()
+        board.apply_changes([(users[0], games[0], 1)])
+        assert not board.is_loaded
+
+    def test_limit_and_min_raters(self, leaderboard):
+        assert len(leaderboard.compute(LeaderboardMethod.BORDA, limit=1)) == 1
+        result = leaderboard.compute(LeaderboardMethod.BORDA, min_raters=2)
+        assert all(entry.raters >= 2 for entry in result)
+        assert len(result) == 3
+
+
+def _session_with_ratings(rows, during_select=None):
+    """Сессия, SELECT которой возвращает rows и вызывает during_select (коммит соседнего импорта)"""
+    def select():
+        if during_select is not None:
+            during_select()
+        return rows
+
+    session = MagicMock()
+    session.query.return_value.filter.return_value.all.side_effect = select
+    return session
+
+
+class TestGroupLeaderboardLoad:
+    """Changes committed while the matrix is being loaded from the database"""
+
+    def test_changes_during_load_are_replayed(self, ids):
+        users, games = ids
+        board = GroupLeaderboard()
+        session = _session_with_ratings(
+            [(users[0], games[0], 1)],
+            during_select=lambda: board.apply_changes([(users[1], games[1], 1), (users[0], games[0], 2)]),
+        )
+
+        board.ensure_loaded(session)
+
+        assert board.is_loaded
+        result = {entry.game_id: entry for entry in board.compute(LeaderboardMethod.MEAN_RANK)}
+        assert result[games[1]].score == 1
+        assert result[games[0]].score == 2
+
+    def test_invalidate_during_load_discards_snapshot(self, ids):
+        users, games = ids
+        board = GroupLeaderboard()
+        session = _session_with_ratings([(users[0], games[0], 1)], during_select=board.invalidate)
+
+        board.ensure_loaded(session)
+
+        assert not board.is_loaded
+        # Следующая загрузка буферизует заново
+        board.ensure_loaded(_session_with_ratings([]))
+        assert board.is_loaded
+        assert board.compute(LeaderboardMethod.BORDA) == []
+
+    def test_buffer_is_dropped_after_load(self, ids):
+        users, games = ids
+        board = GroupLeaderboard()
+        board.ensure_loaded(_session_with_ratings([]))
+        board.invalidate()
+
+        board.apply_changes([(users[0], games[0], 1)])
+        board.ensure_loaded(_session_with_ratings([]))
+
+        assert board.compute(LeaderboardMethod.BORDA) == []
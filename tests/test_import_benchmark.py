@@ -0,0 +1,47 @@
+"""
+Tests for the synthetic sheet generator used by the import benchmark
+"""
+from unittest.mock import MagicMock
+
+from benchmarks.import_benchmark import _reset_database, generate_sheet
+from bot.services.import_ratings import _build_data_rows
+
+
+class TestSyntheticSheet:
+    """Generated sheets must match the format the bot parses"""
+
+    def test_sheet_shape(self):
+        sheet = generate_sheet(20, 5, seed=1)
+        assert len(sheet) == 21
+        assert sheet[0][:4] == ["Название", "Жанр", "bgg", "НизаГамс"]
+        assert sheet[0][-1] == "Общий"
+        assert all(len(row) == len(sheet[0]) for row in sheet)
+
+    def test_sheet_is_deterministic(self):
+        assert generate_sheet(10, 3, seed=7) == generate_sheet(10, 3, seed=7)
+
+    def test_parsed_by_bot(self):
+        data_rows = _build_data_rows(generate_sheet(50, 4, seed=3))
+
+        assert len(data_rows) == 50
+        assert data_rows[0]["name"] == "Synthetic Game 1"
+        for row in data_rows:
+            assert "Общий" not in row["ratings"]
+            assert set(row["ratings"]) <= {"Игрок 1", "Игрок 2", "Игрок 3", "Игрок 4"}
+            assert all(0 <= rank <= 50 for rank in row["ratings"].values())
+            assert row["genre"] in {None, "strategy", "family", "party", "coop", "ameri", "euro", "abstract"}
+
+
+class TestResetDatabase:
+    """Every run starts from empty tables"""
+
+    def test_truncates_all_model_tables(self):
+        engine = MagicMock()
+
+        _reset_database(engine)
+
+        conn = engine.begin.return_value.__enter__.return_value
+        sql = str(conn.execute.call_args.args[0])
+        assert sql.startswith("TRUNCATE ")
+        for table in ("games", "ratings", "users", "ranking_sessions", "import_checkpoints", "bgg_unresolved_names"):
+            assert table in sql
@@ -0,0 +1,286 @@
+"""
+Tests for resumable (checkpointed) table imports
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy.dialects import postgresql
+
+from backend.app.api import clear_database, import_table
+from backend.app.infrastructure import repositories
+from backend.app.infrastructure.db import get_db
+from backend.app.infrastructure.models import ImportCheckpointModel
+
+ROWS = [{"name": f"Game {i}", "ratings": {}} for i in range(1, 6)]
+
+
+def _checkpoint_session(existing):
+    session = MagicMock()
+    session.query.return_value.filter.return_value.one_or_none.return_value = existing
+    return session
+
+
+class TestFingerprint:
+    """The fingerprint depends on the sheet content and the forced flag"""
+
+    def test_stable_and_flag_sensitive(self):
+        content = hashlib.sha256(b'{"name": "Game 1"}\n')
+        fingerprint = repositories.import_fingerprint(content, False)
+        assert repositories.import_fingerprint(content, False) == fingerprint
+        assert repositories.import_fingerprint(content, True) != fingerprint
+        assert repositories.import_fingerprint(hashlib.sha256(b'{"name": "Game 2"}\n'), False) != fingerprint
+
+
+class TestStartCheckpoint:
+    """Interrupted imports resume; finished ones start over"""
+
+    def test_new_import(self):
+        session = _checkpoint_session(None)
+
+        checkpoint = repositories.start_import_checkpoint(session, "abc", total_rows=5)
+
+        session.add.assert_called_once_with(checkpoint)
+        assert checkpoint.last_row == 0
+        assert checkpoint.total_rows == 5
+        session.commit.assert_called_once()
+
+    def test_interrupted_import_resumes(self):
+        existing = ImportCheckpointModel(fingerprint="abc", last_row=3, completed_at=None)
+
+        checkpoint = repositories.start_import_checkpoint(_checkpoint_session(existing), "abc", total_rows=5)
+
+        assert checkpoint is existing
+        assert checkpoint.last_row == 3
+
+    def test_completed_import_restarts(self):
+        existing = ImportCheckpointModel(fingerprint="abc", last_row=5, completed_at=repositories.datetime.now())
+
+        checkpoint = repositories.start_import_checkpoint(_checkpoint_session(existing), "abc", total_rows=5)
+
+        assert checkpoint.last_row == 0
+        assert checkpoint.completed_at is None
+
+
+    def test_only_finished_or_abandoned_checkpoints_pruned(self):
+        session = _checkpoint_session(None)
+
+        repositories.start_import_checkpoint(session, "abc", total_rows=5)
+
+        prune = session.query.return_value.filter.call_args_list[0].args
+        sql = " AND ".join(str(c.compile(dialect=postgresql.dialect())) for c in prune)
+        assert "import_checkpoints.fingerprint !=" in sql
+        # Чекпойнт идущего импорта другой таблицы не удаляется
+        assert "import_checkpoints.completed_at IS NOT NULL OR import_checkpoints.updated_at <" in sql
+
+
+class TestImportLock:
+    """Imports run one at a time across workers"""
+
+    def _session(self, acquired):
+        session = MagicMock()
+        connection = session.get_bind.return_value.connect.return_value
+        connection.execute.return_value.scalar.return_value = acquired
+        return session, connection
+
+    def test_lock_acquired_and_released(self):
+        session, connection = self._session(True)
+
+        with repositories.import_lock(session):
+            assert "pg_try_advisory_lock" in str(connection.execute.call_args.args[0])
+
+        assert "pg_advisory_unlock" in str(connection.execute.call_args.args[0])
+        connection.close.assert_called_once()
+
+    def test_busy_lock_raises(self):
+        session, connection = self._session(False)
+
+        with pytest.raises(repositories.ImportInProgressError):
+            with repositories.import_lock(session):
+                pass
+
+        assert connection.execute.call_count == 1
+        connection.close.assert_called_once()
+
+
+class TestClearDuringImport:
+    """A database clear is rejected while a table import runs"""
+
+    def _post(self, lock):
+        app = FastAPI()
+        app.include_router(clear_database.router, prefix="/api")
+        app.dependency_overrides[get_db] = lambda: MagicMock()
+
+        async def _request():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post("/api/clear-database", json={"confirm": True})
+
+        result = {
+            "games_deleted": 1, "ratings_deleted": 2, "sessions_deleted": 0, "users_deleted": 0,
+        }
+        with patch.object(clear_database, "import_lock", lock), \
+             patch.object(clear_database, "clear_all_data", return_value=result) as clear:
+            return asyncio.run(_request()), clear
+
+    def test_running_import_conflict(self):
+        @contextmanager
+        def busy(session):
+            raise clear_database.ImportInProgressError("busy")
+            yield
+
+        response, clear = self._post(busy)
+
+        assert response.status_code == 409
+        assert response.json()["detail"] == import_table.IMPORT_RUNNING_DETAIL
+        clear.assert_not_called()
+
+    def test_clear_runs_under_import_lock(self):
+        held = []
+
+        @contextmanager
+        def lock(session):
+            held.append(True)
+            yield
+            held.append(False)
+
+        response, clear = self._post(lock)
+
+        assert response.status_code == 200
+        assert response.json()["games_deleted"] == 1
+        clear.assert_called_once()
+        assert held == [True, False]
+
+
+class TestResume:
+    """Committed rows are skipped without touching the DB or BGG"""
+
+    def test_rows_before_checkpoint_skipped(self):
+        checkpoint = ImportCheckpointModel(fingerprint="abc", last_row=3)
+        processed = []
+
+        with patch.object(repositories, "load_unresolved_names", return_value={}), \
+             patch.object(repositories, "_should_update_game", return_value=False), \
+             patch.object(repositories, "unresolved_name_key", side_effect=lambda name: processed.append(name) or name):
+            repositories.replace_all_from_table(MagicMock(), ROWS, checkpoint=checkpoint)
+
+        assert processed == ["Game 4", "Game 5"]
+        assert checkpoint.last_row == 5
+        assert checkpoint.completed_at is not None
+
+    def test_checkpoint_advances_with_each_row_commit(self):
+        checkpoint = ImportCheckpointModel(fingerprint="abc", last_row=0)
+        session = MagicMock()
+        committed = []
+        session.commit.side_effect = lambda: committed.append(checkpoint.last_row)
+
+        with patch.object(repositories, "load_unresolved_names", return_value={}), \
+             patch.object(repositories, "_should_update_game", return_value=False):
+            repositories.replace_all_from_table(session, ROWS[:3], checkpoint=checkpoint)
+
+        # По коммиту на строку (номер строки уже в чекпойнте) и финальный
+        assert committed == [1, 2, 3, 3]
+
+
+class TestStreamResume:
+    """Re-sending the same stream reuses its checkpoint"""
+
+    def _post(self, body, is_forced_update=False):
+        app = FastAPI()
+        app.include_router(import_table.router, prefix="/api")
+        app.dependency_overrides[get_db] = lambda: MagicMock()
+
+        async def _request():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post(
+                    "/api/import-table/stream",
+                    content=gzip.compress(body),
+                    params={"is_forced_update": is_forced_update},
+                    headers={"Content-Encoding": "gzip"},
+                )
+
+        with patch.object(import_table, "start_import_checkpoint", return_value=MagicMock(last_row=2)) as start, \
+             patch.object(import_table, "replace_all_from_table", return_value=3) as replace, \
+             patch.object(import_table, "import_lock"), \
+             patch.object(import_table, "translate_game_descriptions_background"):
+            response = asyncio.run(_request())
+        return response, start.call_args.args[1], replace.call_args.kwargs["checkpoint"]
+
+    def test_same_body_same_fingerprint(self):
+        body = "\n".join(json.dumps(row) for row in ROWS).encode()
+
+        first, fingerprint, checkpoint = self._post(body)
+        _, again, _ = self._post(body)
+        _, forced, _ = self._post(body, is_forced_update=True)
+
+        assert first.status_code == 200
+        assert first.json()["resumed_from_row"] == 2
+        assert checkpoint.last_row == 2
+        assert fingerprint == again
+        assert fingerprint != forced
+        assert fingerprint == repositories.import_fingerprint(hashlib.sha256(body), False)
+
+
+class TestImportStatus:
+    """Concurrent imports get 409, failed rows are reported"""
+
+    def _post(self, lock, replace):
+        app = FastAPI()
+        app.include_router(import_table.router, prefix="/api")
+        app.dependency_overrides[get_db] = lambda: MagicMock()
+
+        async def _request():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return [
+                    await client.post("/api/import-table", json={"rows": ROWS}),
+                    await client.post("/api/import-table/stream", content="\n".join(json.dumps(row) for row in ROWS)),
+                ]
+
+        with patch.object(import_table, "import_lock", lock), \
+             patch.object(import_table, "start_import_checkpoint", return_value=MagicMock(last_row=0)), \
+             patch.object(import_table, "replace_all_from_table", side_effect=replace) as replace_mock, \
+             patch.object(import_table, "translate_game_descriptions_background"):
+            return asyncio.run(_request()), replace_mock
+
+    def test_running_import_conflict(self):
+        @contextmanager
+        def busy(session):
+            raise import_table.ImportInProgressError("busy")
+            yield
+
+        responses, replace = self._post(busy, lambda *args, **kwargs: 0)
+
+        assert [r.status_code for r in responses] == [409, 409]
+        replace.assert_not_called()
+
+    def test_failed_rows_make_status_partial(self):
+        def replace(session, rows, **kwargs):
+            list(rows)
+            kwargs["stats"]["failed"] = 2
+            return 3
+
+        responses, _ = self._post(MagicMock(), replace)
+
+        for response in responses:
+            assert response.status_code == 200
+            assert response.json()["status"] == "partial"
+            assert response.json()["rows_failed"] == 2
+
+    def test_failed_row_counted(self):
+        session = MagicMock()
+        session.commit.side_effect = [RuntimeError("stale checkpoint"), None, None]
+        stats = {}
+
+        with patch.object(repositories, "load_unresolved_names", return_value={}), \
+             patch.object(repositories, "_should_update_game", return_value=False):
+            repositories.replace_all_from_table(session, ROWS[:2], stats=stats)
+
+        assert stats == {"failed": 1}
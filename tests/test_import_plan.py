@@ -0,0 +1,172 @@
+"""
+Tests for the import dry-run planner
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import httpx
+from fastapi import FastAPI
+
+from backend.app.api import import_table
+from backend.app.infrastructure import repositories
+from backend.app.infrastructure.db import get_db
+from backend.app.infrastructure.models import BggUnresolvedNameModel
+
+NOW = datetime.now(timezone.utc)
+
+
+def _game(name, bgg_id=13, days_ago=1):
+    return SimpleNamespace(name=name, bgg_id=bgg_id, updated_at=NOW - timedelta(days=days_ago), ranks_updated_at=None)
+
+
+def _session(games):
+    session = MagicMock()
+    session.query.return_value.filter.side_effect = lambda condition: [
+        game for game in games if game.name in condition.right.value
+    ]
+    return session
+
+
+ROWS = [
+    {"name": "Новая игра", "ratings": {}},
+    {"name": " Свежая ", "ratings": {}},
+    {"name": "Старая", "ratings": {}},
+    {"name": "Без BGG", "ratings": {}},
+    {"name": "Самодельная", "ratings": {}},
+    {"name": "Сопоставленная", "ratings": {}},
+    {"name": "Новая игра", "ratings": {}},
+    {"ratings": {}},
+    "not a row",
+]
+GAMES = [_game("Свежая"), _game("Старая", days_ago=90), _game("Без BGG", bgg_id=None)]
+UNRESOLVED = {
+    "самодельная": BggUnresolvedNameModel(name="Самодельная", next_check_at=NOW + timedelta(days=1)),
+    "сопоставленная": BggUnresolvedNameModel(name="Сопоставленная", bgg_id=42, next_check_at=None),
+}
+
+
+def _plan(session, rows=ROWS, **kwargs):
+    with patch.object(repositories, "load_unresolved_names", return_value=UNRESOLVED), \
+         patch.object(repositories, "_bgg_request_seconds", return_value=0.5), \
+         patch.object(repositories.config, "BGG_REQUEST_DELAY", 2.0), \
+         patch.object(repositories, "search_boardgame") as search, \
+         patch.object(repositories, "get_boardgame_details") as details:
+        plan = repositories.plan_import(session, rows, **kwargs)
+    search.assert_not_called()
+    details.assert_not_called()
+    return plan
+
+
+class TestPlanImport:
+    """Rows are classified with bulk reads only"""
+
+    def test_classification_and_estimate(self):
+        session = _session(GAMES)
+        plan = _plan(session)
+
+        assert plan["rows"] == 9
+        assert plan["invalid"] == 2
+        assert plan["create"] == 3
+        assert plan["update"] == 4
+        assert plan["stale"] == 2
+        assert plan["unchanged"] == 2
+        assert plan["unresolved_skipped"] == 1
+        # Новая игра, Старая, Без BGG — поиск по названию; Сопоставленная — по BGG ID
+        assert plan["bgg_lookups"] == 4
+        assert plan["bgg_calls"] == 3 * repositories.PLAN_CALLS_BY_NAME + repositories.PLAN_CALLS_BY_ID
+        assert plan["estimated_seconds"] == round(plan["bgg_calls"] * 2.5, 1)
+        session.add.assert_not_called()
+        session.commit.assert_not_called()
+
+    def test_forced_update_refreshes_everything(self):
+        plan = _plan(_session(GAMES), is_forced_update=True)
+
+        assert plan["stale"] == 4
+        assert plan["unchanged"] == 0
+        assert plan["bgg_lookups"] == 6
+
+    def test_resumed_rows_left_out(self):
+        # Новая игра, Свежая и Старая закоммичены прерванным импортом
+        committed = [*GAMES, _game("Новая игра")]
+        plan = _plan(_session(committed), resume_after=3)
+
+        assert plan["rows"] == 9
+        assert plan["resumed_skipped"] == 3
+        # Повтор «Новой игры» ниже — уже обновление свежей игры без BGG
+        assert plan["create"] == 2
+        assert plan["unchanged"] == 1
+        assert plan["stale"] == 1
+        assert plan["bgg_lookups"] == 2
+        assert plan["bgg_calls"] == repositories.PLAN_CALLS_BY_NAME + repositories.PLAN_CALLS_BY_ID
+
+    def test_resumable_import_row(self):
+        from backend.app.infrastructure.models import ImportCheckpointModel
+
+        def session_with(checkpoint):
+            session = MagicMock()
+            session.query.return_value.filter.return_value.one_or_none.return_value = checkpoint
+            return session
+
+        assert repositories.resumable_import_row(session_with(None), "abc") == 0
+        assert repositories.resumable_import_row(
+            session_with(ImportCheckpointModel(fingerprint="abc", last_row=4)), "abc"
+        ) == 4
+        assert repositories.resumable_import_row(
+            session_with(ImportCheckpointModel(fingerprint="abc", last_row=9, completed_at=NOW)), "abc"
+        ) == 0
+
+    def test_one_query_per_chunk(self):
+        session = _session(GAMES)
+        with patch.object(repositories.config, "IMPORT_CHUNK_SIZE", 3):
+            _plan(session)
+
+        assert session.query.return_value.filter.call_count == 3
+
+
+class TestRequestSeconds:
+    """Latency comes from BGG metrics when there are observations"""
+
+    def test_default_and_observed(self):
+        histogram = MagicMock()
+        histogram.count.return_value = 0
+        with patch.object(repositories, "BGG_REQUEST_SECONDS", histogram):
+            assert repositories._bgg_request_seconds() == repositories.DEFAULT_BGG_REQUEST_SECONDS
+
+            histogram.count.side_effect = lambda endpoint: {"search": 2, "thing": 2}[endpoint]
+            histogram.total.side_effect = lambda endpoint: {"search": 1.0, "thing": 5.0}[endpoint]
+            assert repositories._bgg_request_seconds() == 1.5
+
+
+class TestDryRunEndpoint:
+    """dry_run returns the plan and does not import"""
+
+    def test_dry_run(self):
+        app = FastAPI()
+        app.include_router(import_table.router, prefix="/api")
+        app.dependency_overrides[get_db] = lambda: MagicMock()
+
+        async def _request():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post("/api/import-table", json={"rows": ROWS[:2], "dry_run": True})
+
+        with patch.object(import_table, "plan_import", return_value={"create": 2}) as plan, \
+             patch.object(import_table, "replace_all_from_table") as replace, \
+             patch.object(import_table, "start_import_checkpoint") as checkpoint, \
+             patch.object(import_table, "resumable_import_row", return_value=1) as resumable:
+            response = asyncio.run(_request())
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "dry_run"
+        assert response.json()["plan"] == {"create": 2}
+        assert plan.call_args.kwargs == {"is_forced_update": False, "resume_after": 1}
+        assert resumable.call_args.args[1] == repositories.import_fingerprint(
+            repositories.hashlib.sha256(
+                import_table.json.dumps(ROWS[:2], sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+            ),
+            False,
+        )
+        replace.assert_not_called()
+        checkpoint.assert_not_called()
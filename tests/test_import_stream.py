@@ -0,0 +1,147 @@
+"""
+Tests for the streaming (gzip NDJSON) table import
+"""
+import asyncio
+import gzip
+import io
+import json
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from backend.app.api import import_table
+from backend.app.infrastructure import repositories
+from backend.app.infrastructure.db import get_db
+from backend.app.infrastructure.models import BggUnresolvedNameModel, GameModel
+from bot.services.import_ratings import _gzip_ndjson, _iter_data_rows
+
+ROWS = [
+    {"name": "Брасс", "bgg_id": 224517, "genre": "euro", "ratings": {"Алиса": 1}},
+    {"name": "Каркассон", "ratings": {"Алиса": 0, "Боб": "7"}},
+]
+
+
+def _ndjson(rows, extra_lines=()):
+    lines = [json.dumps(row, ensure_ascii=False) for row in rows] + list(extra_lines)
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _post(app, path, **kwargs):
+    async def _request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(path, **kwargs)
+
+    return asyncio.run(_request())
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+    app.include_router(import_table.router, prefix="/api")
+    app.dependency_overrides[get_db] = lambda: MagicMock()
+    with patch.object(import_table, "translate_game_descriptions_background"):
+        yield app
+
+
+class TestStreamEndpoint:
+    """Rows are validated line by line and handed to the importer as a stream"""
+
+    def _import(self, app, body, **kwargs):
+        received = {}
+
+        def fake_import(session, rows, *, is_forced_update, total_rows, checkpoint, stats):
+            assert not isinstance(rows, list)
+            received["rows"] = list(rows)
+            received["total_rows"] = total_rows
+            return len(received["rows"])
+
+        with patch.object(import_table, "replace_all_from_table", side_effect=fake_import), \
+             patch.object(import_table, "start_import_checkpoint", return_value=MagicMock(last_row=0)), \
+             patch.object(import_table, "import_lock"):
+            response = _post(app, "/api/import-table/stream", content=body, **kwargs)
+        return response, received
+
+    def test_gzip_stream_imported(self, app):
+        body = gzip.compress(_ndjson(ROWS, ['{"ratings": {}}', "not json", ""]))
+        response, received = self._import(
+            app, body, params={"total_rows": 4}, headers={"Content-Encoding": "gzip"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["games_imported"] == 2
+        assert data["rows_received"] == 4
+        assert data["rows_invalid"] == 2
+        assert received["total_rows"] == 4
+        assert received["rows"][0]["name"] == "Брасс"
+        assert received["rows"][1]["ratings"] == {"Алиса": 0, "Боб": 7}
+        assert received["rows"][1]["bgg_id"] is None
+
+    def test_plain_ndjson_accepted(self, app):
+        response, received = self._import(app, _ndjson(ROWS))
+
+        assert response.status_code == 200
+        assert [row["name"] for row in received["rows"]] == ["Брасс", "Каркассон"]
+
+    def test_broken_gzip_rejected(self, app):
+        body = gzip.compress(_ndjson(ROWS))
+        for broken in (b"not gzip at all", body[: len(body) // 2]):
+            response, received = self._import(app, broken, headers={"Content-Encoding": "gzip"})
+            assert response.status_code == 400
+            assert received == {}
+
+
+class TestChunkedImport:
+    """The importer detaches processed rows from the session every chunk"""
+
+    def test_expunge_every_chunk(self):
+        session = MagicMock()
+        rows = ({"name": f"Game {i}", "ratings": {}} for i in range(5))
+
+        with patch.object(repositories.config, "IMPORT_CHUNK_SIZE", 2), \
+             patch.object(repositories, "_expunge_import_chunk") as expunge, \
+             patch.object(repositories, "load_unresolved_names", return_value={}), \
+             patch.object(repositories, "_should_update_game", return_value=False):
+            repositories.replace_all_from_table(session, rows, total_rows=5)
+
+        assert expunge.call_count == 2
+        assert repositories.IMPORT_ROWS_PROCESSED.value() == 5
+
+    def test_unresolved_entries_stay_attached(self):
+        game, entry = GameModel(name="Брасс"), BggUnresolvedNameModel(name="Homebrew")
+        session = MagicMock()
+        session.identity_map.values.return_value = [game, entry]
+
+        repositories._expunge_import_chunk(session)
+
+        session.expunge.assert_called_once_with(game)
+
+
+class TestBotUpload:
+    """The bot streams rows as gzip NDJSON instead of building a list"""
+
+    def test_gzip_ndjson_round_trip(self):
+        sheet = [
+            ["Название", "Жанр", "bgg", "НизаГамс", "Алиса"],
+            ["Брасс", "евро", "224517", "", "1"],
+            ["", "", "", "", ""],
+            ["Каркассон", "", "", "", "нет"],
+        ]
+        stats = {"rows": 0}
+
+        async def collect():
+            return b"".join([chunk async for chunk in _gzip_ndjson(_iter_data_rows(sheet), stats)])
+
+        body = asyncio.run(collect())
+        rows = [json.loads(line) for line in io.TextIOWrapper(gzip.GzipFile(fileobj=io.BytesIO(body)), encoding="utf-8")]
+
+        assert stats["rows"] == 2
+        assert rows[0] == {"name": "Брасс", "bgg_id": 224517, "niza_games_rank": None, "genre": "euro", "ratings": {"Алиса": 1}}
+        assert rows[1]["ratings"] == {}
+
+    def test_bad_header_rejected_before_streaming(self):
+        with pytest.raises(ValueError):
+            _iter_data_rows([["Название", "Жанр"]])
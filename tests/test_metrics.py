@@ -0,0 +1,118 @@
+"""
+Tests for in-process Prometheus metrics
+"""
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from backend.app.api.metrics import MetricsMiddleware, router as metrics_router
+from backend.app.services import bgg
+from backend.app.utils.metrics import MetricsRegistry
+from benchmarks.fake_bgg import FakeBGGServer
+
+
+def _get(app, path):
+    async def _request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path)
+
+    return asyncio.run(_request())
+
+
+class TestMetricsRegistry:
+    """Test counters, gauges, histograms and text rendering"""
+
+    def test_counter_with_labels(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("jobs_total", "Jobs", ["result"])
+        counter.inc(result="ok")
+        counter.inc(2, result="ok")
+        counter.inc(result="failed")
+
+        text = registry.render()
+        assert "# TYPE jobs_total counter" in text
+        assert 'jobs_total{result="ok"} 3' in text
+        assert 'jobs_total{result="failed"} 1' in text
+
+    def test_wrong_labels_rejected(self):
+        counter = MetricsRegistry().counter("jobs_total", "Jobs", ["result"])
+        with pytest.raises(ValueError):
+            counter.inc(status="ok")
+
+    def test_same_name_returns_same_metric(self):
+        registry = MetricsRegistry()
+        assert registry.counter("a_total", "A") is registry.counter("a_total", "A")
+        with pytest.raises(ValueError):
+            registry.gauge("a_total", "A")
+
+    def test_gauge_function(self):
+        registry = MetricsRegistry()
+        state = {"value": 3}
+        registry.gauge("pool", "Pool", ["state"]).set_function(lambda: state["value"], state="idle")
+        state["value"] = 5
+        assert 'pool{state="idle"} 5' in registry.render()
+
+    def test_histogram_buckets(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 2.0):
+            histogram.observe(value)
+
+        text = registry.render()
+        assert 'latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{le="1"} 2' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+        assert "latency_seconds_count 3" in text
+        assert "latency_seconds_sum 2.55" in text
+
+
+class TestMetricsEndpoint:
+    """Test route latency middleware and GET /metrics"""
+
+    def test_route_template_label(self):
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+        app.include_router(metrics_router)
+
+        @app.get("/api/users/{telegram_id}")
+        def get_user(telegram_id: int):
+            return {"telegram_id": telegram_id}
+
+        _get(app, "/api/users/1")
+        _get(app, "/api/users/2")
+        _get(app, "/no/such/path")
+
+        response = _get(app, "/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert (
+            'http_requests_total{method="GET",route="/api/users/{telegram_id}",status="200"}'
+            in response.text
+        )
+        assert 'route="unmatched",status="404"' in response.text
+        assert "/api/users/1" not in response.text
+
+
+class TestBGGMetrics:
+    """Test BGG client call counters"""
+
+    def test_requests_and_retries_counted(self):
+        with FakeBGGServer(rate_limit_every=2, retry_after=0) as server, \
+                patch.object(bgg, "BGG_THING_URL", server.thing_url), \
+                patch("backend.app.services.bgg.time.sleep"):
+            ok_before = bgg.BGG_REQUESTS.value(endpoint="thing", status="200")
+            limited_before = bgg.BGG_REQUESTS.value(endpoint="thing", status="429")
+            retries_before = bgg.BGG_RETRIES.value(endpoint="thing")
+            calls_before = bgg.BGG_REQUEST_SECONDS.count(endpoint="thing")
+
+            bgg.get_boardgame_details(13, token="fake")
+            bgg.get_boardgame_details(13, token="fake")
+
+        assert bgg.BGG_REQUESTS.value(endpoint="thing", status="200") - ok_before == 2
+        assert bgg.BGG_REQUESTS.value(endpoint="thing", status="429") - limited_before == 1
+        assert bgg.BGG_RETRIES.value(endpoint="thing") - retries_before == 1
+        assert bgg.BGG_REQUEST_SECONDS.count(endpoint="thing") - calls_before == 3
@@ -0,0 +1,60 @@
+"""
+Unit tests for deferred GameModel columns and query projections
+"""
+from types import SimpleNamespace
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from backend.app.infrastructure.models import GameModel
+from backend.app.infrastructure.projections import (
+    full_game_query,
+    ranking_games_query,
+    row_to_game,
+    user_games_query,
+)
+
+HEAVY_COLUMNS = ("description", "description_ru", "categories", "mechanics", "designers", "publishers")
+
+
+def _sql(query) -> str:
+    return str(query.statement.compile(dialect=postgresql.dialect()))
+
+
+def _selected_columns(query) -> set:
+    return {column.name for column in query.statement.selected_columns}
+
+
+class TestProjections:
+    """Test that hot paths do not select heavy columns"""
+
+    def test_default_query_skips_heavy_columns(self):
+        sql = _sql(Session().query(GameModel))
+        assert "games.name" in sql
+        for heavy in HEAVY_COLUMNS:
+            assert f"games.{heavy}" not in sql
+
+    def test_ranking_projection(self):
+        columns = _selected_columns(ranking_games_query(Session()))
+        assert len(columns) == 14
+        for heavy in HEAVY_COLUMNS:
+            assert heavy not in columns
+
+    def test_user_games_projection(self):
+        columns = _selected_columns(user_games_query(Session()))
+        assert columns == {"id", "name", "bgg_id", "bgg_rank", "yearpublished"}
+
+    def test_full_game_query_loads_everything(self):
+        sql = _sql(full_game_query(Session()))
+        for heavy in HEAVY_COLUMNS:
+            assert f"games.{heavy}" in sql
+
+    def test_row_to_game(self):
+        game_id = uuid4()
+        row = SimpleNamespace(_mapping={"id": game_id, "name": "Catan", "bgg_rank": 500, "minage": 10})
+        game = row_to_game(row)
+        assert game.id == game_id
+        assert game.name == "Catan"
+        assert game.bgg_rank == 500
+        assert game.usersrated is None
@@ -0,0 +1,166 @@
+"""
+Tests for SQL statement counting and statement budgets
+"""
+import asyncio
+import os
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from backend.app.infrastructure.query_counter import (
+    QueryCounterMiddleware,
+    assert_statement_budget,
+    count_queries,
+)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+    yield engine
+    engine.dispose()
+
+
+def _get(app, path):
+    async def _request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path)
+
+    return asyncio.run(_request())
+
+
+def _select(engine, times=1):
+    with engine.connect() as conn:
+        for _ in range(times):
+            conn.execute(text("SELECT * FROM items")).all()
+
+
+class TestQueryCounter:
+    """Test statement counting via engine events"""
+
+    def test_counts_statements(self, engine):
+        with count_queries() as stats:
+            _select(engine, times=3)
+        assert stats.statements == 3
+        assert stats.duration_ms >= 0
+
+    def test_nothing_counted_outside_block(self, engine):
+        with count_queries() as stats:
+            pass
+        _select(engine)
+        assert stats.statements == 0
+
+    def test_nested_counters(self, engine):
+        with count_queries() as outer:
+            _select(engine)
+            with count_queries() as inner:
+                _select(engine, times=2)
+        assert inner.statements == 2
+        assert outer.statements == 3
+
+    def test_budget_exceeded(self, engine):
+        with pytest.raises(AssertionError, match="at most 1 SQL statements, got 2"):
+            with assert_statement_budget(1):
+                _select(engine, times=2)
+
+    def test_budget_ok(self, engine):
+        with assert_statement_budget(2) as stats:
+            _select(engine, times=2)
+        assert len(stats.sql) == 2
+
+    def test_middleware_headers(self, engine):
+        app = FastAPI()
+        app.add_middleware(QueryCounterMiddleware)
+
+        @app.get("/sync")
+        def sync_endpoint():
+            # Синхронный эндпоинт выполняется в пуле потоков
+            _select(engine, times=2)
+            return {"ok": True}
+
+        @app.get("/async")
+        async def async_endpoint():
+            _select(engine)
+            return {"ok": True}
+
+        assert _get(app, "/sync").headers["x-db-statements"] == "2"
+        response = _get(app, "/async")
+        assert response.headers["x-db-statements"] == "1"
+        assert float(response.headers["x-db-time-ms"]) >= 0
+
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "")
+
+
+@pytest.mark.skipif(
+    not TEST_DATABASE_URL.startswith("postgresql"),
+    reason="TEST_DATABASE_URL with PostgreSQL is required for endpoint budgets",
+)
+class TestEndpointStatementBudgets:
+    """Key read endpoints must not grow N+1 queries"""
+
+    @pytest.fixture
+    def app(self):
+        # Роутеры импортируют модули как app.*, поэтому и зависимость берём оттуда
+        from sqlalchemy.orm import Session
+        from app.api.routes import router
+        from app.infrastructure.db import Base, get_db
+        from app.infrastructure.models import GameModel, RatingModel, UserModel
+        from app.infrastructure.repositories import user_games_cache
+
+        engine = create_engine(TEST_DATABASE_URL)
+        conn = engine.connect()
+        trans = conn.begin()
+        Base.metadata.create_all(bind=conn)
+        session = Session(bind=conn, join_transaction_mode="create_savepoint")
+
+        user = UserModel(name="Алиса", telegram_id=777)
+        session.add(user)
+        for i in range(30):
+            game = GameModel(name=f"Budget Game {i}", bgg_id=1000 + i)
+            session.add(game)
+            session.flush()
+            session.add(RatingModel(user_id=user.id, game_id=game.id, rank=i % 50 + 1))
+        session.flush()
+        user_games_cache.clear()
+
+        app = FastAPI()
+        app.include_router(router, prefix="/api")
+
+        def override_get_db():
+            yield session
+
+        app.dependency_overrides[get_db] = override_get_db
+        yield app
+
+        session.close()
+        trans.rollback()
+        conn.close()
+        engine.dispose()
+
+    def test_user_exists(self, app):
+        with assert_statement_budget(1):
+            assert _get(app, "/api/users/777").status_code == 200
+
+    def test_user_games(self, app):
+        with assert_statement_budget(2):
+            response = _get(app, "/api/users/777/games")
+        assert len(response.json()["games"]) == 30
+
+        # Повторный запрос обслуживается из кэша: только поиск пользователя
+        with assert_statement_budget(1):
+            _get(app, "/api/users/777/games")
+
+    def test_leaderboard(self, app):
+        from app.services.leaderboard import group_leaderboard
+
+        group_leaderboard.invalidate()
+        with assert_statement_budget(2):
+            response = _get(app, "/api/leaderboard?limit=10")
+        assert len(response.json()["games"]) == 10
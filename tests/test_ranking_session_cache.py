@@ -0,0 +1,185 @@
+"""
+Tests for the per-worker ranking session cache with version-checked writes
+"""
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from backend.app.domain.models import Game
+from backend.app.services import ranking_sessions
+from backend.app.services.ranking_sessions import (
+    RankingSessionState,
+    apply_answer,
+    get_session_state,
+    ranking_session_cache,
+)
+
+GAMES = {i: Game(id=i, name=f"Game {i}") for i in (1, 2, 3)}
+
+
+def _session_row(version=1, **overrides):
+    values = dict(
+        id=10,
+        version=version,
+        games=[1, 2, 3],
+        state="first_tier",
+        first_tiers={},
+        second_tiers={},
+        candidate_ids=None,
+        final_order=None,
+        current_index_first=0,
+        current_index_second=0,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def _cache(version=1, **overrides):
+    state = RankingSessionState.from_model(_session_row(version, **overrides), dict(GAMES))
+    ranking_session_cache.set(state.id, state)
+    return state
+
+
+def _db(rowcounts=(1,)):
+    db = MagicMock()
+    db.execute.side_effect = [MagicMock(rowcount=count) for count in rowcounts]
+    return db
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def answer(game_id, tier):
+    """Упрощённый шаг ранжирования: записать ответ и сдвинуть указатель"""
+
+    def step(session):
+        if session.state != "first_tier":
+            raise ValueError("wrong state")
+        tiers = dict(session.first_tiers)
+        tiers[str(game_id)] = tier
+        session.first_tiers = tiers
+        session.current_index_first = len(tiers)
+        if len(tiers) == len(session.games):
+            session.state = "final"
+        return {"answered": len(tiers), "game": session.projections[game_id].name}
+
+    return step
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    ranking_session_cache.clear()
+    yield
+    ranking_session_cache.clear()
+
+
+class TestRankingSessionCache:
+    """Answers are served from the cache and written with one UPDATE"""
+
+    def test_cached_answer_makes_no_reads(self):
+        _cache()
+        db = _db()
+
+        result = apply_answer(db, 10, answer(1, "good"))
+
+        assert result == {"answered": 1, "game": "Game 1"}
+        db.get.assert_not_called()
+        db.query.assert_not_called()
+        assert db.execute.call_count == 1
+
+        sql = _sql(db.execute.call_args.args[0])
+        assert sql.startswith("UPDATE ranking_sessions SET")
+        assert "WHERE ranking_sessions.id = " in sql and "ranking_sessions.version = " in sql
+        assert "first_tiers=" in sql and "current_index_first=" in sql and "version=" in sql
+        for untouched in ("state=", "second_tiers=", "candidate_ids=", "games="):
+            assert untouched not in sql
+
+        cached = ranking_session_cache.get(10)
+        assert cached.version == 2
+        assert cached.first_tiers == {"1": "good"}
+
+    def test_cache_miss_loads_session_and_games_once(self):
+        db = _db(rowcounts=(1, 1))
+        db.get.return_value = _session_row()
+
+        with patch.object(ranking_sessions, "load_games", return_value=dict(GAMES)) as load_games:
+            apply_answer(db, 10, answer(1, "good"))
+            apply_answer(db, 10, answer(2, "bad"))
+
+        assert db.get.call_count == 1
+        assert load_games.call_count == 1
+        assert ranking_session_cache.get(10).version == 3
+
+    def test_version_conflict_reloads_and_retries(self):
+        _cache(version=1)
+        db = _db(rowcounts=(0, 1))
+        # Другой воркер уже записал ответ на первую игру
+        db.get.return_value = _session_row(version=2, first_tiers={"1": "bad"}, current_index_first=1)
+
+        with patch.object(ranking_sessions, "load_games") as load_games:
+            result = apply_answer(db, 10, answer(2, "good"))
+
+        assert db.get.call_args.kwargs["populate_existing"] is True
+        load_games.assert_not_called()  # игры сессии те же — берутся из прежнего снимка
+        assert result["answered"] == 2
+        cached = ranking_session_cache.get(10)
+        assert cached.version == 3
+        assert cached.first_tiers == {"1": "bad", "2": "good"}
+
+    def test_repeated_conflict_raises(self):
+        _cache(version=1)
+        db = _db(rowcounts=(0, 0))
+        db.get.return_value = _session_row(version=2)
+
+        with pytest.raises(ValueError):
+            apply_answer(db, 10, answer(1, "good"))
+
+        assert ranking_session_cache.get(10) is None
+
+    def test_deleted_session_raises_and_is_evicted(self):
+        _cache()
+        db = _db(rowcounts=(0,))
+        db.get.return_value = None
+
+        with pytest.raises(ValueError):
+            apply_answer(db, 10, answer(1, "good"))
+
+        assert ranking_session_cache.get(10) is None
+
+    def test_failed_step_leaves_cache_untouched(self):
+        cached = _cache(state="second_tier")
+        db = _db()
+
+        with pytest.raises(ValueError):
+            apply_answer(db, 10, answer(1, "good"))
+
+        db.execute.assert_not_called()
+        assert ranking_session_cache.get(10) is cached
+        assert cached.version == 1
+
+    def test_final_session_is_evicted(self):
+        _cache(first_tiers={"1": "good", "2": "good"})
+        db = _db()
+
+        apply_answer(db, 10, answer(3, "good"))
+
+        assert "state=" in _sql(db.execute.call_args.args[0])
+        assert ranking_session_cache.get(10) is None
+
+    def test_cache_is_bounded_by_idle_ttl(self):
+        _cache()
+        with patch.object(ranking_session_cache, "ttl", 0.0), patch("time.monotonic", return_value=1e12):
+            db = MagicMock()
+            db.get.return_value = _session_row()
+            with patch.object(ranking_sessions, "load_games", return_value=dict(GAMES)):
+                get_session_state(db, 10)
+        db.get.assert_called_once()
+
+    def test_cache_metrics(self):
+        _cache()
+        ranking_session_cache.get(10)
+        assert "cache_hits_total" in "\n".join(ranking_sessions.CACHE_HITS.render())
+        assert 'cache="ranking_sessions"' in "\n".join(ranking_sessions.CACHE_HITS.render())
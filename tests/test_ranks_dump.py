@@ -0,0 +1,151 @@
+"""
+Tests for seeding game ranks from a BGG ranks dump
+"""
+import asyncio
+import io
+import zipfile
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from backend.app.api import clear_database
+from backend.app.infrastructure import ranks_dump, repositories
+from backend.app.infrastructure.models import GameModel
+
+DUMP = (
+    "id,name,yearpublished,rank,bayesaverage,average,usersrated,is_expansion,abstracts_rank\n"
+    "224517,Brass: Birmingham,2018,1,8.40,8.58,48000,0,\n"
+    "161936,Pandemic Legacy: Season 1,2015,2,8.36,8.52,53000,0,\n"
+    "999,Unranked Thing,0,0,0,5.5,12,0,\n"
+    "bad,Broken Row,2020,3,7.0,7.0,10,0,\n"
+)
+
+
+class TestParsing:
+    """The dump is read as a stream of typed chunks"""
+
+    def test_rows_are_typed_and_chunked(self):
+        chunks = list(ranks_dump.iter_rank_chunks(io.StringIO(DUMP), chunk_size=2))
+
+        assert [len(chunk) for chunk in chunks] == [2, 1]
+        assert chunks[0][0] == (224517, 1, 2018, 8.40, 8.58, 48000)
+        # Нулевые ранг, год и средняя Байеса означают «нет значения»
+        assert chunks[1][0] == (999, None, None, None, 5.5, 12)
+
+    def test_missing_columns_rejected(self):
+        with pytest.raises(ValueError, match="missing columns"):
+            list(ranks_dump.iter_rank_chunks(io.StringIO("objectid,name\n1,Foo\n")))
+
+    def test_zip_archive(self, tmp_path):
+        path = tmp_path / "boardgames_ranks.zip"
+        with zipfile.ZipFile(path, "w") as archive:
+            archive.writestr("boardgames_ranks.csv", "﻿" + DUMP)
+
+        with ranks_dump.open_ranks_dump(path) as file:
+            rows = [row for chunk in ranks_dump.iter_rank_chunks(file) for row in chunk]
+
+        assert [row[0] for row in rows] == [224517, 161936, 999]
+
+
+def _session(cursor):
+    session = MagicMock()
+    session.connection.return_value.connection.cursor.return_value = cursor
+    session.execute.return_value.rowcount = 2
+    return session
+
+
+class TestIngest:
+    """Chunks go to a temp table, then one UPDATE touches existing games"""
+
+    def test_copy_and_single_update(self):
+        cursor = MagicMock()
+        session = _session(cursor)
+
+        with patch.object(ranks_dump, "user_games_cache") as cache, \
+             patch.object(ranks_dump, "game_index") as index:
+            result = ranks_dump.ingest_ranks_dump(session, io.StringIO(DUMP), chunk_size=2)
+
+        assert result == {"rows": 3, "games_updated": 2}
+        assert cursor.copy_expert.call_count == 2
+        sql, buffer = cursor.copy_expert.call_args_list[0].args
+        assert sql.startswith("COPY bgg_ranks_import")
+        assert buffer.getvalue().splitlines()[0] == "224517,1,2018,8.4,8.58,48000"
+
+        statements = [str(call.args[0]) for call in session.execute.call_args_list]
+        assert "CREATE TEMPORARY TABLE" in statements[0]
+        assert sum("UPDATE games" in sql for sql in statements) == 1
+        assert "ranks_updated_at = now()" in statements[-1]
+        session.commit.assert_called_once()
+        cache.clear.assert_called_once()
+        index.invalidate.assert_called_once()
+
+    def test_insert_fallback_without_copy(self):
+        cursor = MagicMock(spec=["close"])
+        session = _session(cursor)
+
+        with patch.object(ranks_dump, "user_games_cache"), patch.object(ranks_dump, "game_index"):
+            ranks_dump.ingest_ranks_dump(session, io.StringIO(DUMP))
+
+        inserts = [call for call in session.execute.call_args_list if "INSERT INTO" in str(call.args[0])]
+        assert len(inserts) == 1
+        params = inserts[0].args[1]
+        assert params[1] == {
+            "bgg_id": 161936, "bgg_rank": 2, "yearpublished": 2015,
+            "bayesaverage": 8.36, "average": 8.52, "usersrated": 53000,
+        }
+        cursor.close.assert_called_once()
+
+
+class TestFreshness:
+    """The dump refreshes ranks only; full metadata staleness follows updated_at"""
+
+    def _game(self, updated_days_ago, ranks_days_ago=None):
+        now = datetime.now(timezone.utc)
+        return GameModel(
+            name="Brass: Birmingham",
+            bgg_id=224517,
+            updated_at=now - timedelta(days=updated_days_ago),
+            ranks_updated_at=None if ranks_days_ago is None else now - timedelta(days=ranks_days_ago),
+        )
+
+    def test_recent_ranks_dump_does_not_keep_metadata_fresh(self):
+        assert repositories._should_update_game(self._game(90, ranks_days_ago=1), False) is True
+        assert repositories._should_update_game(self._game(1, ranks_days_ago=1), False) is False
+
+    def test_ranks_fresh(self):
+        now = datetime.now(timezone.utc)
+        assert repositories._ranks_fresh(self._game(90, ranks_days_ago=1), now) is True
+        assert repositories._ranks_fresh(self._game(90, ranks_days_ago=60), now) is False
+        assert repositories._ranks_fresh(self._game(90), now) is False
+
+    def test_stale_without_dump(self):
+        assert repositories._should_update_game(self._game(90), False) is True
+        assert repositories._should_update_game(self._game(90, ranks_days_ago=60), False) is True
+
+    def test_forced_update_ignores_dump(self):
+        assert repositories._should_update_game(self._game(90, ranks_days_ago=1), True) is True
+
+
+class TestInvalidateCaches:
+    """The running API drops its game caches on request after a dump ingest"""
+
+    def test_endpoint_clears_caches(self):
+        app = FastAPI()
+        app.include_router(clear_database.router, prefix="/api")
+
+        async def _request():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post("/api/invalidate-caches")
+
+        with patch.object(clear_database, "user_games_cache") as cache, \
+             patch.object(clear_database, "game_index") as index:
+            response = asyncio.run(_request())
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "ok"
+        cache.clear.assert_called_once()
+        index.invalidate.assert_called_once()
@@ -1,6 +1,8 @@
 """
 Unit tests for repository functions
 """
+from unittest.mock import MagicMock
+
 import pytest
 
 from backend.app.infrastructure.repositories import save_game_from_bgg_data
@@ -99,4 +101,49 @@ class TestGameRepository:
         }
 
         with pytest.raises(ValueError):
-            save_game_from_bgg_data(test_db, invalid_data)
\ No newline at end of file
+            save_game_from_bgg_data(test_db, invalid_data)
+
+
+def _lookup_session(*results):
+    """Сессия, отвечающая на последовательные .one_or_none() заданными объектами"""
+    session = MagicMock()
+    session.query.return_value.filter.return_value.one_or_none.side_effect = list(results)
+    return session
+
+
+class TestSaveGameNameConflicts:
+    """BGG save must reuse a sheet row stored under the same Russian name"""
+
+    def test_sheet_row_first_then_bgg_save_under_russian_name(self, sample_bgg_response):
+        # Игра из таблицы без bgg_id, записанная под русским названием
+        sheet_game = GameModel(name="Тестовая игра")
+        session = _lookup_session(None, None, sheet_game)
+        bgg_data = dict(sample_bgg_response, name_ru="Тестовая игра")
+
+        game = save_game_from_bgg_data(session, bgg_data)
+
+        assert game is sheet_game
+        assert game.name == "Тестовая игра"
+        assert game.bgg_id == 12345
+        session.add.assert_not_called()
+
+    def test_user_query_row_is_reused(self, sample_bgg_response):
+        sheet_game = GameModel(name="Моя любимая игра")
+        session = _lookup_session(None, None, sheet_game)
+
+        game = save_game_from_bgg_data(session, sample_bgg_response, "Моя любимая игра")
+
+        assert game is sheet_game
+        assert game.bgg_id == 12345
+
+    def test_russian_name_taken_by_other_bgg_game(self, sample_bgg_response):
+        other_game = GameModel(name="Тестовая игра", bgg_id=999)
+        session = _lookup_session(None, None, other_game)
+        bgg_data = dict(sample_bgg_response, name_ru="Тестовая игра")
+
+        game = save_game_from_bgg_data(session, bgg_data)
+
+        assert game is not other_game
+        assert game.name == "Test Game"
+        assert other_game.bgg_id == 999
+        session.add.assert_called_once_with(game)
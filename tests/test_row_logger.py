@@ -0,0 +1,31 @@
+"""
+Tests for the sampled per-row debug logger
+"""
+import logging
+
+from backend.app.utils.logging import get_row_logger
+
+
+class TestRowLogger:
+    """Per-row details are logged only for sampled rows at DEBUG"""
+
+    def test_samples_every_nth_row(self, caplog):
+        row_logger = get_row_logger("tests.import", every=3)
+        with caplog.at_level(logging.DEBUG, logger="tests.import.rows"):
+            for idx in range(1, 8):
+                row_logger.debug(idx, "row %s", idx)
+
+        assert [r.getMessage() for r in caplog.records] == ["row 1", "row 4", "row 7"]
+        assert {r.name for r in caplog.records} == {"tests.import.rows"}
+
+    def test_disabled_above_debug(self, caplog):
+        row_logger = get_row_logger("tests.import", every=1)
+        with caplog.at_level(logging.INFO, logger="tests.import.rows"):
+            assert not row_logger.enabled(1)
+            row_logger.debug(1, "row %s", 1)
+        assert caplog.records == []
+
+    def test_zero_disables_channel(self, caplog):
+        row_logger = get_row_logger("tests.import", every=0)
+        with caplog.at_level(logging.DEBUG, logger="tests.import.rows"):
+            assert not row_logger.enabled(1)
@@ -0,0 +1,130 @@
+"""
+Tests for single-flight coalescing of identical in-flight calls
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from backend.app.utils.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """Concurrent callers with one key share one call"""
+
+    def _slow(self, calls, result, delay=0.1):
+        def fn(*args):
+            calls.append(args)
+            time.sleep(delay)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return fn
+
+    def test_concurrent_calls_share_result(self):
+        flight = SingleFlight("test")
+        calls = []
+        fn = self._slow(calls, [{"id": 1}])
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(lambda _: flight.do("catan", fn, "catan"), range(5)))
+
+        assert calls == [("catan",)]
+        assert results == [[{"id": 1}]] * 5
+        # Каждый получил свою копию — изменения не видны другим
+        results[0].append("changed")
+        assert results[1] == [{"id": 1}]
+        assert flight.in_flight() == 0
+
+    def test_different_keys_not_shared(self):
+        flight = SingleFlight("test")
+        calls = []
+        fn = self._slow(calls, "ok", delay=0.05)
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(lambda key: flight.do(key, fn, key), ["a", "b"]))
+
+        assert sorted(calls) == [("a",), ("b",)]
+
+    def test_error_shared_and_not_cached(self):
+        flight = SingleFlight("test")
+        calls = []
+        fn = self._slow(calls, RuntimeError("BGG down"))
+
+        def call(_):
+            with pytest.raises(RuntimeError, match="BGG down"):
+                flight.do("key", fn)
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            list(pool.map(call, range(3)))
+        assert len(calls) == 1
+
+        flight.do("key", lambda: "recovered")
+        assert flight.do("key", lambda: "again") == "again"
+
+    def test_async_and_sync_callers_share_call(self):
+        from starlette.concurrency import run_in_threadpool
+
+        flight = SingleFlight("test")
+        calls = []
+        started = threading.Event()
+
+        def fn():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return 42
+
+        sync_result = []
+        thread = threading.Thread(target=lambda: sync_result.append(flight.do("id", fn)))
+        thread.start()
+        started.wait()
+
+        async def api_path():
+            return await asyncio.gather(*(run_in_threadpool(flight.do, "id", fn) for _ in range(3)))
+
+        assert asyncio.run(api_path()) == [42, 42, 42]
+        thread.join()
+        assert sync_result == [42]
+        assert len(calls) == 1
+
+
+class TestBggSingleFlight:
+    """BGG lookups are keyed by normalized query and by id"""
+
+    def test_search_key_normalized(self):
+        from backend.app.services import bgg
+
+        calls = []
+
+        def fake_search(name, exact, **kwargs):
+            calls.append(name)
+            time.sleep(0.1)
+            return [{"id": 13, "name": "Catan"}]
+
+        with patch.object(bgg, "_search_boardgame", fake_search):
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                results = list(pool.map(bgg.search_boardgame, ["Catan", "  catan ", "CATAN"]))
+
+        assert len(calls) == 1
+        assert all(r == [{"id": 13, "name": "Catan"}] for r in results)
+
+    def test_details_keyed_by_id(self):
+        from backend.app.services import bgg
+
+        calls = []
+
+        def fake_details(game_id, **kwargs):
+            calls.append(game_id)
+            time.sleep(0.1)
+            return {"id": int(game_id)}
+
+        with patch.object(bgg, "_get_boardgame_details", fake_details):
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                results = list(pool.map(bgg.get_boardgame_details, [13, "13", 822]))
+
+        assert sorted(map(str, calls)) == ["13", "822"]
+        assert results[0] == results[1] == {"id": 13}
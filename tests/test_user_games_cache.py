@@ -0,0 +1,80 @@
+"""
+Unit tests for the LRU cache and the per-user games cache
+"""
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from backend.app.utils.cache import LRUCache
+
+
+class TestLRUCache:
+    """Test LRU eviction, TTL and counters"""
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1  # "a" становится самым свежим
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_ttl_expiration(self):
+        cache = LRUCache(maxsize=10, ttl=5)
+        with patch("backend.app.utils.cache.time.monotonic", return_value=100.0):
+            cache.set("key", "value")
+        with patch("backend.app.utils.cache.time.monotonic", return_value=104.0):
+            assert cache.get("key") == "value"
+        with patch("backend.app.utils.cache.time.monotonic", return_value=106.0):
+            assert cache.get("key") is None
+        assert len(cache) == 0
+
+    def test_hit_miss_counters_and_invalidate(self):
+        cache = LRUCache(maxsize=10)
+        cache.set("key", [1])
+        cache.get("key")
+        cache.invalidate("key")
+        cache.get("key")
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+
+class TestUserGamesCache:
+    """Test caching of get_user_games_with_bgg_links"""
+
+    def _session(self, rows):
+        session = MagicMock()
+        query = session.query.return_value
+        query.join.return_value.filter.return_value.order_by.return_value.all.return_value = rows
+        return session
+
+    def test_second_call_served_from_cache(self):
+        from backend.app.infrastructure import repositories
+
+        repositories.user_games_cache.clear()
+        user_id = str(uuid4())
+        row = MagicMock(id=uuid4(), bgg_id=13, bgg_rank=100, yearpublished=1995)
+        row.name = "Catan"
+        session = self._session([row])
+
+        first = repositories.get_user_games_with_bgg_links(session, user_id)
+        second = repositories.get_user_games_with_bgg_links(session, user_id)
+
+        assert first == second
+        assert first[0]["bgg_url"] == "https://boardgamegeek.com/boardgame/13"
+        assert session.query.call_count == 1
+
+    def test_rating_change_invalidates_user(self):
+        from backend.app.infrastructure import repositories
+
+        repositories.user_games_cache.clear()
+        user_id = uuid4()
+        session = self._session([])
+
+        repositories.get_user_games_with_bgg_links(session, str(user_id))
+        repositories._notify_ratings_changed([(user_id, uuid4(), 5)])
+        repositories.get_user_games_with_bgg_links(session, str(user_id))
+
+        assert session.query.call_count == 2
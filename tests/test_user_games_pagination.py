@@ -0,0 +1,107 @@
+"""
+Tests for keyset pagination of a user's games
+"""
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from backend.app.infrastructure import repositories
+from backend.app.infrastructure.repositories import _slice_user_games, get_user_games_page, user_games_page_query
+
+
+def _sql(query) -> str:
+    return str(query.statement.compile(dialect=postgresql.dialect())).replace("\n", " ")
+
+
+def _row(name):
+    row = MagicMock(id=uuid4(), bgg_id=13, bgg_rank=100, yearpublished=1995)
+    row.name = name
+    return row
+
+
+class TestUserGamesPageQuery:
+    """Keyset SQL: no OFFSET, cursor resolved by a subquery"""
+
+    def test_first_page(self):
+        sql = _sql(user_games_page_query(Session(), str(uuid4()), 20))
+        assert "ORDER BY games.name, games.id" in sql
+        assert "LIMIT" in sql
+        assert "OFFSET" not in sql
+
+    def test_after_cursor(self):
+        sql = _sql(user_games_page_query(Session(), str(uuid4()), 20, after=str(uuid4())))
+        assert "games.name > (SELECT games_1.name" in sql
+        assert "games.id > " in sql
+        assert "ORDER BY games.name, games.id" in sql
+
+    def test_before_cursor_reversed(self):
+        sql = _sql(user_games_page_query(Session(), str(uuid4()), 20, before=str(uuid4())))
+        assert "games.name < (SELECT games_1.name" in sql
+        assert "ORDER BY games.name DESC, games.id DESC" in sql
+
+
+class TestUserGamesPage:
+    """Page assembly from the DB and from the cached full list"""
+
+    def setup_method(self):
+        repositories.user_games_cache.clear()
+        self.user_id = str(uuid4())
+
+    def _page(self, rows, total=5, **kwargs):
+        session = MagicMock()
+        session.query.return_value.join.return_value.filter.return_value.scalar.return_value = total
+        with patch.object(repositories, "user_games_page_query") as page_query:
+            page_query.return_value.all.return_value = rows
+            return get_user_games_page(session, self.user_id, 2, **kwargs), session
+
+    def test_first_page_has_next(self):
+        rows = [_row("A"), _row("B"), _row("C")]
+        page, _ = self._page(rows)
+        assert [g["name"] for g in page["games"]] == ["A", "B"]
+        assert page["total"] == 5
+        assert page["next_cursor"] == str(rows[1].id)
+        assert page["prev_cursor"] is None
+
+    def test_before_page_restores_order(self):
+        rows = [_row("D"), _row("C"), _row("B")]  # запрос before отдаёт строки по убыванию
+        page, _ = self._page(rows, before=str(uuid4()))
+        assert [g["name"] for g in page["games"]] == ["C", "D"]
+        assert page["prev_cursor"] == str(rows[1].id)
+        assert page["next_cursor"] == str(rows[0].id)
+
+    def test_last_page(self):
+        rows = [_row("E")]
+        page, _ = self._page(rows, after=str(uuid4()))
+        assert page["next_cursor"] is None
+        assert page["prev_cursor"] == str(rows[0].id)
+
+    def test_total_is_cached(self):
+        _, session = self._page([_row("A")])
+        _, second_session = self._page([_row("A")])
+        assert session.query.call_count == 1
+        assert second_session.query.call_count == 0
+
+        repositories._notify_ratings_changed([(self.user_id, uuid4(), 5)])
+        _, third_session = self._page([_row("A")])
+        assert third_session.query.call_count == 1
+
+    def test_served_from_cached_list_without_queries(self):
+        games = [{"id": str(i), "name": name} for i, name in enumerate("ABCDE")]
+        repositories.user_games_cache.set(self.user_id, games)
+        session = MagicMock()
+
+        page = get_user_games_page(session, self.user_id, 2, after="1")
+        assert [g["name"] for g in page["games"]] == ["C", "D"]
+        assert (page["prev_cursor"], page["next_cursor"]) == ("2", "3")
+        assert page["total"] == 5
+        session.query.assert_not_called()
+
+    def test_slice_matches_keyset_semantics(self):
+        games = [{"id": str(i)} for i in range(5)]
+        assert _slice_user_games(games, 2, None, None) == (games[:2], False, True)
+        assert _slice_user_games(games, 2, "3", None) == (games[4:], True, False)
+        assert _slice_user_games(games, 2, None, "2") == (games[:2], False, True)
+        assert _slice_user_games(games, 2, None, "4") == (games[2:4], True, True)
+        assert _slice_user_games(games, 2, "missing", None) == ([], False, False)